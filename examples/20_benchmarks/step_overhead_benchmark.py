@@ -0,0 +1,106 @@
+"""
+Per-step framework overhead benchmark.
+
+Runs pipelines made of hundreds of no-op steps and reports how much time
+the framework spends per step on top of the step body itself (best of
+several repeats).
+"""
+
+import asyncio
+import time
+
+from wpipe import Condition, For, Pipeline, PipelineAsync, step
+
+STEPS = 300
+RUNS = 50
+REPEATS = 5
+
+
+@step(name="noop", retry_count=1, retry_delay=0)
+def noop(context):
+    return None
+
+
+async def noop_async(context):
+    return None
+
+
+def _build_steps():
+    """Build a mixed list of plain, decorated, tuple and block steps."""
+    steps = []
+    for i in range(STEPS):
+        if i % 3 == 0:
+            steps.append(noop)
+        elif i % 3 == 1:
+            steps.append((lambda c: None, f"tuple_{i}", "v1.0"))
+        else:
+            steps.append(lambda c: None)
+    steps.append(Condition("True", branch_true=[noop]))
+    steps.append(For(iterations=5, steps=[noop]))
+    return steps
+
+
+def _raw_cost(calls: int) -> float:
+    """Time spent calling the step bodies directly."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        noop({})
+    return time.perf_counter() - start
+
+
+def benchmark_sync():
+    """Benchmark per-step overhead of Pipeline."""
+    print("\n📊 SYNC PER-STEP OVERHEAD")
+    print("-" * 50)
+
+    p = Pipeline(show_progress=False)
+    p.set_steps(_build_steps())
+    p.run({})
+
+    elapsed = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            p.run({})
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    calls = RUNS * (STEPS + 6)
+    overhead = (elapsed - _raw_cost(calls)) / calls
+    print(f"{STEPS}-step pipeline ({RUNS} runs): {elapsed:.3f}s")
+    print(f"✓ Per-step overhead: {overhead * 1e6:.2f}µs")
+
+
+def benchmark_async():
+    """Benchmark per-step overhead of PipelineAsync."""
+    print("\n📊 ASYNC PER-STEP OVERHEAD")
+    print("-" * 50)
+
+    p = PipelineAsync(show_progress=False)
+    p.set_steps([noop_async] * STEPS)
+
+    async def _runs():
+        for _ in range(RUNS):
+            await p.run({})
+
+    asyncio.run(p.run({}))
+    elapsed = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        asyncio.run(_runs())
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    print(f"{STEPS}-step async pipeline ({RUNS} runs): {elapsed:.3f}s")
+    print(f"✓ Per-step overhead: {elapsed / (RUNS * STEPS) * 1e6:.2f}µs")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 50)
+    print("STEP OVERHEAD BENCHMARKS")
+    print("=" * 50)
+
+    benchmark_sync()
+    benchmark_async()
+
+    print("\n" + "=" * 50)
+    print("✓ All benchmarks complete")
+    print("=" * 50 + "\n")
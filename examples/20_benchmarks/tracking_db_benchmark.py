@@ -0,0 +1,130 @@
+"""
+Benchmark of tracking database queries before and after the schema migrations.
+
+Builds a synthetic tracking database (by default 200k pipelines with 10
+steps each, i.e. 2M step rows), times the hot-path lookups of the tracker
+and the dashboard, applies the migrations and times them again:
+
+    python examples/20_benchmarks/tracking_db_benchmark.py --pipelines 200000 --db /tmp/bench.db
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from wsqlite import WSQLite
+
+from wpipe.tracking.migrations import migrate
+from wpipe.tracking.tracker import alerts_fired, events, pipelines, step_history, steps, system_metrics
+
+NAMES = [f"pipeline_{i}" for i in range(50)]
+STEP_NAMES = [f"step_{i}" for i in range(200)]
+
+# Lookups issued by QueryManager, AnalysisManager, AlertManager and the dashboard
+QUERIES = {
+    "pipelines page": "SELECT id, name, status FROM pipelines ORDER BY started_at DESC, id DESC LIMIT 50",
+    "executions by name": (
+        "SELECT id, status FROM pipelines WHERE name = 'pipeline_7' "
+        "ORDER BY started_at DESC, id DESC LIMIT 100"
+    ),
+    "steps of a pipeline": "SELECT * FROM steps WHERE pipeline_id = ? ORDER BY step_order",
+    "events of a pipeline": "SELECT * FROM events WHERE pipeline_id = ? ORDER BY created_at DESC LIMIT 50",
+    "metrics of a pipeline": "SELECT * FROM system_metrics WHERE pipeline_id = ? ORDER BY recorded_at",
+    "step duration": (
+        "SELECT AVG(duration_ms) FROM step_history WHERE step_name = 'step_42' AND status = 'completed'"
+    ),
+    "error rate seed": (
+        "SELECT status, completed_at FROM pipelines WHERE status IN ('completed', 'error') "
+        "AND completed_at IS NOT NULL ORDER BY completed_at DESC LIMIT 100"
+    ),
+}
+
+
+def build(path: str, n_pipelines: int, steps_per_pipeline: int) -> None:
+    """Create the tracking tables and fill them with synthetic rows."""
+    for model in (pipelines, steps, step_history, events, system_metrics, alerts_fired):
+        WSQLite(model, path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    rng = random.Random(0)
+    start = datetime(2025, 1, 1)
+    batch = 5000
+    for first in range(0, n_pipelines, batch):
+        p_rows, s_rows, h_rows, e_rows, m_rows = [], [], [], [], []
+        for i in range(first, min(first + batch, n_pipelines)):
+            pid = f"PIPE-{i:08X}"
+            started = start + timedelta(seconds=i * 30)
+            status = "error" if rng.random() < 0.05 else "completed"
+            p_rows.append((pid, rng.choice(NAMES), status, started.isoformat(),
+                           (started + timedelta(seconds=20)).isoformat(), 20000.0))
+            for order in range(steps_per_pipeline):
+                name = rng.choice(STEP_NAMES)
+                duration = rng.expovariate(1 / 200)
+                s_rows.append((pid, order, name, "completed", started.isoformat(), duration))
+                h_rows.append((pid, name, duration, "completed"))
+            e_rows.append((pid, "info", "done"))
+            m_rows.append((pid, 10.0, started.isoformat()))
+        conn.executemany(
+            "INSERT INTO pipelines (id, name, status, started_at, completed_at, total_duration_ms) "
+            "VALUES (?, ?, ?, ?, ?, ?)", p_rows)
+        conn.executemany(
+            "INSERT INTO steps (pipeline_id, step_order, step_name, status, started_at, duration_ms) "
+            "VALUES (?, ?, ?, ?, ?, ?)", s_rows)
+        conn.executemany(
+            "INSERT INTO step_history (pipeline_id, step_name, duration_ms, status) VALUES (?, ?, ?, ?)", h_rows)
+        conn.executemany("INSERT INTO events (pipeline_id, event_type, event_name) VALUES (?, ?, ?)", e_rows)
+        conn.executemany(
+            "INSERT INTO system_metrics (pipeline_id, cpu_percent, recorded_at) VALUES (?, ?, ?)", m_rows)
+        conn.commit()
+    conn.close()
+
+
+def measure(conn: sqlite3.Connection, n_pipelines: int, repeat: int) -> dict:
+    """Median latency in milliseconds of each query."""
+    rng = random.Random(1)
+    result = {}
+    for label, query in QUERIES.items():
+        times = []
+        for _ in range(repeat):
+            params = (f"PIPE-{rng.randrange(n_pipelines):08X}",) if "?" in query else ()
+            begin = time.perf_counter()
+            conn.execute(query, params).fetchall()
+            times.append((time.perf_counter() - begin) * 1000)
+        result[label] = sorted(times)[len(times) // 2]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tracking database index benchmark")
+    parser.add_argument("--db", default="tracking_bench.db", help="Path of the synthetic database")
+    parser.add_argument("--pipelines", type=int, default=200000, help="Number of pipelines")
+    parser.add_argument("--steps", type=int, default=10, help="Steps per pipeline")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    begin = time.perf_counter()
+    build(args.db, args.pipelines, args.steps)
+    print(f"Built {args.pipelines} pipelines / {args.pipelines * args.steps} steps "
+          f"in {time.perf_counter() - begin:.1f}s")
+
+    conn = sqlite3.connect(args.db)
+    before = measure(conn, args.pipelines, args.repeat)
+    begin = time.perf_counter()
+    migrate(conn)
+    print(f"Migrations applied in {time.perf_counter() - begin:.1f}s")
+    after = measure(conn, args.pipelines, args.repeat)
+    conn.close()
+
+    print(f"{'query':<24}{'before ms':>12}{'after ms':>12}")
+    for label in QUERIES:
+        print(f"{label:<24}{before[label]:>12.2f}{after[label]:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+import pytest
+
+from wpipe.tracking.tracker import PipelineTracker
+
+
+@pytest.fixture
+def make_tracker(tmp_path):
+    """Build trackers on the test's own database, with any tracker options."""
+
+    def make(**kwargs):
+        return PipelineTracker(str(tmp_path / "tracking.db"), str(tmp_path / "configs"), **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def tracker(make_tracker):
+    return make_tracker()
@@ -0,0 +1,95 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from wpipe.tracking import alerts
+from wpipe.tracking.alerts import ErrorRateWindow
+
+
+def _fired(tracker):
+    conn = tracker.db_alerts_fired._get_connection()
+    return conn.execute("SELECT metric, metric_value FROM alerts_fired ORDER BY id").fetchall()
+
+
+def test_step_alert_configs_are_cached(tracker, monkeypatch):
+    """Las reglas se leen una vez y se recargan al añadir otra."""
+    tracker.add_alert_threshold("step_duration_ms", "> 5")
+    queries = []
+    original = alerts.fetch_rows
+
+    def counting(db, query, *params):
+        if query.startswith("SELECT * FROM alerts_config"):
+            queries.append(query)
+        return original(db, query, *params)
+
+    monkeypatch.setattr(alerts, "fetch_rows", counting)
+
+    for duration in (1, 10, 20):
+        tracker.alerts.check_step_alerts("p1", "slow", duration)
+    assert len(queries) == 1
+    assert [value for _, value in _fired(tracker)] == [10, 20]
+
+    tracker.add_alert_threshold("step_duration_ms", "> 15")
+    tracker.alerts.check_step_alerts("p1", "slow", 20)
+    assert len(queries) == 2
+    assert [value for _, value in _fired(tracker)] == [10, 20, 20, 20]
+
+
+def test_rules_added_by_another_tracker_are_loaded(make_tracker):
+    """Una regla añadida por otro tracker (p. ej. el dashboard) se aplica sin reiniciar."""
+    tracker = make_tracker()
+    tracker.alerts.check_step_alerts("p1", "slow", 10)
+    make_tracker().add_alert_threshold("step_duration_ms", "> 5")
+
+    tracker.alerts.check_step_alerts("p1", "slow", 10)
+    assert [value for _, value in _fired(tracker)] == [10]
+
+
+def test_rules_added_by_another_connection_are_loaded(tracker):
+    """Una regla escrita por otro proceso se detecta con data_version."""
+    tracker.alerts.check_step_alerts("p1", "slow", 10)
+    tracker.db_alerts_config._get_connection().commit()
+    with sqlite3.connect(tracker.db_path) as other:
+        other.execute(
+            "INSERT INTO alerts_config (name, metric, condition, value, severity, enabled) "
+            "VALUES ('slow', 'step_duration_ms', '>', 5, 'warning', 1)"
+        )
+
+    tracker.alerts.check_step_alerts("p1", "slow", 10)
+    assert [value for _, value in _fired(tracker)] == [10]
+
+
+def test_error_rate_uses_the_last_runs(make_tracker):
+    """La tasa de error cubre solo las últimas N ejecuciones."""
+    tracker = make_tracker(error_rate_runs=4)
+    tracker.add_alert_threshold("error_rate", "> 60")
+    for status in ("error", "error", "error", "completed", "completed"):
+        tracker.alerts.check_pipeline_alerts("p", "pipe", status, 0)
+    assert tracker.alerts.error_rate.rate() == 50
+
+    tracker.alerts.check_pipeline_alerts("p", "pipe", "error", 0)
+    assert tracker.alerts.error_rate.rate() == 50
+    assert _fired(tracker) == [("error_rate", 100.0), ("error_rate", 100.0), ("error_rate", 100.0)]
+
+
+def test_error_rate_is_seeded_from_history(tracker):
+    """La ventana se inicializa con el historial guardado, sin contar la ejecución actual."""
+    conn = tracker.db_pipelines._get_connection()
+    now = datetime.now()
+    for i, status in enumerate(("error", "completed", "completed", "error")):
+        conn.execute(
+            "INSERT INTO pipelines (id, name, status, completed_at) VALUES (?, 'pipe', ?, ?)",
+            (f"old{i}", status, (now - timedelta(minutes=i)).isoformat()),
+        )
+    tracker.alerts.check_pipeline_alerts("old0", "pipe", "error", 0)
+    assert tracker.alerts.error_rate.runs == 4
+    assert tracker.alerts.error_rate.rate() == 50
+
+
+def test_error_rate_time_window():
+    """Con una ventana temporal las ejecuciones antiguas dejan de contar."""
+    window = ErrorRateWindow(max_runs=100, minutes=1)
+    window.record(True, time.time() - 120)
+    window.record(False)
+    assert window.runs == 1
+    assert window.rate() == 0
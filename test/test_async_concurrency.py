@@ -0,0 +1,94 @@
+import asyncio
+
+from wpipe import Parallel, PipelineAsync
+
+
+class Gauge:
+    def __init__(self):
+        self.current = self.peak = 0
+
+    def step(self, name):
+        async def run(context):
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+            await asyncio.sleep(0.02)
+            self.current -= 1
+            return {name: context.get("n", 0) * 2}
+        return run
+
+
+def test_parallel_max_concurrency_bounds_branches():
+    """max_concurrency limita las ramas de un Parallel asíncrono."""
+    gauge = Gauge()
+    branches = [(gauge.step(f"b{i}"), f"b{i}") for i in range(10)]
+    pipeline = PipelineAsync(show_progress=False)
+    pipeline.set_steps([Parallel(steps=branches, max_concurrency=3)])
+    result = asyncio.run(pipeline.run({"n": 1}))
+
+    assert gauge.peak == 3
+    assert all(result[f"b{i}"] == 2 for i in range(10))
+
+
+def test_pipeline_semaphore_bounds_every_step():
+    """El semáforo del pipeline se aplica a todas las ramas y ejecuciones."""
+    gauge = Gauge()
+    branches = [(gauge.step(f"b{i}"), f"b{i}") for i in range(4)]
+    pipeline = PipelineAsync(show_progress=False, max_concurrency=2)
+    pipeline.set_steps([Parallel(steps=branches)])
+
+    async def main():
+        return [r async for r in pipeline.arun_many([{"n": i} for i in range(5)], concurrency=5)]
+
+    results = asyncio.run(main())
+    assert len(results) == 5
+    assert gauge.peak == 2
+    # A new event loop gets its own semaphore
+    asyncio.run(pipeline.run({"n": 1}))
+
+
+def test_arun_many_streams_results_from_an_async_source():
+    """arun_many consume un iterable asíncrono y respeta la concurrencia."""
+    gauge = Gauge()
+    pipeline = PipelineAsync(show_progress=False)
+    pipeline.set_steps([(gauge.step("out"), "out")])
+
+    async def source():
+        for i in range(20):
+            yield {"n": i}
+
+    async def main():
+        return [r["out"] async for r in pipeline.arun_many(source(), concurrency=4, ordered=True)]
+
+    assert asyncio.run(main()) == [i * 2 for i in range(20)]
+    assert gauge.peak == 4
+
+
+def test_arun_many_tracks_one_session(tmp_path):
+    """Todas las ejecuciones se registran bajo una única sesión."""
+    async def fail_odd(context):
+        if context["n"] % 2:
+            raise ValueError("odd")
+        return {"ok": True}
+
+    pipeline = PipelineAsync(
+        show_progress=False,
+        continue_on_error=True,
+        tracking_db=str(tmp_path / "tracking.db"),
+        config_dir=str(tmp_path / "configs"),
+    )
+    pipeline.set_steps([(fail_odd, "fail_odd")])
+
+    async def main():
+        return [r async for r in pipeline.arun_many([{"n": i} for i in range(4)], concurrency=2)]
+
+    results = asyncio.run(main())
+    assert sum("error" in r for r in results) == 2
+
+    conn = pipeline.tracker.db_pipelines._get_connection()
+    sessions = conn.execute(
+        "SELECT COUNT(*) FROM pipelines WHERE id = ?", (pipeline.pipeline_id,)
+    ).fetchone()[0]
+    steps = conn.execute(
+        "SELECT COUNT(*) FROM steps WHERE pipeline_id = ?", (pipeline.pipeline_id,)
+    ).fetchone()[0]
+    assert (sessions, steps) == (1, 4)
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import threading
+import time
+
+from wpipe import Parallel, PipelineAsync, step
+
+
+def blocking_io(context):
+    time.sleep(0.3)
+    return {"io_thread": threading.current_thread().name}
+
+
+async def ticker(context):
+    ticks = 0
+    for _ in range(5):
+        await asyncio.sleep(0.05)
+        ticks += 1
+    return {"ticks": ticks, "ticked_at": time.perf_counter()}
+
+
+@step(name="crunch", cpu_bound=True)
+def crunch(context):
+    return {"crunch_pid": os.getpid(), "total": sum(range(context["n"]))}
+
+
+def test_sync_steps_do_not_block_async_branches():
+    """Un paso síncrono bloqueante no congela las ramas asíncronas."""
+    pipeline = PipelineAsync(show_progress=False)
+    pipeline.set_steps([Parallel(steps=[(blocking_io, "blocking_io"), (ticker, "ticker")])])
+    start = time.perf_counter()
+    result = asyncio.run(pipeline.run({}))
+    pipeline.close()
+
+    assert result["io_thread"] != threading.main_thread().name
+    # The ticker finished while the blocking step was still sleeping
+    assert result["ticked_at"] - start < 0.3
+    assert pipeline.loop_lag["max_ms"] < 150
+
+
+def test_cpu_bound_steps_run_in_worker_processes():
+    """Los pasos cpu_bound se ejecutan en otro proceso."""
+    pipeline = PipelineAsync(show_progress=False, process_workers=1)
+    pipeline.set_steps([crunch])
+    result = asyncio.run(pipeline.run({"n": 1000}))
+    pipeline.close()
+
+    assert result["total"] == sum(range(1000))
+    assert result["crunch_pid"] != os.getpid()
+
+
+def test_zero_sync_workers_keeps_steps_on_the_loop():
+    """Con sync_workers=0 los pasos síncronos siguen en el hilo del bucle."""
+    pipeline = PipelineAsync(show_progress=False, sync_workers=0)
+    pipeline.set_steps([(blocking_io, "blocking_io")])
+    result = asyncio.run(pipeline.run({}))
+
+    assert result["io_thread"] == threading.main_thread().name
+    # The blocked loop shows up in the lag metrics
+    assert pipeline.loop_lag["max_ms"] >= 150
+
+
+def test_loop_lag_is_recorded_by_the_tracker(tmp_path):
+    """La latencia del bucle se guarda como métrica del pipeline."""
+    pipeline = PipelineAsync(
+        show_progress=False,
+        tracking_db=str(tmp_path / "tracking.db"),
+        config_dir=str(tmp_path / "configs"),
+    )
+    pipeline.set_steps([(ticker, "ticker")])
+    asyncio.run(pipeline.run({}))
+
+    conn = pipeline.tracker.db_events._get_connection()
+    row = conn.execute(
+        "SELECT COUNT(*) FROM events WHERE pipeline_id = ? AND event_name = 'loop_lag'",
+        (pipeline.pipeline_id,),
+    ).fetchone()
+    assert row[0] == 1
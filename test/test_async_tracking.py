@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from wpipe import Parallel, PipelineAsync
+from wpipe.tracking import PipelineTracker, TrackingWriter
+
+
+def _pipeline(tmp_path):
+    return PipelineAsync(
+        show_progress=False,
+        tracking_db=str(tmp_path / "tracking.db"),
+        config_dir=str(tmp_path / "configs"),
+    )
+
+
+def test_steps_do_not_wait_for_tracking_writes(tmp_path, monkeypatch):
+    """Los pasos no esperan a que se escriban los registros de seguimiento."""
+    pipeline = _pipeline(tmp_path)
+    slow_complete = pipeline.tracker.complete_step
+    completed = []
+
+    def complete_step(*args, **kwargs):
+        time.sleep(0.1)
+        completed.append(kwargs["step_id"])
+        return slow_complete(*args, **kwargs)
+
+    monkeypatch.setattr(pipeline.tracker, "complete_step", complete_step)
+    starts = []
+
+    async def mark(context):
+        starts.append(time.perf_counter())
+        return {}
+
+    pipeline.set_steps([(mark, f"mark_{i}") for i in range(4)])
+    begin = time.perf_counter()
+    asyncio.run(pipeline.run({}))
+
+    assert starts[-1] - starts[0] < 0.1
+    # run() only returns once the records are written
+    assert time.perf_counter() - begin >= 0.4
+    conn = pipeline.tracker.db_steps._get_connection()
+    ids = conn.execute(
+        "SELECT id FROM steps WHERE pipeline_id = ? ORDER BY id", (pipeline.pipeline_id,)
+    ).fetchall()
+    assert completed == [row[0] for row in ids]
+    pipeline.close()
+
+
+def test_parallel_children_are_linked_to_their_block(tmp_path):
+    """Los hijos de un Parallel quedan enlazados al id real del bloque."""
+    async def branch(context):
+        return {}
+
+    pipeline = _pipeline(tmp_path)
+    pipeline.set_steps([Parallel(steps=[(branch, "left"), (branch, "right")])])
+    asyncio.run(pipeline.run({}))
+
+    conn = pipeline.tracker.db_steps._get_connection()
+    block_id = conn.execute(
+        "SELECT id FROM steps WHERE pipeline_id = ? AND step_type = 'parallel'", (pipeline.pipeline_id,)
+    ).fetchone()[0]
+    children = conn.execute(
+        "SELECT step_name, parent_step_id FROM steps WHERE pipeline_id = ? AND step_type = 'task' ORDER BY step_name",
+        (pipeline.pipeline_id,),
+    ).fetchall()
+    assert children == [("left", block_id), ("right", block_id)]
+    pipeline.close()
+
+
+def test_writer_runs_calls_in_order_and_resolves_futures(tmp_path):
+    """El escritor ejecuta en orden y resuelve los futuros de llamadas previas."""
+    tracker = PipelineTracker(str(tmp_path / "tracking.db"), str(tmp_path / "configs"))
+    writer = TrackingWriter(tracker)
+    reg = writer.submit("register_pipeline", name="writer_test", pipeline_steps=[])
+    pipeline_id = reg.result(5)["pipeline_id"]
+    step_id = writer.submit("start_step", pipeline_id=pipeline_id, step_order=1, step_name="s")
+    done = writer.submit("complete_step", step_id=step_id, pipeline_id=pipeline_id)
+    writer.flush(5)
+    assert done.done() and isinstance(step_id.result(), int)
+    writer.close(5)
@@ -0,0 +1,87 @@
+import time
+
+from wpipe import Parallel, Pipeline
+from wpipe.tracking import PipelineTracker
+
+
+def _noop(context):
+    return {}
+
+
+def _pipeline(tmp_path, **kwargs):
+    return Pipeline(
+        show_progress=False,
+        tracking_db=str(tmp_path / "tracking.db"),
+        config_dir=str(tmp_path / "configs"),
+        buffered_tracking=True,
+        **kwargs,
+    )
+
+
+def test_buffered_steps_are_written_on_completion(tmp_path):
+    """Con buffer los pasos se escriben completos al terminar el pipeline."""
+    pipeline = _pipeline(tmp_path)
+    pipeline.set_steps([(_noop, f"step_{i}", "v1.0") for i in range(50)])
+    pipeline.run({})
+
+    conn = pipeline.tracker.db_steps._get_connection()
+    rows = conn.execute(
+        "SELECT status, duration_ms IS NOT NULL FROM steps WHERE pipeline_id = ?", (pipeline.pipeline_id,)
+    ).fetchall()
+    assert rows == [("completed", 1)] * 50
+    history = conn.execute(
+        "SELECT COUNT(*) FROM step_history WHERE pipeline_id = ?", (pipeline.pipeline_id,)
+    ).fetchone()[0]
+    assert history == 50
+
+
+def test_parent_ids_are_resolved_at_flush(tmp_path):
+    """Los ids provisionales de los padres se traducen a ids reales."""
+    pipeline = _pipeline(tmp_path)
+    pipeline.set_steps([Parallel(steps=[(_noop, "left", "v1.0"), (_noop, "right", "v1.0")])])
+    pipeline.run({})
+
+    conn = pipeline.tracker.db_steps._get_connection()
+    block_id = conn.execute(
+        "SELECT id FROM steps WHERE pipeline_id = ? AND step_type = 'parallel'", (pipeline.pipeline_id,)
+    ).fetchone()[0]
+    parents = conn.execute(
+        "SELECT DISTINCT parent_step_id FROM steps WHERE pipeline_id = ? AND step_type = 'task'",
+        (pipeline.pipeline_id,),
+    ).fetchall()
+    assert parents == [(block_id,)]
+
+
+def test_running_steps_are_updated_after_a_flush(tmp_path):
+    """Un paso escrito como 'running' se actualiza en el siguiente flush."""
+    tracker = PipelineTracker(str(tmp_path / "tracking.db"), str(tmp_path / "configs"), buffered=True)
+    pipeline_id = tracker.register_pipeline("buffered", [])["pipeline_id"]
+    step_id = tracker.start_step(pipeline_id, 1, "slow")
+    assert step_id < 0 and tracker.resolve_step_id(step_id) is None
+
+    tracker.flush()
+    real_id = tracker.resolve_step_id(step_id)
+    conn = tracker.db_steps._get_connection()
+    assert conn.execute("SELECT status FROM steps WHERE id = ?", (real_id,)).fetchone() == ("running",)
+
+    tracker.complete_step(step_id, error_message="boom", pipeline_id=pipeline_id)
+    tracker.flush()
+    assert conn.execute("SELECT status, error_message FROM steps WHERE id = ?", (real_id,)).fetchone() == (
+        "error", "boom",
+    )
+
+
+def test_size_threshold_triggers_a_background_flush(tmp_path):
+    """Al llegar a flush_records el hilo escribe sin esperar al intervalo."""
+    tracker = PipelineTracker(
+        str(tmp_path / "tracking.db"), str(tmp_path / "configs"),
+        buffered=True, flush_records=10, flush_interval=60,
+    )
+    pipeline_id = tracker.register_pipeline("threshold", [])["pipeline_id"]
+    handles = [tracker.start_step(pipeline_id, i, f"s{i}") for i in range(10)]
+    conn = tracker.db_steps._get_connection()
+    for _ in range(100):
+        if tracker.resolve_step_id(handles[-1]) is not None:
+            break
+        time.sleep(0.01)
+    assert conn.execute("SELECT COUNT(*) FROM steps WHERE pipeline_id = ?", (pipeline_id,)).fetchone()[0] == 10
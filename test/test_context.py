@@ -0,0 +1,111 @@
+import json
+import pickle
+import threading
+import time
+
+from wpipe import For, Parallel, Pipeline
+from wpipe.pipe.components.context import LayeredContext, fork_context
+from wpipe.pipe.components.logic_blocks import Background
+
+
+def test_layer_reads_through_and_tracks_writes():
+    """Las escrituras quedan en la capa y las lecturas caen al padre."""
+    base = {"a": 1, "b": 2, "c": 3}
+    layer = LayeredContext(base)
+    layer["b"] = 20
+    layer["d"] = 4
+    del layer["c"]
+
+    assert base == {"a": 1, "b": 2, "c": 3}
+    assert layer["a"] == 1 and layer["b"] == 20
+    assert "c" not in layer and layer.get("c") is None
+    assert list(layer) == ["a", "b", "d"]
+    assert len(layer) == 3
+    assert layer == {"a": 1, "b": 20, "d": 4}
+    assert layer.changes() == ({"b": 20, "d": 4}, {"c"})
+
+
+def test_layer_behaves_like_a_dict():
+    """copy, pickle, json y ** devuelven el contenido combinado."""
+    layer = LayeredContext({"a": 1})
+    layer.update({"b": 2})
+    flat = {"a": 1, "b": 2}
+
+    assert type(layer.copy()) is dict and layer.copy() == flat
+    assert pickle.loads(pickle.dumps(layer)) == flat
+    assert json.loads(json.dumps(layer)) == flat
+    assert {**layer} == flat
+    assert dict(layer.items()) == flat
+    assert layer.pop("a") == 1 and layer.pop("a", None) is None
+
+
+def test_fork_isolates_both_sides():
+    """Tras un fork, cada lado solo ve sus propias escrituras."""
+    left, right = fork_context({"x": 1})
+    left["x"] = 2
+    right["y"] = 3
+    assert right["x"] == 1 and "y" not in left
+
+
+def test_parallel_merges_write_sets():
+    """Parallel fusiona lo que escribe cada rama, incluidas claves existentes."""
+    def bump(context):
+        return {"counter": context["counter"] + 1}
+
+    def tag(context):
+        return {"tag": "ok"}
+
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([Parallel(steps=[(bump, "bump", "v1.0"), (tag, "tag", "v1.0")])])
+    result = pipeline.run({"counter": 1, "big": list(range(10))})
+    assert result == {**result, "counter": 2, "tag": "ok"}
+    assert type(result) is dict
+
+
+def test_parallel_branches_do_not_see_siblings():
+    """Una rama lenta no ve lo que escribieron sus hermanas ya terminadas."""
+    def fast(context):
+        return {"x": "from_fast", "n": context["n"] + 1}
+
+    def slow(context):
+        time.sleep(0.2)
+        return {"seen_by_slow": context["x"], "n": context["n"] + 1}
+
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([Parallel(steps=[(fast, "fast", "v1.0"), (slow, "slow", "v1.0")])])
+    result = pipeline.run({"x": "orig", "n": 5})
+    assert result["seen_by_slow"] == "orig" and result["x"] == "from_fast"
+    assert result["n"] == 6
+
+
+def test_for_writes_back_loop_changes():
+    """Los cambios dentro de un For se aplican al contexto principal."""
+    def inc(context):
+        return {"total": context["total"] + context["_loop_iteration"]}
+
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([For(iterations=4, steps=[(inc, "inc", "v1.0")])])
+    result = pipeline.run({"total": 0})
+    assert result["total"] == 6
+    assert result["_loop_iteration"] == 3
+
+
+def test_background_sees_a_snapshot():
+    """Un paso en segundo plano no ve las escrituras posteriores del pipeline."""
+    seen = {}
+    started = threading.Event()
+
+    def background(context):
+        started.wait(1)
+        seen["value"] = context["value"]
+
+    def later(context):
+        started.set()
+        return {"value": "changed"}
+
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([Background(background), (later, "later", "v1.0")])
+    result = pipeline.run({"value": "original"})
+    time.sleep(0.1)
+    assert result["value"] == "changed"
+    assert seen["value"] == "original"
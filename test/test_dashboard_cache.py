@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from wpipe.dashboard.main import create_app
+from wpipe.tracking import ReadPool
+
+
+def _insert_pipeline(db_path, pipeline_id):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO pipelines (id, name, status) VALUES (?, 'p', 'completed')", (pipeline_id,))
+    conn.commit()
+    conn.close()
+
+
+def test_unchanged_data_answered_with_304(tmp_path):
+    """Sin escrituras nuevas, la misma ETag devuelve 304; tras un commit cambia."""
+    db_path = str(tmp_path / "dashboard.db")
+    with TestClient(create_app(db_path=db_path, config_dir=str(tmp_path))) as client:
+        first = client.get("/api/pipelines")
+        assert first.status_code == 200 and first.json() == []
+        etag = first.headers["etag"]
+
+        again = client.get("/api/pipelines", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+
+        _insert_pipeline(db_path, "PIPE-1")
+        changed = client.get("/api/pipelines", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert [p["id"] for p in changed.json()] == ["PIPE-1"]
+        assert changed.headers["etag"] != etag
+
+
+def test_responses_cached_by_url(tmp_path):
+    """Cada URL tiene su propia respuesta en caché."""
+    db_path = str(tmp_path / "dashboard.db")
+    with TestClient(create_app(db_path=db_path, config_dir=str(tmp_path))) as client:
+        _insert_pipeline(db_path, "PIPE-1")
+        assert len(client.get("/api/pipelines").json()) == 1
+        assert client.get("/api/pipelines?status=error").json() == []
+        assert len(client.get("/api/pipelines").json()) == 1
+        assert client.get("/api/pipelines/PIPE-1").json()["steps"] == []
+
+
+def test_read_pool_is_read_only(tmp_path):
+    """Las conexiones del pool no pueden escribir y se reutilizan."""
+    db_path = str(tmp_path / "pool.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+    pool = ReadPool(db_path, size=1)
+    with pool.connection() as first:
+        with pytest.raises(sqlite3.OperationalError):
+            first.execute("INSERT INTO t VALUES (1)")
+    with pool.connection() as second:
+        assert second is first
+    version = pool.data_version()
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    assert pool.data_version() != version
+    pool.close()
+    conn.close()
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from wpipe import Pipeline, step
+from wpipe.pipe.components.plan import build_dataflow, compile_step
+
+
+def _compile(steps):
+    return [compile_step(s, Pipeline) for s in steps]
+
+
+@step(name="load_a", writes=["a"], reads=[])
+def load_a(context):
+    time.sleep(0.3)
+    return {"a": 1}
+
+
+@step(name="load_b", writes=["b"], reads=[])
+def load_b(context):
+    time.sleep(0.3)
+    return {"b": 2}
+
+
+@step(name="combine", reads=["a", "b"], writes=["c"])
+def combine(context):
+    return {"c": context["a"] + context["b"]}
+
+
+def test_build_dataflow_finds_independent_steps():
+    """Los pasos sin dependencias entre sí forman una región concurrente."""
+    regions = build_dataflow(_compile([load_a, load_b, combine]))
+    region = regions[0]
+    assert [sorted(deps) for deps in region.deps] == [[], [], [0, 1]]
+    assert list(region.ancestors[2]) == [0, 1]
+
+    # A chain of dependent steps is not worth a region
+    assert build_dataflow(_compile([load_a, combine])) == {}
+
+
+def test_auto_parallel_runs_independent_steps_concurrently():
+    """Con auto_parallel los pasos independientes se solapan y el resultado es el mismo."""
+    sequential = Pipeline(show_progress=False)
+    sequential.set_steps([load_a, load_b, combine])
+    expected = sequential.run({})
+
+    pipeline = Pipeline(show_progress=False, auto_parallel=True)
+    pipeline.set_steps([load_a, load_b, combine])
+    start = time.time()
+    result = pipeline.run({})
+    assert time.time() - start < 0.55
+    assert {k: result[k] for k in "abc"} == {k: expected[k] for k in "abc"} == {"a": 1, "b": 2, "c": 3}
+
+
+def test_undeclared_step_is_a_barrier():
+    """Un paso sin declaraciones espera a todos los anteriores."""
+    def undeclared(context):
+        return {"d": context["a"] + context["b"]}
+
+    pipeline = Pipeline(show_progress=False, auto_parallel=True)
+    pipeline.set_steps([load_a, load_b, undeclared])
+    assert pipeline.run({})["d"] == 3
+
+
+def test_failure_reports_the_failing_step():
+    """Un fallo se propaga con el nombre del paso que falló."""
+    @step(name="broken", reads=[], writes=["x"])
+    def broken(context):
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    @step(name="after", reads=[], writes=["late"])
+    def after(context):
+        time.sleep(0.2)
+        return {"late": True}
+
+    pipeline = Pipeline(show_progress=False, auto_parallel=True, continue_on_error=False)
+    pipeline.set_steps([load_a, broken, after])
+    with pytest.raises(Exception, match="boom"):
+        pipeline.run({})
+    assert pipeline.task_name == "broken"
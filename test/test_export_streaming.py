@@ -0,0 +1,100 @@
+import gzip
+import json
+import sqlite3
+
+import pytest
+from wsqlite import WSQLite
+
+import wpipe
+from wpipe.export import PipelineExporter
+from wpipe.tracking.tracker import PipelineTracker
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    db_path = str(tmp_path / "tracking.db")
+    PipelineTracker(db_path=db_path, config_dir=str(tmp_path / "configs"))
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT INTO pipelines (id, name, status, started_at, total_duration_ms) VALUES (?, ?, ?, ?, ?)",
+        [
+            ("P1", "etl", "completed", "2026-01-01T10:00:00", 1000),
+            ("P2", "etl", "error", "2026-01-02T10:00:00", 3000),
+            ("P3", "report, daily", "completed", "2026-01-03T10:00:00", None),
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO system_metrics (pipeline_id, cpu_percent, recorded_at) VALUES (?, ?, ?)",
+        [("P1", 10.5, "2026-01-01T10:00:01"), ("P1", 20.0, "2026-01-01T10:00:02"), ("P2", 30.0, "2026-01-02T10:00:01")],
+    )
+    conn.commit()
+    conn.close()
+    return PipelineExporter(db_path)
+
+
+def test_streamed_formats_match_in_memory_output(exporter, tmp_path):
+    """La exportación por lotes produce lo mismo que en memoria, en JSON, NDJSON y CSV."""
+    rows = json.loads(exporter.export_pipeline_logs())
+    assert [r["id"] for r in rows] == ["P3", "P2", "P1"]
+    assert exporter.export_pipeline_logs(chunk_size=1) == json.dumps(rows, indent=2)
+    assert exporter.export_pipeline_logs(export_format="csv", chunk_size=2) == exporter.export_pipeline_logs(
+        export_format="csv"
+    )
+    assert "report; daily" in exporter.export_pipeline_logs(export_format="csv")
+
+    out = str(tmp_path / "metrics.ndjson.gz")
+    assert exporter.export_metrics(pipeline_id="P1", export_format="ndjson", output_path=out, compression="gzip") == out
+    with gzip.open(out, "rt", encoding="utf-8") as f:
+        assert [json.loads(line)["cpu_percent"] for line in f] == [20.0, 10.5]
+
+    with pytest.raises(ValueError):
+        exporter.export_metrics(export_format="ndjson", compression="gzip")
+    with pytest.raises(ValueError):
+        exporter.export_metrics(export_format="ndjson", output_path=out, compression="bz2")
+
+
+def test_filters_and_statistics_in_sql(exporter):
+    """Los filtros de fechas y pipeline se aplican en SQL, igual que las estadísticas."""
+    window = {"since": "2026-01-02", "until": "2026-01-03"}
+    assert [r["id"] for r in json.loads(exporter.export_pipeline_logs(**window))] == ["P2"]
+    assert exporter.export_metrics(export_format="ndjson", **window).count("\n") == 1
+    assert exporter.export_metrics(export_format="csv", pipeline_id="nope") == ""
+
+    stats = json.loads(exporter.export_statistics())
+    assert stats["total_executions"] == 3 and stats["successful_executions"] == 2
+    assert stats["success_rate_percent"] == 66.67
+    assert stats["average_execution_time_seconds"] == 2.0
+    assert json.loads(exporter.export_statistics(since="2026-01-04"))["total_executions"] == 0
+
+
+def test_parquet_and_zstd(exporter, tmp_path):
+    """Parquet y zstd escriben por lotes cuando sus dependencias están instaladas."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    zstandard = pytest.importorskip("zstandard")
+
+    out = str(tmp_path / "metrics.parquet")
+    exporter.export_metrics(export_format="parquet", output_path=out, compression="zstd", chunk_size=2)
+    table = pq.read_table(out)
+    assert table.num_rows == 3 and table.column("cpu_percent").to_pylist() == [30.0, 20.0, 10.5]
+
+    out = str(tmp_path / "pipelines.ndjson.zst")
+    exporter.export_pipeline_logs(export_format="ndjson", output_path=out, compression="zstd")
+    with open(out, "rb") as f:
+        lines = zstandard.ZstdDecompressor().stream_reader(f).read().decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["P3", "P2", "P1"]
+
+
+def test_export_sees_uncommitted_tracking_writes(tmp_path, monkeypatch):
+    """La exportación ve lo que el tracker del mismo proceso aún no ha confirmado."""
+    # Other test modules replace the shared connection of wpipe with their own
+    monkeypatch.setattr(WSQLite, "_get_connection", wpipe.patched_get_connection)
+    db_path = str(tmp_path / "live.db")
+    tracker = PipelineTracker(db_path=db_path, config_dir=str(tmp_path / "configs"))
+    pipeline_id = tracker.register_pipeline("p", [])["pipeline_id"]
+    tracker.record_system_metrics(pipeline_id, {"cpu_percent": 12.5})
+    tracker.complete_pipeline(pipeline_id)
+
+    exporter = PipelineExporter(db_path)
+    assert [r["id"] for r in json.loads(exporter.export_pipeline_logs())] == [pipeline_id]
+    assert json.loads(exporter.export_metrics())[0]["cpu_percent"] == 12.5
+    assert json.loads(exporter.export_statistics())["total_executions"] == 1
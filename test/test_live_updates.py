@@ -0,0 +1,69 @@
+import sqlite3
+
+from wpipe.tracking import DatabaseTailer, LiveBus, ReadPool
+from wpipe.tracking.tracker import PipelineTracker
+
+
+def test_tracker_publishes_coalesced_deltas(tmp_path):
+    """El tracker publica los cambios y cada suscriptor recibe el último estado."""
+    tracker = PipelineTracker(str(tmp_path / "tracking.db"), str(tmp_path / "configs"), buffered=True)
+    woken = []
+    subscription = tracker.live.subscribe(notify=lambda: woken.append(1))
+
+    pipeline_id = tracker.register_pipeline("p", [])["pipeline_id"]
+    step_id = tracker.start_step(pipeline_id, 0, "load")
+    tracker.complete_step(step_id, {"ok": True})
+    tracker.add_event(pipeline_id, "info", "done")
+
+    deltas, overflowed = subscription.drain()
+    assert not overflowed and len(woken) == 1
+    assert [(d["type"], d["data"]["status"] if d["type"] != "event" else None) for d in deltas] == [
+        ("pipeline", "running"),
+        ("step", "completed"),
+        ("event", None),
+    ]
+    assert deltas[1]["data"]["pipeline_id"] == pipeline_id
+    subscription.close()
+    assert not tracker.live.has_subscribers
+    tracker.flush()
+
+
+def test_slow_subscriber_overflows():
+    """Un suscriptor lento pierde los cambios y recibe la orden de recargar."""
+    bus = LiveBus()
+    slow = bus.subscribe(max_pending=3)
+    fast = bus.subscribe()
+    for i in range(5):
+        bus.publish("event", i, {})
+    assert slow.drain() == ([], True)
+    assert len(fast.drain()[0]) == 5
+    bus.publish("event", 9, {})
+    assert slow.drain()[0][0]["id"] == 9
+
+
+def test_tailer_publishes_other_process_writes(tmp_path):
+    """Las escrituras de otros procesos se detectan siguiendo la base de datos."""
+    db_path = str(tmp_path / "tracking.db")
+    PipelineTracker(db_path, str(tmp_path / "configs"))
+    writer = sqlite3.connect(db_path)
+    writer.execute("INSERT INTO pipelines (id, name, status) VALUES ('OLD', 'p', 'completed')")
+    writer.commit()
+
+    bus = LiveBus()
+    subscription = bus.subscribe()
+    pool = ReadPool(db_path, size=1)
+    tailer = DatabaseTailer(pool, bus)
+    tailer.poll()
+    assert tailer.poll() == 0
+
+    writer.execute("INSERT INTO pipelines (id, name, status) VALUES ('NEW', 'p', 'running')")
+    writer.commit()
+    tailer.poll()
+    writer.execute("UPDATE pipelines SET status = 'error' WHERE id = 'NEW'")
+    writer.commit()
+    tailer.poll()
+
+    deltas, _ = subscription.drain()
+    assert [(d["id"], d["data"]["status"]) for d in deltas] == [("NEW", "error")]
+    pool.close()
+    writer.close()
@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+
+from wpipe.checkpoint import CheckpointManager
+from wpipe.tracking.migrations import MIGRATIONS, Migration, applied_versions, migrate
+from wpipe.tracking.tracker import PipelineTracker
+
+
+def _indexes(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def test_tracker_applies_migrations_once(tmp_path):
+    """Las migraciones se registran en schema_version y no se repiten."""
+    tracker = PipelineTracker(str(tmp_path / "tracking.db"), str(tmp_path / "configs"))
+    conn = tracker.db_pipelines._get_connection()
+    assert sorted(applied_versions(conn)) == [1, 2, 4]
+    assert {"idx_steps_pipeline_id", "idx_pipelines_name_started_at"} <= _indexes(conn)
+    assert migrate(conn) == []
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM steps WHERE pipeline_id = 'x' ORDER BY step_order"
+    ).fetchall()
+    assert "idx_steps_pipeline_id" in str(plan)
+
+
+def test_pending_migration_waits_for_its_table(tmp_path):
+    """Una migración cuya tabla aún no existe se aplica cuando aparece."""
+    path = str(tmp_path / "tracking.db")
+    tracker = PipelineTracker(path, str(tmp_path / "configs"))
+    conn = tracker.db_pipelines._get_connection()
+    assert 3 not in applied_versions(conn)
+
+    CheckpointManager(path)
+    assert 3 in applied_versions(conn)
+    assert "idx_checkpoints_pipeline_step" in _indexes(conn)
+
+
+def test_legacy_steps_table_gets_new_columns(tmp_path):
+    """Una base antigua sin columnas nuevas se actualiza."""
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE steps (id INTEGER PRIMARY KEY, pipeline_id TEXT, step_order INTEGER)")
+    conn.commit()
+    assert migrate(conn) == [1]
+    columns = [info[1] for info in conn.execute("PRAGMA table_info(steps)")]
+    assert {"parent_step_id", "parallel_group"} <= set(columns)
+
+
+def test_failed_migration_is_rolled_back(tmp_path):
+    """Una migración que falla no deja cambios ni queda registrada."""
+    conn = sqlite3.connect(str(tmp_path / "t.db"))
+
+    def broken(c):
+        c.execute("CREATE TABLE half_done (x)")
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        migrate(conn, [Migration(99, "broken", (), broken)])
+    assert 99 not in applied_versions(conn)
+    assert "half_done" not in {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+    assert [m.version for m in MIGRATIONS] == sorted(m.version for m in MIGRATIONS)
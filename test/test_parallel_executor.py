@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from wpipe import Pipeline
+from wpipe.parallel import ExecutionMode, ParallelExecutor
+
+
+def _recorder(name, seconds, log):
+    def run(context):
+        log.append((name, "start", time.perf_counter()))
+        time.sleep(seconds)
+        log.append((name, "end", time.perf_counter()))
+        return {name: True}
+    return run
+
+
+def cpu_square(context):
+    return {"square": context["n"] ** 2}
+
+
+def test_steps_start_when_their_own_dependencies_finish():
+    """Un paso lento no retrasa a los que dependen solo de pasos rápidos."""
+    log = []
+    with ParallelExecutor(max_workers=4) as executor:
+        executor.add_step("slow", _recorder("slow", 0.5, log))
+        executor.add_step("fast", _recorder("fast", 0.05, log))
+        executor.add_step("after_fast", _recorder("after_fast", 0.05, log), depends_on=["fast"])
+        executor.add_step("join", _recorder("join", 0, log), depends_on=["slow", "after_fast"])
+        result = executor.execute({})
+
+    ends = {name: at for name, event, at in log if event == "end"}
+    assert ends["after_fast"] < ends["slow"]
+    assert ends["join"] >= ends["slow"]
+    assert all(result[name] for name in ("slow", "fast", "after_fast", "join"))
+    assert executor.get_execution_time() >= 0.5
+    assert executor.get_step_times()["slow"] >= 0.5
+
+
+def test_ready_steps_follow_the_critical_path():
+    """Con un solo worker se prioriza la cadena más larga estimada."""
+    log = []
+    with ParallelExecutor(max_workers=1) as executor:
+        executor.add_step("long", _recorder("long", 0.3, log))
+        executor.add_step("head", _recorder("head", 0.01, log))
+        executor.add_step("tail", _recorder("tail", 0.01, log), depends_on=["head"])
+        executor.execute({})
+        # Without history the two-step chain looks longer
+        assert log[0][0] == "head"
+
+        log.clear()
+        executor.execute({})
+        # Observed durations now show that "long" is the critical path
+        assert log[0][0] == "long"
+
+
+def test_failure_stops_dependents():
+    """Si un paso falla no se lanzan sus dependientes y se propaga el error."""
+    def broken(context):
+        raise ValueError("boom")
+
+    ran = []
+    executor = ParallelExecutor(max_workers=2)
+    executor.add_step("broken", broken)
+    executor.add_step("child", lambda ctx: ran.append(1), depends_on=["broken"])
+    with pytest.raises(ValueError, match="boom"):
+        executor.execute({})
+    assert not ran
+    executor.close()
+
+
+def test_cpu_bound_steps_reuse_the_process_pool():
+    """Los pasos CPU_BOUND se ejecutan en un pool de procesos persistente."""
+    with ParallelExecutor(max_workers=2) as executor:
+        executor.add_step("square", cpu_square, mode=ExecutionMode.CPU_BOUND)
+        assert executor.execute({"n": 3})["square"] == 9
+        pool = executor._executors[ExecutionMode.CPU_BOUND]
+        assert executor.execute({"n": 4})["square"] == 16
+        assert executor._executors[ExecutionMode.CPU_BOUND] is pool
+
+
+def test_estimates_come_from_tracker_history(tmp_path):
+    """Las estimaciones usan la duración media registrada por el tracker."""
+    def tracked(context):
+        time.sleep(0.05)
+        return {}
+
+    pipeline = Pipeline(
+        show_progress=False,
+        tracking_db=str(tmp_path / "tracking.db"),
+        config_dir=str(tmp_path / "configs"),
+    )
+    pipeline.set_steps([(tracked, "tracked", "v1.0")])
+    pipeline.run({})
+
+    executor = ParallelExecutor(tracker=pipeline.tracker)
+    executor.add_step("tracked", tracked)
+    executor.add_step("unknown", tracked)
+    estimates = executor.estimate_durations()
+    assert estimates["tracked"] >= 0.05
+    assert estimates["unknown"] == estimates["tracked"]
@@ -0,0 +1,93 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from wpipe import For, Parallel, Pipeline, PipelineAsync
+from wpipe.dashboard.main import create_app
+
+
+def _add(context):
+    return {"n": context.get("n", 0) + 1, "blob": "x" * 1000}
+
+
+def _run(tmp_path):
+    pipeline = Pipeline(
+        show_progress=False,
+        tracking_db=str(tmp_path / "tracking.db"),
+        config_dir=str(tmp_path / "configs"),
+        buffered_tracking=True,
+    )
+    pipeline.set_steps(
+        [
+            (_add, "first", "v1.0"),
+            For(iterations=30, steps=[(_add, "inc", "v1.0")]),
+            Parallel(steps=[(_add, "left", "v1.0"), (_add, "right", "v1.0")]),
+            (_add, "last", "v1.0"),
+        ]
+    )
+    pipeline.run({})
+    pipeline.tracker.flush()
+    return pipeline
+
+
+def test_summary_leaves_payloads_out(tmp_path):
+    """El resumen no lee los datos de los pasos; se piden paso a paso."""
+    pipeline = _run(tmp_path)
+    summary = pipeline.tracker.get_pipeline(pipeline.pipeline_id, include_data=False)
+    step = summary["steps"][0]
+    assert "output_data" not in step and "input_data" not in summary
+    assert step["has_output"] is True and step["has_traceback"] is False
+
+    full = pipeline.tracker.get_step(step["id"])
+    assert full["output_data"]["blob"] == "x" * 1000
+    assert pipeline.tracker.get_step(-1) is None
+
+
+def test_graph_collapses_large_blocks(tmp_path):
+    """Los bloques For grandes se colapsan y se expanden bajo demanda."""
+    pipeline = _run(tmp_path)
+    graph = pipeline.tracker.get_pipeline_graph(pipeline.pipeline_id)
+    names = [n["name"] for n in graph["nodes"]]
+    assert names == ["first", "For Loop", "Parallel Block", "left", "right", "last"]
+    loop = graph["nodes"][1]
+    assert loop["collapsed"] and loop["hidden_steps"]["count"] == 30
+    assert loop["hidden_steps"]["statuses"] == {"completed": 30}
+    ids = [n["id"] for n in graph["nodes"] if not n["parent_step_id"]]
+    top = [(e["from"], e["to"]) for e in graph["edges"] if e["label"] == "next"]
+    assert top == list(zip(ids, ids[1:]))
+
+    loop_id = int(loop["id"].split("_")[1])
+    expanded = pipeline.tracker.get_pipeline_graph(pipeline.pipeline_id, expand=[loop_id])
+    assert len(expanded["nodes"]) == 36
+    assert sum(e["label"] == "loop" for e in expanded["edges"]) == 30
+    assert len(pipeline.tracker.get_pipeline_graph(pipeline.pipeline_id, collapse_over=0)["nodes"]) == 4
+
+    pipeline.tracker.db_pipelines._get_connection().commit()
+    with TestClient(create_app(str(tmp_path / "tracking.db"), str(tmp_path / "configs"))) as client:
+        detail = client.get(f"/api/pipelines/{pipeline.pipeline_id}").json()
+        assert "output_data" not in detail["steps"][0]
+        assert client.get(f"/api/steps/{detail['steps'][0]['id']}").json()["output_data"]["n"] == 1
+        graph = client.get(f"/api/pipelines/{pipeline.pipeline_id}/graph", params={"expand": [loop_id]}).json()
+        assert len(graph["nodes"]) == 36
+
+
+def test_async_loop_steps_belong_to_their_block(tmp_path):
+    """En async las iteraciones de un For cuelgan del bloque del bucle."""
+
+    async def inc(context):
+        return {"n": context.get("n", 0) + 1}
+
+    pipeline = PipelineAsync(
+        show_progress=False,
+        tracking_db=str(tmp_path / "tracking.db"),
+        config_dir=str(tmp_path / "configs"),
+        buffered_tracking=True,
+    )
+    pipeline.set_steps([For(iterations=3, steps=[(inc, "inc", "v1.0")])])
+    asyncio.run(pipeline.run({}))
+
+    steps = pipeline.tracker.get_pipeline(pipeline.pipeline_id, include_data=False)["steps"]
+    block = next(s for s in steps if s["step_type"] == "for")
+    assert block["status"] == "completed"
+    assert [s["parent_step_id"] for s in steps if s["step_name"] == "inc"] == [block["id"]] * 3
+    pipeline.close()
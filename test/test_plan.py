@@ -0,0 +1,74 @@
+import pickle
+
+import pytest
+
+from wpipe import Condition, For, Pipeline, step
+from wpipe.pipe.components.plan import (
+    STEP_CONDITION,
+    STEP_FOR,
+    STEP_TASK,
+    ExecutionPlan,
+    compile_step,
+    resolve_policy,
+)
+
+
+@step(name="decorated", version="v2.0", retry_count=3, timeout=5)
+def decorated(context):
+    return {"decorated": True}
+
+
+def plain(context):
+    return {"plain": True}
+
+
+def test_compile_task_and_blocks():
+    """Las entradas del tasks_list se compilan con nombre, versión y tipo resueltos."""
+    compiled = compile_step(decorated, Pipeline)
+    assert compiled.kind == STEP_TASK
+    assert compiled.name == "decorated"
+    assert compiled.version == "v2.0"
+    assert compiled.policy.max_retries == 3
+    assert compiled.policy.timeout == 5
+
+    cond = compile_step(Condition("x > 1", branch_true=[plain], branch_false=[decorated]))
+    assert cond.kind == STEP_CONDITION
+    assert [s.name for s in cond.children] == ["plain"]
+    assert [s.name for s in cond.alternative] == ["decorated"]
+
+    loop = compile_step(For(iterations=2, steps=[(plain, "p", "v1.0")]))
+    assert loop.kind == STEP_FOR
+    assert loop.children[0].name == "p"
+
+    assert compile_step("not a step") is None
+
+
+def test_step_meta_overrides_decorator():
+    """Prioridad: Step Meta > Decorator > Pipeline Default."""
+    policy = resolve_policy(decorated, {"retry_count": 7})
+    assert policy.max_retries == 7
+    assert policy.timeout == 5
+    assert resolve_policy(plain).max_retries is None
+
+
+def test_compiled_step_is_immutable_and_picklable():
+    """Los descriptores no se pueden modificar y sobreviven a pickle."""
+    compiled = compile_step((plain, "p", "v1.0"))
+    with pytest.raises(AttributeError):
+        compiled.name = "other"
+    restored = pickle.loads(pickle.dumps(compiled))
+    assert restored.name == "p"
+    assert restored.func is plain
+
+
+def test_plan_recompiles_after_tasks_list_change():
+    """El plan se recompila si el tasks_list cambia fuera de set_steps."""
+    pipeline = Pipeline(verbose=False)
+    pipeline.set_steps([(plain, "p", "v1.0")])
+    assert isinstance(pipeline._plan, ExecutionPlan)
+    assert pipeline._plan.is_current(pipeline.tasks_list)
+
+    pipeline.tasks_list.append((decorated, "d", "v1.0"))
+    result = pipeline.run({})
+    assert result["plain"] and result["decorated"]
+    assert len(pipeline._plan) == 2
@@ -0,0 +1,102 @@
+import os
+import time
+
+import pytest
+
+from wpipe import For, Parallel, Pipeline
+from wpipe.pipe.components.pools import WorkerPools
+
+
+def square(context):
+    return {f"sq_{context['n']}": context["n"] ** 2}
+
+
+def pid(context):
+    return {"pid": os.getpid()}
+
+
+def cube(context):
+    return {"cube": context["n"] ** 3}
+
+
+def nap(context):
+    time.sleep(0.2)
+    return {"napped": context["n"]}
+
+
+def test_thread_pool_is_reused_across_blocks_and_runs():
+    """Los bloques Parallel reutilizan el mismo pool de hilos."""
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([
+        For(iterations=3, steps=[Parallel(steps=[square, cube], max_workers=2)]),
+    ])
+    assert pipeline.run({"n": 2})["cube"] == 8
+    with pipeline.worker_pools.lease_thread_pool(2) as pool:
+        pass
+    pipeline.run({"n": 3})
+    with pipeline.worker_pools.lease_thread_pool(2) as again:
+        assert again is pool
+        with pipeline.worker_pools.lease_thread_pool(2) as other:
+            assert other is not pool
+    pipeline.close()
+
+
+def test_concurrent_runs_do_not_share_a_parallel_pool():
+    """Las ejecuciones concurrentes de run_many no se encolan en un mismo pool."""
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([Parallel(steps=[nap], max_workers=1)])
+    start = time.time()
+    results = list(pipeline.run_many(({"n": i} for i in range(4)), max_concurrency=4))
+    assert sorted(r["napped"] for r in results) == [0, 1, 2, 3]
+    assert time.time() - start < 0.6
+    pipeline.close()
+
+
+def test_nested_parallel_does_not_starve_the_pool():
+    """Un Parallel anidado dentro de otro no bloquea el pool compartido."""
+    inner = Parallel(steps=[square, cube], max_workers=1)
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([Parallel(steps=[inner], max_workers=1)])
+    result = pipeline.run({"n": 2})
+    assert result["sq_2"] == 4 and result["cube"] == 8
+    pipeline.close()
+
+
+def test_process_pool_ships_pipeline_once():
+    """Los procesos reciben el pipeline una sola vez y se reutilizan."""
+    with WorkerPools() as pools:
+        pipeline = Pipeline(show_progress=False, worker_pools=pools)
+        pipeline.set_steps([Parallel(steps=[square, pid], max_workers=2, use_processes=True)])
+
+        first = pipeline.run({"n": 4})
+        assert first["sq_4"] == 16
+        assert first["pid"] != os.getpid()
+
+        executor, refs = pools.process_pool(pipeline._get_plan(), 2, pipeline._process_worker_pipeline)
+        assert len(refs) == 3
+        second = pipeline.run({"n": 5})
+        assert second["sq_5"] == 25
+        assert pools.process_pool(pipeline._get_plan(), 2, pipeline._process_worker_pipeline)[0] is executor
+
+        # A shared manager is not shut down by the pipeline
+        pipeline.close()
+        assert pools.process_pool(pipeline._get_plan(), 2, pipeline._process_worker_pipeline)[0] is executor
+
+        # Workers never run a pipeline that changed since they got it
+        pipeline.continue_on_error = True
+        changed = pools.process_pool(pipeline._get_plan(), 2, pipeline._process_worker_pipeline)[0]
+        assert changed is not executor
+        with pytest.raises(RuntimeError):
+            executor.submit(pid, {})
+        pipeline.set_steps([Parallel(steps=[cube], max_workers=2, use_processes=True)])
+        with pytest.raises(RuntimeError):
+            changed.submit(pid, {})
+        assert pipeline.run({"n": 2})["cube"] == 8
+
+
+def test_process_pool_falls_back_to_threads_for_unpicklable_steps():
+    """Si el pipeline no se puede serializar se usan hilos."""
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([Parallel(steps=[lambda c: {"x": 1}], use_processes=True)])
+    assert pipeline.run({})["x"] == 1
+    pipeline.close()
@@ -0,0 +1,59 @@
+import pytest
+
+from wpipe.tracking.tracker import PipelineTracker
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = PipelineTracker(str(tmp_path / "tracking.db"), str(tmp_path / "configs"))
+    conn = tracker.db_pipelines._get_connection()
+    for i in range(7):
+        conn.execute(
+            "INSERT INTO pipelines (id, name, status, started_at, input_data) VALUES (?, ?, ?, ?, ?)",
+            (f"p{i}", "even" if i % 2 == 0 else "odd", "error" if i == 3 else "completed",
+             f"2026-01-01T00:00:0{i}", '{"big": [1, 2, 3]}'),
+        )
+    return tracker
+
+
+def test_pipelines_are_paged_newest_first(tracker):
+    """Las páginas salen ordenadas de la más reciente a la más antigua."""
+    first = tracker.get_pipelines(limit=3)
+    assert [p["id"] for p in first] == ["p6", "p5", "p4"]
+    assert [p["id"] for p in tracker.get_pipelines(limit=3, offset=3)] == ["p3", "p2", "p1"]
+
+    last = first[-1]
+    keyset = tracker.get_pipelines(limit=3, before=(last["started_at"], last["id"]))
+    assert [p["id"] for p in keyset] == ["p3", "p2", "p1"]
+
+
+def test_pipeline_filters_run_in_sql(tracker):
+    """Los filtros de estado y nombre se aplican en la consulta."""
+    assert [p["id"] for p in tracker.get_pipelines(status="error")] == ["p3"]
+    assert [p["id"] for p in tracker.get_pipelines(name="odd")] == ["p5", "p3", "p1"]
+    executions = tracker.get_pipeline_executions("even", limit=2, offset=1)
+    assert [p["id"] for p in executions] == ["p4", "p2"]
+
+
+def test_payloads_are_only_read_on_request(tracker):
+    """Los datos de entrada y salida solo se devuelven si se piden."""
+    summary = tracker.get_pipelines(limit=1)[0]
+    assert "input_data" not in summary and summary["name"] == "even"
+    detailed = tracker.get_pipelines(limit=1, include_data=True)[0]
+    assert detailed["input_data"] == {"big": [1, 2, 3]}
+
+
+def test_events_and_alerts_are_paged(tracker):
+    """Eventos y alertas disparadas también se paginan en SQL."""
+    for i in range(4):
+        tracker.add_event("p1", "info" if i % 2 else "warning", f"e{i}")
+    events = tracker.get_events("p1", limit=2)
+    assert [e["event_name"] for e in events] == ["e3", "e2"]
+    assert [e["event_name"] for e in tracker.get_events("p1", event_type="warning")] == ["e2", "e0"]
+
+    tracker.add_alert_threshold("step_duration_ms", "> 0", severity="critical")
+    for duration in (1, 2, 3):
+        tracker.alerts.check_step_alerts("p1", "s", duration)
+    alerts = tracker.get_fired_alerts(limit=2, severity="critical")
+    assert [a["metric_value"] for a in alerts] == [3, 2]
+    assert tracker.get_fired_alerts(severity="warning") == []
@@ -0,0 +1,128 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from wpipe.tracking import RetentionManager, RetentionPolicy
+
+
+def _count(tracker, table, where="1"):
+    conn = tracker.db_pipelines._get_connection()
+    return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}").fetchone()[0]
+
+
+def test_delete_pipeline_cascades(tracker):
+    """Borrar un pipeline elimina también sus pasos, eventos y métricas."""
+    keep = tracker.register_pipeline("keep", [])["pipeline_id"]
+    gone = tracker.register_pipeline("gone", [])["pipeline_id"]
+    for pipeline_id in (keep, gone):
+        tracker.start_step(pipeline_id, 0, "load")
+        tracker.add_event(pipeline_id, "info", "hello")
+        tracker.record_system_metrics(pipeline_id, {"cpu_percent": 10.0})
+    tracker.link_pipelines(keep, gone)
+
+    tracker.delete_pipeline(gone)
+
+    for table in ("steps", "events", "system_metrics"):
+        assert _count(tracker, table, f"pipeline_id = '{gone}'") == 0
+        assert _count(tracker, table, f"pipeline_id = '{keep}'") == 1
+    assert _count(tracker, "pipeline_relations") == 0
+    assert _count(tracker, "pipelines") == 1
+
+
+def test_expired_rows_archived_then_deleted(tmp_path, tracker):
+    """Las filas caducadas se archivan comprimidas antes de borrarse, por lotes."""
+    pipeline_id = tracker.register_pipeline("p", [])["pipeline_id"]
+    conn = tracker.db_pipelines._get_connection()
+    old = (datetime.now() - timedelta(days=10)).isoformat()
+    conn.executemany(
+        "INSERT INTO events (pipeline_id, event_type, event_name, created_at) VALUES (?, 'info', ?, ?)",
+        [(pipeline_id, f"old-{i}", old) for i in range(25)],
+    )
+    tracker.add_event(pipeline_id, "info", "recent")
+    conn.commit()
+
+    RetentionManager(tracker.db_pipelines).enable_incremental_vacuum()
+    archive = tmp_path / "archive"
+    result = tracker.apply_retention(
+        [RetentionPolicy("events", 24 * 7)], str(archive), batch_size=10, pause_seconds=0
+    )
+
+    assert result["events"] == 25
+    assert _count(tracker, "events") == 1
+    (path,) = archive.iterdir()
+    with gzip.open(path, "rt") as f:
+        rows = [json.loads(line) for line in f]
+    assert sorted(r["event_name"] for r in rows) == sorted(f"old-{i}" for i in range(25))
+    with pytest.raises(ValueError):
+        RetentionManager(tracker.db_pipelines, [RetentionPolicy("unknown", 1)])
+
+
+def test_expired_pipelines_archive_their_children(tmp_path, tracker):
+    """Al caducar un pipeline también se archivan sus pasos, eventos y métricas."""
+    old = tracker.register_pipeline("old", [])["pipeline_id"]
+    keep = tracker.register_pipeline("keep", [])["pipeline_id"]
+    tracker.start_step(old, 0, "load")
+    tracker.add_event(old, "info", "hello")
+    tracker.record_system_metrics(old, {"cpu_percent": 10.0})
+    tracker.link_pipelines(keep, old)
+    conn = tracker.db_pipelines._get_connection()
+    conn.execute(
+        "UPDATE pipelines SET started_at = ? WHERE id = ?", ((datetime.now() - timedelta(days=3)).isoformat(), old)
+    )
+    conn.commit()
+
+    archive = tmp_path / "archive"
+    tracker.apply_retention([RetentionPolicy("pipelines", 24)], str(archive), pause_seconds=0)
+
+    archived = {}
+    for path in archive.iterdir():
+        with gzip.open(path, "rt") as f:
+            archived[path.name.rsplit("-", 3)[0]] = [json.loads(line) for line in f]
+    assert [r["id"] for r in archived["pipelines"]] == [old]
+    for table in ("steps", "events", "system_metrics"):
+        assert [r["pipeline_id"] for r in archived[table]] == [old]
+        assert _count(tracker, table) == 0
+    assert archived["pipeline_relations"][0]["child_pipeline_id"] == old
+
+
+def test_clear_columns_keeps_rows(tracker):
+    """Una política con columnas vacía los datos pesados sin borrar la fila."""
+    pipeline_id = tracker.register_pipeline("p", [], input_data={"big": "x" * 100})["pipeline_id"]
+    conn = tracker.db_pipelines._get_connection()
+    conn.execute(
+        "UPDATE pipelines SET started_at = ? WHERE id = ?",
+        ((datetime.now() - timedelta(days=3)).isoformat(), pipeline_id),
+    )
+    conn.commit()
+
+    tracker.apply_retention([RetentionPolicy("pipelines", 24, ("input_data", "output_data"))])
+
+    assert _count(tracker, "pipelines", "input_data IS NULL") == 1
+
+
+def test_system_metrics_downsampled(tracker):
+    """Las métricas de sistema antiguas se agregan en intervalos más gruesos."""
+    pipeline_id = tracker.register_pipeline("p", [])["pipeline_id"]
+    conn = tracker.db_pipelines._get_connection()
+    start = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=5)
+    conn.executemany(
+        "INSERT INTO system_metrics (pipeline_id, cpu_percent, disk_io_read_mb, recorded_at) VALUES (?, ?, ?, ?)",
+        [(pipeline_id, float(i % 2) * 10, float(i), (start + timedelta(seconds=i)).isoformat()) for i in range(600)],
+    )
+    recent = datetime.now().isoformat()
+    conn.execute(
+        "INSERT INTO system_metrics (pipeline_id, cpu_percent, recorded_at) VALUES (?, 50, ?)", (pipeline_id, recent)
+    )
+    conn.commit()
+
+    manager = RetentionManager(tracker.db_pipelines, downsample_after_hours=1, bucket_seconds=300, pause_seconds=0)
+    assert manager.run_once()["system_metrics_downsampled"] == 600
+    rows = conn.execute(
+        "SELECT cpu_percent, disk_io_read_mb FROM system_metrics WHERE recorded_at < ? ORDER BY recorded_at",
+        (recent,),
+    ).fetchall()
+    assert rows == [(5.0, 299.0), (5.0, 599.0)]
+    assert _count(tracker, "system_metrics", "cpu_percent = 50") == 1
+    assert manager.run_once()["system_metrics_downsampled"] == 0
@@ -0,0 +1,69 @@
+import subprocess
+import sys
+from datetime import datetime
+
+
+def test_step_rollups_are_updated_on_completion(make_tracker):
+    """Las métricas por paso se actualizan al completar cada paso."""
+    tracker = make_tracker(buffered=True)
+    for i, error in enumerate((None, None, "boom")):
+        step_id = tracker.start_step("p1", i, "load")
+        tracker.complete_step(step_id, error_message=error)
+    tracker.start_step("p1", 3, "load")
+    tracker.flush()
+
+    states = tracker.get_states_analysis()
+    assert states["total_executions"] == 4
+    assert states["total_errors"] == 1
+    assert states["most_errors"][0]["error_rate"] == 0.25
+    slow = tracker.get_top_slow_steps()
+    assert slow[0]["step_name"] == "load" and slow[0]["count"] == 2
+
+
+def test_pipeline_rollups_feed_stats_and_trends(tracker):
+    """Las estadísticas y tendencias se leen de los agregados por día."""
+    today = datetime.now().isoformat()
+    for status, duration in (("completed", 100.0), ("completed", 300.0), ("error", 50.0)):
+        tracker.rollups.started("pipeline", "etl")
+        tracker.rollups.finished("pipeline", "etl", today, status, duration)
+    tracker.rollups.started("pipeline", "etl")
+
+    stats = tracker.get_stats()
+    assert (stats["total_pipelines"], stats["completed"], stats["errors"], stats["running"]) == (4, 2, 1, 1)
+    assert stats["avg_duration_ms"] == 200
+    trend = tracker.get_trend_data(days=1)
+    assert trend == [{"date": today[:10], "count": 3, "success": 2, "errors": 1, "avg_duration": 200}]
+    analysis = tracker.get_pipelines_analysis()
+    assert analysis["total_runs"] == 4 and analysis["slowest"][0]["avg_duration_ms"] == 200
+
+
+def test_rebuild_matches_incremental_rollups(make_tracker):
+    """Reconstruir desde las tablas da los mismos agregados."""
+    tracker = make_tracker(buffered=True)
+    for i in range(3):
+        step_id = tracker.start_step("p1", i, f"s{i % 2}")
+        tracker.complete_step(step_id, error_message="x" if i == 2 else None)
+    tracker.flush()
+    incremental = sorted(map(sorted, (r.items() for r in tracker.rollups.read("step"))))
+
+    tracker.rebuild_rollups()
+    rebuilt = sorted(map(sorted, (r.items() for r in tracker.rollups.read("step"))))
+    assert rebuilt == incremental
+
+
+def test_rebuild_command(tmp_path, tracker):
+    """El comando de mantenimiento reconstruye los agregados de una base existente."""
+    conn = tracker.db_pipelines._get_connection()
+    conn.execute(
+        "INSERT INTO pipelines (id, name, status, started_at, total_duration_ms) "
+        "VALUES ('old', 'legacy', 'completed', '2026-01-01T10:00:00', 42.0)"
+    )
+    conn.commit()
+
+    subprocess.run(
+        [sys.executable, "-m", "wpipe.tracking", "rebuild-rollups", "--db", str(tmp_path / "tracking.db")],
+        check=True,
+        capture_output=True,
+    )
+    rows = tracker.rollups.read("pipeline", day="2026-01-01")
+    assert [(r["entity_name"], r["runs"], r["duration_max"]) for r in rows] == [("legacy", 1, 42.0)]
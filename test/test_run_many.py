@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from wpipe import Pipeline
+from wpipe.exception import ProcessError
+
+
+def double(context):
+    time.sleep(0.01 * (3 - context["x"] % 3))
+    return {"y": context["x"] * 2}
+
+
+def fail_on_three(context):
+    if context["x"] == 3:
+        raise ValueError("three")
+    return {"ok": True}
+
+
+def test_run_many_yields_all_results():
+    """run_many procesa todas las entradas y devuelve un resultado por entrada."""
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([(double, "double", "v1.0")])
+
+    results = list(pipeline.run_many(({"x": i} for i in range(10)), max_concurrency=4))
+    assert sorted(r["y"] for r in results) == [i * 2 for i in range(10)]
+
+
+def test_run_many_ordered():
+    """Con ordered=True los resultados respetan el orden de entrada."""
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([(double, "double", "v1.0")])
+
+    results = list(pipeline.run_many([{"x": i} for i in range(9)], max_concurrency=3, ordered=True))
+    assert [r["x"] for r in results] == list(range(9))
+
+
+def test_run_many_errors():
+    """Los fallos se propagan salvo que continue_on_error esté activo."""
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([(fail_on_three, "fail", "v1.0")])
+    with pytest.raises(ProcessError):
+        list(pipeline.run_many([{"x": i} for i in range(5)], max_concurrency=1))
+
+    pipeline = Pipeline(show_progress=False, continue_on_error=True)
+    pipeline.set_steps([(fail_on_three, "fail", "v1.0")])
+    results = list(pipeline.run_many([{"x": i} for i in range(5)], ordered=True))
+    assert "error" in results[3]
+    assert all("error" not in r for i, r in enumerate(results) if i != 3)
+
+
+def test_run_many_single_tracking_session(tmp_path):
+    """Todo el lote se registra como una única ejecución en el tracker."""
+    pipeline = Pipeline(
+        tracking_db=str(tmp_path / "batch.db"),
+        config_dir=str(tmp_path / "configs"),
+        pipeline_name="batch",
+        show_progress=False,
+    )
+    pipeline.set_steps([(double, "double", "v1.0")])
+
+    results = list(pipeline.run_many([{"x": i} for i in range(6)], max_concurrency=2))
+    assert len(results) == 6
+
+    conn = pipeline.tracker.db_pipelines._get_connection()
+    pipeline_ids = [row[0] for row in conn.execute("SELECT id FROM pipelines")]
+    assert pipeline_ids == [pipeline.pipeline_id]
+    step_rows = conn.execute("SELECT COUNT(*) FROM steps WHERE pipeline_id = ?", (pipeline.pipeline_id,))
+    assert step_rows.fetchone()[0] == 6
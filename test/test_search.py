@@ -0,0 +1,86 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from wpipe.dashboard.main import create_app
+
+
+@pytest.fixture
+def tracker(make_tracker):
+    tracker = make_tracker(search_output_keys=["file"])
+    conn = tracker.db_pipelines._get_connection()
+    conn.executemany(
+        "INSERT INTO pipelines (id, name, status, error_message) VALUES (?, ?, ?, ?)",
+        [("P1", "ingest", "error", "Connection timeout talking to the warehouse"), ("P2", "report", "completed", None)],
+    )
+    conn.executemany(
+        "INSERT INTO steps (pipeline_id, step_order, step_name, status, error_traceback, output_data) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            ("P1", 0, "load", "error", "Traceback ... TimeoutError: read timed out", None),
+            ("P2", 0, "render", "completed", None, '{"file": "quarterly.pdf", "rows": "thousands"}'),
+            ("P2", 1, "send", "completed", None, "not json"),
+        ],
+    )
+    conn.execute(
+        "INSERT INTO events (pipeline_id, event_type, event_name, message) VALUES ('P1', 'warning', 'retry', 'Retrying after timeout')"
+    )
+    conn.commit()
+    return tracker
+
+
+def test_search_ranks_errors_events_and_payloads(tracker):
+    """La búsqueda de texto encuentra errores, trazas, eventos y salidas."""
+    results = tracker.search("timeout")
+    assert {(r["kind"], r["title"]) for r in results} == {("pipeline", "ingest"), ("step", "load"), ("event", "retry")}
+    assert all("[timeout" in r["snippet"].lower() for r in results)
+    assert [r["title"] for r in tracker.search("timed")] == ["load"]
+    assert [r["pipeline_id"] for r in tracker.search("quarter")] == ["P2"]
+    assert tracker.search("timeout", kinds=["event"])[0]["title"] == "retry"
+    assert tracker.search("timeout", pipeline_id="P2") == []
+    assert len(tracker.search("timeout", limit=1)) == 1
+    assert tracker.search('"; DROP') == []
+    with pytest.raises(ValueError):
+        tracker.search("x", kinds=["nope"])
+
+
+def test_index_follows_updates_and_deletes(tracker):
+    """Los triggers mantienen el índice al actualizar y borrar filas."""
+    conn = tracker.db_pipelines._get_connection()
+    conn.execute("UPDATE steps SET error_traceback = 'disk full' WHERE step_name = 'load'")
+    assert tracker.search("timed") == []
+    assert tracker.search("disk")[0]["title"] == "load"
+    tracker.delete_pipeline("P1")
+    assert tracker.search("timeout") == [] and tracker.search("disk") == []
+
+
+def test_only_errors_and_chosen_output_keys_are_indexed(tracker):
+    """Solo se indexan los pasos fallidos y las claves de salida elegidas."""
+    conn = tracker.db_pipelines._get_connection()
+    assert conn.execute("SELECT COUNT(*) FROM steps_fts").fetchone()[0] == 2
+    assert tracker.search("thousands") == [] and tracker.search("send") == []
+
+    tracker.set_search_output_keys(["rows"])
+    assert tracker.search("quarter") == [] and tracker.search("thousands")[0]["title"] == "render"
+    tracker.set_search_output_keys([])
+    assert tracker.search("thousands") == [] and tracker.search("timed")[0]["title"] == "load"
+    conn.execute("INSERT INTO steps (pipeline_id, step_order, step_name, status) VALUES ('P2', 2, 'zip', 'running')")
+    conn.execute("UPDATE steps SET error_message = 'zip failed' WHERE step_name = 'zip'")
+    assert tracker.search("zip")[0]["title"] == "zip"
+    assert conn.execute("SELECT COUNT(*) FROM steps_fts").fetchone()[0] == 2
+
+
+def test_table_data_search_and_pagination(tmp_path, tracker):
+    """La vista de datos pagina, filtra y busca por texto."""
+    page = tracker.get_table_data("pipelines", page=1, page_size=1)
+    assert page["total"] == 2 and page["total_pages"] == 2 and len(page["items"]) == 1
+    assert "input_data" not in page["items"][0]
+    assert [r["id"] for r in tracker.get_table_data("pipelines", search="warehouse")["items"]] == ["P1"]
+    assert [r["step_name"] for r in tracker.get_table_data("steps", status="completed")["items"]] == ["send", "render"]
+    with pytest.raises(ValueError):
+        tracker.get_table_data("alerts_fired", search="x")
+
+    tracker.flush()
+    tracker.db_pipelines._get_connection().commit()
+    with TestClient(create_app(str(tmp_path / "tracking.db"), str(tmp_path / "configs"))) as client:
+        assert client.get("/api/search", params={"q": "warehouse"}).json()[0]["id"] == "P1"
+        assert client.get("/api/data/sqlite_master").status_code == 400
@@ -0,0 +1,55 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from wpipe.tracking import QuantileSketch
+from wpipe.tracking.tracker import PipelineTracker
+
+
+def _exact(values, q):
+    return sorted(values)[round(q * (len(values) - 1))]
+
+
+def test_quantiles_within_relative_accuracy():
+    """Los percentiles estimados tienen un error relativo acotado."""
+    rng = random.Random(7)
+    values = [rng.lognormvariate(3, 1.5) for _ in range(20000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.update(values)
+    for q in (0.5, 0.95, 0.99):
+        assert sketch.quantile(q) == pytest.approx(_exact(values, q), rel=0.02)
+    assert len(sketch.to_bytes()) < 8000
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_merged_sketches_equal_one_sketch():
+    """Unir bocetos da lo mismo que uno con todos los valores."""
+    first, second, both = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i in range(1, 1001):
+        (first if i % 3 else second).add(i)
+        both.add(i)
+    first.merge(QuantileSketch.from_bytes(second.to_bytes()))
+    assert first.count == both.count == 1000
+    assert [first.quantile(q) for q in (0.5, 0.99)] == [both.quantile(q) for q in (0.5, 0.99)]
+    with pytest.raises(ValueError):
+        first.merge(QuantileSketch(relative_accuracy=0.05))
+
+
+def test_percentiles_over_recent_days(tmp_path):
+    """El p99 de los últimos días se obtiene uniendo los bocetos diarios."""
+    tracker = PipelineTracker(str(tmp_path / "tracking.db"), str(tmp_path / "configs"))
+    now = datetime.now()
+    old = (now - timedelta(days=30)).isoformat()
+    for i in range(1, 101):
+        tracker.rollups.started("step", "load")
+        tracker.rollups.finished("step", "load", now.isoformat(), "completed", float(i))
+        tracker.rollups.started("step", "load")
+        tracker.rollups.finished("step", "load", old, "completed", 1000.0 + i)
+
+    recent = tracker.get_percentiles("step", days=7)["load"]
+    assert recent["count"] == 100
+    assert recent["p50"] == pytest.approx(50, rel=0.02)
+    assert recent["p99"] == pytest.approx(99, rel=0.02)
+    all_time = tracker.get_percentiles("step", name="load")["load"]
+    assert all_time["count"] == 200 and all_time["p99"] == pytest.approx(1098, rel=0.02)
@@ -0,0 +1,153 @@
+import asyncio
+import pickle
+import threading
+
+import pytest
+
+from wpipe import Pipeline, PipelineAsync, step
+from wpipe.cache import MemoryCache, StepCache, make_cache_key, stable_hash
+
+
+def test_cache_key_depends_only_on_selected_inputs():
+    """La clave depende del nombre, la versión y las claves seleccionadas."""
+    base = make_cache_key("load", "v1.0", {"x": 1, "noise": 1}, ["x"])
+    assert base == make_cache_key("load", "v1.0", {"x": 1, "noise": 2}, ["x"])
+    assert base != make_cache_key("load", "v1.0", {"x": 2}, ["x"])
+    assert base != make_cache_key("load", "v2.0", {"x": 1}, ["x"])
+    assert make_cache_key("s", "v1", {"x": None}, ["x"]) != make_cache_key("s", "v1", {}, ["x"])
+    assert stable_hash({"b": [1, 2], "a": {3}}) == stable_hash({"a": {3}, "b": [1, 2]})
+    with pytest.raises(TypeError):
+        stable_hash(object())
+
+
+def test_cached_step_skips_repeated_work(tmp_path):
+    """Una segunda ejecución con las mismas entradas no repite el paso."""
+    calls = []
+
+    @step(name="expensive", cache=True, cache_keys=["x"])
+    def expensive(context):
+        calls.append(context["x"])
+        return {"y": context["x"] * 2}
+
+    pipeline = Pipeline(show_progress=False, step_cache=StepCache(str(tmp_path / "cache.db")))
+    pipeline.set_steps([expensive])
+    assert pipeline.run({"x": 2, "other": 1})["y"] == 4
+    assert pipeline.run({"x": 2, "other": 2})["y"] == 4
+    assert pipeline.run({"x": 3})["y"] == 6
+    assert calls == [2, 3]
+
+    # A new process-like cache only has the persistent tier
+    other = Pipeline(show_progress=False, step_cache=pickle.loads(pickle.dumps(pipeline.step_cache)))
+    other.set_steps([expensive])
+    assert other.run({"x": 3})["y"] == 6
+    assert calls == [2, 3]
+
+
+def test_uncacheable_inputs_run_every_time():
+    """Si las entradas no se pueden hashear el paso se ejecuta sin caché."""
+    calls = []
+
+    @step(name="raw", cache=True, cache_keys=["obj"])
+    def raw(context):
+        calls.append(1)
+        return {"done": True}
+
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([raw])
+    pipeline.run({"obj": object()})
+    pipeline.run({"obj": object()})
+    assert len(calls) == 2
+
+
+def test_memory_tier_is_a_bounded_lru():
+    """El nivel en memoria descarta primero lo menos usado."""
+    cache = MemoryCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    assert cache.put("c", 3) == 1
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+
+
+def test_cached_results_are_fresh_copies():
+    """Modificar un resultado de la caché no altera las siguientes ejecuciones."""
+
+    @step(name="load", cache=True, cache_keys=[])
+    def load(context):
+        return {"items": [0, 1]}
+
+    def extend(context):
+        context["items"].append(99)
+        return {"items": context["items"]}
+
+    pipeline = Pipeline(show_progress=False, step_cache=StepCache())
+    pipeline.set_steps([load, (extend, "extend", "v1.0")])
+    assert [pipeline.run({})["items"] for _ in range(3)] == [[0, 1, 99]] * 3
+
+    cache = MemoryCache()
+    lock_holder = {"lock": threading.Lock(), "n": [1]}
+    cache.put("k", lock_holder)
+    assert cache.get("k")[1]["n"] == [1]
+
+
+def test_tracker_records_cache_counters(tmp_path):
+    """El tracker guarda aciertos, fallos y desalojos por paso."""
+    @step(name="tracked_cached", cache=True, cache_keys=["x"])
+    def tracked_cached(context):
+        return {"y": context["x"]}
+
+    pipeline = Pipeline(
+        show_progress=False,
+        tracking_db=str(tmp_path / "tracking.db"),
+        config_dir=str(tmp_path / "configs"),
+        step_cache=StepCache(max_memory_entries=1),
+    )
+    pipeline.set_steps([tracked_cached])
+    for x in (1, 1, 2):
+        pipeline.run({"x": x})
+
+    conn = pipeline.tracker.db_cache_stats._get_connection()
+    totals = conn.execute(
+        "SELECT SUM(hits), SUM(misses), SUM(evictions) FROM cache_stats WHERE step_name = ?",
+        ("tracked_cached",),
+    ).fetchone()
+    assert totals == (1, 2, 1)
+
+
+def test_async_pipeline_uses_the_cache():
+    """PipelineAsync también sirve pasos desde la caché."""
+    calls = []
+
+    async def async_cached(context):
+        calls.append(1)
+        return {"y": context["x"] + 1}
+
+    pipeline = PipelineAsync(show_progress=False)
+    pipeline.set_steps([(async_cached, "async_cached", "v1.0", {"cache": True, "cache_keys": ["x"]})])
+    assert asyncio.run(pipeline.run({"x": 1}))["y"] == 2
+    assert asyncio.run(pipeline.run({"x": 1}))["y"] == 2
+    assert len(calls) == 1
+
+
+def test_batch_runs_add_up_cache_counters(tmp_path):
+    """run_many acumula los contadores de caché de todas sus ejecuciones."""
+    @step(name="batch_cached", cache=True, cache_keys=["x"])
+    def batch_cached(context):
+        return {"y": context["x"]}
+
+    pipeline = Pipeline(
+        show_progress=False,
+        tracking_db=str(tmp_path / "tracking.db"),
+        config_dir=str(tmp_path / "configs"),
+    )
+    pipeline.set_steps([batch_cached])
+    results = list(pipeline.run_many([{"x": x} for x in (1, 1, 2, 2, 3)], max_concurrency=1))
+    assert sorted(r["y"] for r in results) == [1, 1, 2, 2, 3]
+    assert pipeline._cache_counters == {"batch_cached": {"hits": 2, "misses": 3, "evictions": 0}}
+
+    conn = pipeline.tracker.db_cache_stats._get_connection()
+    rows = conn.execute(
+        "SELECT pipeline_id, hits, misses FROM cache_stats WHERE step_name = ?", ("batch_cached",)
+    ).fetchall()
+    assert rows == [(pipeline.pipeline_id, 2, 3)]
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from wpipe import Pipeline
+from wpipe.exception import TaskError
+
+
+def load(context):
+    time.sleep(0.005)
+    return {"loaded": context["x"]}
+
+
+def transform(context):
+    return {"value": context["loaded"] * 10}
+
+
+def fail_on_two(context):
+    if context["x"] == 2:
+        raise ValueError("two")
+    return {"ok": True}
+
+
+def test_stream_keeps_order_with_single_workers():
+    """Con un worker por etapa la salida respeta el orden de entrada."""
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([(load, "load", "v1.0"), (transform, "transform", "v1.0")])
+
+    results = list(pipeline.stream(({"x": i} for i in range(15)), buffer=2))
+    assert [r["value"] for r in results] == [i * 10 for i in range(15)]
+    assert all("progress_rich" not in r for r in results)
+
+
+def test_stream_workers_per_stage():
+    """Cada etapa puede tener varios workers."""
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([(load, "load", "v1.0"), (transform, "transform", "v1.0")])
+
+    results = list(pipeline.stream([{"x": i} for i in range(12)], workers=[3, 1]))
+    assert sorted(r["value"] for r in results) == [i * 10 for i in range(12)]
+
+    with pytest.raises(ValueError):
+        list(pipeline.stream([{"x": 1}], workers=[1]))
+
+
+def test_stream_backpressure():
+    """Un consumidor lento limita cuántas entradas se leen por adelantado."""
+    consumed = []
+
+    def source():
+        for i in range(50):
+            consumed.append(i)
+            yield {"x": i}
+
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([(lambda c: {"loaded": c["x"]}, "load", "v1.0"), (transform, "transform", "v1.0")])
+
+    stream = pipeline.stream(source(), buffer=1)
+    next(stream)
+    time.sleep(0.2)
+    # Two stage queues + one item per stage/feeder in flight
+    assert len(consumed) < 10
+    stream.close()
+    assert not [t for t in threading.enumerate() if t.name.startswith("wpipe_stream")]
+
+
+def test_stream_errors():
+    """Los fallos se propagan salvo que continue_on_error esté activo."""
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([(fail_on_two, "fail", "v1.0")])
+    with pytest.raises(TaskError):
+        list(pipeline.stream([{"x": i} for i in range(5)]))
+
+    pipeline = Pipeline(show_progress=False, continue_on_error=True)
+    pipeline.set_steps([(fail_on_two, "fail", "v1.0"), (lambda c: {"after": True}, "after", "v1.0")])
+    results = list(pipeline.stream([{"x": i} for i in range(5)]))
+    assert len(results) == 5
+    assert "ok" not in results[2]
+    assert all(r["after"] for r in results)
+
+
+def test_streamed_steps_keep_their_plan_order(tmp_path):
+    """Cada etapa registra su paso con el orden que tiene en el plan."""
+    pipeline = Pipeline(
+        show_progress=False,
+        tracking_db=str(tmp_path / "tracking.db"),
+        config_dir=str(tmp_path / "configs"),
+        buffered_tracking=True,
+    )
+    pipeline.set_steps([(load, "load", "v1.0"), (transform, "transform", "v1.0")])
+    assert len(list(pipeline.stream([{"x": i} for i in range(4)], workers=[2, 1]))) == 4
+    pipeline.tracker.flush()
+
+    steps = pipeline.tracker.get_pipeline(pipeline.pipeline_id, include_data=False)["steps"]
+    assert sorted((s["step_name"], s["step_order"]) for s in steps) == [("load", 1)] * 4 + [("transform", 2)] * 4
@@ -0,0 +1,123 @@
+import builtins
+import threading
+import time
+
+import pytest
+
+from wpipe import Pipeline, step
+from wpipe.pipe.components.plan import resolve_policy
+from wpipe.timeout import timeout as timeout_module
+from wpipe.timeout import TimeoutError, current_token, run_with_timeout, timeout_sync
+
+
+def busy_loop(seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        pass
+    return "done"
+
+
+def test_step_timeout_returns_without_waiting_for_the_step():
+    """El timeout de un paso se dispara sin esperar a que termine."""
+    cancelled = threading.Event()
+
+    @step(name="slow", timeout=0.2)
+    def slow(context):
+        token = current_token()
+        if token.wait(3):
+            cancelled.set()
+        return {"never": True}
+
+    pipeline = Pipeline(show_progress=False, continue_on_error=True)
+    pipeline.set_steps([slow])
+    start = time.time()
+    result = pipeline.run({})
+    assert time.time() - start < 1.5
+    assert "never" not in result
+    assert cancelled.wait(1)
+
+
+def test_run_with_timeout_returns_value_and_propagates_errors():
+    """Devuelve el resultado y propaga las excepciones de la función."""
+    assert run_with_timeout(lambda x: x * 2, 1, 21) == 42
+    with pytest.raises(ZeroDivisionError):
+        run_with_timeout(lambda: 1 / 0, 1)
+    with pytest.raises(ValueError):
+        run_with_timeout(lambda: None, 1, isolation="fiber")
+
+
+def test_process_isolation_kills_runaway_code():
+    """Con aislamiento por proceso el código bloqueado se termina."""
+    start = time.time()
+    with pytest.raises(TimeoutError):
+        run_with_timeout(busy_loop, 0.3, 30, isolation="process")
+    assert time.time() - start < 3
+    assert run_with_timeout(busy_loop, 5, 0, isolation="process") == "done"
+
+
+def test_timeout_sync_works_off_the_main_thread():
+    """timeout_sync admite fracciones de segundo fuera del hilo principal."""
+    @timeout_sync(0.1)
+    def sleepy():
+        time.sleep(2)
+
+    errors = []
+
+    def worker():
+        try:
+            sleepy()
+        except TimeoutError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    start = time.time()
+    thread.start()
+    thread.join(2)
+    assert errors and time.time() - start < 1
+
+
+def add_one(context):
+    return {"n": context.get("n", 0) + 1}
+
+
+def test_process_isolated_steps_are_reported_and_nested_pipelines_rejected():
+    """Los pasos aislados en proceso informan a la API; un sub-pipeline no se aísla."""
+    updates = []
+    pipeline = Pipeline(show_progress=False)
+    pipeline.send_to_api = True
+    pipeline.register_process = lambda msg: {"sons": [{"id": "T1"}], "father": "F1"}
+    pipeline.end_process = lambda msg: True
+    pipeline.update_task = lambda msg: updates.append(msg["status"])
+    pipeline.add_state(name="add", state=add_one, timeout=5, isolation="process")
+    assert pipeline.run({"n": 1})["n"] == 2
+    assert updates == ["start", "success"]
+
+    inner = Pipeline(show_progress=False)
+    inner.set_steps([(add_one, "inner", "v1.0")])
+    policy = resolve_policy(inner, {"timeout": 5, "isolation": "process"})
+    with pytest.raises(ValueError, match="process isolation"):
+        Pipeline(show_progress=False)._task_invoke(inner, "nested", {"n": 1}, __policy__=policy)
+
+
+def test_step_timeouts_are_builtin_timeout_errors():
+    """Un timeout de paso es un TimeoutError estándar y se reintenta como tal."""
+    calls = []
+
+    def flaky(context):
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(1)
+        return {"done": True}
+
+    assert issubclass(TimeoutError, builtins.TimeoutError)
+    pipeline = Pipeline(show_progress=False, max_retries=1, retry_on_exceptions=(builtins.TimeoutError,))
+    pipeline.add_state(name="flaky", state=flaky, timeout=0.2)
+    assert pipeline.run({})["done"] and len(calls) == 2
+
+
+def test_process_isolation_works_without_fork(monkeypatch):
+    """Con spawn el paso aislado recibe un contexto sin la barra de progreso."""
+    monkeypatch.setattr(timeout_module, "PROCESS_START_METHOD", "spawn")
+    pipeline = Pipeline(show_progress=True)
+    pipeline.add_state(name="add", state=add_one, timeout=30, isolation="process")
+    assert pipeline.run({"n": 1})["n"] == 2
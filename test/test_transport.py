@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+from wpipe import Parallel, Pipeline
+from wpipe.pipe.components.transport import pack, release, unpack
+
+
+def _segments():
+    if not os.path.isdir("/dev/shm"):
+        return set()
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+def _total(context):
+    array = context["array"]
+    return {"total": float(array.sum()), "read_only": not array.flags.writeable}
+
+
+def _doubled(context):
+    return {"doubled": context["array"] * 2}
+
+
+def test_large_buffers_leave_the_pickle_stream():
+    """Los buffers grandes viajan en memoria compartida y se leen sin copia."""
+    data = {
+        "raw": b"a" * 4096,
+        "mutable": bytearray(b"b" * 4096),
+        "view": memoryview(b"c" * 4096),
+        "nested": [{"blob": b"d" * 4096}],
+        "small": b"tiny",
+    }
+    payload, segment = pack(data, threshold=1024)
+    assert segment is not None
+    assert len(payload[0]) < 1024
+
+    result, mapped = unpack(payload)
+    assert result["raw"] == data["raw"] and type(result["raw"]) is bytes
+    assert type(result["mutable"]) is bytearray
+    assert result["view"].readonly and bytes(result["view"]) == b"c" * 4096
+    assert result["nested"][0]["blob"] == b"d" * 4096
+    assert result["small"] == b"tiny"
+
+    del result
+    release(mapped)
+    release(segment, unlink=True)
+
+
+def test_threshold_none_keeps_everything_in_band():
+    """Con threshold=None no se crea ningún segmento."""
+    payload, segment = pack({"raw": b"a" * 4096}, threshold=None)
+    assert segment is None
+    assert unpack(payload) == ({"raw": b"a" * 4096}, None)
+
+
+def test_numpy_arrays_are_shared_read_only():
+    """Los arrays llegan como vistas de solo lectura; con copy=True son propios."""
+    np = pytest.importorskip("numpy")
+    array = np.arange(10000, dtype=np.float64).reshape(100, 100).T
+    payload, segment = pack({"array": array}, threshold=1024)
+
+    view, mapped = unpack(payload)
+    assert np.array_equal(view["array"], array)
+    assert not view["array"].flags.writeable
+    del view
+    release(mapped)
+
+    copied, _ = unpack(pack({"array": array}, threshold=1024)[0], copy=True)
+    assert copied["array"].flags.writeable
+    release(segment, unlink=True)
+
+
+def test_process_parallel_uses_shared_memory():
+    """Parallel con procesos intercambia arrays grandes y no deja segmentos."""
+    np = pytest.importorskip("numpy")
+    before = _segments()
+
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([
+        Parallel(steps=[_total, _doubled], max_workers=2, use_processes=True, shared_memory_threshold=1024),
+    ])
+    result = pipeline.run({"array": np.ones(100000)})
+    pipeline.close()
+
+    assert result["total"] == 100000
+    assert result["read_only"] is True
+    assert result["doubled"].sum() == 200000
+    assert _segments() <= before
+
+
+
+def _double_in_place(context):
+    context["array"] *= 2
+    return {"first": float(context["array"][0])}
+
+
+def test_process_parallel_gives_writable_copies_by_default():
+    """Sin activar la memoria compartida los procesos pueden modificar los arrays."""
+    np = pytest.importorskip("numpy")
+    pipeline = Pipeline(show_progress=False)
+    pipeline.set_steps([Parallel(steps=[_double_in_place], max_workers=1, use_processes=True)])
+    result = pipeline.run({"array": np.ones(1 << 19)})
+    pipeline.close()
+
+    assert "error" not in result and result["first"] == 2.0
@@ -106,6 +106,7 @@ _LAZY_MAP = {
     "Severity": (".tracking", "Severity"),
     "PipelineTracker": (".tracking", "PipelineTracker"),
     "CheckpointManager": (".checkpoint", "CheckpointManager"),
+    "StepCache": (".cache", "StepCache"),
     "PipelineExporter": (".export", "PipelineExporter"),
     "PipelineContext": (".type_hinting", "PipelineContext"),
     "GenericPipeline": (".type_hinting", "GenericPipeline"),
@@ -115,6 +116,9 @@ _LAZY_MAP = {
     "timeout_sync": (".timeout", "timeout_sync"),
     "timeout_async": (".timeout", "timeout_async"),
     "PipelineTimeoutError": (".timeout", "TimeoutError"),
+    "CancellationToken": (".timeout", "CancellationToken"),
+    "current_token": (".timeout", "current_token"),
+    "run_with_timeout": (".timeout", "run_with_timeout"),
     "memory": (".ram", "memory"),
     "new_logger": (".log", "new_logger"),
     "start_dashboard": (".dashboard.main", "start_dashboard"),
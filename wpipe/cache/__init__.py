@@ -0,0 +1,7 @@
+"""
+Step result caching for WPipe pipelines.
+"""
+
+from .cache import DiskCache, MemoryCache, StepCache, make_cache_key, stable_hash
+
+__all__ = ["DiskCache", "MemoryCache", "StepCache", "make_cache_key", "stable_hash"]
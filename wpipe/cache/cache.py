@@ -0,0 +1,450 @@
+"""
+Step result cache for WPipe pipelines.
+
+Steps declared with ``@step(cache=True)`` are treated as pure functions of
+a few context keys. Their results are stored under a key made of the step
+name, its version and a stable hash of the selected inputs, in a bounded
+in-memory LRU tier backed by an optional SQLite tier that several
+processes can share.
+"""
+
+import copy
+import dataclasses
+import datetime
+import decimal
+import enum
+import hashlib
+import os
+import pathlib
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Context keys that never take part in a cache key
+_IGNORED_KEYS = ("progress_rich", "error")
+
+# Values hashed through their repr, which is stable for these types
+_REPR_TYPES = (
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    decimal.Decimal,
+    uuid.UUID,
+    pathlib.PurePath,
+    enum.Enum,
+)
+
+
+def _feed(digest: Any, value: Any) -> None:
+    """Feed a canonical encoding of a value into a hash."""
+    # pylint: disable=too-many-branches
+    if value is None or isinstance(value, (bool, int, float, str, complex)):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = value.tobytes() if isinstance(value, memoryview) else value
+        digest.update(f"bytes:{len(data)};".encode())
+        digest.update(data)
+    elif isinstance(value, dict):
+        digest.update(f"dict:{len(value)};".encode())
+        for key in sorted(value, key=repr):
+            _feed(digest, key)
+            _feed(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}:{len(value)};".encode())
+        for item in value:
+            _feed(digest, item)
+    elif isinstance(value, (set, frozenset)):
+        digest.update(f"set:{len(value)};".encode())
+        for item_hash in sorted(stable_hash(item) for item in value):
+            digest.update(item_hash.encode())
+    elif isinstance(value, _REPR_TYPES):
+        digest.update(f"{type(value).__qualname__}:{value!r};".encode())
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        digest.update(f"{type(value).__qualname__}:".encode())
+        _feed(digest, {f.name: getattr(value, f.name) for f in dataclasses.fields(value)})
+    else:
+        np = sys.modules.get("numpy")
+        if np is not None and isinstance(value, np.ndarray) and not value.dtype.hasobject:
+            digest.update(f"ndarray:{value.dtype.str}:{value.shape};".encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+            return
+        raise TypeError(f"Cannot build a stable hash for {type(value).__name__}")
+
+
+def stable_hash(value: Any) -> str:
+    """
+    Hash a value so that equal values give the same digest in every process.
+
+    Supports None, numbers, strings, bytes-like objects, dicts, lists,
+    tuples, sets, dates, decimals, UUIDs, paths, enums, dataclasses and
+    numpy arrays.
+
+    Args:
+        value: The value to hash.
+
+    Returns:
+        str: Hex SHA-256 digest.
+
+    Raises:
+        TypeError: If the value (or a nested value) has no stable encoding.
+    """
+    digest = hashlib.sha256()
+    _feed(digest, value)
+    return digest.hexdigest()
+
+
+def make_cache_key(
+    name: str, version: str, context: Dict[str, Any], keys: Optional[Iterable[str]] = None
+) -> str:
+    """
+    Build the cache key of a step call.
+
+    Args:
+        name: Step name.
+        version: Step version.
+        context: The context the step receives.
+        keys: Context keys the step depends on (default: every key not
+            starting with an underscore).
+
+    Returns:
+        str: The cache key.
+
+    Raises:
+        TypeError: If a selected value cannot be hashed stably.
+    """
+    if keys is None:
+        keys = [k for k in context if not str(k).startswith("_") and k not in _IGNORED_KEYS]
+    # A missing key hashes differently from a key set to None
+    inputs = [(key, key in context, context.get(key)) for key in sorted(set(keys), key=repr)]
+    return f"{name}:{version}:{stable_hash(inputs)}"
+
+
+def _freeze(value: Any) -> Tuple[bool, Any]:
+    """Detach a value from its caller: pickle it, or deep-copy it as a fallback."""
+    try:
+        return True, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        pass
+    try:
+        return False, copy.deepcopy(value)
+    except (TypeError, copy.Error):
+        # Neither picklable nor copyable (e.g. holds a lock): shared as is
+        return False, value
+
+
+def _thaw(pickled: bool, stored: Any) -> Any:
+    """Return a fresh copy of a value stored by ``_freeze``."""
+    if pickled:
+        return pickle.loads(stored)
+    try:
+        return copy.deepcopy(stored)
+    except (TypeError, copy.Error):
+        return stored
+
+
+class MemoryCache:
+    """
+    Bounded in-memory LRU cache.
+
+    Values are stored pickled (or deep-copied when they cannot be pickled)
+    and every hit returns a fresh copy, so mutating a result never alters
+    the cached one.
+
+    Attributes:
+        max_entries (int): Maximum number of stored results.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of stored results.
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key and mark it as recently used.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            Tuple[bool, Any]: Whether the key was found, and its value.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return False, None
+            self._entries.move_to_end(key)
+            pickled, stored = self._entries[key]
+        # Every hit gets its own copy, so callers can mutate it freely
+        return True, _thaw(pickled, stored)
+
+    def put(self, key: str, value: Any) -> int:
+        """
+        Store a value, evicting the least recently used entries beyond the limit.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+
+        Returns:
+            int: Number of evicted entries.
+        """
+        entry = _freeze(value)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """
+    SQLite-backed cache that several threads and processes can share.
+
+    Values are pickled. Each thread uses its own connection; the database
+    runs in WAL mode so readers never block the writer.
+
+    Attributes:
+        path (str): Path to the SQLite file.
+        max_entries (Optional[int]): Maximum number of stored results
+            (least recently used ones are evicted first), None for no limit.
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = 10000) -> None:
+        """
+        Initialize the cache. The database is created on first use.
+
+        Args:
+            path: Path to the SQLite file.
+            max_entries: Maximum number of stored results, None for no limit.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the connection of the current thread (and process)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS step_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_step_cache_last_used ON step_cache(last_used);
+            """
+        )
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key and mark it as recently used.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            Tuple[bool, Any]: Whether the key was found, and its value.
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM step_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False, None
+        with conn:
+            conn.execute("UPDATE step_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        return True, pickle.loads(row[0])
+
+    def put(self, key: str, value: Any) -> int:
+        """
+        Store a value, evicting the least recently used entries beyond the limit.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+
+        Returns:
+            int: Number of evicted entries.
+
+        Raises:
+            pickle.PicklingError: If the value cannot be pickled.
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO step_cache (key, value, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, blob, now, now),
+            )
+            if self.max_entries is None:
+                return 0
+            excess = conn.execute("SELECT COUNT(*) FROM step_cache").fetchone()[0] - self.max_entries
+            if excess <= 0:
+                return 0
+            conn.execute(
+                "DELETE FROM step_cache WHERE key IN "
+                "(SELECT key FROM step_cache ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            return excess
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM step_cache")
+
+    def close(self) -> None:
+        """Close the connection of the current thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class StepCache:
+    """
+    Two-tier step result cache: an in-memory LRU in front of an optional SQLite file.
+
+    A StepCache can be pickled (e.g. with a pipeline shipped to process
+    workers); the copy keeps the configuration and the persistent tier but
+    starts with an empty memory tier.
+
+    Attributes:
+        path (Optional[str]): Path of the persistent tier, None for memory only.
+        memory (MemoryCache): The in-memory tier.
+        disk (Optional[DiskCache]): The persistent tier.
+        evictions (int): Total entries evicted from either tier.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_entries: int = 256,
+        max_disk_entries: Optional[int] = 10000,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            path: Path of the SQLite file for the persistent tier (None keeps
+                results in memory only).
+            max_memory_entries: Maximum number of results kept in memory.
+            max_disk_entries: Maximum number of results kept on disk, None for
+                no limit.
+        """
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.memory = MemoryCache(max_memory_entries)
+        self.disk = DiskCache(path, max_disk_entries) if path else None
+        self.evictions = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key in memory, then on disk (promoting disk hits to memory).
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            Tuple[bool, Any]: Whether the key was found, and its value.
+        """
+        found, value = self.memory.get(key)
+        if found or self.disk is None:
+            return found, value
+        try:
+            found, value = self.disk.get(key)
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return False, None
+        if found:
+            self.evictions += self.memory.put(key, value)
+        return found, value
+
+    def put(self, key: str, value: Any) -> int:
+        """
+        Store a result in both tiers.
+
+        Results that cannot be pickled are only kept in memory.
+
+        Args:
+            key: The cache key.
+            value: The result to store.
+
+        Returns:
+            int: Number of entries evicted to make room.
+        """
+        evicted = self.memory.put(key, value)
+        if self.disk is not None:
+            try:
+                evicted += self.disk.put(key, value)
+            except (sqlite3.Error, pickle.PicklingError, TypeError, AttributeError):
+                pass
+        self.evictions += evicted
+        return evicted
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "max_memory_entries": self.max_memory_entries,
+            "max_disk_entries": self.max_disk_entries,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc]  # pylint: disable=unnecessary-dunder-call
+
+
+_COUNTER_LOCK = threading.Lock()
+
+
+def count_cache_event(counters: Dict[str, Dict[str, int]], name: str, event: str, amount: int = 1) -> None:
+    """
+    Increment a per-step cache counter.
+
+    Args:
+        counters: Counters by step name ({"hits", "misses", "evictions"}).
+        name: Step name.
+        event: "hits", "misses" or "evictions".
+        amount: Increment.
+    """
+    with _COUNTER_LOCK:
+        step_counters = counters.setdefault(name, {"hits": 0, "misses": 0, "evictions": 0})
+        step_counters[event] += amount
@@ -11,6 +11,7 @@ from typing import Any, Dict, Optional
 from wsqlite import WSQLite
 
 from wpipe.sqlite.tables_dto.tracker_models import CheckpointModel
+from wpipe.tracking.migrations import ensure_schema
 from wpipe.util.transform import object_to_dict
 
 
@@ -26,6 +27,7 @@ class CheckpointManager:
         """
         self.db_path = db_path
         self.db = WSQLite(CheckpointModel, self.db_path)
+        ensure_schema(self.db)
 
     def save_checkpoint(
         self,
@@ -9,19 +9,26 @@ The dashboard is modularized into:
 - templates/: HTML template views
 """
 
+import asyncio
+import json
 import threading
 import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 from webbrowser import open as open_url
 
 import uvicorn
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 from jinja2 import Environment, FileSystemLoader
 
-from wpipe.tracking import PipelineTracker
+from wpipe.tracking import DatabaseTailer, PipelineTracker
 
 # Get the dashboard directory path
 DASHBOARD_DIR = Path(__file__).parent
@@ -62,87 +69,197 @@ def start_dashboard(
     uvicorn.run(app, host=host, port=port)
 
 
+class _ResponseCache:
+    """
+    Serialized JSON responses by URL, valid for one database version.
+
+    Attributes:
+        token (str): Random prefix of the ETags, so the ETags of a previous
+            server process never match.
+        max_entries (int): Maximum number of cached responses.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.token = uuid.uuid4().hex[:8]
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, version: int) -> Optional[bytes]:
+        """Get the cached body of a URL if it was built at this version."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, version: int, body: bytes) -> None:
+        """Cache the body of a URL built at a version."""
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
 def create_app(
     db_path: str = "wpipe_dashboard.db",
     config_dir: Optional[str] = None,
+    read_pool_size: int = 4,
+    live_interval: float = 1.0,
+    live_max_pending: int = 1000,
 ) -> FastAPI:
     """
     Create and configure the FastAPI application.
 
+    The app holds one tracker. Queries run in the threadpool on a pool of
+    read-only connections, and JSON responses are cached and carry an ETag
+    until ``PRAGMA data_version`` reports a commit, so polling unchanged
+    data is answered from memory or with 304 Not Modified.
+
+    ``/api/live`` streams the changes as Server-Sent Events: deltas of the
+    trackers of this process, and of other processes found by tailing the
+    database every ``live_interval`` seconds.
+
     Args:
         db_path: Path to the SQLite database.
         config_dir: Directory containing pipeline configurations.
+        read_pool_size: Number of read-only database connections.
+        live_interval: Seconds between two checks for writes of other processes.
+        live_max_pending: Pending deltas after which a slow live client is
+            told to reload instead.
 
     Returns:
         The configured FastAPI application instance.
     """
-    app = FastAPI(title="wpipe Dashboard")
+    tracker = PipelineTracker(db_path=db_path, config_dir=config_dir, read_pool_size=read_pool_size)
+    cache = _ResponseCache()
+    tailer = DatabaseTailer(tracker.read_pool, tracker.live, live_interval) if tracker.read_pool else None
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        if tailer is not None:
+            tailer.start()
+        yield
+        if tailer is not None:
+            tailer.stop()
+        if tracker.read_pool is not None:
+            tracker.read_pool.close()
+
+    app = FastAPI(title="wpipe Dashboard", lifespan=lifespan)
 
     # Mount static files
     static_dir = DASHBOARD_DIR / "static"
     if static_dir.exists():
         app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
+    async def cached(request: Request, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Response:
+        """Answer a read endpoint from the cache, or run it in the threadpool."""
+        if tracker.read_pool is None:
+            return JSONResponse(jsonable_encoder(await run_in_threadpool(func, *args, **kwargs)))
+        version = await run_in_threadpool(tracker.read_pool.data_version)
+        etag = f'"{cache.token}-{version}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+            return Response(status_code=304, headers=headers)
+        key = str(request.url)
+        body = cache.get(key, version)
+        if body is None:
+            result = await run_in_threadpool(func, *args, **kwargs)
+            body = json.dumps(jsonable_encoder(result)).encode("utf-8")
+            cache.put(key, version, body)
+        return Response(body, media_type="application/json", headers=headers)
+
     @app.get("/")
     async def root() -> HTMLResponse:
         """Root endpoint that serves the dashboard HTML."""
         return HTMLResponse(get_dashboard_html())
 
     @app.get("/api/stats")
-    async def get_stats() -> Dict[str, Any]:
+    async def get_stats(request: Request) -> Response:
         """Get pipeline execution statistics."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_stats()
+        return await cached(request, tracker.get_stats)
 
     @app.get("/api/pipelines")
-    async def get_pipelines(status: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get list of pipelines, optionally filtered by status."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_pipelines(status=status)
+    async def get_pipelines(
+        request: Request,
+        status: Optional[str] = None,
+        name: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Response:
+        """Get a page of pipelines, optionally filtered by status and name."""
+        return await cached(request, tracker.get_pipelines, limit=limit, offset=offset, status=status, name=name)
 
     @app.get("/api/data/{table}")
     async def get_table_data(
+        request: Request,
         table: str,
         page: int = 1,
         page_size: int = 20,
         search: Optional[str] = None,
         status: Optional[str] = None,
-    ) -> Dict[str, Any]:
+    ) -> Response:
         """Get paginated data from a specific tracking table."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_table_data(
-            table=table,
-            page=page,
-            page_size=page_size,
-            search=search,
-            status=status,
-        )
+        try:
+            return await cached(
+                request,
+                tracker.get_table_data,
+                table=table,
+                page=page,
+                page_size=page_size,
+                search=search,
+                status=status,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+    @app.get("/api/search")
+    async def search(
+        request: Request,
+        q: str,
+        kind: Optional[List[str]] = Query(None),
+        pipeline_id: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Response:
+        """Full-text search over pipeline errors, step errors and outputs, and events."""
+        try:
+            return await cached(
+                request, tracker.search, q, kinds=kind, pipeline_id=pipeline_id, limit=limit, offset=offset
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
 
     @app.get("/api/pipelines/{pipeline_id}")
-    async def get_pipeline(pipeline_id: str) -> Optional[Dict[str, Any]]:
-        """Get details for a specific pipeline execution."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_pipeline(pipeline_id)
+    async def get_pipeline(request: Request, pipeline_id: str, include_data: bool = False) -> Response:
+        """Get details for a specific pipeline execution (step payloads on request)."""
+        return await cached(request, tracker.get_pipeline, pipeline_id, include_data=include_data)
+
+    @app.get("/api/steps/{step_id}")
+    async def get_step(request: Request, step_id: int) -> Response:
+        """Get one step with its input, output and traceback."""
+        return await cached(request, tracker.get_step, step_id)
 
     @app.get("/api/pipelines/by-name/{pipeline_name}")
     async def get_pipeline_executions(
-        pipeline_name: str, limit: int = 100, offset: int = 0
-    ) -> List[Dict[str, Any]]:
+        request: Request, pipeline_name: str, limit: int = 100, offset: int = 0
+    ) -> Response:
         """Get all executions of a pipeline by name."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_pipeline_executions(pipeline_name, limit=limit, offset=offset)
+        return await cached(request, tracker.get_pipeline_executions, pipeline_name, limit=limit, offset=offset)
 
     @app.get("/api/pipelines/{pipeline_id}/graph")
-    async def get_pipeline_graph(pipeline_id: str) -> Dict[str, Any]:
-        """Get the execution graph for a pipeline."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_pipeline_graph(pipeline_id)
+    async def get_pipeline_graph(
+        request: Request, pipeline_id: str, expand: Optional[List[int]] = Query(None), collapse_over: int = 20
+    ) -> Response:
+        """Get the execution graph for a pipeline, with large blocks collapsed."""
+        return await cached(
+            request, tracker.get_pipeline_graph, pipeline_id, expand=expand, collapse_over=collapse_over
+        )
 
-    @app.get("/api/pipelines/{pipeline_id}/yaml")
-    async def get_pipeline_yaml(pipeline_id: str) -> Union[str, Dict[str, str]]:
-        """Get the YAML configuration for a pipeline execution."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        pipeline = tracker.get_pipeline(pipeline_id)
+    def read_pipeline_yaml(pipeline_id: str) -> Union[str, Dict[str, str]]:
+        pipeline = tracker.get_pipeline(pipeline_id, include_data=False)
         if pipeline and pipeline.get("config_yaml"):
             yaml_path = Path(pipeline["config_yaml"])
             if not yaml_path.exists() and config_dir:
@@ -153,59 +270,92 @@ def create_app(
                 return yaml_path.read_text(encoding="utf-8")
         return {"error": "YAML not found"}
 
+    @app.get("/api/pipelines/{pipeline_id}/yaml")
+    async def get_pipeline_yaml(pipeline_id: str) -> Union[str, Dict[str, str]]:
+        """Get the YAML configuration for a pipeline execution."""
+        return await run_in_threadpool(read_pipeline_yaml, pipeline_id)
+
     @app.get("/api/trends")
     async def get_trends(
-        days: int = 7, pipeline_name: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+        request: Request, days: int = 7, pipeline_name: Optional[str] = None
+    ) -> Response:
         """Get execution trends over time."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_trend_data(days=days, pipeline_name=pipeline_name)
+        return await cached(request, tracker.get_trend_data, days=days, pipeline_name=pipeline_name)
 
     @app.get("/api/alerts")
     async def get_alerts(
-        limit: int = 50, severity: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+        request: Request, limit: int = 50, severity: Optional[str] = None
+    ) -> Response:
         """Get recently fired alerts."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_fired_alerts(limit=limit, severity=severity)
+        return await cached(request, tracker.get_fired_alerts, limit=limit, severity=severity)
 
     @app.get("/api/alerts/config")
-    async def get_alert_config() -> List[Dict[str, Any]]:
+    async def get_alert_config(request: Request) -> Response:
         """Get alert threshold configurations."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_alert_thresholds()
+        return await cached(request, tracker.get_alert_thresholds)
 
     @app.get("/api/events")
     async def get_events(
-        pipeline_id: Optional[str] = None, limit: int = 50
-    ) -> List[Dict[str, Any]]:
+        request: Request, pipeline_id: Optional[str] = None, limit: int = 50
+    ) -> Response:
         """Get pipeline events."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_events(pipeline_id=pipeline_id, limit=limit)
+        return await cached(request, tracker.get_events, pipeline_id=pipeline_id, limit=limit)
 
     @app.get("/api/slow-steps")
-    async def get_slow_steps(limit: int = 10) -> List[Dict[str, Any]]:
+    async def get_slow_steps(request: Request, limit: int = 10) -> Response:
         """Get the slowest pipeline steps."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_top_slow_steps(limit=limit)
+        return await cached(request, tracker.get_top_slow_steps, limit=limit)
 
     @app.get("/api/analysis/states")
-    async def get_states_analysis() -> Dict[str, Any]:
+    async def get_states_analysis(request: Request) -> Response:
         """Get analysis of pipeline states."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_states_analysis()
+        return await cached(request, tracker.get_states_analysis)
+
+    @app.get("/api/analysis/percentiles")
+    async def get_percentiles(
+        request: Request, entity_type: str = "step", name: Optional[str] = None, days: Optional[int] = None
+    ) -> Response:
+        """Get p50/p95/p99 durations by step or pipeline name."""
+        return await cached(request, tracker.get_percentiles, entity_type=entity_type, name=name, days=days)
 
     @app.get("/api/analysis/pipelines")
-    async def get_pipelines_analysis() -> Dict[str, Any]:
+    async def get_pipelines_analysis(request: Request) -> Response:
         """Get analysis of pipeline performance."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.get_pipelines_analysis()
+        return await cached(request, tracker.get_pipelines_analysis)
 
     @app.post("/api/alerts/{alert_id}/acknowledge")
     async def acknowledge_alert(alert_id: int) -> Dict[str, Any]:
         """Acknowledge a fired alert."""
-        tracker = PipelineTracker(db_path=db_path, config_dir=config_dir)
-        return tracker.acknowledge_alert(alert_id)
+        return await run_in_threadpool(tracker.acknowledge_alert, alert_id)
+
+    @app.get("/api/live")
+    async def live(request: Request) -> StreamingResponse:
+        """Stream pipeline, step, event and alert changes as Server-Sent Events."""
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        subscription = tracker.live.subscribe(live_max_pending, lambda: loop.call_soon_threadsafe(wake.set))
+
+        async def stream() -> AsyncIterator[str]:
+            try:
+                yield "retry: 3000\n\n"
+                while not await request.is_disconnected():
+                    try:
+                        await asyncio.wait_for(wake.wait(), timeout=15)
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+                        continue
+                    wake.clear()
+                    deltas, overflowed = subscription.drain()
+                    if overflowed:
+                        yield "event: resync\ndata: {}\n\n"
+                    for delta in deltas:
+                        yield f"event: {delta['type']}\ndata: {json.dumps(delta, default=str)}\n\n"
+                    # Let bursts of changes coalesce before the next message
+                    await asyncio.sleep(0.25)
+            finally:
+                subscription.close()
+
+        return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
     @app.get("/api/health")
     async def health_check() -> Dict[str, str]:
@@ -16,6 +16,7 @@ let graphState = {
     translateX: 0,
     translateY: 0,
     currentGraph: null,
+    expanded: new Set(),
     selectedNode: null,
     hoveredNode: null,
     isDragging: false,
@@ -50,6 +51,46 @@ function init() {
     loadPipelines();
     loadStats();
     setupEventListeners();
+    connectLive();
+}
+
+// ==================== LIVE UPDATES ====================
+// The server pushes pipeline, step, event and alert changes; each change
+// schedules a reload of the views it affects, batched over a short delay.
+let liveReloads = new Set();
+let liveTimer = null;
+
+function scheduleReload(...views) {
+    views.forEach(v => liveReloads.add(v));
+    if (liveTimer) return;
+    liveTimer = setTimeout(() => {
+        const views = liveReloads;
+        liveReloads = new Set();
+        liveTimer = null;
+        const visible = name => document.getElementById(`tab-${name}`)?.style.display === 'block';
+        if (views.has('pipelines')) loadPipelines();
+        if (views.has('stats')) loadStats();
+        if (views.has('graph') && currentPipelineId) selectPipeline(currentPipelineId);
+        if (views.has('events') && visible('events')) loadEvents();
+        if (views.has('alerts') && visible('alerts')) loadAlerts();
+    }, 1000);
+}
+
+function connectLive() {
+    if (!window.EventSource) return;
+    const source = new EventSource('/api/live');
+    const isCurrent = delta => delta.data && (delta.id === currentPipelineId || delta.data.pipeline_id === currentPipelineId);
+    source.addEventListener('pipeline', e => {
+        const delta = JSON.parse(e.data);
+        scheduleReload('pipelines', 'stats', ...(isCurrent(delta) ? ['graph'] : []));
+    });
+    source.addEventListener('step', e => {
+        const delta = JSON.parse(e.data);
+        if (isCurrent(delta)) scheduleReload('graph');
+    });
+    source.addEventListener('event', () => scheduleReload('events'));
+    source.addEventListener('alert', () => scheduleReload('alerts', 'stats'));
+    source.addEventListener('resync', () => scheduleReload('pipelines', 'stats', 'graph', 'events', 'alerts'));
 }
 
 // ==================== STATS ====================
@@ -195,6 +236,7 @@ window.filterPipelines = function(status) {
 // ==================== PIPELINE HISTORY ====================
 let currentPipelineId = null;
 let currentPipelineName = null;
+let currentSteps = [];
 
 window.showCurrentPipelineHistory = function() {
     if (currentPipelineName) {
@@ -428,6 +470,7 @@ async function selectPipeline(id) {
         
         if (!pipeline) return;
 
+        if (id !== currentPipelineId) graphState.expanded = new Set();
         currentPipelineId = id;
         currentPipelineName = pipeline.name || id;
         
@@ -437,16 +480,7 @@ async function selectPipeline(id) {
         });
         document.querySelector(`.pipeline-execution[onclick="selectPipeline('${id}')"]`)?.classList.add('active');
         
-        const gRes = await fetch('/api/pipelines/' + id + '/graph');
-        if (gRes.ok) {
-            const graph = await gRes.json();
-            graphState.currentGraph = graph;
-            try {
-                renderGraph(graph);
-            } catch (ge) {
-                console.error('Render graph error:', ge);
-            }
-        }
+        await loadGraph(id);
         
         try {
             renderSteps(pipeline);
@@ -469,6 +503,21 @@ async function selectPipeline(id) {
     }
 }
 
+async function loadGraph(id) {
+    // Collapsed For/Parallel blocks the user opened
+    const params = new URLSearchParams();
+    graphState.expanded.forEach(stepId => params.append('expand', stepId));
+    const gRes = await fetch('/api/pipelines/' + id + '/graph?' + params);
+    if (!gRes.ok) return;
+    const graph = await gRes.json();
+    graphState.currentGraph = graph;
+    try {
+        renderGraph(graph);
+    } catch (ge) {
+        console.error('Render graph error:', ge);
+    }
+}
+
 // ==================== GRAPH RENDERING ====================
 function renderGraph(graph) {
     const svg = document.getElementById('graph-svg');
@@ -498,6 +547,7 @@ function renderGraph(graph) {
     
     // Asignar niveles basándose en el flujo secuencial y jerarquía
     let currentLevel = 0;
+    const siblingCount = {}; // `${level}_${parent_step_id}` -> nodos ya colocados
     
     graph.nodes.forEach(node => {
         if (!node.parent_step_id) {
@@ -516,8 +566,9 @@ function renderGraph(graph) {
                 if (!levels[subLevel]) levels[subLevel] = [];
                 
                 // Determinamos offset vertical (cuántos sub-nodos hay ya en este nivel para este padre)
-                const siblings = levels[subLevel].filter(id => nodesMap[id] && nodesMap[id].parent_step_id === node.parent_step_id);
-                nodePositions[node.id] = { level: subLevel, offset: siblings.length };
+                const siblingKey = `${subLevel}_${node.parent_step_id}`;
+                nodePositions[node.id] = { level: subLevel, offset: siblingCount[siblingKey] || 0 };
+                siblingCount[siblingKey] = (siblingCount[siblingKey] || 0) + 1;
                 levels[subLevel].push(node.id);
             } else {
                 // Fallback si no encontramos al padre o el padre no ha sido posicionado aún
@@ -535,6 +586,8 @@ function renderGraph(graph) {
     const centerY = 250;
     
     // Calculamos coordenadas X, Y para cada nodo
+    const indexInLevel = {};
+    Object.values(levels).forEach(ids => ids.forEach((nodeId, i) => indexInLevel[nodeId] = i));
     graph.nodes.forEach(nd => {
         const pos = nodePositions[nd.id];
         nd.x = startX + (pos.level * spacingX);
@@ -543,7 +596,7 @@ function renderGraph(graph) {
         const siblingsInLevel = levels[pos.level].length;
         if (siblingsInLevel > 1) {
             const totalH = (siblingsInLevel - 1) * spacingY;
-            nd.y = (centerY - totalH/2) + (levels[pos.level].indexOf(nd.id) * spacingY);
+            nd.y = (centerY - totalH/2) + (indexInLevel[nd.id] * spacingY);
         } else {
             nd.y = centerY;
         }
@@ -572,12 +625,12 @@ function renderGraph(graph) {
     };
     
     graph.edges.forEach(e => {
-        const f = graph.nodes.find(n => n.id === e.from);
-        const t = graph.nodes.find(n => n.id === e.to);
+        const f = nodesMap[e.from];
+        const t = nodesMap[e.to];
         if (!f || !t) return;
         
         const color = e.color || statusColors[f.status] || '#64748b';
-        const isParallel = e.label === 'parallel';
+        const isParallel = e.label === 'parallel' || e.label === 'loop';
         const isSkipped = e.label === 'skipped';
         
         const line = document.createElementNS('http://www.w3.org/2000/svg', 'line');
@@ -604,13 +657,16 @@ function renderGraph(graph) {
         g.addEventListener('click', () => selectNode(nd));
         
         const color = statusColors[nd.status] || '#64748b';
-        const isParallel = nd.step_type === 'parallel';
+        const isBlock = nd.type === 'parallel' || nd.type === 'for';
         
-        if (isParallel) {
-            // Nodo especial para el bloque Parallel (Caja)
+        if (isBlock) {
+            // Nodo especial para los bloques Parallel/For (Caja); colapsado muestra los pasos ocultos
+            const hidden = nd.hidden_steps;
             g.innerHTML = `
-                <rect x="-40" y="-30" width="80" height="60" rx="8" fill="#1e293b" stroke="${color}" stroke-width="3"/>
-                <path d="M-15,-10 L15,-10 M-15,0 L15,0 M-15,10 L15,10" stroke="${color}" stroke-width="3" stroke-linecap="round"/>
+                <rect x="-40" y="-30" width="80" height="60" rx="8" fill="#1e293b" stroke="${color}" stroke-width="3" ${hidden ? 'stroke-dasharray="6,3"' : ''}/>
+                ${hidden
+                    ? `<text text-anchor="middle" dominant-baseline="central" fill="${color}" font-size="16" font-weight="bold">×${hidden.count}</text>`
+                    : `<path d="M-15,-10 L15,-10 M-15,0 L15,0 M-15,10 L15,10" stroke="${color}" stroke-width="3" stroke-linecap="round"/>`}
                 <rect x="-55" y="35" width="110" height="22" rx="5" fill="rgba(15,23,42,0.95)"/>
                 <text y="51" text-anchor="middle" fill="#00f2fe" font-size="11" font-weight="bold">${nd.name.toUpperCase()}</text>
             `;
@@ -756,6 +812,12 @@ function showNodeTooltip(e, node) {
         content += `<br><span>Ended: ${fmtTime(node.end_time)}</span>`;
     }
     
+    // Collapsed For/Parallel block: summary of its hidden steps
+    if (node.hidden_steps) {
+        const counts = Object.entries(node.hidden_steps.statuses).map(([st, n]) => `${n} ${st}`).join(', ');
+        content += `<br><span>${node.hidden_steps.count} steps (${counts}) — click to expand</span>`;
+    }
+    
     // Show condition info if applicable
     if (node.type === 'condition') {
         content += `<br><span style="border-top: 1px solid rgba(148, 163, 184, 0.3); padding-top: 0.5rem; margin-top: 0.5rem;">`;
@@ -790,8 +852,16 @@ function hideNodeTooltip() {
 
 function selectNode(node) {
     graphState.selectedNode = node;
-    // Could expand step details here
-    console.log('Selected node:', node);
+    // Los bloques For/Parallel se expanden o colapsan al hacer clic
+    const stepId = Number(node.id.replace('step_', ''));
+    if (node.collapsed) {
+        graphState.expanded.add(stepId);
+    } else if (graphState.expanded.has(stepId)) {
+        graphState.expanded.delete(stepId);
+    } else {
+        return;
+    }
+    if (currentPipelineId) loadGraph(currentPipelineId);
 }
 
 // ==================== EXECUTION STEPS ====================
@@ -804,6 +874,7 @@ function renderSteps(pipeline) {
     }
     
     sec.style.display = 'block';
+    currentSteps = pipeline.steps;
     list.innerHTML = pipeline.steps.map((s, idx) => `
         <div class="step-card" onclick="toggleStepDetails(${idx})" style="cursor:pointer">
             <div class="step-header" style="display:flex;align-items:center;gap:0.75rem">
@@ -818,9 +889,7 @@ function renderSteps(pipeline) {
                     <i class="fas fa-chevron-down step-chevron" style="margin-left:0.5rem;font-size:0.7rem"></i>
                 </div>
             </div>
-            <div class="step-details" id="step-details-${idx}" style="display:none;margin-top:0.75rem;padding-top:0.75rem;border-top:1px solid var(--border)">
-                ${renderStepDetails(s)}
-            </div>
+            <div class="step-details" id="step-details-${idx}" style="display:none;margin-top:0.75rem;padding-top:0.75rem;border-top:1px solid var(--border)"></div>
         </div>
     `).join('');
 }
@@ -899,12 +968,32 @@ function formatJSON(obj) {
     try { return JSON.stringify(obj, null, 2); } catch { return String(obj); }
 }
 
+// Input, output and traceback are fetched when a step is first opened
+async function loadStepDetails(idx) {
+    const details = document.getElementById(`step-details-${idx}`);
+    const step = currentSteps[idx];
+    if (!details || !step || details.dataset.loaded) return;
+    details.dataset.loaded = '1';
+    details.innerHTML = renderStepDetails(step);
+    if (!step.has_input && !step.has_output && !step.has_traceback) return;
+    try {
+        const res = await fetch('/api/steps/' + step.id);
+        if (!res.ok) throw new Error('Step fetch failed');
+        const full = await res.json();
+        if (full) details.innerHTML = renderStepDetails(full);
+    } catch (e) {
+        delete details.dataset.loaded;
+        console.error('Error loading step details:', e);
+    }
+}
+
 window.toggleStepDetails = function(idx) {
     const details = document.getElementById(`step-details-${idx}`);
     const chevron = document.querySelectorAll('.step-chevron')[idx];
     if (details) {
         details.style.display = details.style.display === 'none' ? 'block' : 'none';
         if (chevron) chevron.style.transform = details.style.display === 'block' ? 'rotate(180deg)' : '';
+        if (details.style.display === 'block') loadStepDetails(idx);
     }
 };
 
@@ -913,7 +1002,10 @@ window.toggleAllSteps = function() {
     const allChevrons = document.querySelectorAll('.step-chevron');
     const isExpanded = allDetails[0]?.style.display === 'block';
     
-    allDetails.forEach(d => d.style.display = isExpanded ? 'none' : 'block');
+    allDetails.forEach((d, idx) => {
+        d.style.display = isExpanded ? 'none' : 'block';
+        if (!isExpanded) loadStepDetails(idx);
+    });
     allChevrons.forEach(c => c.style.transform = isExpanded ? '' : 'rotate(180deg)');
 };
 
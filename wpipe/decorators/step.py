@@ -24,7 +24,13 @@ class StepMetadata:
         func: The function to execute.
         version: The version of the step.
         timeout: Execution timeout in seconds.
+        isolation: Timeout isolation, "thread" (default) or "process".
+        cache: Whether results are cached.
+        cache_keys: Context keys the cache key is built from.
+        cpu_bound: Whether async pipelines run the step in a process pool.
         depends_on: List of step names this step depends on.
+        reads: Context keys the step reads.
+        writes: Context keys the step writes.
         retry_count: Number of retries on failure.
         retry_delay: Delay between retries in seconds.
         retry_on_exceptions: Tuple of exceptions that trigger a retry.
@@ -37,7 +43,13 @@ class StepMetadata:
     func: Callable
     version: str = "v1.0"
     timeout: Optional[float] = None
+    isolation: Optional[str] = None
+    cache: bool = False
+    cache_keys: Optional[List[str]] = None
+    cpu_bound: bool = False
     depends_on: List[str] = field(default_factory=list)
+    reads: Optional[List[str]] = None
+    writes: Optional[List[str]] = None
     retry_count: Optional[int] = None
     retry_delay: Optional[float] = None
     retry_on_exceptions: Optional[Tuple[type, ...]] = None
@@ -70,6 +82,12 @@ class DecoratedStep:
         parallel: bool = False,
         description: str = "",
         tags: Optional[List[str]] = None,
+        isolation: Optional[str] = None,
+        cache: bool = False,
+        cache_keys: Optional[List[str]] = None,
+        reads: Optional[List[str]] = None,
+        writes: Optional[List[str]] = None,
+        cpu_bound: bool = False,
     ):
         """Initialize decorated step.
 
@@ -85,13 +103,25 @@ class DecoratedStep:
             parallel: Parallel execution flag.
             description: Step description.
             tags: Category tags.
+            isolation: Timeout isolation ("thread" or "process").
+            cache: Result caching flag.
+            cache_keys: Context keys the cache key is built from.
+            reads: Context keys the step reads.
+            writes: Context keys the step writes.
+            cpu_bound: CPU-bound flag (process pool in async pipelines).
         """
         self.metadata = StepMetadata(
             name=name or func.__name__,
             func=func,
             version=version,
             timeout=timeout,
+            isolation=isolation,
+            cache=cache,
+            cache_keys=list(cache_keys) if cache_keys is not None else None,
+            cpu_bound=cpu_bound,
             depends_on=depends_on or [],
+            reads=list(reads) if reads is not None else None,
+            writes=list(writes) if writes is not None else None,
             retry_count=retry_count,
             retry_delay=retry_delay,
             retry_on_exceptions=retry_on_exceptions,
@@ -158,6 +188,12 @@ def step(
     parallel: bool = False,
     description: str = "",
     tags: Optional[List[str]] = None,
+    isolation: Optional[str] = None,
+    cache: bool = False,
+    cache_keys: Optional[List[str]] = None,
+    reads: Optional[List[str]] = None,
+    writes: Optional[List[str]] = None,
+    cpu_bound: bool = False,
 ) -> Callable:
     """Decorator to mark a function as a pipeline step.
 
@@ -172,6 +208,22 @@ def step(
         parallel: Whether this step can run in parallel.
         description: Step description.
         tags: List of tags for step.
+        isolation: How a timed-out step is isolated: "thread" (default, the
+            step gets a cancellation token) or "process" (the step runs in a
+            child process that is terminated at the deadline; the step
+            must then be importable and its context values picklable).
+        cache: Cache results keyed by step name, version and a stable hash
+            of the inputs, so repeated runs and retries skip the work. The
+            step must be a pure function of its inputs.
+        cache_keys: Context keys the step depends on (default: every
+            context key not starting with an underscore).
+        reads: Context keys the step reads. With ``depends_on`` and
+            ``writes`` this lets ``Pipeline(auto_parallel=True)`` run
+            independent steps concurrently.
+        writes: Context keys the step writes.
+        cpu_bound: Run the step in a process pool when it is synchronous and
+            part of a PipelineAsync, instead of a worker thread. The step and
+            its context must be picklable.
 
     Returns:
         Decorated function.
@@ -198,6 +250,12 @@ def step(
             parallel=parallel,
             description=description,
             tags=tags,
+            isolation=isolation,
+            cache=cache,
+            cache_keys=cache_keys,
+            reads=reads,
+            writes=writes,
+            cpu_bound=cpu_bound,
         )
 
         # Register in global registry
@@ -341,6 +399,11 @@ class AutoRegister:
                 state=decorated_step.metadata.func,
                 depends_on=metadata.depends_on,
                 timeout=metadata.timeout,
+                isolation=metadata.isolation,
+                cache=metadata.cache,
+                cache_keys=metadata.cache_keys,
+                reads=metadata.reads,
+                writes=metadata.writes,
             )
 
     @staticmethod
@@ -369,6 +432,11 @@ class AutoRegister:
                     state=decorated_step.metadata.func,
                     depends_on=metadata.depends_on,
                     timeout=metadata.timeout,
+                    isolation=metadata.isolation,
+                    cache=metadata.cache,
+                    cache_keys=metadata.cache_keys,
+                    reads=metadata.reads,
+                    writes=metadata.writes,
                 )
 
 
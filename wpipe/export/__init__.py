@@ -2,7 +2,7 @@
 Export and analytics module for pipeline execution data.
 
 Provides functionality to export pipeline logs, metrics, and statistics
-to various formats (JSON, CSV) for analysis and reporting.
+to various formats (JSON, NDJSON, CSV, Parquet) for analysis and reporting.
 """
 
 from .exporter import PipelineExporter
@@ -2,17 +2,38 @@
 Export and analytics module for pipeline execution data.
 
 Provides functionality to export pipeline logs, metrics, and statistics
-to various formats (JSON, CSV) for analysis and reporting.
+to various formats (JSON, NDJSON, CSV, Parquet) for analysis and reporting.
+
+Exports stream: rows are read from a read-only connection in chunks and
+written as they arrive, so memory stays flat whatever the size of the
+tables. Filters are pushed into SQL and statistics are SQL aggregates.
+Writes still pending on this process's shared tracking connection are
+committed first, so an export sees what the tracker recorded.
 """
 
+import io
 import json
+import os
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from wpipe.tracking.pool import ReadPool
+
+from .writers import (
+    COMPRESSIONS,
+    EXPORT_FORMATS,
+    Chunk,
+    open_text_output,
+    write_csv,
+    write_json,
+    write_ndjson,
+    write_parquet,
+)
 
-from wsqlite import WSQLite
+TimeBound = Optional[Union[str, datetime]]
 
-from wpipe.sqlite.tables_dto.tracker_models import PipelineModel, SystemMetricsModel
+_TEXT_WRITERS = {"json": write_json, "ndjson": write_ndjson, "csv": write_csv}
 
 
 class PipelineExporter:
@@ -37,81 +58,74 @@ class PipelineExporter:
         pipeline_id: Optional[str] = None,
         export_format: str = "json",
         output_path: Optional[str] = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        compression: Optional[str] = None,
+        chunk_size: int = 5000,
     ) -> str:
         """
-        Exports pipeline execution logs.
+        Exports pipeline execution logs, most recent first.
 
         Args:
             pipeline_id (Optional[str]): ID of the pipeline to export. If None, exports all.
-            export_format (str): Export format ('json' or 'csv'). Defaults to 'json'.
+            export_format (str): 'json', 'ndjson', 'csv' or 'parquet'. Defaults to 'json'.
             output_path (Optional[str]): File path to save the export. If None, returns string.
+            since (TimeBound): Only pipelines started at or after this time.
+            until (TimeBound): Only pipelines started before this time.
+            compression (Optional[str]): 'gzip' or 'zstd' (requires output_path).
+            chunk_size (int): Rows read and written at a time.
 
         Returns:
             str: Exported data as a string or the path to the saved file.
 
         Raises:
-            ValueError: If the requested format is not supported.
+            ValueError: If the requested format or compression is not supported.
         """
-        # Force the table name to 'pipelines' as used by the Tracker.
-        db = WSQLite(PipelineModel, self.db_path)
-        db.table_name = "pipelines"
-
-        if pipeline_id:
-            results = db.get_by_field(id=pipeline_id)
-        else:
-            results = db.get_all()
-
-        results.sort(key=lambda x: x.started_at or "", reverse=True)
-        data = [r.model_dump() for r in results]
-
-        if export_format == "json":
-            return self._export_json(data, output_path)
-        if export_format == "csv":
-            return self._export_csv(data, output_path)
-        raise ValueError(f"Unsupported format: {export_format}")
+        return self._export_table(
+            "pipelines", "id", "started_at", pipeline_id, since, until,
+            export_format, output_path, compression, chunk_size,
+        )
 
     def export_metrics(
         self,
         pipeline_id: Optional[str] = None,
         export_format: str = "json",
         output_path: Optional[str] = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        compression: Optional[str] = None,
+        chunk_size: int = 5000,
     ) -> str:
         """
-        Exports system metrics data.
+        Exports system metrics data, most recent first.
 
         Args:
             pipeline_id (Optional[str]): ID of the pipeline to export metrics for.
-            export_format (str): Export format ('json' or 'csv'). Defaults to 'json'.
+            export_format (str): 'json', 'ndjson', 'csv' or 'parquet'. Defaults to 'json'.
             output_path (Optional[str]): File path to save the export.
+            since (TimeBound): Only metrics recorded at or after this time.
+            until (TimeBound): Only metrics recorded before this time.
+            compression (Optional[str]): 'gzip' or 'zstd' (requires output_path).
+            chunk_size (int): Rows read and written at a time.
 
         Returns:
             str: Exported data as a string or the path to the saved file.
 
         Raises:
-            ValueError: If the requested format is not supported.
+            ValueError: If the requested format or compression is not supported.
         """
-        db = WSQLite(SystemMetricsModel, self.db_path)
-        db.table_name = "system_metrics"
-
-        if pipeline_id:
-            results = db.get_by_field(pipeline_id=pipeline_id)
-        else:
-            results = db.get_all()
-
-        results.sort(key=lambda x: x.recorded_at or "", reverse=True)
-        data = [r.model_dump() for r in results]
-
-        if export_format == "json":
-            return self._export_json(data, output_path)
-        if export_format == "csv":
-            return self._export_csv(data, output_path)
-        raise ValueError(f"Unsupported format: {export_format}")
+        return self._export_table(
+            "system_metrics", "pipeline_id", "recorded_at", pipeline_id, since, until,
+            export_format, output_path, compression, chunk_size,
+        )
 
     def export_statistics(
         self,
         pipeline_id: Optional[str] = None,
         export_format: str = "json",
         output_path: Optional[str] = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
     ) -> str:
         """
         Exports calculated pipeline statistics.
@@ -120,6 +134,8 @@ class PipelineExporter:
             pipeline_id (Optional[str]): ID of the pipeline to calculate stats for.
             export_format (str): Export format (only 'json' is supported). Defaults to 'json'.
             output_path (Optional[str]): File path to save the export.
+            since (TimeBound): Only pipelines started at or after this time.
+            until (TimeBound): Only pipelines started before this time.
 
         Returns:
             str: Exported statistics as a string or the path to the saved file.
@@ -127,111 +143,166 @@ class PipelineExporter:
         Raises:
             ValueError: If the requested format is not supported.
         """
-        stats = self._calculate_statistics(pipeline_id)
+        if export_format != "json":
+            raise ValueError("Statistics export only supports JSON format")
 
-        if export_format == "json":
-            data = json.dumps(stats, indent=2, default=str)
-            if output_path:
-                Path(output_path).write_text(data, encoding="utf-8")
-                return output_path
-            return data
-        raise ValueError("Statistics export only supports JSON format")
+        stats = self._calculate_statistics(pipeline_id, since, until)
+        data = json.dumps(stats, indent=2, default=str)
+        if output_path:
+            Path(output_path).write_text(data, encoding="utf-8")
+            return output_path
+        return data
 
-    def _export_json(
-        self, data: List[Dict[str, Any]], output_path: Optional[str] = None
-    ) -> str:
+    def _commit_pending_writes(self) -> None:
+        """
+        Commit the shared tracking connection of this database, if any.
+
+        Tracking inserts are left uncommitted until a pipeline run ends, and
+        the export reads through its own read-only connection.
+        """
+        from wpipe import _db_connections, _db_lock  # pylint: disable=import-outside-toplevel
+
+        target = os.path.abspath(self.db_path)
+        with _db_lock:
+            for path, conn in _db_connections.items():
+                if os.path.abspath(path) == target and conn.in_transaction:
+                    conn.commit()
+
+    @staticmethod
+    def _where(
+        id_column: str, time_column: str, pipeline_id: Optional[str], since: TimeBound, until: TimeBound
+    ) -> Tuple[str, List[Any]]:
         """
-        Exports data as a JSON string or file.
+        Build the WHERE clause of the pipeline and time filters.
 
         Args:
-            data (List[Dict[str, Any]]): Data to export.
-            output_path (Optional[str]): File path to save the export.
+            id_column (str): Column holding the pipeline ID.
+            time_column (str): Column the time range applies to.
+            pipeline_id (Optional[str]): Pipeline to keep.
+            since (TimeBound): Inclusive lower bound.
+            until (TimeBound): Exclusive upper bound.
 
         Returns:
-            str: JSON string or the path to the saved file.
+            Tuple[str, List[Any]]: The clause (empty without filters) and its parameters.
         """
-        json_str = json.dumps(data, indent=2, default=str)
-        if output_path:
-            Path(output_path).write_text(json_str, encoding="utf-8")
-            return output_path
-        return json_str
-
-    def _export_csv(
-        self, data: List[Dict[str, Any]], output_path: Optional[str] = None
+        where, params = [], []
+        if pipeline_id:
+            where.append(f"{id_column} = ?")
+            params.append(pipeline_id)
+        for bound, operator in ((since, ">="), (until, "<")):
+            if bound is not None:
+                where.append(f"{time_column} {operator} ?")
+                params.append(bound.isoformat() if isinstance(bound, datetime) else bound)
+        return (" WHERE " + " AND ".join(where) if where else ""), params
+
+    def _export_table(
+        self,
+        table: str,
+        id_column: str,
+        time_column: str,
+        pipeline_id: Optional[str],
+        since: TimeBound,
+        until: TimeBound,
+        export_format: str,
+        output_path: Optional[str],
+        compression: Optional[str],
+        chunk_size: int,
     ) -> str:
         """
-        Exports data as a CSV string or file.
+        Stream the filtered rows of a table, newest first, to a file or string.
 
         Args:
-            data (List[Dict[str, Any]]): Data to export.
+            table (str): Table to export.
+            id_column (str): Column holding the pipeline ID.
+            time_column (str): Column the rows are filtered and sorted on.
+            pipeline_id (Optional[str]): Pipeline to keep.
+            since (TimeBound): Inclusive lower time bound.
+            until (TimeBound): Exclusive upper time bound.
+            export_format (str): One of ``EXPORT_FORMATS``.
             output_path (Optional[str]): File path to save the export.
+            compression (Optional[str]): One of ``COMPRESSIONS``, or None.
+            chunk_size (int): Rows read and written at a time.
 
         Returns:
-            str: CSV string or the path to the saved file.
-        """
-        if not data:
-            csv_str = ""
-            if output_path:
-                Path(output_path).write_text(csv_str, encoding="utf-8")
-            return csv_str
-
-        keys = list(data[0].keys())
-        csv_lines = [",".join(keys)]
-        for row in data:
-            values = [str(row.get(key, "")).replace(",", ";") for key in keys]
-            csv_lines.append(",".join(values))
-
-        csv_str = "\n".join(csv_lines)
-        if output_path:
-            Path(output_path).write_text(csv_str, encoding="utf-8")
-            return output_path
-        return csv_str
+            str: Exported data as a string or the path to the saved file.
 
-    def _calculate_statistics(self, pipeline_id: Optional[str]) -> Dict[str, Any]:
+        Raises:
+            ValueError: If the format or compression is not supported, or
+                a binary or compressed export has no output path.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported format: {export_format}")
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if output_path is None and (export_format == "parquet" or compression):
+            raise ValueError(f"{export_format} and compressed exports need an output_path")
+
+        where, params = self._where(id_column, time_column, pipeline_id, since, until)
+        query = f"SELECT * FROM {table}{where} ORDER BY {time_column} DESC"
+        self._commit_pending_writes()
+        pool = ReadPool(self.db_path, size=1)
+        try:
+            with pool.connection() as conn:
+                cursor = conn.execute(query, params)
+                columns = [c[0] for c in cursor.description]
+                chunks = self._chunks(cursor, chunk_size)
+                if export_format == "parquet":
+                    declared = {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table})")}
+                    write_parquet(output_path, [(c, declared.get(c, "")) for c in columns], chunks, compression)
+                    return output_path
+                writer = _TEXT_WRITERS[export_format]
+                if output_path is None:
+                    buffer = io.StringIO()
+                    writer(buffer, columns, chunks)
+                    return buffer.getvalue()
+                with open_text_output(output_path, compression) as out:
+                    writer(out, columns, chunks)
+                return output_path
+        finally:
+            pool.close()
+
+    @staticmethod
+    def _chunks(cursor: Any, chunk_size: int) -> Iterator[Chunk]:
+        """Yield the rows of a cursor in chunks of ``chunk_size``."""
+        while True:
+            chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def _calculate_statistics(
+        self, pipeline_id: Optional[str], since: TimeBound = None, until: TimeBound = None
+    ) -> Dict[str, Any]:
         """
-        Calculates pipeline execution statistics using WSQLite.
+        Calculates pipeline execution statistics with SQL aggregates.
 
         Args:
             pipeline_id (Optional[str]): ID of the pipeline to analyze.
+            since (TimeBound): Only pipelines started at or after this time.
+            until (TimeBound): Only pipelines started before this time.
 
         Returns:
             Dict[str, Any]: Dictionary containing calculated statistics.
         """
+        where, params = self._where("id", "started_at", pipeline_id, since, until)
+        self._commit_pending_writes()
+        pool = ReadPool(self.db_path, size=1)
         try:
-            db = WSQLite(PipelineModel, self.db_path)
-            db.table_name = "pipelines"
-
-            if pipeline_id:
-                results = db.get_by_field(id=pipeline_id)
-            else:
-                results = db.get_all()
-
-            if not results:
-                return {
-                    "total_executions": 0,
-                    "successful_executions": 0,
-                    "success_rate_percent": 0.0,
-                    "average_execution_time_seconds": 0.0,
-                    "exported_at": datetime.now().isoformat(),
-                }
-
-            total_executions = len(results)
-            durations = [
-                r.total_duration_ms / 1000.0
-                for r in results
-                if r.total_duration_ms is not None
-            ]
-            avg_time = sum(durations) / len(durations) if durations else 0.0
-            successful = len([r for r in results if r.status == 'completed'])
-
-            return {
-                "total_executions": total_executions,
-                "successful_executions": successful,
-                "success_rate_percent": round(
-                    (successful / total_executions * 100), 2
-                ) if total_executions > 0 else 0,
-                "average_execution_time_seconds": round(avg_time, 2),
-                "exported_at": datetime.now().isoformat(),
-            }
-        except OSError as e:
-            return {"error": str(e), "total_executions": 0}
+            with pool.connection() as conn:
+                total_executions, successful, avg_ms = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(status = 'completed'), 0), AVG(total_duration_ms) "
+                    f"FROM pipelines{where}",
+                    params,
+                ).fetchone()
+        finally:
+            pool.close()
+
+        return {
+            "total_executions": total_executions,
+            "successful_executions": successful,
+            "success_rate_percent": round(
+                (successful / total_executions * 100), 2
+            ) if total_executions > 0 else 0.0,
+            "average_execution_time_seconds": round((avg_ms or 0.0) / 1000.0, 2),
+            "exported_at": datetime.now().isoformat(),
+        }
@@ -0,0 +1,175 @@
+"""
+Streaming writers for exported rows.
+
+Each writer consumes rows chunk by chunk (lists of tuples, as returned by
+``cursor.fetchmany``) so an export never holds more than one chunk in
+memory. Text formats (JSON, NDJSON, CSV) can be compressed with gzip or,
+if ``zstandard`` is installed, zstd. Parquet needs ``pyarrow`` and uses
+its own column compression.
+"""
+
+import gzip
+import io
+import json
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+Chunk = List[Tuple[Any, ...]]
+
+EXPORT_FORMATS = ("json", "ndjson", "csv", "parquet")
+COMPRESSIONS = ("gzip", "zstd")
+
+
+@contextmanager
+def open_text_output(output_path: str, compression: Optional[str] = None) -> Iterator[TextIO]:
+    """
+    Open a text file for writing, optionally compressed.
+
+    Args:
+        output_path: File path to write.
+        compression: None, "gzip" or "zstd".
+
+    Yields:
+        TextIO: The text stream.
+
+    Raises:
+        ValueError: If the compression is not supported.
+        ImportError: If zstd is requested and ``zstandard`` is not installed.
+    """
+    if compression is None:
+        stream: TextIO = open(output_path, "w", encoding="utf-8", newline="")
+    elif compression == "gzip":
+        stream = gzip.open(output_path, "wt", encoding="utf-8", newline="")
+    elif compression == "zstd":
+        try:
+            import zstandard  # pylint: disable=import-outside-toplevel
+        except ImportError as e:
+            raise ImportError("zstd compression requires the 'zstandard' package") from e
+        # pylint: disable-next=consider-using-with
+        raw = zstandard.ZstdCompressor().stream_writer(open(output_path, "wb"))
+        stream = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    else:
+        raise ValueError(f"Unsupported compression: {compression}")
+    with stream:
+        yield stream
+
+
+def write_json(out: TextIO, columns: Sequence[str], chunks: Iterable[Chunk]) -> int:
+    """
+    Write rows as a JSON array, formatted as ``json.dumps(rows, indent=2)``.
+
+    Args:
+        out: Text stream.
+        columns: Column names.
+        chunks: Chunks of rows.
+
+    Returns:
+        int: Number of rows written.
+    """
+    count = 0
+    out.write("[")
+    for chunk in chunks:
+        for row in chunk:
+            item = json.dumps(dict(zip(columns, row)), indent=2, default=str)
+            out.write(",\n  " if count else "\n  ")
+            out.write(item.replace("\n", "\n  "))
+            count += 1
+    out.write("\n]" if count else "]")
+    return count
+
+
+def write_ndjson(out: TextIO, columns: Sequence[str], chunks: Iterable[Chunk]) -> int:
+    """
+    Write rows as newline-delimited JSON, one object per line.
+
+    Args:
+        out: Text stream.
+        columns: Column names.
+        chunks: Chunks of rows.
+
+    Returns:
+        int: Number of rows written.
+    """
+    count = 0
+    for chunk in chunks:
+        out.writelines(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in chunk)
+        count += len(chunk)
+    return count
+
+
+def write_csv(out: TextIO, columns: Sequence[str], chunks: Iterable[Chunk]) -> int:
+    """
+    Write rows as CSV (commas inside values become semicolons).
+
+    Nothing, not even the header, is written when there are no rows.
+
+    Args:
+        out: Text stream.
+        columns: Column names.
+        chunks: Chunks of rows.
+
+    Returns:
+        int: Number of rows written.
+    """
+    count = 0
+    for chunk in chunks:
+        lines = [",".join(str(value).replace(",", ";") for value in row) for row in chunk]
+        if not lines:
+            continue
+        out.write(("\n" if count else ",".join(columns) + "\n") + "\n".join(lines))
+        count += len(lines)
+    return count
+
+
+def _arrow_type(pa: Any, declared: str) -> Any:
+    """Map a SQLite declared type to an Arrow type, by SQLite's affinity rules."""
+    declared = declared.upper()
+    if "INT" in declared or "BOOL" in declared:
+        return pa.int64()
+    if any(name in declared for name in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    return pa.string()
+
+
+def write_parquet(
+    output_path: str,
+    columns: Sequence[Tuple[str, str]],
+    chunks: Iterable[Chunk],
+    compression: Optional[str] = None,
+) -> int:
+    """
+    Write rows to a Parquet file, one row group per chunk.
+
+    Args:
+        output_path: File path to write.
+        columns: ``(name, declared SQLite type)`` of each column.
+        chunks: Chunks of rows.
+        compression: Parquet codec (e.g. "gzip" or "zstd"), or None for
+            pyarrow's default.
+
+    Returns:
+        int: Number of rows written.
+
+    Raises:
+        ImportError: If ``pyarrow`` is not installed.
+    """
+    try:
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        raise ImportError("Parquet export requires the 'pyarrow' package") from e
+
+    schema = pa.schema([(name, _arrow_type(pa, declared)) for name, declared in columns])
+    strings = [i for i, field in enumerate(schema) if field.type == pa.string()]
+    count = 0
+    with pq.ParquetWriter(output_path, schema, compression=compression or "snappy") as writer:
+        for chunk in chunks:
+            values = [list(column) for column in zip(*chunk)] or [[] for _ in columns]
+            for i in strings:
+                # SQLite columns are dynamically typed
+                values[i] = [v if v is None or isinstance(v, str) else str(v) for v in values[i]]
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(v, type=field.type) for v, field in zip(values, schema)], schema=schema
+            ))
+            count += len(chunk)
+    return count
@@ -5,13 +5,39 @@ Enables execution of multiple pipeline steps in parallel using:
 - ThreadPoolExecutor for I/O-bound tasks
 - ProcessPoolExecutor for CPU-bound tasks
 - Automatic dependency resolution
+
+Steps start as soon as their own dependencies are done. When several steps
+are ready at once, the one with the longest estimated path to the end of
+the graph (its critical path) goes first, using durations observed by this
+executor or recorded by a PipelineTracker.
 """
 
+import heapq
 import threading
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set
+from multiprocessing import resource_tracker
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Estimated duration (seconds) of a step with no history at all
+DEFAULT_ESTIMATE = 1.0
+
+
+def _call_step(func: Callable, context: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+    """Run a step function and time it (module level so processes can run it)."""
+    start = time.perf_counter()
+    result = func(context)
+    return result or {}, time.perf_counter() - start
+
+
+def _shutdown_executors(executors: Dict[Any, Any]) -> None:
+    """Shut down the pools of an executor without waiting for idle workers."""
+    for executor in list(executors.values()):
+        executor.shutdown(wait=False)
+    executors.clear()
 
 
 class ExecutionMode(Enum):
@@ -95,21 +121,73 @@ class DAGScheduler:
         groups = self.topological_sort()
         return [[self.steps[name] for name in group] for group in groups]
 
+    def dependents(self) -> Dict[str, List[str]]:
+        """
+        Get the steps waiting on each step.
+
+        Returns:
+            Dictionary mapping each step name to the names of its dependents.
+        """
+        result: Dict[str, List[str]] = {name: [] for name in self.graph}
+        for name, deps in self.graph.items():
+            for dep in deps:
+                result[dep].append(name)
+        return result
+
+    def critical_path(self, estimates: Dict[str, float]) -> Dict[str, float]:
+        """
+        Get the length of the longest path from each step to the end of the graph.
+
+        Args:
+            estimates: Estimated duration of each step.
+
+        Returns:
+            Dictionary mapping step names to their critical path length (the
+            step's own estimate plus the longest chain of dependents).
+        """
+        dependents = self.dependents()
+        order = [name for group in self.topological_sort() for name in group]
+        lengths: Dict[str, float] = {}
+        for name in reversed(order):
+            downstream = max((lengths.get(d, 0.0) for d in dependents.get(name, ())), default=0.0)
+            lengths[name] = estimates.get(name, 0.0) + downstream
+        return lengths
+
 
 class ParallelExecutor:
-    """Executes pipeline steps in parallel with dependency resolution."""
+    """
+    Executes pipeline steps in parallel with dependency resolution.
+
+    Thread and process pools are created on first use and kept alive across
+    ``execute`` calls until ``close`` is called.
+
+    Attributes:
+        max_workers (int): Maximum number of worker threads/processes per mode.
+        tracker (Optional[PipelineTracker]): Tracker whose step history seeds
+            the duration estimates.
+        step_times (Dict[str, float]): Duration in seconds of each step of the
+            last execution.
+    """
 
-    def __init__(self, max_workers: int = 4):
+    def __init__(self, max_workers: int = 4, tracker: Optional[Any] = None):
         """
         Initialize parallel executor.
 
         Args:
             max_workers: Maximum number of worker threads/processes
+            tracker: Optional PipelineTracker used to estimate step durations
+                from previous executions
         """
         self.max_workers = max_workers
+        self.tracker = tracker
         self.scheduler = DAGScheduler()
         self.results: Dict[str, Any] = {}
+        self.step_times: Dict[str, float] = {}
         self.lock = threading.Lock()
+        self._observed: Dict[str, float] = {}
+        self._execution_time = 0.0
+        self._executors: Dict[ExecutionMode, Any] = {}
+        self._finalizer = weakref.finalize(self, _shutdown_executors, self._executors)
 
     def add_step(
         self,
@@ -138,69 +216,143 @@ class ParallelExecutor:
         )
         self.scheduler.add_step(step)
 
+    def estimate_durations(self) -> Dict[str, float]:
+        """
+        Estimate the duration of every step, in seconds.
+
+        Durations observed by this executor come first, then the tracker's
+        history; steps with neither get the mean of the known estimates.
+
+        Returns:
+            Dictionary mapping step names to estimated durations.
+        """
+        names = list(self.scheduler.steps)
+        estimates: Dict[str, float] = {}
+        missing = [name for name in names if name not in self._observed]
+        if missing and self.tracker is not None:
+            history = self.tracker.get_step_durations(missing)
+            estimates.update({name: ms / 1000.0 for name, ms in history.items()})
+        estimates.update({name: self._observed[name] for name in names if name in self._observed})
+        default = sum(estimates.values()) / len(estimates) if estimates else DEFAULT_ESTIMATE
+        return {name: estimates.get(name, default) for name in names}
+
+    def _pool(self, mode: ExecutionMode) -> Any:
+        """Get the long-lived pool of an execution mode."""
+        executor = self._executors.get(mode)
+        if executor is None:
+            if mode == ExecutionMode.CPU_BOUND:
+                resource_tracker.ensure_running()
+                executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="wpipe_executor"
+                )
+            self._executors[mode] = executor
+        return executor
+
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Execute all steps respecting dependencies.
 
+        A step starts as soon as all its dependencies have finished, on a copy
+        of the context holding every result merged so far. At most
+        ``max_workers`` steps per mode run at once; ready steps wait in a
+        queue ordered by critical path length. SEQUENTIAL steps run on the
+        calling thread. Steps depending on unknown names never run.
+
         Args:
             context: Initial pipeline context
 
         Returns:
             Final context with all step results
+
+        Raises:
+            Exception: The first error raised by a step, once the running
+                steps have finished. No further steps are started after it.
         """
-        parallel_groups = self.scheduler.get_parallel_groups()
+        # pylint: disable=too-many-locals
+        started = time.perf_counter()
+        steps = self.scheduler.steps
+        dependents = self.scheduler.dependents()
+        priority = self.scheduler.critical_path(self.estimate_durations())
+        waiting = dict(self.scheduler.in_degree)
         current_context = context.copy()
+        self.step_times = {}
+
+        ready: List[Tuple[float, int, str]] = []
+        order = {name: index for index, name in enumerate(steps)}
+
+        def push(name: str) -> None:
+            heapq.heappush(ready, (-priority[name], order[name], name))
+
+        for name, degree in waiting.items():
+            if degree == 0:
+                push(name)
+
+        running: Dict[Future, str] = {}
+        busy = {mode: 0 for mode in ExecutionMode}
+        error: Optional[BaseException] = None
 
-        for group in parallel_groups:
-            # Separate by execution mode
-            io_tasks = [s for s in group if s.mode == ExecutionMode.IO_BOUND]
-            cpu_tasks = [s for s in group if s.mode == ExecutionMode.CPU_BOUND]
-            seq_tasks = [s for s in group if s.mode == ExecutionMode.SEQUENTIAL]
-
-            # Execute sequential tasks first (no parallelism)
-            for step in seq_tasks:
-                result = self._execute_step(step, current_context)
-                if result:
-                    current_context.update(result)
-                with self.lock:
-                    self.results[step.name] = result
-
-            # Execute IO-bound tasks in ThreadPool
-            if io_tasks:
-                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                    futures = {
-                        executor.submit(self._execute_step, step, current_context): step
-                        for step in io_tasks
-                    }
-
-                    for future in as_completed(futures):
-                        step = futures[future]
-                        result = future.result()
-                        if result:
-                            current_context.update(result)
-                        with self.lock:
-                            self.results[step.name] = result
-
-            # Execute CPU-bound tasks in ProcessPool
-            if cpu_tasks:
-                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
-                    futures = {
-                        executor.submit(
-                            self._execute_step_safe, step, current_context
-                        ): step
-                        for step in cpu_tasks
-                    }
-
-                    for future in as_completed(futures):
-                        step = futures[future]
-                        result = future.result()
-                        if result:
-                            current_context.update(result)
-                        with self.lock:
-                            self.results[step.name] = result
+        def finish(name: str, result: Dict[str, Any], elapsed: float) -> None:
+            if result:
+                current_context.update(result)
+            with self.lock:
+                self.results[name] = result
+            self.step_times[name] = self._observed[name] = elapsed
+            for other in dependents.get(name, ()):
+                waiting[other] -= 1
+                if waiting[other] == 0:
+                    push(other)
 
+        try:
+            while ready or running:
+                deferred = []
+                while ready and error is None:
+                    item = heapq.heappop(ready)
+                    step = steps[item[2]]
+                    if step.mode == ExecutionMode.SEQUENTIAL:
+                        try:
+                            finish(step.name, *self._run_inline(step, current_context))
+                        except Exception as e:  # pylint: disable=broad-exception-caught
+                            error = e
+                        continue
+                    if busy[step.mode] >= self.max_workers:
+                        deferred.append(item)
+                        continue
+                    future = self._pool(step.mode).submit(_call_step, step.func, current_context.copy())
+                    running[future] = step.name
+                    busy[step.mode] += 1
+                for item in deferred:
+                    heapq.heappush(ready, item)
+                if error is not None:
+                    ready.clear()
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    busy[steps[name].mode] -= 1
+                    try:
+                        result, elapsed = future.result()
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        print(f"Error in step {name}: {e}")
+                        error = error or e
+                        continue
+                    finish(name, result, elapsed)
+        finally:
+            self._execution_time = time.perf_counter() - started
+
+        if error is not None:
+            raise error
         return current_context
 
+    def _run_inline(self, step: StepDependency, context: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+        """Run a SEQUENTIAL step on the calling thread and time it."""
+        start = time.perf_counter()
+        result = self._execute_step(step, context)
+        return result, time.perf_counter() - start
+
     def _execute_step(
         self,
         step: StepDependency,
@@ -229,22 +381,29 @@ class ParallelExecutor:
             print(f"Unexpected error in step {step.name}: {e}")
             raise
 
-    def _execute_step_safe(
-        self,
-        step: StepDependency,
-        context: Dict[str, Any],
-    ) -> Dict[str, Any]:
-        """Execute step safely (for ProcessPool)."""
-        # Note: For ProcessPool, we need to handle serialization
-        return self._execute_step(step, context)
-
     def get_results(self) -> Dict[str, Any]:
         """Get results from all executed steps."""
         return self.results.copy()
 
     def get_execution_time(self) -> float:
-        """Get total execution time (stub for now)."""
-        return 0.0
+        """Get the wall-clock duration in seconds of the last execution."""
+        return self._execution_time
+
+    def get_step_times(self) -> Dict[str, float]:
+        """Get the duration in seconds of each step of the last execution."""
+        return self.step_times.copy()
+
+    def close(self) -> None:
+        """Shut down the worker pools."""
+        for executor in list(self._executors.values()):
+            executor.shutdown(wait=True)
+        self._executors.clear()
+
+    def __enter__(self) -> "ParallelExecutor":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
 
 
 class ContextMerger:
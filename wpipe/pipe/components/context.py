@@ -0,0 +1,267 @@
+"""
+Copy-on-write context layers for WPipe pipelines.
+
+Logic blocks (For, Parallel, Background) used to shallow-copy the whole
+context dict for every branch. A LayeredContext is a dict that only stores
+the keys written through it and reads everything else from its parent, so a
+branch allocates only for what it changes and its write-set can be merged
+back without diffing key sets.
+"""
+
+from collections.abc import ItemsView, KeysView, ValuesView
+from typing import Any, Dict, Iterator, Mapping, Set, Tuple
+
+# Tombstone stored in a layer for keys deleted through it
+_DELETED = object()
+_MISSING = object()
+
+# Depth after which a layer chain is flattened to keep lookups cheap
+MAX_LAYER_DEPTH = 8
+
+
+class LayeredContext(dict):
+    """
+    Copy-on-write view over a parent context.
+
+    The dict storage of a layer only holds its own writes (deleted keys are
+    kept as tombstones); every other key is read from ``parent``. The parent
+    must not be modified while layers on top of it are alive. Copying or
+    pickling a layer produces a plain dict with the merged contents.
+
+    Attributes:
+        parent (Mapping[str, Any]): The context this layer is stacked on.
+        depth (int): Number of layers in the chain, this one included.
+    """
+
+    __slots__ = ("parent", "depth")
+
+    def __init__(self, parent: Mapping[str, Any]) -> None:
+        """
+        Create an empty layer on top of a context.
+
+        Args:
+            parent: The context to read through to.
+        """
+        super().__init__()
+        self.parent = parent
+        self.depth = parent.depth + 1 if isinstance(parent, LayeredContext) else 1
+
+    # Reads
+
+    def __getitem__(self, key: Any) -> Any:
+        value = dict.get(self, key, _MISSING)
+        if value is _MISSING:
+            return self.parent[key]
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: Any) -> bool:
+        value = dict.get(self, key, _MISSING)
+        if value is _MISSING:
+            return key in self.parent
+        return value is not _DELETED
+
+    def __iter__(self) -> Iterator[Any]:
+        for key in self.parent:
+            if dict.get(self, key, _MISSING) is not _DELETED:
+                yield key
+        for key, value in dict.items(self):
+            if value is not _DELETED and key not in self.parent:
+                yield key
+
+    def __reversed__(self) -> Iterator[Any]:
+        return reversed(list(self))
+
+    def __len__(self) -> int:
+        size = len(self.parent)
+        for key, value in dict.items(self):
+            in_parent = key in self.parent
+            if value is _DELETED:
+                size -= in_parent
+            elif not in_parent:
+                size += 1
+        return size
+
+    def keys(self) -> KeysView:  # type: ignore[override]
+        return KeysView(self)
+
+    def items(self) -> ItemsView:  # type: ignore[override]
+        return ItemsView(self)
+
+    def values(self) -> ValuesView:  # type: ignore[override]
+        return ValuesView(self)
+
+    # Writes (__setitem__ and update are inherited and write to this layer)
+
+    def __delitem__(self, key: Any) -> None:
+        if key not in self:
+            raise KeyError(key)
+        if key in self.parent:
+            dict.__setitem__(self, key, _DELETED)
+        else:
+            dict.__delitem__(self, key)
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self) -> Tuple[Any, Any]:
+        for key in reversed(list(self)):
+            return key, self.pop(key)
+        raise KeyError("popitem(): dictionary is empty")
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def clear(self) -> None:
+        for key in list(self):
+            del self[key]
+
+    # Conversions
+
+    def flatten(self) -> Dict[str, Any]:
+        """
+        Materialize the layer chain into a plain dict.
+
+        Returns:
+            Dict[str, Any]: The merged contents of every layer.
+        """
+        layers = [self]
+        while isinstance(layers[-1].parent, LayeredContext):
+            layers.append(layers[-1].parent)
+        result = dict(layers[-1].parent)
+        for layer in reversed(layers):
+            for key, value in dict.items(layer):
+                if value is _DELETED:
+                    result.pop(key, None)
+                else:
+                    result[key] = value
+        return result
+
+    def copy(self) -> Dict[str, Any]:  # type: ignore[override]
+        return self.flatten()
+
+    __copy__ = copy
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Dict[str, Any]]]:
+        return dict, (self.flatten(),)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LayeredContext):
+            other = other.flatten()
+        return self.flatten() == other
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __or__(self, other: Any) -> Dict[str, Any]:
+        result = self.flatten()
+        result.update(other)
+        return result
+
+    def __ror__(self, other: Any) -> Dict[str, Any]:
+        result = dict(other)
+        result.update(self.flatten())
+        return result
+
+    def __repr__(self) -> str:
+        return repr(self.flatten())
+
+    # Write tracking
+
+    def changes(self, base: Mapping[str, Any] = _MISSING) -> Tuple[Dict[str, Any], Set[Any]]:  # type: ignore[assignment]
+        """
+        Collect the keys written and deleted on top of a base context.
+
+        Args:
+            base: A context lower in the chain (defaults to this layer's parent).
+
+        Returns:
+            Tuple[Dict[str, Any], Set[Any]]: The written values and the deleted keys.
+        """
+        if base is _MISSING:
+            base = self.parent
+        layers = []
+        current: Any = self
+        while isinstance(current, LayeredContext) and current is not base:
+            layers.append(current)
+            current = current.parent
+        if current is not base:
+            # The chain was flattened below base (see fork_context): diff instead
+            merged = self.flatten()
+            written = {k: v for k, v in merged.items() if k not in base or base[k] is not v}
+            return written, {k for k in base if k not in merged}
+        written: Dict[str, Any] = {}
+        deleted: Set[Any] = set()
+        for layer in reversed(layers):
+            for key, value in dict.items(layer):
+                if value is _DELETED:
+                    written.pop(key, None)
+                    deleted.add(key)
+                else:
+                    written[key] = value
+                    deleted.discard(key)
+        return written, deleted
+
+
+def fork_context(data: Mapping[str, Any]) -> Tuple[LayeredContext, LayeredContext]:
+    """
+    Split a context into two independent copy-on-write views.
+
+    After the fork the original context is treated as frozen; both sides
+    write only to their own layer. Deep chains are flattened first so
+    lookups stay cheap.
+
+    Args:
+        data: The context to fork.
+
+    Returns:
+        Tuple[LayeredContext, LayeredContext]: Two layers over the same base.
+    """
+    if isinstance(data, LayeredContext) and data.depth >= MAX_LAYER_DEPTH:
+        data = data.flatten()
+    return LayeredContext(data), LayeredContext(data)
+
+
+def apply_changes(
+    target: Dict[str, Any],
+    written: Mapping[str, Any],
+    deleted: Set[Any] = frozenset(),  # type: ignore[assignment]
+    exclude: Tuple[str, ...] = ("progress_rich",),
+) -> Dict[str, Any]:
+    """
+    Merge a write-set back into a context.
+
+    Args:
+        target: The context to update in place.
+        written: Keys written by the branch.
+        deleted: Keys deleted by the branch.
+        exclude: Keys that are never merged back.
+
+    Returns:
+        Dict[str, Any]: The updated target.
+    """
+    for key, value in written.items():
+        if key not in exclude:
+            target[key] = value
+    for key in deleted:
+        if key not in exclude:
+            target.pop(key, None)
+    return target
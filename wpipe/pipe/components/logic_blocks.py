@@ -7,6 +7,8 @@ and parallel execution within a pipeline execution flow.
 
 from typing import Any, Dict, List, Optional, Union
 
+from .context import LayeredContext
+
 
 def _serialize_step(step: Any) -> Union[Dict[str, Any], str]:
     """
@@ -86,7 +88,7 @@ class Condition:
             ValueError: If the expression is invalid or cannot be evaluated.
         """
         # We use a restricted environment for eval to improve security.
-        safe_locals = data.copy()
+        safe_locals = LayeredContext(data)
         safe_globals: Dict[str, Any] = {
             "True": True,
             "False": False,
@@ -178,7 +180,7 @@ class For:
 
         if self.validation_expression:
             try:
-                safe_locals = data.copy()
+                safe_locals = LayeredContext(data)
                 safe_globals: Dict[str, Any] = {
                     "True": True,
                     "False": False,
@@ -238,6 +240,11 @@ class Parallel:
         steps (List[Any]): List of steps to execute in parallel.
         max_workers (Optional[int]): Maximum number of worker threads/processes.
         use_processes (bool): Whether to use ProcessPoolExecutor instead of ThreadPoolExecutor.
+        shared_memory_threshold (Optional[int]): Size in bytes from which arrays and
+            buffers are sent to worker processes through shared memory (None:
+            disabled, the default).
+        max_concurrency (Optional[int]): Maximum number of branches awaited at once
+            by async pipelines.
     """
 
     def __init__(
@@ -245,6 +252,8 @@ class Parallel:
         steps: List[Any],
         max_workers: Optional[int] = None,
         use_processes: bool = False,
+        shared_memory_threshold: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
     ) -> None:
         """
         Initialize a Parallel block.
@@ -253,10 +262,20 @@ class Parallel:
             steps: List of steps to execute in parallel.
             max_workers: Maximum number of worker threads/processes.
             use_processes: Whether to use ProcessPoolExecutor.
+            shared_memory_threshold: Opt-in size in bytes from which numpy
+                arrays, bytes, bytearrays and memoryviews travel through shared
+                memory instead of being pickled (e.g. ``1 << 20``).
+                Workers then get arrays and memoryviews as read-only views, so
+                steps must not modify them in place. None (the default) pickles
+                everything and workers get private, writable copies.
+            max_concurrency: Maximum number of branches running at once in a
+                PipelineAsync (None: all of them).
         """
         self.steps: List[Any] = steps or []
         self.max_workers: Optional[int] = max_workers
         self.use_processes: bool = use_processes
+        self.shared_memory_threshold: Optional[int] = shared_memory_threshold
+        self.max_concurrency: Optional[int] = max_concurrency
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -269,5 +288,7 @@ class Parallel:
             "type": "parallel",
             "max_workers": self.max_workers,
             "use_processes": self.use_processes,
+            "shared_memory_threshold": self.shared_memory_threshold,
+            "max_concurrency": self.max_concurrency,
             "steps": [_serialize_step(s) for s in self.steps],
         }
@@ -0,0 +1,472 @@
+"""
+Compiled execution plans for WPipe pipelines.
+
+This module turns the normalized ``tasks_list`` of a pipeline into an
+immutable sequence of slotted step descriptors. Names, versions, logic
+block children and retry/timeout policies are resolved once, so the
+execution loop only dispatches on a precomputed ``kind``.
+"""
+
+import asyncio
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+from .logic_blocks import Background, Condition, For, Parallel
+
+STEP_TASK = "task"
+STEP_BACKGROUND = "background"
+STEP_CONDITION = "condition"
+STEP_FOR = "for"
+STEP_PARALLEL = "parallel"
+
+
+def _meta_value(meta: Any, key: str) -> Any:
+    """
+    Read a setting from step metadata (dict or StepMetadata-like object).
+
+    Args:
+        meta: The step metadata.
+        key: The setting name.
+
+    Returns:
+        Any: The setting value, or None if missing.
+    """
+    if not meta:
+        return None
+    if isinstance(meta, dict):
+        return meta.get(key)
+    return getattr(meta, key, None)
+
+
+def is_async_callable(func: Any) -> bool:
+    """
+    Check if a callable is async (handles both functions and callable objects).
+
+    Args:
+        func: The object to check.
+
+    Returns:
+        bool: True if it's an async callable, False otherwise.
+    """
+    if asyncio.iscoroutinefunction(func):
+        return True
+    return hasattr(func, "__call__") and asyncio.iscoroutinefunction(func.__call__)
+
+
+class _Frozen:
+    """Base for slotted descriptors that cannot be modified after creation."""
+
+    __slots__: Tuple[str, ...] = ()
+
+    def __init__(self, **fields: Any) -> None:
+        for key in self.__slots__:
+            object.__setattr__(self, key, fields.get(key))
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for key, value in state.items():
+            object.__setattr__(self, key, value)
+
+
+class StepPolicy(_Frozen):
+    """
+    Retry, timeout and caching settings resolved for a step.
+
+    A value of None means "inherit the pipeline default".
+
+    Attributes:
+        max_retries (Optional[int]): Number of retries on failure.
+        retry_delay (Optional[float]): Delay between retries in seconds.
+        retry_on_exceptions (Optional[Tuple[type, ...]]): Exceptions that trigger a retry.
+        timeout (Optional[float]): Execution timeout in seconds.
+        isolation (Optional[str]): Timeout isolation mode ("thread" or "process").
+        cache (bool): Whether results are cached.
+        cache_keys (Optional[Tuple[str, ...]]): Context keys the cache key is built from.
+        cpu_bound (bool): Whether async pipelines run the step in a process pool.
+    """
+
+    __slots__ = (
+        "max_retries", "retry_delay", "retry_on_exceptions", "timeout", "isolation", "cache", "cache_keys",
+        "cpu_bound",
+    )
+
+
+def resolve_policy(func: Any, meta: Any = None) -> StepPolicy:
+    """
+    Resolve the retry/timeout policy of a step.
+
+    Settings follow the priority Step Meta > Decorator > Pipeline Default.
+
+    Args:
+        func: The step callable.
+        meta: Step metadata from the tasks list (dict or StepMetadata).
+
+    Returns:
+        StepPolicy: The resolved policy.
+    """
+    settings: Dict[str, Any] = {
+        "max_retries": None,
+        "retry_delay": None,
+        "retry_on_exceptions": None,
+        "timeout": None,
+        "isolation": None,
+        "cache": False,
+        "cache_keys": None,
+        "cpu_bound": False,
+    }
+    for source in (getattr(func, "_wpipe_metadata", None), meta):
+        if not source:
+            continue
+        settings["max_retries"] = _meta_value(source, "retry_count") or settings["max_retries"]
+        settings["retry_delay"] = _meta_value(source, "retry_delay") or settings["retry_delay"]
+        settings["retry_on_exceptions"] = (
+            _meta_value(source, "retry_on_exceptions") or settings["retry_on_exceptions"]
+        )
+        settings["isolation"] = _meta_value(source, "isolation") or settings["isolation"]
+        settings["cache"] = bool(_meta_value(source, "cache")) or settings["cache"]
+        settings["cpu_bound"] = bool(_meta_value(source, "cpu_bound")) or settings["cpu_bound"]
+        cache_keys = _meta_value(source, "cache_keys")
+        if cache_keys is not None:
+            settings["cache_keys"] = tuple(cache_keys)
+        timeout = _meta_value(source, "timeout")
+        if timeout is not None:
+            settings["timeout"] = timeout
+    return StepPolicy(**settings)
+
+
+class CompiledStep(_Frozen):
+    """
+    Immutable descriptor for one entry of an execution plan.
+
+    Attributes:
+        kind (str): One of the ``STEP_*`` constants.
+        func (Optional[Callable]): The callable for task and background steps.
+        name (str): Resolved step name.
+        version (str): Resolved step version.
+        meta (Any): Original step metadata (dict or StepMetadata).
+        task_id (Any): API task identifier attached by the worker registration.
+        policy (Optional[StepPolicy]): Resolved retry/timeout policy.
+        capture_error (bool): Whether a background failure runs error handlers.
+        is_pipeline (bool): Whether ``func`` is a nested pipeline.
+        is_async (bool): Whether ``func`` is a coroutine function.
+        block (Any): The original logic block for Condition/For/Parallel.
+        children (Tuple[CompiledStep, ...]): Loop/parallel steps or the true branch.
+        alternative (Tuple[CompiledStep, ...]): The false branch of a Condition.
+        source (Any): The tasks list entry this descriptor was compiled from.
+    """
+
+    __slots__ = (
+        "kind",
+        "func",
+        "name",
+        "version",
+        "meta",
+        "task_id",
+        "policy",
+        "capture_error",
+        "is_pipeline",
+        "is_async",
+        "block",
+        "children",
+        "alternative",
+        "source",
+    )
+
+
+def _resolve_callable_name(func: Any) -> str:
+    """
+    Resolve the display name of a bare callable step.
+
+    Args:
+        func: The step callable.
+
+    Returns:
+        str: NAME attribute > __name__ > class name.
+    """
+    name = getattr(func, "NAME", getattr(func, "__name__", func.__class__.__name__))
+    if name in ("task", "function"):
+        name = func.__class__.__name__
+    return name
+
+
+def compile_step(item: Any, pipeline_type: type = type(None)) -> Optional[CompiledStep]:
+    """
+    Compile a single tasks list entry into a step descriptor.
+
+    Args:
+        item: A normalized step tuple, a bare callable or a logic block.
+        pipeline_type: Pipeline class used to detect nested pipelines.
+
+    Returns:
+        Optional[CompiledStep]: The descriptor, or None if the item is not executable.
+    """
+    if isinstance(item, Condition):
+        return CompiledStep(
+            kind=STEP_CONDITION,
+            name="condition",
+            block=item,
+            children=compile_steps(item.branch_true, pipeline_type),
+            alternative=compile_steps(item.branch_false or [], pipeline_type),
+            source=item,
+        )
+    if isinstance(item, For):
+        return CompiledStep(
+            kind=STEP_FOR,
+            name="for",
+            block=item,
+            children=compile_steps(item.steps, pipeline_type),
+            source=item,
+        )
+    if isinstance(item, Parallel):
+        return CompiledStep(
+            kind=STEP_PARALLEL,
+            name="Parallel Block",
+            block=item,
+            children=compile_steps(item.steps, pipeline_type),
+            source=item,
+        )
+    if isinstance(item, Background):
+        inner = compile_step(item.step, pipeline_type)
+        if inner is None:
+            return None
+        state = inner.__getstate__()
+        state.update(kind=STEP_BACKGROUND, capture_error=item.capture_error, source=item)
+        return CompiledStep(**state)
+
+    meta: Any = {}
+    task_id = None
+    if isinstance(item, tuple):
+        if len(item) < 2 or not callable(item[0]):
+            return None
+        func, name = item[0], item[1]
+        version = item[2] if len(item) > 2 else "v1.0"
+        if len(item) >= 4:
+            if isinstance(item[3], dict) or hasattr(item[3], "retry_count"):
+                meta = item[3]
+            else:
+                task_id = item[3]
+    elif callable(item):
+        func = item
+        name = _resolve_callable_name(item)
+        version = getattr(item, "VERSION", "v1.0")
+        meta = getattr(item, "_wpipe_metadata", None) or {}
+    else:
+        return None
+
+    is_background = isinstance(meta, dict) and meta.get("_is_background", False)
+    return CompiledStep(
+        kind=STEP_BACKGROUND if is_background else STEP_TASK,
+        func=func,
+        name=name,
+        version=version,
+        meta=meta,
+        task_id=task_id,
+        policy=resolve_policy(func, meta),
+        capture_error=bool(is_background and meta.get("_background_capture_error", False)),
+        is_pipeline=isinstance(func, pipeline_type),
+        is_async=is_async_callable(func),
+        source=item,
+    )
+
+
+class Dataflow(_Frozen):
+    """
+    Dependency graph of a run of consecutive task steps.
+
+    Step ``j`` waits for an earlier step ``i`` when it names it in
+    ``depends_on`` or reads a key ``i`` writes. A step that declares
+    neither ``reads`` nor ``depends_on`` waits for every earlier step, and
+    a step that does not declare ``writes`` may feed any later reader.
+    Indices are relative to the region.
+
+    Attributes:
+        start (int): Plan index of the first step of the region.
+        steps (Tuple[CompiledStep, ...]): The steps, in pipeline order.
+        deps (Tuple[FrozenSet[int], ...]): Direct predecessors of each step.
+        ancestors (Tuple[Tuple[int, ...], ...]): Transitive predecessors of
+            each step, in pipeline order.
+    """
+
+    __slots__ = ("start", "steps", "deps", "ancestors")
+
+
+def step_dataflow(step: CompiledStep) -> Tuple[FrozenSet[str], Optional[FrozenSet[str]], Optional[FrozenSet[str]]]:
+    """
+    Resolve the declared dependencies and context keys of a task step.
+
+    Settings follow the priority Step Meta > Decorator.
+
+    Args:
+        step: The compiled step.
+
+    Returns:
+        Tuple: ``depends_on`` names, ``reads`` keys and ``writes`` keys (None when undeclared).
+    """
+    settings: Dict[str, Any] = {"depends_on": None, "reads": None, "writes": None}
+    for source in (getattr(step.func, "_wpipe_metadata", None), step.meta):
+        if not source:
+            continue
+        for key in settings:
+            value = _meta_value(source, key)
+            if value:
+                settings[key] = frozenset(value)
+            elif value is not None and key != "depends_on":
+                settings[key] = frozenset()
+    return settings["depends_on"] or frozenset(), settings["reads"], settings["writes"]
+
+
+def _build_region(start: int, steps: Sequence[CompiledStep]) -> Dataflow:
+    """Compute the dependency graph of a run of declared task steps."""
+    flows = [step_dataflow(step) for step in steps]
+    deps = []
+    ancestors = []
+    for j, (depends_on, reads, _) in enumerate(flows):
+        if reads is None and not depends_on:
+            direct = frozenset(range(j))
+        else:
+            direct = frozenset(
+                i for i in range(j)
+                if steps[i].name in depends_on
+                or (reads is not None and (flows[i][2] is None or flows[i][2] & reads))
+            )
+        closure = set(direct)
+        for i in direct:
+            closure.update(ancestors[i])
+        deps.append(direct)
+        ancestors.append(tuple(sorted(closure)))
+    return Dataflow(start=start, steps=tuple(steps), deps=tuple(deps), ancestors=tuple(ancestors))
+
+
+def _is_declared(step: Optional[CompiledStep]) -> bool:
+    """Check whether a plan entry is a synchronous task with declared dataflow."""
+    if step is None or step.kind != STEP_TASK or step.is_async:
+        return False
+    depends_on, reads, writes = step_dataflow(step)
+    return bool(depends_on) or reads is not None or writes is not None
+
+
+def build_dataflow(steps: Sequence[Optional[CompiledStep]]) -> Dict[int, Dataflow]:
+    """
+    Find the runs of task steps that can be scheduled as a dependency graph.
+
+    Only synchronous task steps that declare ``reads``, ``writes`` or
+    ``depends_on`` take part; any other entry (logic blocks, undeclared
+    steps) acts as a barrier. Runs without any independent steps are left
+    to the sequential loop.
+
+    Args:
+        steps: Top-level plan entries.
+
+    Returns:
+        Dict[int, Dataflow]: Regions keyed by the plan index of their first step.
+    """
+    regions: Dict[int, Dataflow] = {}
+    run: List[CompiledStep] = []
+
+    def close_run(end: int) -> None:
+        if len(run) > 1:
+            region = _build_region(end - len(run), run)
+            if any(len(region.ancestors[j]) < j for j in range(len(run))):
+                regions[region.start] = region
+        run.clear()
+
+    for index, step in enumerate(steps):
+        if _is_declared(step):
+            run.append(step)
+        else:
+            close_run(index)
+    close_run(len(steps))
+    return regions
+
+
+def compile_steps(items: Sequence[Any], pipeline_type: type = type(None)) -> Tuple[CompiledStep, ...]:
+    """
+    Compile a list of steps, dropping entries that are not executable.
+
+    Args:
+        items: Steps to compile.
+        pipeline_type: Pipeline class used to detect nested pipelines.
+
+    Returns:
+        Tuple[CompiledStep, ...]: The compiled descriptors.
+    """
+    compiled = (compile_step(item, pipeline_type) for item in items)
+    return tuple(step for step in compiled if step is not None)
+
+
+class ExecutionPlan:
+    """
+    Immutable, index-aligned plan compiled from a pipeline's ``tasks_list``.
+
+    Attributes:
+        steps (Tuple[Optional[CompiledStep], ...]): One descriptor per tasks list entry
+            (None for entries that are not executable).
+        source (List[Any]): The tasks list the plan was compiled from.
+    """
+
+    __slots__ = ("steps", "source", "_dataflow")
+
+    def __init__(self, tasks_list: Sequence[Any], pipeline_type: type = type(None)) -> None:
+        """
+        Compile the plan.
+
+        Args:
+            tasks_list: The normalized steps of the pipeline.
+            pipeline_type: Pipeline class used to detect nested pipelines.
+        """
+        self.steps = tuple(compile_step(item, pipeline_type) for item in tasks_list)
+        self.source = tasks_list
+        self._dataflow: Optional[Dict[int, Dataflow]] = None
+
+    def is_current(self, tasks_list: Sequence[Any]) -> bool:
+        """
+        Check whether the plan still matches the given tasks list.
+
+        Args:
+            tasks_list: The pipeline's current tasks list.
+
+        Returns:
+            bool: True if the plan was compiled from this list and it is unchanged in size.
+        """
+        return self.source is tasks_list and len(self.steps) == len(tasks_list)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __getitem__(self, index: int) -> Optional[CompiledStep]:
+        return self.steps[index]
+
+    def __iter__(self) -> Iterator[Optional[CompiledStep]]:
+        return iter(self.steps)
+
+    def dataflow(self) -> Dict[int, Dataflow]:
+        """
+        Get the dependency-graph regions of the plan (computed once).
+
+        Returns:
+            Dict[int, Dataflow]: Regions keyed by the index of their first step.
+        """
+        if self._dataflow is None:
+            self._dataflow = build_dataflow(self.steps)
+        return self._dataflow
+
+    def walk(self) -> Iterator[CompiledStep]:
+        """
+        Iterate over every compiled step, nested ones included.
+
+        The order only depends on the plan structure, so a plan and its
+        unpickled copy yield matching sequences.
+
+        Yields:
+            CompiledStep: Steps in pre-order (children before the false branch).
+        """
+        stack = [step for step in reversed(self.steps) if step is not None]
+        while stack:
+            step = stack.pop()
+            yield step
+            stack.extend(reversed(step.alternative or ()))
+            stack.extend(reversed(step.children or ()))
@@ -0,0 +1,312 @@
+"""
+Persistent worker pools for WPipe pipelines.
+
+Parallel blocks used to create and tear down an executor every time they
+ran. WorkerPools keeps warm thread and process pools alive across blocks
+and runs. A block leases a thread pool for as long as it runs, so blocks
+of concurrent runs (and nested blocks) never queue on each other. Process
+workers receive the pipeline once through the pool initializer;
+afterwards each task only carries a step reference and the branch context.
+"""
+
+import pickle
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .context import LayeredContext
+from .transport import SHARE_THRESHOLD, Payload, pack, release, unpack
+
+# Pipeline and flattened plan installed in each process worker by the initializer
+_worker_pipeline: Any = None
+_worker_steps: List[Any] = []
+
+
+def _init_process_worker(payload: bytes) -> None:
+    """
+    Initializer of process pools: install the pipeline shipped by the parent.
+
+    Args:
+        payload: The pickled pipeline.
+    """
+    global _worker_pipeline, _worker_steps  # pylint: disable=global-statement
+    _worker_pipeline = pickle.loads(payload)
+    _worker_steps = list(_worker_pipeline._get_plan().walk())
+
+
+def _run_branch(step: Any, data: Dict[str, Any], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Execute a branch and return its write-set."""
+    try:
+        res = _worker_pipeline._execute_step(step, LayeredContext(data), **kwargs)
+        return res.changes(data)[0] if isinstance(res, LayeredContext) else res
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return {"error": f"Parallel execution error: {str(e)}"}
+
+
+def run_process_task(
+    step_ref: Any,
+    payload: Payload,
+    kwargs: Dict[str, Any],
+    threshold: Optional[int] = SHARE_THRESHOLD,
+) -> Payload:
+    """
+    Run one Parallel branch inside a process worker.
+
+    Large buffers of the context are mapped from the parent's shared memory
+    segment without copying; large buffers of the result are shipped back
+    in a new segment that the parent unlinks.
+
+    Args:
+        step_ref: Index of the step in the walked plan, or the step itself
+            when it is not part of the plan.
+        payload: The branch context, packed by ``transport.pack``.
+        kwargs: Keyword arguments for step execution.
+        threshold: Minimum size in bytes of a shared result buffer.
+
+    Returns:
+        Payload: The keys written by the branch, packed.
+    """
+    step = _worker_steps[step_ref] if isinstance(step_ref, int) else step_ref
+    data, segment = unpack(payload)
+    try:
+        result, result_segment = pack(_run_branch(step, data, kwargs), threshold)
+    finally:
+        # Drop the views over the parent's segment before closing it
+        del data
+        if segment is not None:
+            release(segment)
+    if result_segment is not None:
+        result_segment.close()
+    return result
+
+
+def _shutdown_pools(
+    threads: Dict[Any, Executor],
+    idle: Dict[Any, List[Executor]],
+    processes: "OrderedDict[Any, Any]",
+    tasks: Dict[Any, Executor],
+) -> None:
+    """Shut down every pool without waiting for idle workers."""
+    executors = list(threads.values()) + list(tasks.values()) + [e for pools in idle.values() for e in pools]
+    for executor in executors + [entry[-1] for entry in processes.values()]:
+        executor.shutdown(wait=False)
+    threads.clear()
+    idle.clear()
+    processes.clear()
+    tasks.clear()
+
+
+class WorkerPools:
+    """
+    Warm thread and process pools for the Parallel blocks of one or more pipelines.
+
+    Shared thread pools are keyed by kind and size. Leased thread pools
+    belong to one caller at a time and are kept warm between leases. Process
+    pools are keyed by the execution plan they were initialized with and
+    their size, and rebuilt when the pipeline they shipped changes; the
+    least recently used ones are shut down beyond ``max_process_pools``.
+    Task process pools (keyed by size) run self-contained callables and
+    hold no pipeline.
+
+    Attributes:
+        max_process_pools (int): Maximum number of live process pools.
+        max_idle_thread_pools (int): Idle leased pools kept per kind and size.
+    """
+
+    def __init__(self, max_process_pools: int = 4, max_idle_thread_pools: int = 4) -> None:
+        """
+        Initialize the pool manager. Pools are created on first use.
+
+        Args:
+            max_process_pools: Maximum number of live process pools.
+            max_idle_thread_pools: Idle leased pools kept per kind and size.
+        """
+        self.max_process_pools = max_process_pools
+        self.max_idle_thread_pools = max_idle_thread_pools
+        self._lock = threading.Lock()
+        self._threads: Dict[Tuple[str, int], ThreadPoolExecutor] = {}
+        self._idle: Dict[Tuple[str, int], List[ThreadPoolExecutor]] = {}
+        self._leased: Set[ThreadPoolExecutor] = set()
+        self._processes: "OrderedDict[Tuple[int, int], Tuple[Any, bytes, Dict[int, int], ProcessPoolExecutor]]" = (
+            OrderedDict()
+        )
+        self._tasks: Dict[int, ProcessPoolExecutor] = {}
+        self._finalizer = weakref.finalize(
+            self, _shutdown_pools, self._threads, self._idle, self._processes, self._tasks
+        )
+
+    def thread_pool(self, workers: int, kind: str = "batch") -> ThreadPoolExecutor:
+        """
+        Get a warm thread pool shared by every caller.
+
+        Args:
+            workers: Number of worker threads.
+            kind: Pool role, part of the key and of the thread names.
+
+        Returns:
+            ThreadPoolExecutor: The shared pool.
+        """
+        key = (kind, workers)
+        with self._lock:
+            executor = self._threads.get(key)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"wpipe_{kind}")
+                self._threads[key] = executor
+            return executor
+
+    @contextmanager
+    def lease_thread_pool(self, workers: int, kind: str = "parallel") -> Iterator[ThreadPoolExecutor]:
+        """
+        Borrow a warm thread pool for the duration of one block.
+
+        Concurrent callers (e.g. the Parallel blocks of concurrent
+        ``run_many`` runs, or a nested block) each get a pool of their own.
+
+        Args:
+            workers: Number of worker threads.
+            kind: Pool role, part of the key and of the thread names.
+
+        Yields:
+            ThreadPoolExecutor: A pool no other caller uses until it is returned.
+        """
+        key = (kind, workers)
+        with self._lock:
+            idle = self._idle.get(key)
+            executor = idle.pop() if idle else None
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"wpipe_{kind}")
+            self._leased.add(executor)
+        try:
+            yield executor
+        finally:
+            with self._lock:
+                # Pools shut down meanwhile (shutdown, discard) are not returned
+                kept = executor in self._leased and len(self._idle.setdefault(key, [])) < self.max_idle_thread_pools
+                self._leased.discard(executor)
+                if kept:
+                    self._idle[key].append(executor)
+            if not kept:
+                executor.shutdown(wait=False)
+
+    def process_pool(
+        self, plan: Any, workers: int, pipeline_factory: Callable[[], Any]
+    ) -> Tuple[ProcessPoolExecutor, Dict[int, int]]:
+        """
+        Get a warm process pool whose workers already hold the pipeline.
+
+        A pool is only reused while the pipeline it shipped is unchanged.
+
+        Args:
+            plan: The execution plan the workers run.
+            workers: Number of worker processes.
+            pipeline_factory: Builds the picklable pipeline shipped to workers.
+
+        Returns:
+            Tuple[ProcessPoolExecutor, Dict[int, int]]: The pool and a map from
+                ``id(step)`` to the step reference understood by the workers.
+
+        Raises:
+            pickle.PicklingError: If the pipeline cannot be shipped to processes.
+        """
+        key = (id(plan), workers)
+        payload = pickle.dumps(pipeline_factory())
+        with self._lock:
+            entry = self._processes.pop(key, None)
+            if entry is not None:
+                if entry[0] is plan and entry[1] == payload:
+                    self._processes[key] = entry
+                    return entry[3], entry[2]
+                entry[3].shutdown(wait=False)
+
+            # Forked workers must share the parent's tracker, or they would
+            # unlink shared memory segments they merely attached to
+            resource_tracker.ensure_running()
+            refs = {id(step): index for index, step in enumerate(plan.walk())}
+            executor = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_process_worker, initargs=(payload,)
+            )
+            self._processes[key] = (plan, payload, refs, executor)
+            while len(self._processes) > self.max_process_pools:
+                _, oldest = self._processes.popitem(last=False)
+                oldest[3].shutdown(wait=False)
+            return executor, refs
+
+    def discard_plan(self, plan: Any) -> None:
+        """
+        Shut down the process pools of an execution plan that was replaced.
+
+        Args:
+            plan: The former plan.
+        """
+        with self._lock:
+            stale = [key for key, entry in self._processes.items() if entry[0] is plan]
+            executors = [self._processes.pop(key)[3] for key in stale]
+        for executor in executors:
+            executor.shutdown(wait=False)
+
+    def task_process_pool(self, workers: int) -> ProcessPoolExecutor:
+        """
+        Get a warm process pool for tasks that carry their own callable.
+
+        Args:
+            workers: Number of worker processes.
+
+        Returns:
+            ProcessPoolExecutor: The shared pool.
+        """
+        with self._lock:
+            executor = self._tasks.get(workers)
+            if executor is None:
+                resource_tracker.ensure_running()
+                executor = ProcessPoolExecutor(max_workers=workers)
+                self._tasks[workers] = executor
+            return executor
+
+    def discard(self, executor: Executor) -> None:
+        """
+        Drop a pool (e.g. a broken process pool) so the next request rebuilds it.
+
+        Args:
+            executor: The pool to drop.
+        """
+        with self._lock:
+            for key, pool in list(self._threads.items()):
+                if pool is executor:
+                    del self._threads[key]
+            for key, entry in list(self._processes.items()):
+                if entry[3] is executor:
+                    del self._processes[key]
+            self._leased.discard(executor)
+            for key, pool in list(self._tasks.items()):
+                if pool is executor:
+                    del self._tasks[key]
+        executor.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down every pool.
+
+        Args:
+            wait: Whether to wait for running tasks to finish.
+        """
+        with self._lock:
+            threads = list(self._threads.values()) + list(self._leased)
+            threads += [executor for pools in self._idle.values() for executor in pools]
+            processes = [entry[3] for entry in self._processes.values()] + list(self._tasks.values())
+            self._threads.clear()
+            self._idle.clear()
+            self._leased.clear()
+            self._processes.clear()
+            self._tasks.clear()
+        for executor in threads + processes:
+            executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "WorkerPools":
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.shutdown()
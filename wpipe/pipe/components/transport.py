@@ -0,0 +1,189 @@
+"""
+Shared-memory transport for process-mode Parallel blocks.
+
+Contexts sent to process workers are pickled once per block. When the
+block opts in with ``shared_memory_threshold``, large ``numpy.ndarray``,
+``bytes``, ``bytearray`` and ``memoryview`` values are kept out of the
+pickle stream: their bytes are copied into a single
+``multiprocessing.shared_memory`` segment and the stream only carries a
+reference to them. Workers map the segment and see arrays and memoryviews
+as read-only views over it, without copying; ``bytes`` and ``bytearray``
+are rebuilt from the mapping with a single memcpy.
+
+Results travel back the same way; the parent copies them out of the
+worker's segment and unlinks it.
+"""
+
+import io
+import pickle
+import sys
+from multiprocessing import shared_memory
+from typing import Any, List, Optional, Tuple
+
+# Values smaller than this (in bytes) stay inside the pickle stream
+SHARE_THRESHOLD = 1 << 20
+
+# Alignment of every buffer inside a segment
+_ALIGN = 64
+
+# (pickle stream, segment name or None, (offset, nbytes) of each buffer)
+Payload = Tuple[bytes, Optional[str], Tuple[Tuple[int, int], ...]]
+
+# Segments whose views were still referenced when released
+_lingering: List[shared_memory.SharedMemory] = []
+
+
+class _Packer(pickle.Pickler):
+    """Pickler that moves large buffers out of band."""
+
+    def __init__(self, file: Any, threshold: int) -> None:
+        super().__init__(file, protocol=5)
+        self.threshold = threshold
+        self.buffers: List[memoryview] = []
+
+    def persistent_id(self, obj: Any) -> Any:  # pylint: disable=too-many-return-statements
+        kind = type(obj)
+        if kind is bytes or kind is bytearray:
+            if len(obj) >= self.threshold:
+                return self._share(kind.__name__, memoryview(obj), None)
+        elif kind is memoryview:
+            if obj.nbytes >= self.threshold and obj.c_contiguous:
+                return self._share("memoryview", obj.cast("B"), (obj.format, obj.shape))
+        else:
+            np = sys.modules.get("numpy")
+            if (
+                np is not None
+                and kind is np.ndarray
+                and obj.nbytes >= self.threshold
+                and not obj.dtype.hasobject
+            ):
+                flat = np.ascontiguousarray(obj).reshape(-1).view(np.uint8)
+                return self._share("ndarray", memoryview(flat), (obj.dtype.str, obj.shape))
+        return None
+
+    def _share(self, kind: str, view: memoryview, meta: Any) -> Tuple[str, int, Any]:
+        self.buffers.append(view)
+        return kind, len(self.buffers) - 1, meta
+
+
+class _Unpacker(pickle.Unpickler):
+    """Unpickler that resolves out-of-band buffers from a mapped segment."""
+
+    def __init__(self, file: Any, views: List[memoryview], copy: bool) -> None:
+        super().__init__(file)
+        self.views = views
+        self.copy = copy
+
+    def persistent_load(self, pid: Any) -> Any:
+        kind, index, meta = pid
+        view = self.views[index]
+        if kind == "bytes":
+            return bytes(view)
+        if kind == "bytearray":
+            return bytearray(view)
+        if self.copy:
+            view = memoryview(bytearray(view))
+        if kind == "memoryview":
+            fmt, shape = meta
+            return view if (fmt, shape) == ("B", (view.nbytes,)) else view.cast(fmt, shape)
+        if kind == "ndarray":
+            import numpy as np
+
+            dtype, shape = meta
+            return np.ndarray(shape, dtype=dtype, buffer=view)
+        raise pickle.UnpicklingError(f"Unknown shared buffer kind: {kind}")
+
+
+def pack(obj: Any, threshold: Optional[int] = SHARE_THRESHOLD) -> Tuple[Payload, Optional[shared_memory.SharedMemory]]:
+    """
+    Serialize an object, moving large buffers to shared memory.
+
+    Args:
+        obj: The object to serialize.
+        threshold: Minimum size in bytes of a shared buffer, None to keep
+            everything in the pickle stream.
+
+    Returns:
+        Tuple[Payload, Optional[SharedMemory]]: The picklable payload and the
+            segment holding the buffers (None if nothing was shared). The
+            caller owns the segment and must release it.
+
+    Raises:
+        pickle.PicklingError: If the object cannot be pickled.
+    """
+    stream = io.BytesIO()
+    packer = _Packer(stream, sys.maxsize if threshold is None else threshold)
+    packer.dump(obj)
+    if not packer.buffers:
+        return (stream.getvalue(), None, ()), None
+
+    layout = []
+    size = 0
+    for view in packer.buffers:
+        layout.append((size, view.nbytes))
+        size += -(-view.nbytes // _ALIGN) * _ALIGN
+    segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for (offset, nbytes), view in zip(layout, packer.buffers):
+        segment.buf[offset:offset + nbytes] = view
+    return (stream.getvalue(), segment.name, tuple(layout)), segment
+
+
+def unpack(payload: Payload, copy: bool = False) -> Tuple[Any, Optional[shared_memory.SharedMemory]]:
+    """
+    Rebuild an object serialized with ``pack``.
+
+    Args:
+        payload: The payload returned by ``pack``.
+        copy: Copy shared buffers into private memory and unlink the
+            segment right away, instead of returning views over it.
+
+    Returns:
+        Tuple[Any, Optional[SharedMemory]]: The object and the mapped segment
+            its views point to (None when ``copy`` is set or nothing was
+            shared). The caller must ``release`` it once done with the views.
+    """
+    data, name, layout = payload
+    if name is None:
+        return pickle.loads(data), None
+
+    segment = shared_memory.SharedMemory(name=name)
+    views = [segment.buf[offset:offset + nbytes].toreadonly() for offset, nbytes in layout]
+    try:
+        obj = _Unpacker(io.BytesIO(data), views, copy).load()
+    except BaseException:
+        views.clear()
+        release(segment)
+        raise
+    if not copy:
+        return obj, segment
+    views.clear()
+    release(segment, unlink=True)
+    return obj, None
+
+
+def release(segment: shared_memory.SharedMemory, unlink: bool = False) -> None:
+    """
+    Close (and optionally unlink) a segment.
+
+    If views over it are still referenced the mapping is kept until a later
+    release succeeds in closing it; an unlinked segment is freed by the OS
+    once every process has closed it.
+
+    Args:
+        segment: The segment to release.
+        unlink: Whether to remove the segment name as well.
+    """
+    if unlink:
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+    for pending in [segment] + _lingering:
+        try:
+            pending.close()
+        except BufferError:
+            if pending not in _lingering:
+                _lingering.append(pending)
+        else:
+            if pending in _lingering:
+                _lingering.remove(pending)
@@ -6,24 +6,49 @@ a sequence of tasks, with support for conditional branching,
 retry logic, API tracking, and execution history tracking.
 """
 
+import copy
 import inspect
 import json
+import os
+import queue
+import threading
 import time
 import traceback
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, as_completed, wait
+from contextlib import ExitStack
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 from wpipe.api_client.api_client import APIClient
+from wpipe.cache.cache import StepCache, count_cache_event, make_cache_key
 from wpipe.exception import ApiError, Codes, ProcessError, TaskError
 from wpipe.exception.api_error import logger
+from wpipe.timeout.timeout import ISOLATION_PROCESS, run_with_timeout
 from wpipe.tracking import PipelineTracker
 from wpipe.util.utils import clean_for_json
 
+from .components.context import LayeredContext, apply_changes, fork_context
 from .components.logic_blocks import Background, Condition, For, Parallel
 from .components.metrics import SystemMetricsCollector
+from .components.pools import WorkerPools, run_process_task
+from .components.transport import pack, unpack
+from .components.transport import release as release_segment
+from .components.plan import (
+    STEP_BACKGROUND,
+    STEP_CONDITION,
+    STEP_FOR,
+    STEP_PARALLEL,
+    CompiledStep,
+    Dataflow,
+    ExecutionPlan,
+    compile_step,
+    resolve_policy,
+)
 from .components.progress import ProgressManager
 
+# Marks the end of the input stream in the queues between stages
+_STREAM_END = object()
+
 
 class Pipeline(APIClient):
     """
@@ -66,7 +91,7 @@ class Pipeline(APIClient):
     def tracker(self) -> Any:
         if self._tracker is None and getattr(self, "tracking_db", None):
             from wpipe.tracking import PipelineTracker
-            self._tracker = PipelineTracker(self.tracking_db)
+            self._tracker = PipelineTracker(self.tracking_db, buffered=self.buffered_tracking)
         return self._tracker
         
     @tracker.setter
@@ -76,6 +101,14 @@ class Pipeline(APIClient):
     pipeline_id: Optional[str] = None
     _step_order: int = 0
     _step_ids: Dict[str, Any] = {}
+    _plan: Optional[ExecutionPlan] = None
+    _session_id: Optional[str] = None
+    _pools: Optional[WorkerPools] = None
+    _owns_pools: bool = True
+    step_cache: Optional[StepCache] = None
+    auto_parallel: bool = False
+    buffered_tracking: bool = False
+    _cache_counters: Dict[str, Dict[str, int]] = {}
     _metrics_collector: Optional[SystemMetricsCollector] = None
     parent_pipeline_id: Optional[str] = None
 
@@ -95,6 +128,10 @@ class Pipeline(APIClient):
         collect_system_metrics: bool = False,
         continue_on_error: bool = False,
         show_progress: bool = True,
+        worker_pools: Optional[WorkerPools] = None,
+        step_cache: Optional[StepCache] = None,
+        auto_parallel: bool = False,
+        buffered_tracking: bool = False,
     ) -> None:
         """
         Initialize the Pipeline.
@@ -114,6 +151,18 @@ class Pipeline(APIClient):
             collect_system_metrics: Whether to collect resource usage.
             continue_on_error: Whether to proceed if a step fails.
             show_progress: Whether to show a progress bar.
+            worker_pools: Warm worker pools to share with other pipelines
+                (by default the pipeline creates and owns its own).
+            step_cache: Result cache for steps declared with ``cache=True``
+                (by default an in-memory LRU, persisted next to ``tracking_db``
+                when tracking is enabled).
+            auto_parallel: Run consecutive steps that declare ``reads``/``writes``
+                or ``depends_on`` as a dependency graph, so independent ones
+                run concurrently. Results are merged in pipeline order, as if
+                the steps had run one after another.
+            buffered_tracking: Keep step tracking records in memory and write
+                them in batches from a background thread (flushed when the
+                run completes).
         """
         # pylint: disable=too-many-arguments
         if api_config:
@@ -137,7 +186,14 @@ class Pipeline(APIClient):
         self._collect_system_metrics = collect_system_metrics
         self.continue_on_error = continue_on_error
         self.show_progress = show_progress
+        self.auto_parallel = auto_parallel
+        self.buffered_tracking = buffered_tracking
         self.tracking_db = tracking_db
+        self._pools = worker_pools
+        self._owns_pools = worker_pools is None
+        self.step_cache = step_cache or StepCache(
+            os.path.join(os.path.dirname(os.path.abspath(tracking_db)), "step_cache.db") if tracking_db else None
+        )
 
         # Internal queues for events and post-run tasks
         self._pending_events: List[Dict[str, Any]] = []
@@ -147,7 +203,7 @@ class Pipeline(APIClient):
 
         # Initialize tracking if database path provided
         if tracking_db:
-            self.tracker = PipelineTracker(tracking_db, config_dir)
+            self.tracker = PipelineTracker(tracking_db, config_dir, buffered=buffered_tracking)
 
         self.pipeline_name = pipeline_name or "Pipeline"
 
@@ -519,6 +575,8 @@ class Pipeline(APIClient):
                     steps=normalized_steps,
                     max_workers=item.max_workers,
                     use_processes=item.use_processes,
+                    shared_memory_threshold=item.shared_memory_threshold,
+                    max_concurrency=item.max_concurrency,
                 ))
             elif isinstance(item, Background):
                 normalized_step = normalize_step(item.step)
@@ -550,8 +608,23 @@ class Pipeline(APIClient):
                 raise ValueError("Invalid step type in tasks list")
 
         self.tasks_list = new_list
+        self._replace_plan(ExecutionPlan(new_list, Pipeline))
         return self
 
+    def _replace_plan(self, plan: ExecutionPlan) -> None:
+        """Install a new compiled plan, dropping the process pools of the old one."""
+        old, self._plan = self._plan, plan
+        if old is not None and self._pools is not None:
+            self._pools.discard_plan(old)
+
+    def _get_plan(self) -> ExecutionPlan:
+        """Return the compiled plan, recompiling it if ``tasks_list`` was replaced."""
+        plan = self._plan
+        if plan is None or not plan.is_current(self.tasks_list):
+            plan = ExecutionPlan(self.tasks_list, Pipeline)
+            self._replace_plan(plan)
+        return plan
+
     def add_state(
         self,
         name: str,
@@ -563,6 +636,11 @@ class Pipeline(APIClient):
         retry_count: Optional[int] = None,
         retry_delay: Optional[float] = None,
         retry_on_exceptions: Optional[Tuple[type, ...]] = None,
+        isolation: Optional[str] = None,
+        cache: Optional[bool] = None,
+        cache_keys: Optional[List[str]] = None,
+        reads: Optional[List[str]] = None,
+        writes: Optional[List[str]] = None,
         **kwargs: Any,
     ) -> "Pipeline":
         """Add a single step to the pipeline."""
@@ -577,6 +655,11 @@ class Pipeline(APIClient):
             "retry_count": retry_count,
             "retry_delay": retry_delay,
             "retry_on_exceptions": retry_on_exceptions,
+            "isolation": isolation,
+            "cache": cache,
+            "cache_keys": cache_keys,
+            "reads": reads,
+            "writes": writes,
         }
 
         decorator_meta = getattr(step_func, "_wpipe_metadata", None)
@@ -666,44 +749,49 @@ class Pipeline(APIClient):
 
     def _task_invoke(self, func: Callable, name: str, *args: Any, **kwargs: Any) -> Any:
         """Invoke a task with retry logic and timeout."""
+        policy = kwargs.pop("__policy__", None)
         step_meta = kwargs.pop("__step_meta__", {})
-        decorator_meta = getattr(func, "_wpipe_metadata", None)
-
-        max_retries = self.max_retries
-        retry_delay = self.retry_delay
-        retry_on_exceptions = self.retry_on_exceptions
-        timeout = None
+        if policy is None:
+            policy = resolve_policy(func, step_meta)
 
         # Apply settings: Step Meta > Decorator > Pipeline Default
-        if decorator_meta:
-            max_retries = getattr(decorator_meta, "retry_count", max_retries) or max_retries
-            retry_delay = getattr(decorator_meta, "retry_delay", retry_delay) or retry_delay
-            retry_on_exceptions = getattr(decorator_meta, "retry_on_exceptions", retry_on_exceptions) or retry_on_exceptions
-            timeout = getattr(decorator_meta, "timeout", None)
-
-        if step_meta:
-            max_retries = getattr(step_meta, "retry_count", None) or max_retries
-            retry_delay = getattr(step_meta, "retry_delay", None) or retry_delay
-            retry_on_exceptions = getattr(step_meta, "retry_on_exceptions", None) or retry_on_exceptions
-            timeout = getattr(step_meta, "timeout", timeout)
+        max_retries = policy.max_retries or self.max_retries
+        retry_delay = policy.retry_delay or self.retry_delay
+        retry_on_exceptions = policy.retry_on_exceptions or self.retry_on_exceptions
+        timeout = policy.timeout
 
         kwargs.pop("parent_step_id", None)
         kwargs.pop("parallel_group", None)
 
+        in_process = bool(timeout) and policy.isolation == ISOLATION_PROCESS
+        if in_process and isinstance(func, Pipeline):
+            raise ValueError(f"Step '{name}' is a pipeline and cannot run with process isolation")
+
+        def _call(*call_args: Any, **call_kwargs: Any) -> Any:
+            if in_process:
+                # The child process is terminated at the deadline; unless it is
+                # forked it gets a pickled copy of the context
+                if call_args and isinstance(call_args[0], dict):
+                    child_data = {k: v for k, v in call_args[0].items() if k != "progress_rich" and not callable(v)}
+                    call_args = (child_data, *call_args[1:])
+                return run_with_timeout(func, timeout, *call_args, isolation=ISOLATION_PROCESS, **call_kwargs)
+            if isinstance(func, Pipeline):
+                return func.run(*call_args, **call_kwargs)
+            return func(*call_args, **call_kwargs)
+
+        def _run():
+            if self.send_to_api:
+                return self._task_invoke_with_report(_call, *args, **kwargs)
+            return _call(*args, **kwargs)
+
         last_exception = None
         for attempt in range(max_retries + 1):
             try:
-                def _run():
-                    if self.send_to_api:
-                        return self._task_invoke_with_report(func, *args, **kwargs)
-                    if isinstance(func, Pipeline):
-                        return func.run(*args, **kwargs)
-                    return func(*args, **kwargs)
-
-                if timeout:
-                    with ThreadPoolExecutor(max_workers=1) as executor:
-                        future = executor.submit(_run)
-                        result = future.result(timeout=timeout)
+                if in_process:
+                    result = _run()
+                elif timeout:
+                    # The shared watchdog frees this thread at the deadline
+                    result = run_with_timeout(_run, timeout)
                 else:
                     result = _run()
 
@@ -748,61 +836,59 @@ class Pipeline(APIClient):
 
         raise last_exception if last_exception else TaskError("Unknown error", Codes.TASK_FAILED)
 
-    @staticmethod
-    def _run_parallel_step(pipeline_instance: "Pipeline", step_item: Any, step_data: Dict[str, Any], pipe_kwargs: Dict[str, Any]) -> Dict[str, Any]:
-        """Helper static method to run a step in parallel."""
-        try:
-            return pipeline_instance._execute_step(step_item, step_data, **pipe_kwargs)
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            return {"error": f"Parallel execution error: {str(e)}"}
-
-    def _execute_step(self, item: Any, data: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
-        """Execute a single step."""
-        # Clean kwargs to prevent collision with named arguments
-        kwargs = {k: v for k, v in kwargs.items() if k not in ("parent_step_id", "parallel_group")}
-        parent_step_id = kwargs.get("parent_step_id")
-        parallel_group = kwargs.get("parallel_group")
+    def _execute_step(
+        self,
+        item: Any,
+        data: Dict[str, Any],
+        parent_step_id: Optional[int] = None,
+        parallel_group: Optional[str] = None,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        """Execute a single step (a compiled descriptor or a raw tasks list entry)."""
+        step = item if item.__class__ is CompiledStep else compile_step(item, Pipeline)
+        if step is None:
+            return data
+        kind = step.kind
 
-        if isinstance(item, Condition):
+        if kind == STEP_CONDITION:
             if self.verbose:
-                print(f"[CONDITION] Evaluating: {item.expression}")
-            data, _ = self._run_branch([item], data, **kwargs)
+                print(f"[CONDITION] Evaluating: {step.block.expression}")
+            data, _ = self._run_branch((step,), data, **kwargs)
             return data
 
-        if isinstance(item, For):
-            loop_data = data.copy()
+        if kind == STEP_FOR:
+            # The loop is tracked as a block step that parents every iteration's steps
+            tracked_id = self._start_step_tracking(
+                "For Loop", "v1.0", "for", None, parent_step_id=parent_step_id, parallel_group=parallel_group
+            )
+            loop_group = f"loop_{tracked_id or 'none'}"
+            loop_data = LayeredContext(data)
             loop_data.pop("progress_rich", None)
             iteration = 0
-            while item.should_continue(loop_data, iteration):
+            while step.block.should_continue(loop_data, iteration):
                 loop_data["_loop_iteration"] = iteration
-                for step_in_loop in item.steps:
-                    loop_data = self._execute_step(step_in_loop, loop_data, **kwargs)
+                for step_in_loop in step.children:
+                    loop_data = self._execute_step(step_in_loop, loop_data, tracked_id, loop_group, **kwargs)
                     if "error" in loop_data:
                         print(f"  [ERROR] Loop broken at iteration {iteration} due to: {loop_data['error']}")
                         break
                 if "error" in loop_data:
                     break
                 iteration += 1
-            data.update(loop_data)
-            return data
-
-        if isinstance(item, Parallel):
-            return self._execute_parallel(item, data, parent_step_id, parallel_group, **kwargs)
+            self._end_step_tracking(tracked_id, {"iterations": iteration}, loop_data.get("error"))
+            return apply_changes(data, *loop_data.changes(data))
 
-        is_background = False
-        capture_error = False
-        if isinstance(item, tuple) and len(item) >= 4 and isinstance(item[3], dict):
-            is_background = item[3].get("_is_background", False)
-            capture_error = item[3].get("_background_capture_error", False)
+        if kind == STEP_PARALLEL:
+            return self._execute_parallel(step, data, parent_step_id, parallel_group, **kwargs)
 
-        if is_background:
-            return self._execute_background_step(item, data, capture_error, parent_step_id, parallel_group, **kwargs)
+        if kind == STEP_BACKGROUND:
+            return self._execute_background_step(step, data, parent_step_id, parallel_group, **kwargs)
 
-        return self._execute_task_step(item, data, parent_step_id, parallel_group, **kwargs)
+        return self._execute_task_step(step, data, parent_step_id, parallel_group, **kwargs)
 
     def _execute_parallel(
         self,
-        item: Parallel,
+        step: CompiledStep,
         data: Dict[str, Any],
         parent_step_id: Optional[int],
         parallel_group: Optional[str],
@@ -810,110 +896,147 @@ class Pipeline(APIClient):
     ) -> Dict[str, Any]:
         """Execute steps in parallel."""
         # pylint: disable=too-many-locals
+        item: Parallel = step.block
         tracked_id = self._start_step_tracking(
             "Parallel Block", "v1.0", "parallel", data,
             parent_step_id=parent_step_id,
             parallel_group=parallel_group,
         )
-        loop_data = data.copy()
+        loop_data = LayeredContext(data)
         loop_data.pop("progress_rich", None)
-        max_workers = item.max_workers or max(1, len(item.steps))
+        max_workers = item.max_workers or max(1, len(step.children))
         is_multiprocess = item.use_processes
-        ExecutorClass = ProcessPoolExecutor if is_multiprocess else ThreadPoolExecutor
 
         if self.verbose:
             mode = "PROCESSES" if is_multiprocess else "THREADS"
-            print(f"[PARALLEL] Executing {len(item.steps)} steps using {mode} (workers={max_workers})")
+            print(f"[PARALLEL] Executing {len(step.children)} steps using {mode} (workers={max_workers})")
 
+        # Thread pools are leased for the whole block, so concurrent runs do not queue on one pool
+        leases = ExitStack()
+        segment = None
         try:
             current_group = f"group_{tracked_id or 'none'}"
-            clean_self = self
-            
-            # Check if data is picklable if using processes
+            refs: Dict[int, int] = {}
+
+            # Pack the context once for every branch (large buffers go to shared memory)
             if is_multiprocess:
                 import pickle
                 try:
-                    pickle.dumps(loop_data)
+                    payload, segment = pack(loop_data, item.shared_memory_threshold)
+                    executor, refs = self.worker_pools.process_pool(
+                        self._get_plan(), max_workers, self._process_worker_pipeline
+                    )
                 except (pickle.PicklingError, TypeError, AttributeError) as e:
                     if self.verbose:
-                        print(f"[WARNING] Data not picklable: {e}. Falling back to THREADS.")
+                        print(f"[WARNING] Data or pipeline not picklable: {e}. Falling back to THREADS.")
                     is_multiprocess = False
-                    ExecutorClass = ThreadPoolExecutor
 
-            if is_multiprocess:
-                import copy as cp  # pylint: disable=import-outside-toplevel
-                clean_self = cp.copy(self)
-                clean_self.tracker = None
-                clean_self._metrics_collector = None
-
-            with ExecutorClass(max_workers=max_workers) as executor:
-                initial_keys = set(loop_data.keys())
-                futures = {}
-                for step in item.steps:
+            if not is_multiprocess:
+                executor = leases.enter_context(self.worker_pools.lease_thread_pool(max_workers))
+
+            futures = {}
+            for child in step.children:
+                if is_multiprocess:
+                    fut = executor.submit(run_process_task, refs.get(id(child), child), payload, {
+                        **kwargs, "parent_step_id": tracked_id, "parallel_group": current_group,
+                    }, item.shared_memory_threshold)
+                else:
+                    fut = executor.submit(
+                        self._execute_step, child, LayeredContext(loop_data), tracked_id, current_group, **kwargs
+                    )
+                futures[fut] = child
+
+            errors = []
+            # Write-sets by branch, merged once every branch is done: the layers
+            # read through to ``data``, which must not change while they run
+            changes: Dict[int, Tuple[Dict[str, Any], Set[Any]]] = {}
+            order = {fut: i for i, fut in enumerate(futures)}
+            for future in as_completed(futures):
+                try:
+                    res = future.result()
                     if is_multiprocess:
-                        fut = executor.submit(self._run_parallel_step, clean_self, step, loop_data.copy(), {
-                            **kwargs, "parent_step_id": tracked_id, "parallel_group": current_group,
-                        })
-                    else:
-                        def _thread_worker(s, d):
-                            # Ensure we don't pass duplicate arguments to _execute_step
-                            worker_kwargs = {k: v for k, v in kwargs.items() if k not in ("parent_step_id", "parallel_group")}
-                            return self._execute_step(s, d, 
-                                                   parent_step_id=tracked_id, 
-                                                   parallel_group=current_group, 
-                                                   **worker_kwargs)
-                        fut = executor.submit(_thread_worker, step, loop_data.copy())
-                    futures[fut] = step
-
-                errors = []
-                for future in as_completed(futures):
-                    try:
-                        res = future.result()
-                        if res and "error" in res:
-                            errors.append(res["error"])
-                        elif isinstance(res, dict):
-                            delta = {k: v for k, v in res.items() if k not in initial_keys and k != "progress_rich"}
-                            data.update(delta or {k: v for k, v in res.items() if k != "progress_rich"})
-                    except Exception as e:  # pylint: disable=broad-exception-caught
-                        errors.append(str(e))
+                        res = unpack(res, copy=True)[0]
+                    # Merge only what each branch wrote (processes already return their write-set)
+                    written, deleted = res.changes(loop_data) if isinstance(res, LayeredContext) else (res, set())
+                    if written and "error" in written:
+                        errors.append(written["error"])
+                    elif isinstance(written, dict):
+                        changes[order[future]] = (written, deleted)
+                except BrokenExecutor as e:
+                    errors.append(str(e))
+                    self.worker_pools.discard(executor)
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    errors.append(str(e))
 
+            for i in sorted(changes):
+                apply_changes(data, *changes[i])
             if errors:
                 data["error"] = " | ".join(errors)
+        except BrokenExecutor as e:
+            self.worker_pools.discard(executor)
+            data["error"] = f"Executor failure: {str(e)}"
         except Exception as e:  # pylint: disable=broad-exception-caught
             data["error"] = f"Executor failure: {str(e)}"
         finally:
+            leases.close()
+            if segment is not None:
+                release_segment(segment, unlink=True)
             self._end_step_tracking(tracked_id, data if "error" not in data else None, data.get("error"))
         return data
 
+    def _process_worker_pipeline(self) -> "Pipeline":
+        """
+        Build the copy of the pipeline shipped once to process pool workers.
+
+        Returns:
+            Pipeline: A shallow copy without tracker, metrics, pools or progress handles.
+        """
+        clean_self = copy.copy(self)
+        clean_self.tracker = None
+        clean_self._metrics_collector = None
+        clean_self._pools = None
+        clean_self.progress_rich = None
+        clean_self.checkpoint_mgr = None
+        # Run state is left out so the shipped pipeline only changes with its setup
+        clean_self.pipeline_id = None
+        clean_self.checkpoint_id = None
+        clean_self._step_order = 0
+        clean_self._cache_counters = {}
+        clean_self._pending_events = []
+        return clean_self
+
+    @property
+    def worker_pools(self) -> WorkerPools:
+        """Warm thread/process pools used by Parallel blocks and run_many."""
+        if self._pools is None:
+            self._pools = WorkerPools()
+        return self._pools
+
+    def close(self) -> None:
+        """Shut down the worker pools owned by this pipeline."""
+        if self._pools is not None and self._owns_pools:
+            self._pools.shutdown()
+            self._pools = None
+
     def _execute_background_step(
         self,
-        item: Any,
+        step: CompiledStep,
         data: Dict[str, Any],
-        capture_error: bool,
         parent_step_id: Optional[int],
         parallel_group: Optional[str],
         **kwargs: Any
     ) -> Dict[str, Any]:
         """Execute a background step without blocking the pipeline."""
         import threading as bg_thread
-        
-        func, name, version, step_id, step_meta = None, "background", "v1.0", None, {}
-        if isinstance(item, tuple):
-            if len(item) >= 2:
-                func, name, version = item[0], item[1], item[2] if len(item) > 2 else "v1.0"
-                if len(item) >= 4 and isinstance(item[3], dict):
-                    step_meta = item[3]
-        elif callable(item):
-            func = item
-            name = getattr(item, "NAME", getattr(item, "__name__", "background"))
-
-        task_data = data.copy()
+
+        func, name, capture_error = step.func, step.name, step.capture_error
+        # Both sides get their own copy-on-write view; the forked base is no longer written
+        task_data, data = fork_context(data)
         task_data.pop("progress_rich", None)
 
         def run_background():
             try:
-                if func:
-                    self._task_invoke(func, name, task_data, parent_step_id=parent_step_id, parallel_group=parallel_group, **kwargs)
+                self._task_invoke(func, name, task_data, __policy__=step.policy, parent_step_id=parent_step_id, parallel_group=parallel_group, **kwargs)
             except Exception as e:  # pylint: disable=broad-exception-caught
                 if capture_error:
                     error_info = {"step_name": name, "error": str(e), "error_message": str(e)}
@@ -928,68 +1051,138 @@ class Pipeline(APIClient):
 
     def _execute_task_step(
         self,
-        item: Any,
+        step: CompiledStep,
         data: Dict[str, Any],
         parent_step_id: Optional[int],
         parallel_group: Optional[str],
         **kwargs: Any
     ) -> Dict[str, Any]:
         """Execute a single task step."""
-        func, name, version, step_id, step_meta = None, "unknown", "v1.0", None, {}
-        if isinstance(item, tuple):
-            if len(item) < 2:
-                return data
-            func, name, version = item[0], item[1], item[2] if len(item) > 2 else "v1.0"
-            if len(item) >= 4:
-                if isinstance(item[3], dict):
-                    step_meta = item[3]
-                else:
-                    step_id = item[3]
-        elif callable(item):
-            func = item
-            # Look for step name in priorities: NAME attribute > __name__ > class name
-            name = getattr(item, "NAME", getattr(item, "__name__", item.__class__.__name__))
-            if name == "task" or name == "function":
-                # Fallback to a more descriptive name if possible
-                name = item.__class__.__name__
-            
-            version = getattr(item, "VERSION", "v1.0")
-            step_meta = getattr(item, "_wpipe_metadata", {})
-
-        if func:
-            self.task_name = name
-            self.task_id = step_id
-            tracked_id = self._start_step_tracking(name, version, "task", data,
+        name = step.name
+        self.task_name = name
+        self.task_id = step.task_id
+        tracked_id = None
+        if self.pipeline_id and self.tracker:
+            tracked_id = self._start_step_tracking(name, step.version, "task", data,
                                                    parent_step_id=parent_step_id,
                                                    parallel_group=parallel_group)
-            data["progress_rich"] = data.get("progress_rich") or self.progress_rich
-            try:
-                result_data = self._task_invoke(func, name, data, __step_meta__=step_meta, **kwargs)
-                data.update(result_data or {})
-                data.pop("error", None)
-            except Exception as e:  # pylint: disable=broad-exception-caught
-                if not self.continue_on_error:
-                    raise
-                data["error"] = str(e)
-            finally:
+        data["progress_rich"] = data.get("progress_rich") or self.progress_rich
+        try:
+            result_data = self._invoke_cached(step, data, **kwargs)
+            if result_data:
+                data.update(result_data)
+            data.pop("error", None)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            if not self.continue_on_error:
+                raise
+            data["error"] = str(e)
+        finally:
+            if tracked_id:
                 hooks = self._end_step_tracking(tracked_id, data if "error" not in data else None, data.get("error"))
                 data = self._handle_alert_hooks(hooks, data)
         return data
 
-    def _run_branch(self, steps: List[Any], data: Dict[str, Any], **kwargs: Any) -> Tuple[Dict[str, Any], List[int]]:
-        """Execute a branch of steps."""
+    def _execute_dataflow(self, region: Dataflow, data: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        """
+        Run a region of declared steps as a dependency graph on the worker pool.
+
+        Each step sees the base context plus the writes of its ancestors, in
+        pipeline order, and writes to its own layer. Write-sets are merged
+        back in pipeline order once the region is done. If a step fails, the
+        steps before it still run and are merged, later ones are not started.
+        """
+        # pylint: disable=too-many-locals
+        size = len(region.steps)
+        results: Dict[int, Tuple[Dict[str, Any], Any]] = {}
+        failures: Dict[int, BaseException] = {}
+        waiting = [len(deps) for deps in region.deps]
+        dependents: List[List[int]] = [[] for _ in range(size)]
+        for j, deps in enumerate(region.deps):
+            for i in deps:
+                dependents[i].append(j)
+        group = f"dataflow_{region.start}"
+
+        def run(j: int) -> Tuple[Dict[str, Any], Any]:
+            view = LayeredContext(data)
+            for i in region.ancestors[j]:
+                apply_changes(view, *results[i])
+            own = LayeredContext(view)
+            own = self._execute_task_step(region.steps[j], own, None, group, **kwargs)
+            return own.changes(view)
+
+        workers = min(size, (os.cpu_count() or 1) + 4)
+        with self.worker_pools.lease_thread_pool(workers, kind="dataflow") as executor:
+            running = {executor.submit(run, j): j for j in range(size) if not waiting[j]}
+            try:
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        j = running.pop(future)
+                        try:
+                            results[j] = future.result()
+                        except Exception as e:  # pylint: disable=broad-exception-caught
+                            failures[j] = e
+                            continue
+                        first_failure = min(failures, default=size)
+                        for k in dependents[j]:
+                            waiting[k] -= 1
+                            if not waiting[k] and k < first_failure:
+                                running[executor.submit(run, k)] = k
+            finally:
+                wait(running)
+
+        stop = min(failures, default=size)
+        for j in range(stop):
+            written, deleted = results[j]
+            if "error" not in written:
+                data.pop("error", None)
+            apply_changes(data, written, deleted)
+        if failures:
+            self.task_name = region.steps[stop].name
+            raise failures[stop]
+        return data
+
+    def _invoke_cached(self, step: CompiledStep, data: Dict[str, Any], **kwargs: Any) -> Any:
+        """Invoke a task step, serving it from the step cache when it opts in."""
+        policy = step.policy
+        if not policy.cache or self.step_cache is None:
+            return self._task_invoke(step.func, step.name, data, __policy__=policy, **kwargs)
+
+        try:
+            key: Optional[str] = make_cache_key(step.name, step.version, data, policy.cache_keys)
+        except TypeError as e:
+            if self.verbose:
+                print(f"[CACHE] {step.name}: inputs not hashable, running uncached ({e})")
+            key = None
+        if key is not None:
+            found, value = self.step_cache.get(key)
+            if found:
+                count_cache_event(self._cache_counters, step.name, "hits")
+                return value
+
+        count_cache_event(self._cache_counters, step.name, "misses")
+        result = self._task_invoke(step.func, step.name, data, __policy__=policy, **kwargs)
+        if key is not None and (result is None or isinstance(result, dict)):
+            evicted = self.step_cache.put(key, result)
+            if evicted:
+                count_cache_event(self._cache_counters, step.name, "evictions", evicted)
+        return result
+
+    def _run_branch(self, steps: Tuple[CompiledStep, ...], data: Dict[str, Any], **kwargs: Any) -> Tuple[Dict[str, Any], List[int]]:
+        """Execute a branch of compiled steps."""
         executed_ids: List[int] = []
-        for item in steps:
-            if isinstance(item, Condition):
+        for step in steps:
+            if step.kind == STEP_CONDITION:
+                item: Condition = step.block
                 cond_name = getattr(item, "name", "condition")
                 cond_expr = item.expression
                 try:
                     res = item.evaluate(data)
-                    branch = item.branch_true if res else item.branch_false
+                    branch = step.children if res else step.alternative
                     taken = "true" if res else "false"
                     err = None
                 except Exception as e:  # pylint: disable=broad-exception-caught
-                    branch, taken, err = item.branch_false, "false", str(e)
+                    branch, taken, err = step.alternative, "false", str(e)
 
                 cond_id = self._start_step_tracking(cond_name, "1.0.0", "condition", {"expression": cond_expr})
                 data, b_ids = self._run_branch(branch, data, **kwargs)
@@ -999,7 +1192,7 @@ class Pipeline(APIClient):
                     hooks = self._end_step_tracking(cond_id, {"branch_taken": taken, "expression": cond_expr}, err)
                     data = self._handle_alert_hooks(hooks, data)
             else:
-                data = self._execute_step(item, data, **kwargs)
+                data = self._execute_step(step, data, **kwargs)
                 if "error" in data:
                     break
         return data, executed_ids
@@ -1082,6 +1275,9 @@ class Pipeline(APIClient):
                 and the step index to start from.
         """
         data = initial_data.copy()
+        if not self._session_id:
+            # Batch runners add to the counters they share with the batch
+            self._cache_counters = {}
         pipeline_start = datetime.now()
         data["_pipeline_start_time"] = pipeline_start.isoformat()
 
@@ -1094,7 +1290,11 @@ class Pipeline(APIClient):
                 print(f"[CHECKPOINT] Resuming '{checkpoint_id}' from step {start_at_step}")
 
         metrics_collector: Optional[SystemMetricsCollector] = None
-        if self.tracker:
+        if self._session_id:
+            # Batch run: steps are tracked under the shared run_many session
+            self.pipeline_id = self._session_id
+            self._step_order = start_at_step
+        elif self.tracker:
             reg = self.tracker.register_pipeline(
                 name=self.pipeline_name,
                 pipeline_steps=self.tasks_list,
@@ -1190,14 +1390,24 @@ class Pipeline(APIClient):
         error_msg: Optional[str] = None
         error_step: Optional[str] = None
 
+        plan = self._get_plan()
+        regions = plan.dataflow() if self.auto_parallel else {}
+        region_end = -1
         try:
             data = self._evaluate_checkpoints(data)
             for idx, progress in progress_bar_gen(size=total_steps):
-                if idx < start_at_step:
+                if idx < start_at_step or idx <= region_end:
                     continue
-                item = self.tasks_list[idx]
+                step = plan[idx]
+                item = step.source if step is not None else self.tasks_list[idx]
                 data["progress_rich"] = progress
-                data = self._execute_step(item, data, **step_kwargs)
+                region = regions.get(idx)
+                if region is not None:
+                    data = self._execute_dataflow(region, data, **step_kwargs)
+                    idx = region_end = region.start + len(region.steps) - 1
+                    item = region.steps[-1].source
+                elif step is not None:
+                    data = self._execute_step(step, data, **step_kwargs)
 
                 if "error" in data:
                     error_msg, error_step = data["error"], getattr(item, "NAME", str(item))
@@ -1243,6 +1453,7 @@ class Pipeline(APIClient):
         data = self._execute_post_run_tasks(data)
         if metrics_collector:
             metrics_collector.stop()
+        self._record_cache_stats()
         self._complete_tracking(data, error_msg, error_step)
         # Clear checkpoints only if pipeline completed successfully and a checkpoint manager was used.
         if not error_msg and self.tracker and hasattr(self, 'checkpoint_mgr') and self.checkpoint_mgr and hasattr(self, 'checkpoint_id') and self.checkpoint_id:
@@ -1267,7 +1478,7 @@ class Pipeline(APIClient):
         # pylint: disable=too-many-locals,too-many-branches,too-many-statements
 
         # Initialize context (data, tracker, metrics, start_at_step)
-        initial_data = args[0].copy() if args else {}
+        initial_data = args[0] if args else {}
         checkpoint_mgr = kwargs.pop("checkpoint_mgr", None)
         checkpoint_id = kwargs.pop("checkpoint_id", None)
         # Assign checkpoint_mgr and checkpoint_id to self for _finalize_pipeline_execution
@@ -1296,10 +1507,22 @@ class Pipeline(APIClient):
             self._finalize_pipeline_execution(data, metrics_collector, error_msg, error_step)
 
         data.pop("progress_rich", None) # Clean up progress_rich from data
-        return data
+        return data.flatten() if isinstance(data, LayeredContext) else data
+
+    def _record_cache_stats(self) -> None:
+        """Record the step cache counters of the run (or batch) with the tracker."""
+        # Batch runners share their counters with the batch, which records them once
+        if self._cache_counters and not self._session_id and self.tracker and self.pipeline_id:
+            try:
+                self.tracker.record_cache_stats(self.pipeline_id, self._cache_counters)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                if self.verbose:
+                    print(f"[WARNING] Cache stats recording failed: {e}")
 
     def _complete_tracking(self, data: Dict[str, Any], error_msg: Optional[str], error_step: Optional[str]) -> None:
         """Finalize tracking for the pipeline."""
+        if self._session_id:
+            return
         if self.tracker and self.pipeline_id:
             try:
                 output = data.copy() if not error_msg else {}
@@ -1325,8 +1548,11 @@ class Pipeline(APIClient):
         if "error" in (args[0] if args else {}):
             raise TaskError(f"[{self.task_name}] Initial data contains error", Codes.TASK_FAILED)
         result = self._pipeline_run_with_report(*args, **kwargs)
-        
-        # Release database locks after execution
+        self._release_db_locks()
+        return result
+
+    def _release_db_locks(self) -> None:
+        """Commit pending tracking writes on the shared database connection."""
         if self.tracking_db:
             try:
                 from wpipe import _db_connections, _db_lock
@@ -1335,4 +1561,399 @@ class Pipeline(APIClient):
                         _db_connections[self.tracking_db].commit()
             except Exception:
                 pass
-        return result
+
+    def run_many(
+        self,
+        inputs: Iterable[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        ordered: bool = False,
+        **kwargs: Any,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Execute the pipeline over many inputs, yielding results as they finish.
+
+        Registration, progress display, system metrics and the worker pool are
+        set up once for the whole batch instead of once per input: every run is
+        tracked under a single pipeline session and advances a single progress
+        bar. Inputs are consumed lazily, so at most ``max_concurrency`` runs are
+        in flight at a time.
+
+        Args:
+            inputs: Iterable of initial data dictionaries.
+            max_concurrency: Maximum number of concurrent runs (defaults to the CPU count).
+            ordered: Yield results in input order instead of completion order.
+            **kwargs: Additional keyword arguments passed to every step.
+
+        Yields:
+            Dict[str, Any]: The final data dictionary of each run.
+
+        Raises:
+            ProcessError: If a run fails and ``continue_on_error`` is False.
+        """
+        # pylint: disable=too-many-locals,too-many-branches
+        workers = max(1, max_concurrency or os.cpu_count() or 1)
+        window = workers * 2 if ordered else workers
+        total = len(inputs) if hasattr(inputs, "__len__") else None  # type: ignore[arg-type]
+        source = enumerate(inputs)
+
+        batch_start = datetime.now().isoformat()
+        self._cache_counters = {}
+        metrics_collector = self._start_batch_session(total)
+        advance, close_progress = self._setup_batch_progress(total)
+
+        pending: Dict[Any, int] = {}
+        buffered: Dict[int, Dict[str, Any]] = {}
+        next_index = 0
+        processed = failed = 0
+        error_msg: Optional[str] = None
+        pool = self.worker_pools.thread_pool(workers, kind="batch")
+        try:
+            while True:
+                while len(pending) + len(buffered) < window:
+                    entry = next(source, None)
+                    if entry is None:
+                        break
+                    pending[pool.submit(self._run_batch_item, entry[1], **kwargs)] = entry[0]
+                if not pending:
+                    break
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        error_msg = str(e)
+                        raise
+                    processed += 1
+                    failed += 1 if "error" in result else 0
+                    advance()
+                    if ordered:
+                        buffered[index] = result
+                    else:
+                        yield result
+
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+        finally:
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            close_progress()
+            if metrics_collector:
+                metrics_collector.stop()
+            if failed and not error_msg:
+                error_msg = f"{failed} of {processed} runs failed"
+            self._record_cache_stats()
+            self._complete_tracking(
+                {"_pipeline_start_time": batch_start, "processed": processed, "failed": failed},
+                error_msg, None,
+            )
+            self._release_db_locks()
+
+    def _start_batch_session(self, total: Optional[int]) -> Optional[SystemMetricsCollector]:
+        """
+        Register the single tracking session shared by a run_many batch.
+
+        Args:
+            total: Number of inputs in the batch, if known.
+
+        Returns:
+            Optional[SystemMetricsCollector]: The running metrics collector, if enabled.
+        """
+        self.pipeline_id = None
+        if not self.tracker:
+            return None
+        reg = self.tracker.register_pipeline(
+            name=self.pipeline_name,
+            pipeline_steps=self.tasks_list,
+            input_data={"batch_size": total} if total is not None else None,
+            worker_id=self.worker_id,
+            worker_name=self.worker_name,
+            parent_pipeline_id=self.parent_pipeline_id,
+        )
+        self.pipeline_id = reg["pipeline_id"]
+        if self.verbose:
+            print(f"[PIPELINE STATUS] Registered batch: {self.pipeline_id}")
+        for event in self._pending_events:
+            self.tracker.add_event(pipeline_id=self.pipeline_id, **event)
+        self._pending_events = []
+        if not self._collect_system_metrics:
+            return None
+        metrics_collector = SystemMetricsCollector(self.tracker, self.pipeline_id)
+        metrics_collector.start()
+        return metrics_collector
+
+    def _setup_batch_progress(self, total: Optional[int]) -> Tuple[Callable[[], None], Callable[[], None]]:
+        """
+        Set up one progress display for a run_many batch.
+
+        Args:
+            total: Number of inputs in the batch, if known.
+
+        Returns:
+            Tuple[Callable[[], None], Callable[[], None]]: Functions to advance and close the display.
+        """
+        if not self.show_progress:
+            return lambda: None, lambda: None
+        try:
+            from rich.errors import LiveError
+        except ImportError:
+            class LiveError(Exception): pass
+
+        try:
+            manager = ProgressManager()
+            progress = manager.__enter__()
+            task = progress.add_task(f"[cyan]{self.pipeline_name} (batch)", total=total)
+            return (
+                lambda: progress.update(task, advance=1),
+                lambda: manager.__exit__(None, None, None),
+            )
+        except (LiveError, ImportError):
+            # Fallback to tqdm if rich is not available or fails
+            from tqdm import tqdm
+            bar = tqdm(total=total, desc=self.pipeline_name)
+            return lambda: bar.update(1), bar.close
+
+    def _run_batch_item(self, data: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+        """
+        Run one input of a run_many batch on a lightweight copy of the pipeline.
+
+        Args:
+            data: The initial data dictionary for this run.
+            **kwargs: Additional keyword arguments passed to every step.
+
+        Returns:
+            Dict[str, Any]: The final data dictionary.
+        """
+        if "error" in data:
+            raise TaskError(f"[{self.task_name}] Initial data contains error", Codes.TASK_FAILED)
+        return self._make_batch_runner()._pipeline_run_with_report(data, **kwargs)
+
+    def _make_batch_runner(self) -> "Pipeline":
+        """
+        Create a lightweight copy of the pipeline that tracks under the current session.
+
+        Returns:
+            Pipeline: A shallow copy with its own per-run state.
+        """
+        runner = copy.copy(self)
+        runner._session_id = self.pipeline_id
+        runner._step_order = 0
+        runner._pending_events = []
+        runner._collect_system_metrics = False
+        runner.show_progress = False
+        runner.progress_rich = None
+        return runner
+
+    def stream(
+        self,
+        inputs: Iterable[Dict[str, Any]],
+        buffer: int = 8,
+        workers: Union[int, Sequence[int]] = 1,
+        **kwargs: Any,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Execute the pipeline as an assembly line over a stream of inputs.
+
+        Every step of the pipeline becomes a stage with its own worker threads,
+        and consecutive stages are connected by bounded queues holding at most
+        ``buffer`` items. A slow stage blocks its producers once its queue is
+        full (backpressure) while the other stages keep working on other
+        inputs. Results are yielded lazily as they leave the last stage; with
+        one worker per stage they keep the input order.
+
+        Tracking, progress and system metrics are shared by the whole stream
+        as in run_many. Checkpoints and API process reporting are not used in
+        streaming mode.
+
+        Args:
+            inputs: Iterable of initial data dictionaries.
+            buffer: Capacity of each queue between stages.
+            workers: Worker threads per stage, either one number for every
+                stage or one number per step.
+            **kwargs: Additional keyword arguments passed to every step.
+
+        Yields:
+            Dict[str, Any]: The final data dictionary of each input.
+
+        Raises:
+            ValueError: If ``workers`` does not match the number of steps.
+            TaskError: If an input contains an error or a step fails and
+                ``continue_on_error`` is False.
+        """
+        # pylint: disable=too-many-locals
+        # (plan index, step) of each stage; the index is the stage's tracked step order
+        stages = [(index, step) for index, step in enumerate(self._get_plan()) if step is not None]
+        counts = [workers] * len(stages) if isinstance(workers, int) else list(workers)
+        if len(counts) != len(stages):
+            raise ValueError(f"Expected {len(stages)} worker counts, got {len(counts)}")
+        counts = [max(1, count) for count in counts]
+        total = len(inputs) if hasattr(inputs, "__len__") else None  # type: ignore[arg-type]
+
+        queues: List["queue.Queue[Any]"] = [queue.Queue(maxsize=max(1, buffer)) for _ in range(len(stages) + 1)]
+        stop = threading.Event()
+        errors: List[BaseException] = []
+
+        stream_start = datetime.now().isoformat()
+        self._cache_counters = {}
+        metrics_collector = self._start_batch_session(total)
+        advance, close_progress = self._setup_batch_progress(total)
+
+        def feed() -> None:
+            try:
+                for initial in inputs:
+                    if "error" in initial:
+                        raise TaskError(f"[{self.task_name}] Initial data contains error", Codes.TASK_FAILED)
+                    data = initial.copy()
+                    data["_pipeline_start_time"] = datetime.now().isoformat()
+                    if not self._stream_put(queues[0], data, stop):
+                        return
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                errors.append(e)
+                stop.set()
+                return
+            for _ in range(counts[0] if stages else 1):
+                self._stream_put(queues[0], _STREAM_END, stop)
+
+        threads = [threading.Thread(target=feed, daemon=True, name="wpipe_stream_feed")]
+        for idx, (step_order, step) in enumerate(stages):
+            remaining = [counts[idx]]
+            lock = threading.Lock()
+            next_count = counts[idx + 1] if idx + 1 < len(stages) else 1
+            for worker in range(counts[idx]):
+                threads.append(threading.Thread(
+                    target=self._stream_stage,
+                    args=(step, step_order, queues[idx], queues[idx + 1], stop, errors, remaining, lock, next_count),
+                    kwargs=kwargs, daemon=True, name=f"wpipe_stream_{step.name}_{worker}",
+                ))
+        for thread in threads:
+            thread.start()
+
+        processed = failed = 0
+        error_msg: Optional[str] = None
+        try:
+            while True:
+                data = self._stream_get(queues[-1], stop)
+                if data is _STREAM_END or errors:
+                    break
+                data = self._execute_post_run_tasks(data)
+                data.pop("progress_rich", None)
+                if isinstance(data, LayeredContext):
+                    data = data.flatten()
+                processed += 1
+                failed += 1 if "error" in data else 0
+                advance()
+                yield data
+            if errors:
+                error_msg = str(errors[0])
+                raise errors[0]
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            close_progress()
+            if metrics_collector:
+                metrics_collector.stop()
+            if failed and not error_msg:
+                error_msg = f"{failed} of {processed} runs failed"
+            self._record_cache_stats()
+            self._complete_tracking(
+                {"_pipeline_start_time": stream_start, "processed": processed, "failed": failed},
+                error_msg, None,
+            )
+            self._release_db_locks()
+
+    def _stream_stage(
+        self,
+        step: CompiledStep,
+        step_order: int,
+        inbox: "queue.Queue[Any]",
+        outbox: "queue.Queue[Any]",
+        stop: threading.Event,
+        errors: List[BaseException],
+        remaining: List[int],
+        lock: threading.Lock,
+        next_count: int,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Worker loop of one streaming stage.
+
+        Args:
+            step: The compiled step run by this stage.
+            step_order: Index of the step in the plan. Every input tracks the
+                step in the same position as run() would.
+            inbox: Queue the stage reads inputs from.
+            outbox: Queue the stage writes results to.
+            stop: Event set when the stream must shut down.
+            errors: Shared list collecting the first failures.
+            remaining: Number of workers of this stage still running.
+            lock: Lock protecting ``remaining``.
+            next_count: Number of workers of the next stage.
+            **kwargs: Additional keyword arguments passed to the step.
+        """
+        runner = self._make_batch_runner()
+        while True:
+            data = self._stream_get(inbox, stop)
+            if data is _STREAM_END:
+                break
+            try:
+                # Like run(): a failed input skips the remaining steps unless continue_on_error
+                if "error" not in data or self.continue_on_error:
+                    runner._step_order = step_order
+                    data = runner._execute_step(step, data, **kwargs)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                errors.append(e)
+                stop.set()
+                return
+            if not self._stream_put(outbox, data, stop):
+                return
+
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(next_count):
+                self._stream_put(outbox, _STREAM_END, stop)
+
+    @staticmethod
+    def _stream_put(target: "queue.Queue[Any]", item: Any, stop: threading.Event) -> bool:
+        """
+        Put an item on a bounded stage queue, blocking until there is room.
+
+        Args:
+            target: The queue to write to.
+            item: The item to enqueue.
+            stop: Event that aborts the wait when set.
+
+        Returns:
+            bool: True if the item was enqueued, False if the stream stopped.
+        """
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _stream_get(source: "queue.Queue[Any]", stop: threading.Event) -> Any:
+        """
+        Get the next item from a stage queue.
+
+        Args:
+            source: The queue to read from.
+            stop: Event that aborts the wait when set.
+
+        Returns:
+            Any: The next item, or the end-of-stream marker if the stream stopped.
+        """
+        while True:
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                if stop.is_set():
+                    return _STREAM_END
@@ -7,34 +7,49 @@ retry logic, API tracking, and execution history tracking.
 """
 
 import asyncio
+import copy
+import os
+import pickle
+import uuid
+import weakref
+from concurrent.futures import Future
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from functools import partial
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
 
 from rich.progress import Progress
 
 from wpipe.api_client.api_client import APIClient
+from wpipe.cache.cache import StepCache, count_cache_event, make_cache_key
 from wpipe.exception import Codes, TaskError
-from wpipe.tracking import PipelineTracker
+from wpipe.timeout.timeout import ISOLATION_PROCESS, ISOLATION_THREAD, run_with_timeout
+from wpipe.tracking import PipelineTracker, TrackingWriter
 
 from .pipe import Background, Condition, Parallel, SystemMetricsCollector
+from .components.context import LayeredContext, apply_changes, fork_context
 from .components.logic_blocks import For
-
-
-def _is_async_callable(func: Any) -> bool:
-    """
-    Check if a callable is async (handles both functions and callable objects).
-
-    Args:
-        func: The object to check.
-
-    Returns:
-        bool: True if it's an async callable, False otherwise.
-    """
-    if asyncio.iscoroutinefunction(func):
-        return True
-    if hasattr(func, "__call__") and asyncio.iscoroutinefunction(func.__call__):
-        return True
-    return False
+from .components.pools import WorkerPools
+from .components.plan import (
+    STEP_BACKGROUND,
+    STEP_CONDITION,
+    STEP_FOR,
+    STEP_PARALLEL,
+    CompiledStep,
+    ExecutionPlan,
+    compile_step,
+    resolve_policy,
+)
+from .components.plan import is_async_callable as _is_async_callable
+
+
+async def _aiter(inputs: Union[AsyncIterable[Any], Iterable[Any]]) -> AsyncIterator[Any]:
+    """Iterate over an async or regular iterable."""
+    if hasattr(inputs, "__aiter__"):
+        async for item in inputs:  # type: ignore[union-attr]
+            yield item
+    else:
+        for item in inputs:  # type: ignore[union-attr]
+            yield item
 
 
 class PipelineAsync(APIClient):
@@ -48,6 +63,10 @@ class PipelineAsync(APIClient):
         tasks_list (List[Any]): List of steps/tasks to execute.
         pipeline_name (str): Name of the pipeline.
         tracker (Optional[PipelineTracker]): Tracker for execution history.
+            Writes go through a background TrackingWriter, so steps never
+            wait on the database.
+        loop_lag (Dict[str, float]): Event loop lag observed during the last
+            run ({"samples", "mean_ms", "max_ms"}).
     """
 
     # pylint: disable=too-many-instance-attributes
@@ -67,6 +86,13 @@ class PipelineAsync(APIClient):
         collect_system_metrics: bool = False,
         continue_on_error: bool = False,
         show_progress: bool = True,
+        step_cache: Optional[StepCache] = None,
+        worker_pools: Optional[WorkerPools] = None,
+        sync_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        loop_lag_interval: Optional[float] = 0.1,
+        max_concurrency: Optional[int] = None,
+        buffered_tracking: bool = False,
     ) -> None:
         """
         Initialize the Async Pipeline.
@@ -86,6 +112,23 @@ class PipelineAsync(APIClient):
             collect_system_metrics: Whether to collect resource usage.
             continue_on_error: Whether to proceed if a step fails.
             show_progress: Whether to show a progress bar.
+            step_cache: Result cache for steps declared with ``cache=True``
+                (by default an in-memory LRU, persisted next to ``tracking_db``
+                when tracking is enabled).
+            worker_pools: Warm worker pools to share with other pipelines
+                (by default the pipeline creates and owns its own).
+            sync_workers: Maximum number of synchronous steps running at once
+                on worker threads (default: min(32, CPU count + 4)). 0 runs
+                them on the event loop thread.
+            process_workers: Maximum number of ``cpu_bound`` steps running at
+                once in worker processes (default: CPU count).
+            loop_lag_interval: Sampling interval in seconds of the event loop
+                lag monitor, None to disable it.
+            max_concurrency: Maximum number of steps running at once across
+                every Parallel branch and ``arun_many`` run of this pipeline
+                (None: no limit).
+            buffered_tracking: Keep step tracking records in memory and write
+                them in batches (flushed when the run completes).
         """
         # pylint: disable=too-many-arguments
         if api_config:
@@ -111,15 +154,35 @@ class PipelineAsync(APIClient):
         self.continue_on_error: bool = continue_on_error
         self.show_progress: bool = show_progress
         self.tracking_db: Optional[str] = tracking_db
+        self.step_cache: Optional[StepCache] = step_cache or StepCache(
+            os.path.join(os.path.dirname(os.path.abspath(tracking_db)), "step_cache.db") if tracking_db else None
+        )
+        self._cache_counters: Dict[str, Dict[str, int]] = {}
+        self._pools = worker_pools
+        self._owns_pools = worker_pools is None
+        cpu_count = os.cpu_count() or 1
+        self.sync_workers: int = min(32, cpu_count + 4) if sync_workers is None else sync_workers
+        self.process_workers: int = process_workers or cpu_count
+        self.loop_lag_interval: Optional[float] = loop_lag_interval
+        self.loop_lag: Dict[str, float] = {}
+        self.max_concurrency: Optional[int] = max_concurrency
+        # One semaphore per event loop, shared with arun_many runners
+        self._gates: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._session_id: Optional[str] = None
 
         # Initialize tracking if database path provided
         self.tracker: Optional[PipelineTracker] = None
+        self._tracking: Optional[TrackingWriter] = None
         if tracking_db:
-            self.tracker = PipelineTracker(tracking_db, config_dir)
+            self.tracker = PipelineTracker(tracking_db, config_dir, buffered=buffered_tracking)
+            self._tracking = TrackingWriter(self.tracker)
 
         self.pipeline_name: str = pipeline_name or "Pipeline"
         self.pipeline_id: Optional[str] = None
         self.tasks_list: List[Any] = []
+        self._plan: Optional[ExecutionPlan] = None
         self._step_order: int = 0
 
         # Internal queues
@@ -158,8 +221,8 @@ class PipelineAsync(APIClient):
             "data": data,
             "tags": tags,
         }
-        if self.tracker and self.pipeline_id:
-            self.tracker.add_event(pipeline_id=self.pipeline_id, **event_info)
+        if self._tracking and self.pipeline_id:
+            self._tracking.submit("add_event", pipeline_id=self.pipeline_id, **event_info)
         else:
             self._pending_events.append(event_info)
 
@@ -274,31 +337,47 @@ class PipelineAsync(APIClient):
         Raises:
             TaskError: If the task fails after all retries.
         """
-        # Retry priority: Decorator > Pipeline
-        decorator_meta = getattr(func, "_wpipe_metadata", None)
-        max_retries = self.max_retries
-        retry_delay = self.retry_delay
-        retry_on_exceptions = self.retry_on_exceptions
-
-        if decorator_meta:
-            if getattr(decorator_meta, "retry_count", None) is not None:
-                max_retries = decorator_meta.retry_count
-            if getattr(decorator_meta, "retry_delay", None) is not None:
-                retry_delay = decorator_meta.retry_delay
+        # Retry priority: Step Meta > Decorator > Pipeline
+        policy = kwargs.pop("__policy__", None)
+        if policy is None:
+            policy = resolve_policy(func)
+        max_retries = policy.max_retries or self.max_retries
+        retry_delay = policy.retry_delay or self.retry_delay
+        retry_on_exceptions = policy.retry_on_exceptions or self.retry_on_exceptions
+        timeout = policy.timeout
 
         # Clean internal tracking arguments
         kwargs.pop("parent_step_id", None)
         kwargs.pop("parallel_group", None)
 
+        is_pipeline = isinstance(func, PipelineAsync)
+        is_async = not is_pipeline and _is_async_callable(func)
+
         last_exception = None
         for attempt in range(max_retries + 1):
             try:
-                if isinstance(func, PipelineAsync):
+                if is_pipeline:
                     result = await func.run(*args, **kwargs)
-                elif _is_async_callable(func):
-                    result = await func(*args, **kwargs)
+                elif is_async:
+                    if timeout:
+                        result = await asyncio.wait_for(func(*args, **kwargs), timeout=timeout)
+                    else:
+                        result = await func(*args, **kwargs)
+                elif timeout:
+                    call_args = args
+                    if policy.isolation == ISOLATION_PROCESS and args and isinstance(args[0], dict):
+                        # The child process gets a pickled copy of the context
+                        child_data = {k: v for k, v in args[0].items() if k != "progress_rich" and not callable(v)}
+                        call_args = (child_data, *args[1:])
+                    # Wait for the deadline off the event loop
+                    result = await self._run_sync(partial(
+                        run_with_timeout, func, timeout, *call_args,
+                        isolation=policy.isolation or ISOLATION_THREAD, **kwargs,
+                    ))
+                elif policy.cpu_bound:
+                    result = await self._run_cpu_bound(func, name, *args, **kwargs)
                 else:
-                    result = func(*args, **kwargs)
+                    result = await self._run_sync(partial(func, *args, **kwargs))
 
                 # Success cleanup
                 if args and isinstance(args[0], dict):
@@ -334,17 +413,107 @@ class PipelineAsync(APIClient):
 
         raise last_exception if last_exception else RuntimeError("Task failed")
 
+    @property
+    def worker_pools(self) -> WorkerPools:
+        """Warm thread/process pools used to run synchronous steps."""
+        if self._pools is None:
+            self._pools = WorkerPools()
+        return self._pools
+
+    def close(self) -> None:
+        """Stop the tracking writer and shut down the worker pools owned by this pipeline."""
+        if self._tracking is not None:
+            self._tracking.close()
+        if self._pools is not None and self._owns_pools:
+            self._pools.shutdown()
+            self._pools = None
+
+    def _step_gate(self) -> Optional[asyncio.Semaphore]:
+        """Get the pipeline-wide step semaphore of the running event loop."""
+        if not self.max_concurrency:
+            return None
+        loop = asyncio.get_running_loop()
+        gate = self._gates.get(loop)
+        if gate is None:
+            gate = self._gates[loop] = asyncio.Semaphore(self.max_concurrency)
+        return gate
+
+    async def _run_sync(self, call: Any) -> Any:
+        """Run a synchronous call on the bounded thread pool, off the event loop."""
+        if self.sync_workers <= 0:
+            return call()
+        executor = self.worker_pools.thread_pool(self.sync_workers, kind="async_sync")
+        return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+    async def _run_cpu_bound(self, func: Any, name: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a CPU-bound synchronous step in the process pool.
+
+        The step receives a plain copy of the context, so in-place changes
+        are not seen by the pipeline; only the returned dict is. Steps that
+        cannot be pickled run on the thread pool instead.
+        """
+        try:
+            pickle.dumps(func)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            if self.verbose:
+                print(f"[WARNING] Step {name} not picklable: {e}. Falling back to THREADS.")
+            return await self._run_sync(partial(func, *args, **kwargs))
+        args = tuple(a.flatten() if isinstance(a, LayeredContext) else a for a in args)
+        executor = self.worker_pools.task_process_pool(self.process_workers)
+        return await asyncio.get_running_loop().run_in_executor(executor, partial(func, *args, **kwargs))
+
+    async def _monitor_loop_lag(self, samples: List[float]) -> None:
+        """Sample how late the event loop wakes up from a sleep, until cancelled."""
+        loop = asyncio.get_running_loop()
+        interval = self.loop_lag_interval or 0.0
+        while True:
+            started = loop.time()
+            try:
+                await asyncio.sleep(interval)
+            finally:
+                # A cancelled sample still counts if the loop was already late
+                lag = loop.time() - started - interval
+                if lag > 0 or not samples:
+                    samples.append(max(lag, 0.0))
+
+    def _record_loop_lag(self, samples: List[float]) -> None:
+        """Summarize the loop lag samples of a run and record them."""
+        if not samples:
+            self.loop_lag = {}
+            return
+        self.loop_lag = {
+            "samples": len(samples),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+            "max_ms": round(max(samples) * 1000, 3),
+        }
+        if self._tracking and self.pipeline_id:
+            self._tracking.submit(
+                "add_event",
+                pipeline_id=self.pipeline_id,
+                event_type="metric",
+                event_name="loop_lag",
+                message=f"Event loop lag: max {self.loop_lag['max_ms']} ms",
+                data=self.loop_lag,
+            )
+
     def _start_step_tracking(
         self,
         name: str,
         version: Optional[str] = None,
         step_type: str = "task",
         input_data: Optional[Dict[str, Any]] = None,
-        parent_step_id: Optional[int] = None,
+        parent_step_id: Optional[Future] = None,
         parallel_group: Optional[str] = None,
-    ) -> Optional[int]:
-        """Start tracking a pipeline step."""
-        if not self.tracker or not self.pipeline_id:
+    ) -> Optional[Future]:
+        """
+        Start tracking a pipeline step.
+
+        The write is queued on the tracking writer. The returned future
+        resolves to the step id and can be passed on (e.g. as a parent id)
+        before the write has happened.
+        """
+        if not self._tracking or not self.pipeline_id:
             return None
         self._step_order += 1
         filtered_input = {
@@ -352,7 +521,8 @@ class PipelineAsync(APIClient):
             for k, v in (input_data or {}).items()
             if k not in ("progress_rich",) and not callable(v)
         }
-        return self.tracker.start_step(
+        return self._tracking.submit(
+            "start_step",
             pipeline_id=self.pipeline_id,
             step_order=self._step_order,
             step_name=name,
@@ -365,14 +535,14 @@ class PipelineAsync(APIClient):
 
     def _end_step_tracking(
         self,
-        step_id: Optional[int],
+        step_id: Optional[Future],
         output_data: Optional[Dict[str, Any]] = None,
         error_message: Optional[str] = None,
         error_traceback: Optional[str] = None,
-    ) -> List[Any]:
-        """End tracking a pipeline step."""
-        if not self.tracker or not step_id:
-            return []
+    ) -> None:
+        """End tracking a pipeline step (queued on the tracking writer)."""
+        if not self._tracking or step_id is None:
+            return
         filtered_output = None
         if output_data and not error_message:
             filtered_output = {
@@ -381,7 +551,8 @@ class PipelineAsync(APIClient):
                 if k not in ("progress_rich",) and not callable(v)
             }
 
-        return self.tracker.complete_step(
+        self._tracking.submit(
+            "complete_step",
             step_id=step_id,
             output_data=filtered_output,
             error_message=error_message,
@@ -394,45 +565,66 @@ class PipelineAsync(APIClient):
         Execute a single step in the async pipeline.
 
         Args:
-            item: The step to execute (callable, logic block, etc).
+            item: The step to execute (compiled descriptor, callable, logic block, etc).
             data: Current pipeline context.
             **kwargs: Additional execution parameters.
 
         Returns:
             Dict[str, Any]: Updated pipeline context.
         """
-        parent_step_id = kwargs.get("parent_step_id")
-        parallel_group = kwargs.get("parallel_group")
+        step = item if item.__class__ is CompiledStep else compile_step(item, PipelineAsync)
+        if step is None:
+            return data
+        kind = step.kind
+        parent_step_id = kwargs.pop("parent_step_id", None)
+        parallel_group = kwargs.pop("parallel_group", None)
+        nested = {**kwargs, "parent_step_id": parent_step_id, "parallel_group": parallel_group}
 
-        if isinstance(item, Condition):
+        if kind == STEP_CONDITION:
             tracked_id = self._start_step_tracking(
                 "Condition", "v1.0", "condition", data,
                 parent_step_id=parent_step_id,
                 parallel_group=parallel_group
             )
-            branch = item.branch_true if item.evaluate(data) else (item.branch_false or [])
-            for step in branch:
-                data = await self._execute_step(step, data, **kwargs)
+            branch = step.children if step.block.evaluate(data) else step.alternative
+            for child in branch:
+                data = await self._execute_step(child, data, **nested)
             self._end_step_tracking(tracked_id, data)
             return data
 
-        if isinstance(item, Parallel):
-            return await self._execute_parallel(item, data, parent_step_id, parallel_group, **kwargs)
+        if kind == STEP_FOR:
+            # The loop is tracked as a block step that parents every iteration's steps
+            tracked_id = self._start_step_tracking(
+                "For Loop", "v1.0", "for", None, parent_step_id=parent_step_id, parallel_group=parallel_group
+            )
+            loop_kwargs = {
+                **kwargs,
+                "parent_step_id": tracked_id,
+                "parallel_group": f"loop_{uuid.uuid4().hex[:8]}" if tracked_id else "loop_none",
+            }
+            iteration = 0
+            while step.block.should_continue(data, iteration):
+                data["_loop_iteration"] = iteration
+                for child in step.children:
+                    data = await self._execute_step(child, data, **loop_kwargs)
+                    if "error" in data:
+                        self._end_step_tracking(tracked_id, None, data["error"])
+                        return data
+                iteration += 1
+            self._end_step_tracking(tracked_id, {"iterations": iteration})
+            return data
 
-        is_background = False
-        capture_error = False
-        if isinstance(item, tuple) and len(item) >= 4 and isinstance(item[3], dict):
-            is_background = item[3].get("_is_background", False)
-            capture_error = item[3].get("_background_capture_error", False)
+        if kind == STEP_PARALLEL:
+            return await self._execute_parallel(step, data, parent_step_id, parallel_group, **kwargs)
 
-        if is_background:
-            return await self._execute_background_step(item, data, capture_error, parent_step_id, parallel_group, **kwargs)
+        if kind == STEP_BACKGROUND:
+            return await self._execute_background_step(step, data, parent_step_id, parallel_group, **kwargs)
 
-        return await self._execute_task(item, data, parent_step_id, parallel_group, **kwargs)
+        return await self._execute_task(step, data, parent_step_id, parallel_group, **kwargs)
 
     async def _execute_parallel(
         self,
-        item: Parallel,
+        step: CompiledStep,
         data: Dict[str, Any],
         parent_step_id: Optional[int],
         parallel_group: Optional[str],
@@ -444,32 +636,36 @@ class PipelineAsync(APIClient):
             parent_step_id=parent_step_id,
             parallel_group=parallel_group
         )
-        loop_data = data.copy()
+        loop_data = LayeredContext(data)
         loop_data.pop("progress_rich", None)
-        current_group = f"group_{tracked_parallel_id or 'none'}"
+        current_group = f"group_{uuid.uuid4().hex[:8]}" if tracked_parallel_id else "group_none"
 
         if self.verbose:
-            print(f"\n[PARALLEL ASYNC] Executing {len(item.steps)} steps concurrently")
+            print(f"\n[PARALLEL ASYNC] Executing {len(step.children)} steps concurrently")
 
         error_msg = None
+        branch_kwargs = {**kwargs, "parent_step_id": tracked_parallel_id, "parallel_group": current_group}
+        limit = step.block.max_concurrency
+        gate = asyncio.Semaphore(limit) if limit else None
+
+        async def run_branch(child: CompiledStep) -> Dict[str, Any]:
+            if gate is None:
+                return await self._execute_step(child, LayeredContext(loop_data), **branch_kwargs)
+            async with gate:
+                return await self._execute_step(child, LayeredContext(loop_data), **branch_kwargs)
+
         try:
-            tasks = [
-                self._execute_step(
-                    step,
-                    loop_data.copy(),
-                    **{**kwargs, "parent_step_id": tracked_parallel_id, "parallel_group": current_group}
-                )
-                for step in item.steps
-            ]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            results = await asyncio.gather(*(run_branch(child) for child in step.children), return_exceptions=True)
             errors = []
             for res in results:
                 if isinstance(res, Exception):
                     errors.append(str(res))
                 elif isinstance(res, dict):
-                    if "error" in res:
-                        errors.append(res["error"])
-                    data.update({k: v for k, v in res.items() if k != "progress_rich"})
+                    # Merge only what each branch wrote
+                    written = res.changes(loop_data)[0] if isinstance(res, LayeredContext) else res
+                    if "error" in written:
+                        errors.append(written["error"])
+                    apply_changes(data, written)
             if errors:
                 error_msg = " | ".join(errors)
                 data["error"] = error_msg
@@ -499,25 +695,23 @@ class PipelineAsync(APIClient):
 
     async def _execute_background_step(
         self,
-        item: Any,
+        step: CompiledStep,
         data: Dict[str, Any],
-        capture_error: bool,
         parent_step_id: Optional[int],
         parallel_group: Optional[str],
         **kwargs: Any
     ) -> Dict[str, Any]:
         """Execute a background step without blocking the pipeline."""
-        func, name, version = None, "background", "v1.0"
-        if isinstance(item, tuple) and len(item) >= 2:
-            func, name, version = item[0], item[1], item[2] if len(item) > 2 else "v1.0"
+        name, capture_error = step.name, step.capture_error
+        task_step = compile_step(step.func, PipelineAsync)
 
-        task_data = data.copy()
+        # Both sides get their own copy-on-write view; the forked base is no longer written
+        task_data, data = fork_context(data)
         task_data.pop("progress_rich", None)
 
         async def run_background():
             try:
-                if func:
-                    await self._execute_task(func, task_data, parent_step_id, parallel_group, **kwargs)
+                await self._execute_task(task_step, task_data, parent_step_id, parallel_group, **kwargs)
             except Exception as e:  # pylint: disable=broad-exception-caught
                 if capture_error:
                     error_info = {"step_name": name, "error": str(e)}
@@ -530,51 +724,71 @@ class PipelineAsync(APIClient):
 
     async def _execute_task(
         self,
-        item: Any,
+        step: CompiledStep,
         data: Dict[str, Any],
         parent_step_id: Optional[int],
         parallel_group: Optional[str],
         **kwargs: Any
     ) -> Dict[str, Any]:
         """Execute a single task step."""
-        func = None
-        name = "unknown"
-        version = "v1.0"
-
-        if isinstance(item, tuple):
-            func, name, version = item[0], item[1], item[2]
-        elif callable(item):
-            func = item
-            name = getattr(item, "NAME", getattr(item, "__name__", "task"))
-            version = getattr(item, "VERSION", "v1.0")
-
-        if func:
-            tracked_step_id = self._start_step_tracking(
-                name, version, "task", data,
-                parent_step_id=parent_step_id,
-                parallel_group=parallel_group
-            )
-            error_msg = None
-            try:
-                result = await self._task_invoke(func, name, data, **kwargs)
-                if result is None:
-                    result = {}
-                data.update(result)
-                data.pop("error", None)
-            except Exception as e:  # pylint: disable=broad-exception-caught
-                error_msg = str(e)
-                data["error"] = error_msg
-                if not self.continue_on_error:
-                    self._end_step_tracking(tracked_step_id, None, error_msg)
-                    raise
-            finally:
-                self._end_step_tracking(tracked_step_id, data if not error_msg else None, error_msg)
+        name = step.name
+        tracked_step_id = self._start_step_tracking(
+            name, step.version, "task", data,
+            parent_step_id=parent_step_id,
+            parallel_group=parallel_group
+        )
+        error_msg = None
+        gate = self._step_gate()
+        try:
+            if gate is None:
+                result = await self._invoke_cached(step, data, **kwargs)
+            else:
+                async with gate:
+                    result = await self._invoke_cached(step, data, **kwargs)
+            if result is None:
+                result = {}
+            data.update(result)
+            data.pop("error", None)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            error_msg = str(e)
+            data["error"] = error_msg
+            if not self.continue_on_error:
+                self._end_step_tracking(tracked_step_id, None, error_msg)
+                raise
+        finally:
+            self._end_step_tracking(tracked_step_id, data if not error_msg else None, error_msg)
         return data
 
+    async def _invoke_cached(self, step: CompiledStep, data: Dict[str, Any], **kwargs: Any) -> Any:
+        """Invoke a task step, serving it from the step cache when it opts in."""
+        policy = step.policy
+        if not policy.cache or self.step_cache is None:
+            return await self._task_invoke(step.func, step.name, data, __policy__=policy, **kwargs)
+
+        try:
+            key: Optional[str] = make_cache_key(step.name, step.version, data, policy.cache_keys)
+        except TypeError:
+            key = None
+        if key is not None:
+            found, value = self.step_cache.get(key)
+            if found:
+                count_cache_event(self._cache_counters, step.name, "hits")
+                return value
+
+        count_cache_event(self._cache_counters, step.name, "misses")
+        result = await self._task_invoke(step.func, step.name, data, __policy__=policy, **kwargs)
+        if key is not None and (result is None or isinstance(result, dict)):
+            evicted = self.step_cache.put(key, result)
+            if evicted:
+                count_cache_event(self._cache_counters, step.name, "evictions", evicted)
+        return result
+
     async def _pipeline_run(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
         """Internal async pipeline run implementation."""
         data = args[0].copy() if args else {}
         error_message = None
+        if not self._session_id:
+            self._cache_counters = {}
 
         # Resumption logic
         checkpoint_mgr = kwargs.get("checkpoint_mgr")
@@ -585,19 +799,33 @@ class PipelineAsync(APIClient):
             data.update(last["data"] or {})
             start_at_step = last["step_order"] + 1
 
-        if self.tracker:
-            reg = self.tracker.register_pipeline(name=self.pipeline_name, pipeline_steps=self.tasks_list, input_data=data)
+        if self._session_id:
+            # Runs of an arun_many batch track their steps under the batch session
+            self.pipeline_id = self._session_id
+        elif self._tracking:
+            reg = await self._tracking.call(
+                "register_pipeline", name=self.pipeline_name, pipeline_steps=self.tasks_list, input_data=data
+            )
             self.pipeline_id = reg["pipeline_id"]
             for event in self._pending_events:
-                self.tracker.add_event(pipeline_id=self.pipeline_id, **event)
+                self._tracking.submit("add_event", pipeline_id=self.pipeline_id, **event)
             self._pending_events = []
 
-        total_steps = len(self.tasks_list)
+        plan = self._get_plan()
+        total_steps = len(plan)
+        lag_samples: List[float] = []
+        lag_monitor = None
+        if self.loop_lag_interval:
+            lag_monitor = asyncio.create_task(self._monitor_loop_lag(lag_samples))
+            # Let the monitor take its first timestamp before any step blocks
+            await asyncio.sleep(0)
         try:
             data = await self._evaluate_checkpoints(data)
             for i in range(start_at_step, total_steps):
-                item = self.tasks_list[i]
-                data = await self._execute_step(item, data)
+                step = plan[i]
+                item = step.source if step is not None else self.tasks_list[i]
+                if step is not None:
+                    data = await self._execute_step(step, data)
 
                 if "error" not in data:
                     error_message = None
@@ -613,16 +841,28 @@ class PipelineAsync(APIClient):
             error_message = str(e)
             data["error"] = error_message
         finally:
-            if self.tracker and self.pipeline_id:
-                self.tracker.complete_pipeline(
+            if lag_monitor is not None:
+                lag_monitor.cancel()
+                try:
+                    await lag_monitor
+                except asyncio.CancelledError:
+                    pass
+            self._record_loop_lag(lag_samples)
+            if self._tracking and self.pipeline_id and not self._session_id:
+                if self._cache_counters:
+                    self._tracking.submit("record_cache_stats", self.pipeline_id, self._cache_counters)
+                self._tracking.submit(
+                    "complete_pipeline",
                     pipeline_id=self.pipeline_id,
                     output_data=data if not error_message else None,
                     error_message=error_message
                 )
+                # The run is only reported once its tracking records are written
+                await self._tracking.drain()
                 if self.verbose:
                     status = "ERROR" if error_message else "COMPLETED"
                     print(f"\n[ASYNC STATUS] {self.pipeline_id}: {status}")
-        return data
+        return data.flatten() if isinstance(data, LayeredContext) else data
 
     async def run(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
         """
@@ -636,8 +876,11 @@ class PipelineAsync(APIClient):
             Dict[str, Any]: The final pipeline data dictionary.
         """
         result = await self._pipeline_run(*args, **kwargs)
-        
-        # Release database locks after execution
+        self._release_db_locks()
+        return result
+
+    def _release_db_locks(self) -> None:
+        """Commit pending tracking writes on the shared database connection."""
         if self.tracking_db:
             try:
                 from wpipe import _db_connections, _db_lock
@@ -646,7 +889,124 @@ class PipelineAsync(APIClient):
                         _db_connections[self.tracking_db].commit()
             except Exception:
                 pass
-        return result
+
+    async def arun_many(
+        self,
+        inputs: Union[AsyncIterable[Dict[str, Any]], Iterable[Dict[str, Any]]],
+        concurrency: Optional[int] = None,
+        ordered: bool = False,
+        **kwargs: Any,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the pipeline over many inputs, yielding results as they finish.
+
+        Inputs are consumed lazily, so at most ``concurrency`` runs are in
+        flight at a time. Every run is tracked under a single pipeline
+        session and the loop lag monitor runs once for the whole batch.
+
+        Args:
+            inputs: Async or regular iterable of initial data dictionaries.
+            concurrency: Maximum number of concurrent runs (defaults to the CPU count).
+            ordered: Yield results in input order instead of completion order.
+            **kwargs: Additional keyword arguments passed to every run.
+
+        Yields:
+            Dict[str, Any]: The final data dictionary of each run. Failed runs
+                carry an "error" key, as with ``run``.
+        """
+        # pylint: disable=too-many-locals,too-many-branches,too-many-statements
+        workers = max(1, concurrency or os.cpu_count() or 1)
+        window = workers * 2 if ordered else workers
+        source = _aiter(inputs)
+
+        batch_start = datetime.now().isoformat()
+        self._cache_counters = {}
+        self.pipeline_id = None
+        if self._tracking:
+            reg = await self._tracking.call(
+                "register_pipeline", name=self.pipeline_name, pipeline_steps=self.tasks_list, input_data=None
+            )
+            self.pipeline_id = reg["pipeline_id"]
+            for event in self._pending_events:
+                self._tracking.submit("add_event", pipeline_id=self.pipeline_id, **event)
+            self._pending_events = []
+        lag_samples: List[float] = []
+        lag_monitor = None
+        if self.loop_lag_interval:
+            lag_monitor = asyncio.create_task(self._monitor_loop_lag(lag_samples))
+
+        pending: Dict["asyncio.Task[Dict[str, Any]]", int] = {}
+        buffered: Dict[int, Dict[str, Any]] = {}
+        next_index = submitted = processed = failed = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < workers and len(pending) + len(buffered) < window:
+                    try:
+                        data = await source.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    runner = self._make_batch_runner()
+                    pending[asyncio.create_task(runner._pipeline_run(data, **kwargs))] = submitted
+                    submitted += 1
+                if not pending:
+                    break
+
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    index = pending.pop(task)
+                    result = task.result()
+                    processed += 1
+                    failed += 1 if "error" in result else 0
+                    if ordered:
+                        buffered[index] = result
+                    else:
+                        yield result
+
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            if lag_monitor is not None:
+                lag_monitor.cancel()
+                try:
+                    await lag_monitor
+                except asyncio.CancelledError:
+                    pass
+            self._record_loop_lag(lag_samples)
+            if self._tracking and self.pipeline_id:
+                if self._cache_counters:
+                    self._tracking.submit("record_cache_stats", self.pipeline_id, self._cache_counters)
+                error_message = f"{failed} of {processed} runs failed" if failed else None
+                self._tracking.submit(
+                    "complete_pipeline",
+                    pipeline_id=self.pipeline_id,
+                    output_data=None if error_message else {
+                        "_pipeline_start_time": batch_start, "processed": processed, "failed": failed,
+                    },
+                    error_message=error_message,
+                )
+                await self._tracking.drain()
+            self._release_db_locks()
+
+    def _make_batch_runner(self) -> "PipelineAsync":
+        """
+        Create a lightweight copy of the pipeline that tracks under the current session.
+
+        Returns:
+            PipelineAsync: A shallow copy with its own per-run state.
+        """
+        runner = copy.copy(self)
+        runner._session_id = self.pipeline_id
+        runner._step_order = 0
+        runner._pending_events = []
+        runner.loop_lag_interval = None
+        return runner
 
     def set_steps(self, steps: List[Any]) -> None:
         """
@@ -692,6 +1052,8 @@ class PipelineAsync(APIClient):
                     steps=normalized_steps,
                     max_workers=item.max_workers,
                     use_processes=item.use_processes,
+                    shared_memory_threshold=item.shared_memory_threshold,
+                    max_concurrency=item.max_concurrency,
                 ))
             elif isinstance(item, Background):
                 normalized_step = normalize_step(item.step)
@@ -714,3 +1076,11 @@ class PipelineAsync(APIClient):
                 new_list.append(item)
 
         self.tasks_list = new_list
+        self._plan = ExecutionPlan(new_list, PipelineAsync)
+
+    def _get_plan(self) -> ExecutionPlan:
+        """Return the compiled plan, recompiling it if ``tasks_list`` was replaced."""
+        plan = self._plan
+        if plan is None or not plan.is_current(self.tasks_list):
+            plan = self._plan = ExecutionPlan(self.tasks_list, PipelineAsync)
+        return plan
@@ -289,6 +289,31 @@ class SystemMetricsModel(BaseModel):
     )
 
 
+class CacheStatsModel(BaseModel):
+    """
+    Data Transfer Object for the cache_stats table.
+
+    Attributes:
+        id (Optional[int]): Primary Key of the entry.
+        pipeline_id (str): ID of the pipeline run.
+        step_name (str): Name of the cached step.
+        hits (int): Results served from the cache.
+        misses (int): Executions that had to run the step.
+        evictions (int): Entries evicted to store this step's results.
+        recorded_at (Optional[str]): ISO timestamp of the record.
+    """
+
+    id: Optional[int] = Field(None, description="Primary Key")
+    pipeline_id: str
+    step_name: str
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    recorded_at: Optional[str] = Field(
+        default_factory=lambda: datetime.now().isoformat()
+    )
+
+
 class ResourceMetricsModel(BaseModel):
     """
     Data Transfer Object for the resource_metrics table.
@@ -5,6 +5,22 @@ Provides timeout functionality for task execution to prevent hanging tasks
 and ensure pipeline reliability.
 """
 
-from .timeout import TaskTimer, TimeoutError, timeout_async, timeout_sync
+from .timeout import (
+    CancellationToken,
+    TaskTimer,
+    TimeoutError,
+    current_token,
+    run_with_timeout,
+    timeout_async,
+    timeout_sync,
+)
 
-__all__ = ["TimeoutError", "timeout_sync", "timeout_async", "TaskTimer"]
+__all__ = [
+    "TimeoutError",
+    "timeout_sync",
+    "timeout_async",
+    "TaskTimer",
+    "CancellationToken",
+    "current_token",
+    "run_with_timeout",
+]
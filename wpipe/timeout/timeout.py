@@ -6,26 +6,325 @@ and ensure pipeline reliability.
 """
 
 import asyncio
-import signal
+import builtins
+import heapq
+import itertools
+import multiprocessing
+import os
 import threading
+import time
 from functools import wraps
-from typing import Any, Callable, Optional, TypeVar
+from typing import Any, Callable, List, Optional, TypeVar
 
 T = TypeVar("T")
 
+ISOLATION_THREAD = "thread"
+ISOLATION_PROCESS = "process"
 
-class TimeoutError(Exception):
-    """Raised when a task execution exceeds timeout."""
+# Seconds a terminated process gets before it is killed
+_KILL_GRACE = 1.0
+
+# multiprocessing start method of isolated tasks; None uses the platform
+# default ("spawn" on macOS and Windows, "forkserver" from Python 3.14 on
+# Linux), under which the callable and its arguments must be picklable
+PROCESS_START_METHOD: Optional[str] = None
+
+
+class TimeoutError(builtins.TimeoutError):
+    """Raised when a task execution exceeds timeout (a builtin TimeoutError)."""
 
     pass
 
 
-def timeout_sync(seconds: Optional[float]) -> Callable:
+class CancellationToken:
+    """
+    Cooperative cancellation flag handed to a running task.
+
+    A timed-out thread cannot be stopped from outside, so long-running steps
+    should check their token (``current_token()``) and return early once it
+    is cancelled.
+
+    Attributes:
+        reason (Optional[str]): Why the token was cancelled.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an active token."""
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested."""
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """
+        Request cancellation.
+
+        Args:
+            reason: Why the task is cancelled.
+        """
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raise if cancellation was requested.
+
+        Raises:
+            TimeoutError: If the token is cancelled.
+        """
+        if self._event.is_set():
+            raise TimeoutError(self.reason or "cancelled")
+
+    def wait(self, seconds: Optional[float] = None) -> bool:
+        """
+        Sleep up to ``seconds``, waking up early on cancellation.
+
+        Args:
+            seconds: Maximum time to wait, None to wait for cancellation.
+
+        Returns:
+            bool: True if the token was cancelled.
+        """
+        return self._event.wait(seconds)
+
+
+_NEVER_CANCELLED = CancellationToken()
+_local = threading.local()
+
+
+def current_token() -> CancellationToken:
+    """
+    Get the cancellation token of the task running in this thread.
+
+    Returns:
+        CancellationToken: The task token, or a token that is never cancelled.
+    """
+    return getattr(_local, "token", None) or _NEVER_CANCELLED
+
+
+class Watchdog:
+    """
+    Single background thread that fires deadline callbacks.
+
+    All timed tasks share one watchdog instead of one timer (or executor)
+    per call; deadlines have sub-second resolution.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the watchdog. The thread starts on first use."""
+        self._heap: List[List[Any]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> List[Any]:
+        """
+        Run ``callback`` after ``delay`` seconds unless cancelled first.
+
+        Args:
+            delay: Seconds until the deadline.
+            callback: Function called on the watchdog thread at the deadline.
+
+        Returns:
+            List[Any]: A handle for ``cancel``.
+        """
+        entry = [time.monotonic() + delay, next(self._counter), callback]
+        with self._condition:
+            heapq.heappush(self._heap, entry)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, daemon=True, name="wpipe_watchdog")
+                self._thread.start()
+            self._condition.notify()
+        return entry
+
+    def cancel(self, entry: List[Any]) -> None:
+        """
+        Cancel a scheduled deadline.
+
+        Args:
+            entry: Handle returned by ``schedule``.
+        """
+        entry[2] = None
+
+    def _loop(self) -> None:
+        while True:
+            with self._condition:
+                while self._heap and self._heap[0][2] is None:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                delay = self._heap[0][0] - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                callback = heapq.heappop(self._heap)[2]
+            if callback is not None:
+                try:
+                    callback()
+                except Exception:  # pylint: disable=broad-exception-caught
+                    pass
+
+
+_watchdog: Optional[Watchdog] = None
+_watchdog_pid: Optional[int] = None
+_watchdog_lock = threading.Lock()
+
+
+def get_watchdog() -> Watchdog:
+    """
+    Get the process-wide watchdog (recreated after a fork).
+
+    Returns:
+        Watchdog: The shared watchdog.
+    """
+    global _watchdog, _watchdog_pid  # pylint: disable=global-statement
+    with _watchdog_lock:
+        if _watchdog is None or _watchdog_pid != os.getpid():
+            _watchdog = Watchdog()
+            _watchdog_pid = os.getpid()
+        return _watchdog
+
+
+def run_with_timeout(
+    func: Callable[..., T],
+    seconds: Optional[float],
+    *args: Any,
+    isolation: str = ISOLATION_THREAD,
+    **kwargs: Any,
+) -> T:
+    """
+    Run a callable with a deadline that frees the caller as soon as it expires.
+
+    In thread isolation the callable runs on a daemon thread with a
+    cancellation token (see ``current_token``); on timeout the token is
+    cancelled and the caller gets TimeoutError immediately while the thread
+    is left to finish. In process isolation the callable runs in a child
+    process that is terminated (then killed) at the deadline, so runaway
+    CPU-bound work is really stopped. The child is started with
+    ``PROCESS_START_METHOD``; the callable, its arguments and its result
+    must be picklable unless it is forked.
+
+    Args:
+        func: The callable to run.
+        seconds: Timeout in seconds, None for no timeout.
+        *args: Positional arguments for ``func``.
+        isolation: "thread" (default) or "process".
+        **kwargs: Keyword arguments for ``func``.
+
+    Returns:
+        T: The callable's result.
+
+    Raises:
+        TimeoutError: If the deadline expires first.
+        ValueError: If ``isolation`` is unknown.
+    """
+    if seconds is None:
+        return func(*args, **kwargs)
+    if isolation == ISOLATION_PROCESS:
+        return _run_in_process(func, seconds, args, kwargs)
+    if isolation != ISOLATION_THREAD:
+        raise ValueError(f"Unknown timeout isolation: {isolation}")
+
+    name = getattr(func, "__name__", "task")
+    token = CancellationToken()
+    done = threading.Event()
+    outcome: List[Any] = []
+
+    def target() -> None:
+        _local.token = token
+        try:
+            outcome.append((True, func(*args, **kwargs)))
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            outcome.append((False, e))
+        finally:
+            _local.token = None
+            done.set()
+
+    def expire() -> None:
+        token.cancel(f"Task '{name}' exceeded timeout of {seconds}s")
+        done.set()
+
+    entry = get_watchdog().schedule(seconds, expire)
+    threading.Thread(target=target, daemon=True, name=f"wpipe_timed_{name}").start()
+    done.wait()
+    get_watchdog().cancel(entry)
+
+    # A cancelled token wins even if the callable returned right after it
+    if token.cancelled or not outcome:
+        raise TimeoutError(token.reason)
+    ok, value = outcome[0]
+    if ok:
+        return value
+    raise value
+
+
+def _process_entry(conn: Any, func: Callable, args: Any, kwargs: Any) -> None:
+    """Child process body for process isolation."""
+    try:
+        conn.send((True, func(*args, **kwargs)))
+    except BaseException as e:  # pylint: disable=broad-exception-caught
+        try:
+            conn.send((False, e))
+        except Exception:  # pylint: disable=broad-exception-caught
+            conn.send((False, RuntimeError(repr(e))))
+    finally:
+        conn.close()
+
+
+def _run_in_process(func: Callable[..., T], seconds: float, args: Any, kwargs: Any) -> T:
+    """Run a callable in a child process terminated at the deadline."""
+    name = getattr(func, "__name__", "task")
+    ctx = multiprocessing.get_context(PROCESS_START_METHOD)
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(
+        target=_process_entry, args=(sender, func, args, kwargs), daemon=True, name=f"wpipe_isolated_{name}"
+    )
+    token = CancellationToken()
+    watchdog = get_watchdog()
+    kill_entry: List[Any] = []
+
+    def expire() -> None:
+        token.cancel(f"Task '{name}' exceeded timeout of {seconds}s")
+        process.terminate()
+        kill_entry.append(watchdog.schedule(_KILL_GRACE, process.kill))
+
+    process.start()
+    sender.close()
+    entry = watchdog.schedule(seconds, expire)
+    try:
+        ok, value = receiver.recv()
+    except EOFError:
+        if token.cancelled:
+            raise TimeoutError(token.reason) from None
+        process.join()
+        raise RuntimeError(f"Isolated task '{name}' exited with code {process.exitcode}") from None
+    finally:
+        watchdog.cancel(entry)
+        receiver.close()
+        process.join(_KILL_GRACE)
+        for pending in kill_entry:
+            watchdog.cancel(pending)
+        if process.is_alive():
+            process.kill()
+    if ok:
+        return value
+    raise value
+
+
+def timeout_sync(seconds: Optional[float], isolation: str = ISOLATION_THREAD) -> Callable:
     """
     Decorator for synchronous task timeout.
 
+    Works from any thread with sub-second resolution (see run_with_timeout).
+
     Args:
         seconds: Timeout in seconds, None for no timeout
+        isolation: "thread" (default) or "process" to terminate runaway tasks
 
     Returns:
         Decorated function with timeout
@@ -34,29 +333,7 @@ def timeout_sync(seconds: Optional[float]) -> Callable:
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> T:
-            if seconds is None:
-                return func(*args, **kwargs)
-
-            # Check if running in main thread, signal.signal only works there
-            if threading.current_thread() != threading.main_thread():
-                # Cannot enforce timeout using signals in a background thread
-                return func(*args, **kwargs)
-
-            def _handle_timeout(signum: int, frame: Any) -> None:
-                raise TimeoutError(
-                    f"Task '{func.__name__}' exceeded timeout of {seconds}s"
-                )
-
-            old_handler = signal.signal(signal.SIGALRM, _handle_timeout)
-            signal.alarm(int(seconds))
-
-            try:
-                result = func(*args, **kwargs)
-            finally:
-                signal.alarm(0)
-                signal.signal(signal.SIGALRM, old_handler)
-
-            return result
+            return run_with_timeout(func, seconds, *args, isolation=isolation, **kwargs)
 
         return wrapper
 
@@ -5,6 +5,22 @@ Provides functionality to track pipeline execution history,
 step timings, and error information.
 """
 
+from .live import DatabaseTailer, LiveBus
+from .pool import ReadPool
+from .retention import RetentionManager, RetentionPolicy
+from .sketch import QuantileSketch
 from .tracker import Metric, PipelineTracker, Severity
+from .writer import TrackingWriter
 
-__all__ = ["PipelineTracker", "Metric", "Severity"]
+__all__ = [
+    "PipelineTracker",
+    "Metric",
+    "Severity",
+    "TrackingWriter",
+    "QuantileSketch",
+    "RetentionManager",
+    "RetentionPolicy",
+    "ReadPool",
+    "LiveBus",
+    "DatabaseTailer",
+]
@@ -0,0 +1,55 @@
+"""
+Maintenance commands for a tracking database: python -m wpipe.tracking
+
+    python -m wpipe.tracking rebuild-rollups --db pipeline.db
+    python -m wpipe.tracking retention --db pipeline.db --keep events=720 --keep steps=2160 \\
+        --archive-dir archive --downsample-after-hours 24
+"""
+
+import argparse
+
+from .retention import RetentionManager, RetentionPolicy
+from .tracker import PipelineTracker
+
+
+def _policy(value: str) -> RetentionPolicy:
+    table, _, hours = value.partition("=")
+    try:
+        return RetentionPolicy(table, float(hours))
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Expected TABLE=HOURS, got {value!r}") from e
+
+
+def main():
+    parser = argparse.ArgumentParser(description="wpipe tracking maintenance")
+    parser.add_argument("command", choices=["rebuild-rollups", "retention"], help="Command to run")
+    parser.add_argument("--db", default="pipeline.db", help="Path to SQLite database")
+    parser.add_argument(
+        "--keep", type=_policy, action="append", default=[], metavar="TABLE=HOURS",
+        help="Retention of a table (repeatable)",
+    )
+    parser.add_argument("--archive-dir", help="Archive expired rows here before deleting them")
+    parser.add_argument("--downsample-after-hours", type=float, help="Downsample older system metrics")
+    parser.add_argument("--bucket-seconds", type=int, default=300, help="Downsampled system metrics bucket")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true", help="Switch to incremental vacuum")
+
+    args = parser.parse_args()
+    tracker = PipelineTracker(db_path=args.db)
+    if args.command == "rebuild-rollups":
+        tracker.rebuild_rollups()
+        print(f"Rollups rebuilt for {args.db}")
+    elif args.command == "retention":
+        if args.enable_incremental_vacuum:
+            RetentionManager(tracker.db_pipelines).enable_incremental_vacuum()
+        result = tracker.apply_retention(
+            args.keep,
+            args.archive_dir,
+            downsample_after_hours=args.downsample_after_hours,
+            bucket_seconds=args.bucket_seconds,
+        )
+        for table, count in result.items():
+            print(f"{table}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,102 @@
 """
 Alert system for pipeline and step monitoring.
+
+Enabled alert configurations are read once and cached by metric. The
+cache is reloaded when rules are added by any tracker of the process, or
+when another connection (e.g. another process) adds, removes, enables or
+disables rules; call ``invalidate`` after other edits. Checking costs a
+dictionary lookup and a ``PRAGMA data_version``. The ``error_rate`` metric
+is kept as a rolling window of recent pipeline outcomes, seeded from the
+database once and updated on every pipeline completion, so no alert check
+scans history.
 """
 
 import re
+import sqlite3
+import threading
+import time
 import uuid
-from typing import Any, Dict, List, Optional
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from wpipe.sqlite.tables_dto.tracker_models import AlertConfigModel, AlertFiredModel
 
+from .live import LiveBus
+from .queries import fetch_rows
+
+# Changes to the alert rules made in this process, by database path
+_generations: Dict[Optional[str], int] = {}
+_generations_lock = threading.Lock()
+
+_RULES_SIGNATURE = "SELECT COUNT(*), MAX(id), TOTAL(enabled) FROM {table}"
+
+
+def _bump_generation(db_path: Optional[str]) -> None:
+    with _generations_lock:
+        _generations[db_path] = _generations.get(db_path, 0) + 1
+
+
+class ErrorRateWindow:
+    """
+    Rolling error rate over the last runs and/or the last minutes.
+
+    Attributes:
+        max_runs (int): Number of most recent runs kept.
+        max_age_s (Optional[float]): Maximum age of a run in seconds, None
+            for no age limit.
+        errors (int): Number of failed runs in the window.
+    """
+
+    def __init__(self, max_runs: int = 100, minutes: Optional[float] = None) -> None:
+        """
+        Initialize an empty window.
+
+        Args:
+            max_runs: Number of most recent runs kept.
+            minutes: Only runs completed in the last ``minutes`` count.
+        """
+        self.max_runs = max_runs
+        self.max_age_s = minutes * 60 if minutes is not None else None
+        self.errors = 0
+        self._runs: Deque[Tuple[float, bool]] = deque()
+
+    def record(self, failed: bool, timestamp: Optional[float] = None) -> None:
+        """
+        Add a run outcome.
+
+        Args:
+            failed: Whether the run failed.
+            timestamp: Completion time (epoch seconds), defaults to now.
+        """
+        self._runs.append((time.time() if timestamp is None else timestamp, failed))
+        self.errors += failed
+        while len(self._runs) > self.max_runs:
+            self.errors -= self._runs.popleft()[1]
+
+    def _expire(self) -> None:
+        if self.max_age_s is None:
+            return
+        limit = time.time() - self.max_age_s
+        while self._runs and self._runs[0][0] < limit:
+            self.errors -= self._runs.popleft()[1]
+
+    @property
+    def runs(self) -> int:
+        """Number of runs in the window."""
+        self._expire()
+        return len(self._runs)
+
+    def rate(self) -> float:
+        """
+        Get the error rate of the window.
+
+        Returns:
+            float: Percentage of failed runs (0 if the window is empty).
+        """
+        self._expire()
+        return self.errors / len(self._runs) * 100 if self._runs else 0.0
+
 
 class AlertManager:
     """Handles alert threshold configuration and firing logic."""
@@ -17,6 +106,10 @@ class AlertManager:
         db_alerts_config: Any,
         db_alerts_fired: Any,
         alert_hooks: Dict[str, List[str]],
+        error_rate_runs: int = 100,
+        error_rate_minutes: Optional[float] = None,
+        live: Optional[LiveBus] = None,
+        db_pipelines: Any = None,
     ):
         """
         Initialize the AlertManager.
@@ -25,10 +118,142 @@ class AlertManager:
             db_alerts_config: Database accessor for alert configurations.
             db_alerts_fired: Database accessor for fired alerts.
             alert_hooks: Dictionary mapping alert names to step names.
+            error_rate_runs: Number of most recent pipeline runs the
+                ``error_rate`` metric is computed over.
+            error_rate_minutes: Only runs completed in the last minutes count
+                for ``error_rate`` (None for no age limit).
+            live: Bus fired alerts are published to.
+            db_pipelines: Database accessor of the pipelines the
+                ``error_rate`` window is seeded from.
         """
         self.db_alerts_config = db_alerts_config
         self.db_alerts_fired = db_alerts_fired
         self._alert_hooks = alert_hooks
+        self.error_rate = ErrorRateWindow(error_rate_runs, error_rate_minutes)
+        self._error_rate_seeded = False
+        self._configs: Optional[Dict[str, List[AlertConfigModel]]] = None
+        # What the cached rules were loaded at: generation, data_version, signature
+        self._loaded: Tuple[int, Optional[int], Any] = (0, None, None)
+        self._lock = threading.Lock()
+        self.live = live
+        self.db_pipelines = db_pipelines
+
+    def get_configs(self, metric: Optional[str] = None) -> List[AlertConfigModel]:
+        """
+        Get the enabled alert configurations, from the cache.
+
+        Args:
+            metric: Only return configurations of this metric.
+
+        Returns:
+            List of enabled alert configurations.
+        """
+        with self._lock:
+            if self._configs is None or self._rules_changed():
+                generation = _generations.get(self._db_path, 0)
+                data_version, signature = self._data_version(), self._signature()
+                by_metric: Dict[str, List[AlertConfigModel]] = {}
+                try:
+                    rows = fetch_rows(
+                        self.db_alerts_config,
+                        f"SELECT * FROM {self.db_alerts_config.table_name} WHERE enabled = 1 ORDER BY id",
+                    )
+                except (AttributeError, sqlite3.Error):
+                    rows = []
+                for row in rows:
+                    config = AlertConfigModel(**row)
+                    by_metric.setdefault(config.metric, []).append(config)
+                self._configs = by_metric
+                self._loaded = (generation, data_version, signature)
+            configs = self._configs
+        if metric is not None:
+            return configs.get(metric, [])
+        return [config for group in configs.values() for config in group]
+
+    def invalidate(self) -> None:
+        """Drop the cached alert configurations of every tracker of this database."""
+        _bump_generation(self._db_path)
+        with self._lock:
+            self._configs = None
+
+    @property
+    def _db_path(self) -> Optional[str]:
+        return getattr(self.db_alerts_config, "db_path", None)
+
+    def _data_version(self) -> Optional[int]:
+        """SQLite's counter of commits made by other connections to the database."""
+        from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+        try:
+            with _db_lock:
+                conn = self.db_alerts_config._get_connection()  # pylint: disable=protected-access
+                return conn.execute("PRAGMA data_version").fetchone()[0]
+        except (AttributeError, sqlite3.Error):
+            return None
+
+    def _signature(self) -> Any:
+        """Summary of the rules that changes when rules are added, removed or toggled."""
+        try:
+            rows = fetch_rows(self.db_alerts_config, _RULES_SIGNATURE.format(table=self.db_alerts_config.table_name))
+        except (AttributeError, sqlite3.Error):
+            return None
+        return tuple(rows[0].values())
+
+    def _rules_changed(self) -> bool:
+        """
+        Whether the cached rules may be stale.
+
+        The rules table is only read when another connection committed
+        something since the last check.
+        """
+        generation, data_version, signature = self._loaded
+        if _generations.get(self._db_path, 0) != generation:
+            return True
+        version = self._data_version()
+        if version == data_version:
+            return False
+        self._loaded = (generation, version, signature)
+        return self._signature() != signature
+
+    def record_pipeline_result(
+        self, status: str, completed_at: Optional[str] = None, pipeline_id: Optional[str] = None
+    ) -> None:
+        """
+        Add a pipeline outcome to the ``error_rate`` window.
+
+        The first call seeds the window from the most recent completed
+        pipelines in the database.
+
+        Args:
+            status: Final pipeline status.
+            completed_at: ISO completion time, defaults to now.
+            pipeline_id: Id of the pipeline, left out of the seed.
+        """
+        with self._lock:
+            if not self._error_rate_seeded:
+                self._error_rate_seeded = True
+                self._seed_error_rate(pipeline_id)
+            timestamp = datetime.fromisoformat(completed_at).timestamp() if completed_at else None
+            self.error_rate.record(status == "error", timestamp)
+
+    def _seed_error_rate(self, exclude_id: Optional[str]) -> None:
+        """Load the last completed runs into the error rate window."""
+        if self.db_pipelines is None:
+            return
+        try:
+            rows = fetch_rows(
+                self.db_pipelines,
+                "SELECT status, completed_at FROM pipelines "
+                "WHERE status IN ('completed', 'error') AND completed_at IS NOT NULL AND id IS NOT ? "
+                "ORDER BY completed_at DESC LIMIT ?",
+                (exclude_id, self.error_rate.max_runs),
+            )
+        except (AttributeError, sqlite3.Error):
+            return
+        for row in reversed(rows):
+            self.error_rate.record(
+                row["status"] == "error", datetime.fromisoformat(row["completed_at"]).timestamp()
+            )
 
     def add_alert_threshold(
         self,
@@ -77,7 +302,9 @@ class AlertManager:
             severity=severity,
             message=message,
         )
-        return self.db_alerts_config.insert(model)
+        alert_id = self.db_alerts_config.insert(model)
+        self.invalidate()
+        return alert_id
 
     def evaluate_condition(
         self, condition: str, actual: float, threshold: float
@@ -102,6 +329,12 @@ class AlertManager:
         }
         return ops.get(condition, False)
 
+    def _fire(self, model: AlertFiredModel) -> None:
+        """Record a fired alert and publish it."""
+        alert_id = self.db_alerts_fired.insert(model)
+        if self.live is not None and self.live.has_subscribers:
+            self.live.publish("alert", alert_id, model.model_dump(exclude={"id"}))
+
     def check_step_alerts(
         self, pipeline_id: str, step_name: str, duration_ms: float
     ) -> List[str]:
@@ -117,12 +350,7 @@ class AlertManager:
             List of fired hooks (step names).
         """
         fired_hooks: List[str] = []
-        # Import local constants to avoid circular imports if needed
-        configs = self.db_alerts_config.get_by_field(
-            metric="step_duration_ms", enabled=1
-        )
-
-        for config in configs:
+        for config in self.get_configs("step_duration_ms"):
             if self.evaluate_condition(config.condition, duration_ms, config.value):
                 fire_model = AlertFiredModel(
                     alert_config_id=config.id or 0,
@@ -133,7 +361,7 @@ class AlertManager:
                     severity=config.severity,
                     message=config.message or f"Step {step_name} exceeded threshold",
                 )
-                self.db_alerts_fired.insert(fire_model)
+                self._fire(fire_model)
                 if config.name in self._alert_hooks:
                     fired_hooks.extend(self._alert_hooks[config.name])
         return fired_hooks
@@ -144,7 +372,8 @@ class AlertManager:
         pipeline_name: str,
         status: str,
         duration_ms: float,
-        db_pipelines: Any,
+        db_pipelines: Any = None,
+        completed_at: Optional[str] = None,
     ) -> List[str]:
         """
         Check and fire pipeline-level alerts.
@@ -154,22 +383,21 @@ class AlertManager:
             pipeline_name: Name of the pipeline.
             status: Execution status.
             duration_ms: Execution duration in milliseconds.
-            db_pipelines: Database accessor for pipeline history.
+            db_pipelines: Unused, kept for backward compatibility.
+            completed_at: ISO completion time of the pipeline.
 
         Returns:
             List of fired hooks (step names).
         """
+        # pylint: disable=unused-argument
+        self.record_pipeline_result(status, completed_at, pipeline_id)
         fired_hooks: List[str] = []
-        configs = self.db_alerts_config.get_by_field(enabled=1)
-
-        for config in configs:
+        for config in self.get_configs():
             metric_value = None
             if config.metric == "pipeline_duration_ms" and duration_ms > 0:
                 metric_value = duration_ms
             elif config.metric == "error_rate" and status == "error":
-                all_p = db_pipelines.get_all()
-                errors = len([p for p in all_p if p.status == "error"])
-                metric_value = (errors / len(all_p) * 100) if all_p else 0
+                metric_value = self.error_rate.rate()
 
             if metric_value is not None and self.evaluate_condition(
                 config.condition, metric_value, config.value
@@ -183,7 +411,7 @@ class AlertManager:
                     severity=config.severity,
                     message=config.message or f"Pipeline {pipeline_name} alert",
                 )
-                self.db_alerts_fired.insert(fire_model)
+                self._fire(fire_model)
                 if config.name in self._alert_hooks:
                     fired_hooks.extend(self._alert_hooks[config.name])
         return fired_hooks
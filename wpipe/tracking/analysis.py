@@ -1,10 +1,21 @@
 """
 Statistical analysis and trend calculation for the dashboard.
+
+Dashboard aggregates are read from the rollups maintained by the tracker
+(see ``RollupManager``), so their cost does not grow with the history.
 """
 
-import math
+import sqlite3
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
+
+from .queries import PIPELINE_SUMMARY_COLUMNS, fetch_rows
+from .rollups import RollupManager
+
+
+def _avg(row: Dict[str, Any]) -> float:
+    """Average successful duration of a rollup row."""
+    return row["duration_sum"] / row["duration_count"] if row["duration_count"] else 0
 
 
 class AnalysisManager:
@@ -16,6 +27,7 @@ class AnalysisManager:
         db_steps: Any,
         db_step_history: Any,
         db_alerts_fired: Any,
+        rollups: Optional[RollupManager] = None,
     ):
         """
         Initialize the AnalysisManager with database accessors.
@@ -25,11 +37,20 @@ class AnalysisManager:
             db_steps: Database accessor for step history.
             db_step_history: Database accessor for detailed step history.
             db_alerts_fired: Database accessor for fired alerts.
+            rollups: Rollup manager the aggregates are read from.
         """
         self.db_pipelines = db_pipelines
         self.db_steps = db_steps
         self.db_step_history = db_step_history
         self.db_alerts_fired = db_alerts_fired
+        self.rollups = rollups or RollupManager(db_pipelines)
+
+    def _rollups(self, entity_type: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        """Read rollup rows, empty if the database cannot be read."""
+        try:
+            return self.rollups.read(entity_type, **kwargs)
+        except (AttributeError, RuntimeError, sqlite3.Error):
+            return []
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -38,41 +59,26 @@ class AnalysisManager:
         Returns:
             Dictionary with aggregated statistics.
         """
-        try:
-            all_p = self.db_pipelines.get_all()
-        except (AttributeError, RuntimeError, ValueError):
-            all_p = []
-
-        total = len(all_p)
-        completed = len([p for p in all_p if p.status == "completed"])
-        errors = len([p for p in all_p if p.status == "error"])
-        running = len([p for p in all_p if p.status == "running"])
-
-        durations = [
-            p.total_duration_ms
-            for p in all_p
-            if p.status == "completed" and p.total_duration_ms
-        ]
-        avg_duration = sum(durations) / len(durations) if durations else 0
-
-        try:
-            all_steps = self.db_steps.get_all()
-        except (AttributeError, RuntimeError, ValueError):
-            all_steps = []
+        pipelines = self._rollups("pipeline")
+        completed = sum(r["success"] for r in pipelines)
+        running = sum(r["running"] for r in pipelines)
+        total = sum(r["runs"] for r in pipelines) + running
+        duration_count = sum(r["duration_count"] for r in pipelines)
+        avg_duration = sum(r["duration_sum"] for r in pipelines) / duration_count if duration_count else 0
 
-        total_steps = len(all_steps)
-        completed_steps = len([s for s in all_steps if s.status == "completed"])
+        steps = self._rollups("step")
+        total_steps = sum(r["runs"] + r["running"] for r in steps)
+        completed_steps = sum(r["success"] for r in steps)
 
         try:
-            fired = self.db_alerts_fired.get_all()
-        except (AttributeError, RuntimeError, ValueError):
-            fired = []
-        unack = len([a for a in fired if getattr(a, "acknowledged", 0) == 0])
+            unack = fetch_rows(self.db_alerts_fired, "SELECT COUNT(*) AS n FROM alerts_fired")[0]["n"]
+        except (AttributeError, RuntimeError, sqlite3.Error):
+            unack = 0
 
         return {
             "total_pipelines": total,
             "completed": completed,
-            "errors": errors,
+            "errors": sum(r["errors"] for r in pipelines),
             "running": running,
             "success_rate": round((completed / total * 100), 1) if total > 0 else 0,
             "avg_duration_ms": round(avg_duration, 2),
@@ -98,42 +104,22 @@ class AnalysisManager:
         Returns:
             A list of daily aggregated data dictionaries.
         """
-        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
-        try:
-            all_p = self.db_pipelines.get_all()
-        except (AttributeError, RuntimeError, ValueError):
-            return []
-
-        filtered = [p for p in all_p if p.started_at and p.started_at >= cutoff]
-        if pipeline_name:
-            filtered = [p for p in filtered if p.name == pipeline_name]
-
+        cutoff = (datetime.now() - timedelta(days=days)).date().isoformat()
         daily: Dict[str, Dict[str, Any]] = {}
-        for p in filtered:
-            date = p.started_at.split("T")[0]
-            if date not in daily:
-                daily[date] = {
-                    "date": date,
-                    "count": 0,
-                    "success": 0,
-                    "errors": 0,
-                    "durations": [],
-                }
-            daily[date]["count"] += 1
-            if p.status == "completed":
-                daily[date]["success"] += 1
-                if p.total_duration_ms:
-                    daily[date]["durations"].append(p.total_duration_ms)
-            elif p.status == "error":
-                daily[date]["errors"] += 1
+        for row in self._rollups("pipeline", day=None, since=cutoff, name=pipeline_name):
+            day = daily.setdefault(
+                row["day"],
+                {"date": row["day"], "count": 0, "success": 0, "errors": 0, "duration_count": 0, "duration_sum": 0},
+            )
+            for key, column in (("count", "runs"), ("success", "success"), ("errors", "errors"),
+                                ("duration_count", "duration_count"), ("duration_sum", "duration_sum")):
+                day[key] += row[column]
 
         result = []
         for date in sorted(daily.keys()):
             day = daily[date]
-            day["avg_duration"] = (
-                sum(day["durations"]) / len(day["durations"]) if day["durations"] else 0
-            )
-            del day["durations"]
+            day["avg_duration"] = _avg(day)
+            del day["duration_count"], day["duration_sum"]
             result.append(day)
         return result
 
@@ -147,35 +133,48 @@ class AnalysisManager:
         Returns:
             A list of step statistics dictionaries.
         """
-        try:
-            all_history = self.db_step_history.get_all()
-        except (AttributeError, RuntimeError, ValueError):
-            return []
-
-        stats: Dict[str, Dict[str, Any]] = {}
-        for h in all_history:
-            if h.status != "completed":
-                continue
-            if h.step_name not in stats:
-                stats[h.step_name] = {
-                    "step_name": h.step_name,
-                    "count": 0,
-                    "total_ms": 0,
-                    "max_ms": 0,
-                }
-            stats[h.step_name]["count"] += 1
-            stats[h.step_name]["total_ms"] += h.duration_ms
-            stats[h.step_name]["max_ms"] = max(
-                stats[h.step_name]["max_ms"], h.duration_ms
-            )
-
-        slow_steps = []
-        for s in stats.values():
-            s["avg_duration_ms"] = s["total_ms"] / s["count"]
-            slow_steps.append(s)
+        slow_steps = [
+            {
+                "step_name": r["entity_name"],
+                "count": r["duration_count"],
+                "total_ms": r["duration_sum"],
+                "max_ms": r["duration_max"],
+                "avg_duration_ms": _avg(r),
+            }
+            for r in self._rollups("step")
+            if r["duration_count"]
+        ]
         slow_steps.sort(key=lambda x: x["avg_duration_ms"], reverse=True)
         return slow_steps[:limit]
 
+    def get_step_durations(self, step_names: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Get the average duration of completed steps, by step name.
+
+        Args:
+            step_names: Optional step names to restrict the result to.
+
+        Returns:
+            Dictionary of average duration in milliseconds by step name.
+        """
+        query = (
+            "SELECT step_name, AVG(duration_ms) FROM step_history "
+            "WHERE status = 'completed' AND duration_ms IS NOT NULL"
+        )
+        params: List[Any] = []
+        if step_names is not None:
+            if not step_names:
+                return {}
+            query += f" AND step_name IN ({', '.join('?' * len(step_names))})"
+            params.extend(step_names)
+        try:
+            rows = self.db_step_history._get_connection().execute(  # pylint: disable=protected-access
+                query + " GROUP BY step_name", params
+            ).fetchall()
+        except (AttributeError, RuntimeError, sqlite3.Error):
+            return {}
+        return {name: float(avg) for name, avg in rows}
+
     def get_states_analysis(self) -> Dict[str, Any]:
         """
         Get comprehensive analysis of all states/steps.
@@ -183,12 +182,19 @@ class AnalysisManager:
         Returns:
             Dictionary with states analysis.
         """
-        try:
-            all_steps = self.db_steps.get_all()
-        except (AttributeError, RuntimeError, ValueError):
-            all_steps = []
+        stats = [
+            {
+                "state_name": r["entity_name"],
+                "execution_count": r["runs"] + r["running"],
+                "total_ms": r["duration_sum"],
+                "error_count": r["errors"],
+                "avg_duration_ms": _avg(r),
+            }
+            for r in self._rollups("step")
+            if r["runs"] + r["running"]
+        ]
 
-        if not all_steps:
+        if not stats:
             return {
                 "total_states": 0,
                 "total_executions": 0,
@@ -198,40 +204,14 @@ class AnalysisManager:
                 "most_errors": [],
             }
 
-        stats: Dict[str, Dict[str, Any]] = {}
-        for s in all_steps:
-            name = s.step_name
-            if name not in stats:
-                stats[name] = {
-                    "state_name": name,
-                    "execution_count": 0,
-                    "total_ms": 0,
-                    "error_count": 0,
-                }
-            stats[name]["execution_count"] += 1
-            if s.status == "error":
-                stats[name]["error_count"] += 1
-            if s.duration_ms:
-                stats[name]["total_ms"] += s.duration_ms
-
-        most_used = sorted(
-            stats.values(), key=lambda x: x["execution_count"], reverse=True
-        )[:20]
-        for item in most_used:
-            item["avg_duration_ms"] = item["total_ms"] / item["execution_count"]
-
+        most_used = sorted(stats, key=lambda x: x["execution_count"], reverse=True)[:20]
         slowest = sorted(
-            [s for s in stats.values() if s["execution_count"] > s["error_count"]],
-            key=lambda x: (x["total_ms"] / (x["execution_count"] - x["error_count"])),
+            [s for s in stats if s["execution_count"] > s["error_count"]],
+            key=lambda x: x["avg_duration_ms"],
             reverse=True,
         )[:15]
-        for item in slowest:
-            item["avg_duration_ms"] = item["total_ms"] / (
-                item["execution_count"] - item["error_count"]
-            )
-
         most_errors = sorted(
-            [s for s in stats.values() if s["error_count"] > 0],
+            [s for s in stats if s["error_count"] > 0],
             key=lambda x: x["error_count"] / x["execution_count"],
             reverse=True,
         )[:15]
@@ -240,8 +220,8 @@ class AnalysisManager:
 
         return {
             "total_states": len(stats),
-            "total_executions": len(all_steps),
-            "total_errors": len([s for s in all_steps if s.status == "error"]),
+            "total_executions": sum(s["execution_count"] for s in stats),
+            "total_errors": sum(s["error_count"] for s in stats),
             "most_used": most_used,
             "slowest": slowest,
             "most_errors": most_errors,
@@ -254,12 +234,20 @@ class AnalysisManager:
         Returns:
             Dictionary with pipelines analysis.
         """
-        try:
-            all_p = self.db_pipelines.get_all()
-        except (AttributeError, RuntimeError, ValueError):
-            all_p = []
+        stats = [
+            {
+                "name": r["entity_name"],
+                "execution_count": r["runs"] + r["running"],
+                "total_ms": r["duration_sum"],
+                "error_count": r["errors"],
+                "avg_duration_ms": _avg(r),
+                "duration_count": r["duration_count"],
+            }
+            for r in self._rollups("pipeline")
+            if r["runs"] + r["running"]
+        ]
 
-        if not all_p:
+        if not stats:
             return {
                 "total_pipelines": 0,
                 "total_runs": 0,
@@ -270,83 +258,72 @@ class AnalysisManager:
                 "recent": [],
             }
 
-        stats: Dict[str, Dict[str, Any]] = {}
-        for p in all_p:
-            if p.name not in stats:
-                stats[p.name] = {
-                    "name": p.name,
-                    "execution_count": 0,
-                    "total_ms": 0,
-                    "error_count": 0,
-                }
-            stats[p.name]["execution_count"] += 1
-            if p.status == "error":
-                stats[p.name]["error_count"] += 1
-            if p.total_duration_ms:
-                stats[p.name]["total_ms"] += p.total_duration_ms
+        duration_count = sum(s.pop("duration_count") for s in stats)
+        avg_dur = sum(s["total_ms"] for s in stats) / duration_count if duration_count else 0
 
         slowest = sorted(
-            [s for s in stats.values() if s["execution_count"] > s["error_count"]],
-            key=lambda x: (x["total_ms"] / (x["execution_count"] - x["error_count"])),
+            [s for s in stats if s["execution_count"] > s["error_count"]],
+            key=lambda x: x["avg_duration_ms"],
             reverse=True,
         )[:10]
-        for item in slowest:
-            item["avg_duration_ms"] = item["total_ms"] / (
-                item["execution_count"] - item["error_count"]
-            )
-
         most_errors = sorted(
-            [s for s in stats.values() if s["error_count"] > 0],
+            [s for s in stats if s["error_count"] > 0],
             key=lambda x: x["error_count"] / x["execution_count"],
             reverse=True,
         )[:10]
         for item in most_errors:
             item["error_rate"] = item["error_count"] / item["execution_count"]
 
-        all_p.sort(key=lambda x: x.started_at or "", reverse=True)
-        recent = []
-        for p in all_p[:10]:
-            try:
-                recent.append(p.model_dump())
-            except (AttributeError, TypeError):
-                continue
-
-        durations = [
-            p.total_duration_ms
-            for p in all_p
-            if p.status == "completed" and p.total_duration_ms
-        ]
-        avg_dur = sum(durations) / len(durations) if durations else 0
+        try:
+            recent = fetch_rows(
+                self.db_pipelines,
+                f"SELECT {', '.join(PIPELINE_SUMMARY_COLUMNS)} FROM pipelines "
+                "ORDER BY started_at DESC, id DESC LIMIT 10",
+            )
+        except (AttributeError, RuntimeError, sqlite3.Error):
+            recent = []
 
         return {
-            "total_pipelines": len(set(p.name for p in all_p)),
-            "total_runs": len(all_p),
+            "total_pipelines": len(stats),
+            "total_runs": sum(s["execution_count"] for s in stats),
             "avg_duration_ms": avg_dur,
-            "total_errors": len([p for p in all_p if p.status == "error"]),
+            "total_errors": sum(s["error_count"] for s in stats),
             "slowest": slowest,
             "most_errors": most_errors,
             "recent": recent,
         }
 
-    def _percentile(self, data: List[float], percentile: int) -> float:
+    def get_percentiles(
+        self,
+        entity_type: str = "step",
+        name: Optional[str] = None,
+        days: Optional[int] = None,
+        quantiles: Sequence[float] = (0.5, 0.95, 0.99),
+    ) -> Dict[str, Dict[str, Any]]:
         """
-        Calculate the percentile of a list of values.
+        Get duration percentiles of successful runs from the rollup sketches.
 
         Args:
-            data: List of values.
-            percentile: Percentile to calculate (0-100).
+            entity_type: "step" or "pipeline".
+            name: Optional filter by step or pipeline name.
+            days: Only runs started in the last days (None for all time).
+            quantiles: Quantiles to compute, between 0 and 1.
 
         Returns:
-            The calculated percentile value.
+            Dictionary by name with the run count and ``p<N>`` values in
+            milliseconds (e.g. ``{"load": {"count": 10, "p50": ..., "p99": ...}}``).
         """
-        if not data:
-            return 0.0
-        data_sorted = sorted(data)
-        index = (len(data_sorted) - 1) * percentile / 100
-        lower = math.floor(index)
-        upper = math.ceil(index)
-        if lower == upper:
-            return data_sorted[int(index)]
-        return data_sorted[int(lower)] * (upper - index) + data_sorted[int(upper)] * (
-            index - lower
-        )
+        since = None
+        if days is not None:
+            since = (datetime.now() - timedelta(days=days)).date().isoformat()
+        try:
+            sketches = self.rollups.sketches(entity_type, name=name, since=since)
+        except (AttributeError, RuntimeError, sqlite3.Error):
+            return {}
+        result = {}
+        for entity_name, sketch in sketches.items():
+            values: Dict[str, Any] = {"count": sketch.count}
+            for q in quantiles:
+                values[f"p{q * 100:g}"] = sketch.quantile(q)
+            result[entity_name] = values
+        return result
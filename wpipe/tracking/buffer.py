@@ -0,0 +1,278 @@
+"""
+Write-behind buffer for step tracking.
+
+In buffered mode PipelineTracker keeps the rows of running steps in memory
+instead of inserting, reloading and updating them one statement at a time.
+Pending rows are written by a background thread in a single transaction
+every ``flush_records`` records or ``flush_interval`` seconds, with one
+``executemany`` per statement kind. A step that starts and completes
+between two flushes costs one insert.
+
+Steps started in buffered mode get a provisional negative id, which the
+tracker accepts wherever a step id is expected (``complete_step``,
+``parent_step_id``). Database ids are assigned at flush time, inside the
+write transaction.
+"""
+
+import atexit
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from wpipe.exception.api_error import logger
+
+# Columns of the steps table written on completion
+_COMPLETION_COLUMNS = (
+    "status", "completed_at", "duration_ms", "output_data", "error_message", "error_traceback",
+)
+
+_live_buffers: "weakref.WeakSet[StepBuffer]" = weakref.WeakSet()
+
+
+class StepBuffer:
+    """
+    In-memory buffer of step rows, flushed in batches by a background thread.
+
+    Attributes:
+        flush_records (int): Number of pending records that triggers a flush.
+        flush_interval (float): Maximum time in seconds a record stays pending.
+    """
+
+    def __init__(
+        self,
+        db_steps: Any,
+        db_step_history: Any,
+        flush_records: int = 500,
+        flush_interval: float = 0.2,
+        rollups: Optional[Any] = None,
+    ) -> None:
+        """
+        Initialize the buffer and start its writer thread.
+
+        Args:
+            db_steps: Database accessor of the steps table.
+            db_step_history: Database accessor of the step_history table.
+            flush_records: Number of pending records that triggers a flush.
+            flush_interval: Maximum time in seconds a record stays pending.
+            rollups: RollupManager whose pending deltas are written in the
+                same transaction as each batch.
+        """
+        self.db_steps = db_steps
+        self.db_step_history = db_step_history
+        self.rollups = rollups
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._next_handle = 0
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._ids: Dict[int, int] = {}
+        self._inserts: List[int] = []
+        self._updates: List[int] = []
+        self._history: List[Dict[str, Any]] = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="wpipe_tracking_buffer", daemon=True)
+        self._thread.start()
+        _live_buffers.add(self)
+
+    def _pending(self) -> int:
+        return len(self._inserts) + len(self._updates) + len(self._history)
+
+    def start(self, row: Dict[str, Any]) -> int:
+        """
+        Buffer the row of a started step.
+
+        Args:
+            row: Column values of the step (without ``id``).
+
+        Returns:
+            int: The provisional (negative) step id.
+        """
+        with self._lock:
+            self._next_handle -= 1
+            handle = self._next_handle
+            self._rows[handle] = row
+            self._inserts.append(handle)
+            if self._pending() >= self.flush_records:
+                self._wake.notify()
+            return handle
+
+    def owns(self, step_id: Any) -> bool:
+        """Check whether a step id is a provisional id of this buffer."""
+        return isinstance(step_id, int) and step_id < 0 and step_id >= self._next_handle
+
+    def get(self, handle: int) -> Optional[Dict[str, Any]]:
+        """
+        Get a copy of a buffered step row.
+
+        Args:
+            handle: The provisional step id.
+
+        Returns:
+            Optional[Dict[str, Any]]: The row, None if it is no longer buffered.
+        """
+        with self._lock:
+            row = self._rows.get(handle)
+            return dict(row) if row is not None else None
+
+    def complete(self, handle: int, values: Dict[str, Any], history: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Buffer the completion of a step.
+
+        Args:
+            handle: The provisional step id.
+            values: Completion column values (status, completed_at, ...).
+            history: The step_history row to insert.
+
+        Returns:
+            Optional[Dict[str, Any]]: The updated step row, None if the handle
+                is unknown.
+        """
+        with self._lock:
+            row = self._rows.get(handle)
+            if row is None:
+                return None
+            row.update(values)
+            # Rows not inserted yet are written once, in their final state
+            if handle not in self._inserts:
+                self._updates.append(handle)
+            self._history.append(history)
+            if self._pending() >= self.flush_records:
+                self._wake.notify()
+            return dict(row)
+
+    def resolve(self, step_id: Any) -> Any:
+        """
+        Get the database id of a step.
+
+        Args:
+            step_id: A provisional or database step id.
+
+        Returns:
+            Any: The database id, None for a provisional id not flushed yet,
+                or ``step_id`` itself if it is not provisional.
+        """
+        if not self.owns(step_id):
+            return step_id
+        with self._lock:
+            return self._ids.get(step_id)
+
+    def flush(self) -> None:
+        """Write every pending record in one transaction."""
+        # pylint: disable=too-many-locals
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending():
+                    return
+                inserts = [(h, dict(self._rows[h])) for h in self._inserts]
+                updates = [(h, dict(self._rows[h])) for h in self._updates]
+                history = self._history
+                self._inserts, self._updates, self._history = [], [], []
+            try:
+                ids = self._write(inserts, updates, history)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning("Tracking flush failed, will retry: %s", e)
+                with self._lock:
+                    self._inserts[:0] = [h for h, _ in inserts]
+                    self._updates[:0] = [h for h, _ in updates]
+                    self._history[:0] = history
+                return
+            with self._lock:
+                self._ids.update(ids)
+                for handle, row in inserts + updates:
+                    if row.get("status") != "running":
+                        self._rows.pop(handle, None)
+                # Provisional ids are only needed while some step may refer to them
+                if not self._rows:
+                    self._ids.clear()
+
+    def _write(
+        self,
+        inserts: List[Tuple[int, Dict[str, Any]]],
+        updates: List[Tuple[int, Dict[str, Any]]],
+        history: List[Dict[str, Any]],
+    ) -> Dict[int, int]:
+        """Write a batch and return the database ids assigned to new rows."""
+        from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+        steps_table = self.db_steps.table_name
+        with _db_lock:
+            conn = self.db_steps._get_connection()  # pylint: disable=protected-access
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            conn.execute("SAVEPOINT wpipe_buffer_flush")
+            try:
+                ids = dict(self._ids)
+                next_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {steps_table}").fetchone()[0]
+                for handle, _ in inserts:
+                    next_id += 1
+                    ids[handle] = next_id
+
+                def parent(row: Dict[str, Any]) -> Any:
+                    value = row.get("parent_step_id")
+                    return ids.get(value) if isinstance(value, int) and value < 0 else value
+
+                if inserts:
+                    columns = list(inserts[0][1])
+                    conn.executemany(
+                        f"INSERT INTO {steps_table} (id, {', '.join(columns)}) "
+                        f"VALUES ({', '.join('?' * (len(columns) + 1))})",
+                        [
+                            (ids[h], *(parent(row) if c == "parent_step_id" else row.get(c) for c in columns))
+                            for h, row in inserts
+                        ],
+                    )
+                if updates:
+                    conn.executemany(
+                        f"UPDATE {steps_table} SET {', '.join(f'{c} = ?' for c in _COMPLETION_COLUMNS)} "
+                        "WHERE id = ?",
+                        [(*(row.get(c) for c in _COMPLETION_COLUMNS), ids[h]) for h, row in updates if h in ids],
+                    )
+                if history:
+                    columns = list(history[0])
+                    conn.executemany(
+                        f"INSERT INTO {self.db_step_history.table_name} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join('?' * len(columns))})",
+                        [tuple(row.get(c) for c in columns) for row in history],
+                    )
+                if self.rollups is not None:
+                    self.rollups.write(conn)
+            except BaseException:
+                conn.execute("ROLLBACK TO wpipe_buffer_flush")
+                conn.execute("RELEASE wpipe_buffer_flush")
+                raise
+            conn.execute("RELEASE wpipe_buffer_flush")
+            conn.commit()
+        return {h: ids[h] for h, _ in inserts}
+
+    def _run(self) -> None:
+        """Writer thread body: flush on size or on the interval."""
+        while True:
+            with self._lock:
+                if not self._closed and self._pending() < self.flush_records:
+                    self._wake.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def close(self) -> None:
+        """Flush pending records and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wake.notify()
+        self._thread.join()
+        self.flush()
+
+
+@atexit.register
+def _flush_live_buffers() -> None:
+    """Flush every buffer at interpreter exit, so a crash loses no finished step."""
+    for buffer in list(_live_buffers):
+        try:
+            buffer.close()
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
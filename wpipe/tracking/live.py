@@ -0,0 +1,275 @@
+"""
+Live updates of a tracking database.
+
+``PipelineTracker`` publishes a small delta to the ``LiveBus`` of its
+database whenever a pipeline or step starts or finishes, an event is added
+or an alert fires. Subscribers (e.g. the dashboard's Server-Sent Events
+stream) receive the deltas instead of polling the tables.
+
+Each ``Subscription`` coalesces pending deltas by entity, so a slow client
+only gets the latest state of every pipeline or step, and holds at most
+``max_pending`` of them: past that it drops them and reports an overflow,
+and the client reloads its views instead.
+
+Writers in other processes are picked up by a ``DatabaseTailer``, which
+polls ``PRAGMA data_version`` and, when something was committed, publishes
+the new rows and the rows that were running and have changed since.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from wpipe.exception.api_error import logger
+
+from .pool import ReadPool
+
+Delta = Dict[str, Any]
+
+# Buses by database path
+_buses: Dict[str, "LiveBus"] = {}
+_buses_lock = threading.Lock()
+
+
+class Subscription:
+    """
+    Pending deltas of one subscriber.
+
+    Attributes:
+        max_pending (int): Maximum number of pending deltas.
+    """
+
+    def __init__(self, bus: "LiveBus", max_pending: int, notify: Optional[Callable[[], None]]) -> None:
+        self.max_pending = max_pending
+        self._bus = bus
+        self._notify = notify
+        self._pending: "OrderedDict[Tuple[str, Any], Delta]" = OrderedDict()
+        self._overflowed = False
+        self._lock = threading.Lock()
+
+    def push(self, delta: Delta) -> None:
+        """Queue a delta, replacing a pending delta of the same entity."""
+        with self._lock:
+            was_empty = not self._pending and not self._overflowed
+            if self._overflowed:
+                return
+            key = (delta["type"], delta["id"])
+            self._pending.pop(key, None)
+            self._pending[key] = delta
+            if len(self._pending) > self.max_pending:
+                self._pending.clear()
+                self._overflowed = True
+        if was_empty and self._notify is not None:
+            try:
+                self._notify()
+            except RuntimeError:
+                # The subscriber's event loop is gone
+                self.close()
+
+    def drain(self) -> Tuple[List[Delta], bool]:
+        """
+        Take the pending deltas.
+
+        Returns:
+            Tuple[List[Delta], bool]: Deltas in publication order, and
+                whether deltas were dropped since the last drain.
+        """
+        with self._lock:
+            deltas, overflowed = list(self._pending.values()), self._overflowed
+            self._pending.clear()
+            self._overflowed = False
+        return deltas, overflowed
+
+    def close(self) -> None:
+        """Stop receiving deltas."""
+        self._bus.unsubscribe(self)
+
+
+class LiveBus:
+    """In-process fan-out of tracking deltas to subscribers."""
+
+    def __init__(self) -> None:
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    @property
+    def has_subscribers(self) -> bool:
+        """Whether anyone listens (publishers skip building deltas otherwise)."""
+        return bool(self._subscriptions)
+
+    def subscribe(self, max_pending: int = 1000, notify: Optional[Callable[[], None]] = None) -> Subscription:
+        """
+        Add a subscriber.
+
+        Args:
+            max_pending: Pending deltas after which the subscriber overflows.
+            notify: Called, from the publishing thread, when deltas become
+                pending.
+
+        Returns:
+            Subscription: The subscriber's queue.
+        """
+        subscription = Subscription(self, max_pending, notify)
+        with self._lock:
+            self._subscriptions = [*self._subscriptions, subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber."""
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+
+    def publish(self, kind: str, entity_id: Any, data: Dict[str, Any]) -> None:
+        """
+        Send a delta to every subscriber.
+
+        Args:
+            kind: "pipeline", "step", "event" or "alert".
+            entity_id: Id of the pipeline, step, event or alert.
+            data: Changed fields.
+        """
+        delta = {"type": kind, "id": entity_id, "data": data}
+        for subscription in self._subscriptions:
+            subscription.push(delta)
+
+
+def get_bus(db_path: str) -> LiveBus:
+    """
+    Get the bus of a database.
+
+    Args:
+        db_path: Path to the SQLite database.
+
+    Returns:
+        LiveBus: The process-wide bus of the database.
+    """
+    with _buses_lock:
+        bus = _buses.get(db_path)
+        if bus is None:
+            bus = _buses[db_path] = LiveBus()
+        return bus
+
+
+# Tailed tables: kind, table, id column, columns of the delta
+_TAILED = {
+    "pipeline": ("pipelines", "rowid", "id, name, status, started_at, completed_at, total_duration_ms, error_message"),
+    "step": (
+        "steps",
+        "id",
+        "id, pipeline_id, step_name, step_order, status, started_at, completed_at, duration_ms, error_message",
+    ),
+    "event": ("events", "id", "id, pipeline_id, step_id, event_type, event_name, message, created_at"),
+    "alert": ("alerts_fired", "id", "id, pipeline_id, metric, metric_value, severity, message, fired_at"),
+}
+
+
+class DatabaseTailer:
+    """
+    Publishes the changes committed by other processes.
+
+    Attributes:
+        interval (float): Seconds between two checks of ``PRAGMA data_version``.
+        batch_size (int): Maximum new rows read per table and check.
+    """
+
+    def __init__(self, pool: ReadPool, bus: LiveBus, interval: float = 1.0, batch_size: int = 500) -> None:
+        """
+        Initialize the tailer.
+
+        Args:
+            pool: Read pool of the database.
+            bus: Bus the changes are published to.
+            interval: Seconds between two checks.
+            batch_size: Maximum new rows read per table and check.
+        """
+        self.pool = pool
+        self.bus = bus
+        self.interval = interval
+        self.batch_size = batch_size
+        self._last_ids: Dict[str, int] = {}
+        self._running: Dict[str, Set[Any]] = {"pipeline": set(), "step": set()}
+        self._version: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _query(self, query: str, params: Tuple[Any, ...] = ()) -> List[Dict[str, Any]]:
+        with self.pool.connection() as conn:
+            cursor = conn.execute(query, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def _start_position(self) -> None:
+        """Skip the existing rows, remembering the ones still running."""
+        self._version = self.pool.data_version()
+        for kind, (table, id_column, _) in _TAILED.items():
+            self._last_ids[kind] = self._query(f"SELECT COALESCE(MAX({id_column}), 0) AS n FROM {table}")[0]["n"]
+        for kind in self._running:
+            table, id_column, _ = _TAILED[kind]
+            self._running[kind] = {
+                row["k"] for row in self._query(f"SELECT {id_column} AS k FROM {table} WHERE status = 'running'")
+            }
+
+    def poll(self) -> int:
+        """
+        Publish what changed since the previous call.
+
+        Returns:
+            int: Number of deltas published.
+        """
+        if not self._last_ids:
+            self._start_position()
+            return 0
+        version = self.pool.data_version()
+        if version == self._version:
+            return 0
+        published = 0
+        caught_up = True
+        for kind, (table, id_column, columns) in _TAILED.items():
+            rows = self._query(
+                f"SELECT {id_column} AS _k, {columns} FROM {table} WHERE {id_column} > ? ORDER BY {id_column} LIMIT ?",
+                (self._last_ids[kind], self.batch_size),
+            )
+            caught_up = caught_up and len(rows) < self.batch_size
+            if kind in self._running and self._running[kind]:
+                keys = list(self._running[kind])
+                rows += self._query(
+                    f"SELECT {id_column} AS _k, {columns} FROM {table} "
+                    f"WHERE {id_column} IN ({', '.join('?' * len(keys))}) AND status != 'running'",
+                    tuple(keys),
+                )
+            for row in rows:
+                key = row.pop("_k")
+                self._last_ids[kind] = max(self._last_ids[kind], key)
+                if kind in self._running:
+                    if row["status"] == "running":
+                        self._running[kind].add(key)
+                    else:
+                        self._running[kind].discard(key)
+                self.bus.publish(kind, row["id"], row)
+                published += 1
+        if caught_up:
+            # Otherwise the next call reads the following batch
+            self._version = version
+        return published
+
+    def start(self) -> None:
+        """Poll in a background thread."""
+        self._stop.clear()
+
+        def loop() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.warning("Tracking database tail failed: %s", e)
+                self._stop.wait(self.interval)
+
+        self._thread = threading.Thread(target=loop, name="wpipe_tracking_tail", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
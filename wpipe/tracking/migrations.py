@@ -0,0 +1,324 @@
+"""
+Versioned schema migrations for the tracking database.
+
+Each migration has a number, a name, the tables it needs and a function
+that must be idempotent. Applied migrations are recorded in the
+``schema_version`` table; ``migrate`` applies the missing ones in order,
+each in its own write transaction, so several processes opening the same
+database apply every migration once. A migration whose tables do not exist
+yet (e.g. checkpoints before the first CheckpointManager) is left pending
+and applied by a later ``migrate``.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from wpipe.exception.api_error import logger
+
+
+class Migration(NamedTuple):
+    """A numbered schema change."""
+
+    version: int
+    name: str
+    tables: Tuple[str, ...]
+    apply: Callable[[Any], None]
+
+
+def _columns(conn: Any, table: str) -> List[str]:
+    return [info[1] for info in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _step_parent_columns(conn: Any) -> None:
+    """Add parent_step_id and parallel_group to step tables created by old versions."""
+    for table in ("steps", "stepmodel"):
+        columns = _columns(conn, table)
+        if not columns:
+            continue
+        if "parent_step_id" not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN parent_step_id INTEGER")
+        if "parallel_group" not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN parallel_group TEXT")
+
+
+def _indexes(*indexes: Tuple[str, str, str]) -> Callable[[Any], None]:
+    """Build a migration function creating ``(name, table, columns)`` indexes."""
+
+    def apply(conn: Any) -> None:
+        for name, table, columns in indexes:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+    return apply
+
+
+class SearchIndex(NamedTuple):
+    """A full-text index over a tracking table."""
+
+    index: str
+    rowid: str
+    columns: Tuple[str, ...]
+    # JSON column of which only the configured keys are indexed
+    payload: Optional[str] = None
+    # Rows indexed even without configured payload keys (None: all of them)
+    condition: Optional[str] = None
+
+
+# Full-text indexes by table. Steps are only indexed when they fail or
+# when keys of their output are configured: indexing every output made
+# each step write several times slower.
+SEARCH_INDEXES = {
+    "pipelines": SearchIndex("pipelines_fts", "rowid", ("name", "error_step", "error_message")),
+    "steps": SearchIndex(
+        "steps_fts",
+        "id",
+        ("step_name", "error_message", "error_traceback"),
+        payload="output_data",
+        condition="{r}.error_message IS NOT NULL OR {r}.error_traceback IS NOT NULL",
+    ),
+    "events": SearchIndex("events_fts", "id", ("event_name", "message", "data")),
+}
+
+_SEARCH_PAYLOAD_KEYS_TABLE = """
+CREATE TABLE IF NOT EXISTS search_payload_keys (
+    table_name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (table_name, path)
+)
+"""
+
+
+def fts5_available(conn: Any) -> bool:
+    """Whether the SQLite library was built with FTS5."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+    except sqlite3.OperationalError:
+        return False
+    conn.execute("DROP TABLE temp._fts5_probe")
+    return True
+
+
+def _index_columns(spec: SearchIndex) -> str:
+    return ", ".join(spec.columns + (("payload",) if spec.payload else ()))
+
+
+def _index_guard(table: str, spec: SearchIndex, r: str) -> Optional[str]:
+    """SQL telling whether row ``r`` may be indexed, or None if all rows are."""
+    if spec.condition is None:
+        return None
+    return f"{spec.condition.format(r=r)} OR EXISTS (SELECT 1 FROM search_payload_keys WHERE table_name = '{table}')"
+
+
+def _index_rows(table: str, spec: SearchIndex, r: str, source: str = "") -> str:
+    """
+    Build the SELECT of the index rows (rowid first) of row alias ``r``.
+
+    Only the configured keys of the payload column are indexed, and rows
+    are skipped unless they match the condition or one of those keys.
+    """
+    values = [f"{r}.{spec.rowid}"] + [f"{r}.{c}" for c in spec.columns]
+    conditions = [f"({spec.condition.format(r=r)})"] if spec.condition else []
+    if spec.payload:
+        payload = (
+            f"(SELECT group_concat(json_extract({r}.{spec.payload}, k.path), ' ') FROM search_payload_keys k "
+            f"WHERE k.table_name = '{table}' AND json_valid({r}.{spec.payload}))"
+        )
+        values.append(payload)
+        conditions.append(f"{payload} IS NOT NULL")
+    where = f" WHERE {' OR '.join(conditions)}" if conditions else ""
+    return f"SELECT {', '.join(values)}{source}{where}"
+
+
+def _rebuild_index(conn: Any, table: str, spec: SearchIndex) -> None:
+    conn.execute(f"DELETE FROM {spec.index}")
+    conn.execute(
+        f"INSERT INTO {spec.index} (rowid, {_index_columns(spec)}) {_index_rows(table, spec, 't', f' FROM {table} t')}"
+    )
+
+
+def _search_indexes(conn: Any) -> None:
+    """
+    Create FTS5 indexes kept up to date by triggers.
+
+    Rows a table's index would skip do not even run its triggers' bodies,
+    so successful steps cost nothing unless output keys are configured
+    (see ``set_search_payload_keys``). Without FTS5 the migration does
+    nothing and search is unavailable.
+    """
+    conn.execute(_SEARCH_PAYLOAD_KEYS_TABLE)
+    if not fts5_available(conn):
+        logger.warning("SQLite has no FTS5: tracking search is disabled")
+        return
+    for table, spec in SEARCH_INDEXES.items():
+        index, cols = spec.index, _index_columns(spec)
+        watched = ", ".join(spec.columns + ((spec.payload,) if spec.payload else ()))
+        new, old = _index_guard(table, spec, "new"), _index_guard(table, spec, "old")
+        conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5({cols}, tokenize='unicode61 remove_diacritics 2')"
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {index}_ai AFTER INSERT ON {table}{f' WHEN {new}' if new else ''} "
+            f"BEGIN INSERT INTO {index} (rowid, {cols}) {_index_rows(table, spec, 'new')}; END"
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {index}_ad AFTER DELETE ON {table}{f' WHEN {old}' if old else ''} "
+            f"BEGIN DELETE FROM {index} WHERE rowid = old.{spec.rowid}; END"
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {index}_au AFTER UPDATE OF {watched} ON {table}"
+            f"{f' WHEN {old} OR {new}' if new else ''} BEGIN "
+            f"DELETE FROM {index} WHERE rowid = old.{spec.rowid}; "
+            f"INSERT INTO {index} (rowid, {cols}) {_index_rows(table, spec, 'new')}; END"
+        )
+        _rebuild_index(conn, table, spec)
+
+
+def set_search_payload_keys(conn: Any, table: str, keys: Sequence[str]) -> bool:
+    """
+    Choose the payload keys of a table indexed for search.
+
+    Changing the keys indexes the whole table again.
+
+    Args:
+        conn: SQLite connection (the change is committed).
+        table: "steps", whose payload is ``output_data``.
+        keys: Top-level keys, or JSON paths starting with ``$``.
+
+    Returns:
+        bool: Whether the keys changed.
+
+    Raises:
+        ValueError: If the table has no payload to index.
+    """
+    spec = SEARCH_INDEXES.get(table)
+    if spec is None or spec.payload is None:
+        raise ValueError(f"Table {table} has no searchable payload")
+    paths = {key if key.startswith("$") else f'$."{key}"' for key in keys}
+    conn.execute(_SEARCH_PAYLOAD_KEYS_TABLE)
+    current = {row[0] for row in conn.execute("SELECT path FROM search_payload_keys WHERE table_name = ?", (table,))}
+    if paths == current:
+        return False
+    conn.execute("DELETE FROM search_payload_keys WHERE table_name = ?", (table,))
+    conn.executemany("INSERT INTO search_payload_keys (table_name, path) VALUES (?, ?)", [(table, p) for p in paths])
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (spec.index,)).fetchone():
+        _rebuild_index(conn, table, spec)
+    conn.commit()
+    return True
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "step_parent_columns", ("steps",), _step_parent_columns),
+    Migration(
+        2,
+        "tracking_indexes",
+        ("pipelines", "steps", "step_history", "events", "system_metrics", "alerts_fired"),
+        _indexes(
+            ("idx_pipelines_started_at", "pipelines", "started_at"),
+            ("idx_pipelines_name_started_at", "pipelines", "name, started_at"),
+            ("idx_pipelines_status_completed_at", "pipelines", "status, completed_at"),
+            ("idx_steps_pipeline_id", "steps", "pipeline_id, step_order"),
+            ("idx_steps_parent_step_id", "steps", "parent_step_id"),
+            ("idx_step_history_step_name", "step_history", "step_name, status, duration_ms"),
+            ("idx_events_pipeline_id", "events", "pipeline_id, created_at"),
+            ("idx_system_metrics_pipeline_id", "system_metrics", "pipeline_id, recorded_at"),
+            ("idx_alerts_fired_fired_at", "alerts_fired", "fired_at"),
+        ),
+    ),
+    Migration(
+        3,
+        "checkpoint_indexes",
+        ("checkpointmodel",),
+        _indexes(("idx_checkpoints_pipeline_step", "checkpointmodel", "pipeline_id, step_order")),
+    ),
+    Migration(4, "search_indexes", ("pipelines", "steps", "events"), _search_indexes),
+]
+
+_SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TEXT NOT NULL
+)
+"""
+
+# Tables still needed by pending migrations, by database path
+_missing_tables: Dict[str, Set[str]] = {}
+_lock = threading.Lock()
+
+
+def applied_versions(conn: Any) -> Dict[int, str]:
+    """
+    Get the migrations applied to a database.
+
+    Args:
+        conn: SQLite connection.
+
+    Returns:
+        Dict[int, str]: Migration name by version.
+    """
+    conn.execute(_SCHEMA_VERSION_TABLE)
+    return dict(conn.execute("SELECT version, name FROM schema_version"))
+
+
+def migrate(conn: Any, migrations: List[Migration] = MIGRATIONS) -> List[int]:
+    """
+    Apply the pending migrations whose tables exist.
+
+    Args:
+        conn: SQLite connection (any open transaction is committed first).
+        migrations: Migrations to consider, in order.
+
+    Returns:
+        List[int]: Versions applied by this call.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    applied: List[int] = []
+    for migration in migrations:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if migration.version in applied_versions(conn) or not tables.issuperset(migration.tables):
+                conn.rollback()
+                continue
+            migration.apply(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                (migration.version, migration.name, datetime.now().isoformat()),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(migration.version)
+    return applied
+
+
+def ensure_schema(db: Any) -> None:
+    """
+    Migrate the database of a table accessor.
+
+    The migrations run once per process and path, and again only when the
+    accessor's table is one a pending migration was waiting for.
+
+    Args:
+        db: Database accessor of any table of the tracking database.
+    """
+    from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+    path = db.db_path
+    with _lock:
+        if path in _missing_tables and db.table_name not in _missing_tables[path]:
+            return
+        with _db_lock:
+            conn = db._get_connection()  # pylint: disable=protected-access
+            try:
+                migrate(conn)
+                applied = applied_versions(conn)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning("Tracking database migration failed: %s", e)
+                return
+        _missing_tables[path] = {
+            table for m in MIGRATIONS if m.version not in applied for table in m.tables
+        }
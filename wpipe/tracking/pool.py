@@ -0,0 +1,134 @@
+"""
+Pool of read-only connections to a tracking database.
+
+The tracker reads through one shared connection guarded by a process-wide
+lock, which serializes every query. A read-mostly process such as the
+dashboard registers a ``ReadPool`` for its database instead: ``fetch_rows``
+then runs each query on a read-only WAL connection of the pool, so
+concurrent requests read in parallel and never wait for writers. Pooled
+readers only see committed data.
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# Registered pools, by database path
+_pools: Dict[str, "ReadPool"] = {}
+
+
+class ReadPool:
+    """
+    Read-only SQLite connections, opened on demand up to ``size``.
+
+    Attributes:
+        db_path (str): Path to the SQLite database.
+        size (int): Maximum number of open connections.
+    """
+
+    def __init__(self, db_path: str, size: int = 4, timeout: float = 30.0) -> None:
+        """
+        Initialize the pool.
+
+        Args:
+            db_path: Path to the SQLite database (it must exist).
+            size: Maximum number of open connections.
+            timeout: Seconds to wait for a free connection.
+        """
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._version_conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False, timeout=self.timeout
+        )
+        conn.execute("PRAGMA query_only=1")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a connection for the duration of a ``with`` block.
+
+        Yields:
+            sqlite3.Connection: A read-only connection.
+        """
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    conn = self._connect()
+                except BaseException:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._idle.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def data_version(self) -> int:
+        """
+        Get a number that changes whenever another connection commits.
+
+        Returns:
+            int: ``PRAGMA data_version`` of the pool's version connection.
+        """
+        with self._lock:
+            if self._version_conn is None:
+                self._version_conn = self._connect()
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the idle connections and unregister the pool."""
+        if _pools.get(self.db_path) is self:
+            del _pools[self.db_path]
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+            self._opened = 0
+
+
+def register_pool(pool: ReadPool) -> None:
+    """
+    Route the reads of ``fetch_rows`` on the pool's database to the pool.
+
+    Args:
+        pool: The read pool.
+    """
+    _pools[pool.db_path] = pool
+
+
+def get_pool(db_path: Optional[str]) -> Optional[ReadPool]:
+    """
+    Get the read pool registered for a database.
+
+    Args:
+        db_path: Path to the SQLite database.
+
+    Returns:
+        The registered pool, or None.
+    """
+    return _pools.get(db_path) if db_path is not None else None
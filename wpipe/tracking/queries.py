@@ -1,9 +1,74 @@
 """
 Data query module for pipeline and event retrieval.
+
+List queries filter, sort and paginate in SQL, so their cost depends on
+the page size rather than on the size of the history. Pages can be read
+by offset or, for deep pagination, by keyset: pass the sort value and id
+of the last row of the previous page as ``before``.
 """
 
 import json
-from typing import Any, Dict, List, Optional
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from wpipe.sqlite.tables_dto.tracker_models import PipelineModel, StepModel
+
+from .migrations import SEARCH_INDEXES
+from .pool import get_pool
+
+# Pipeline columns holding large JSON payloads, only read on request
+_PAYLOAD_COLUMNS = ("input_data", "output_data")
+PIPELINE_SUMMARY_COLUMNS = [c for c in PipelineModel.model_fields if c not in _PAYLOAD_COLUMNS]
+# Step columns only read one step at a time, by get_step
+_STEP_PAYLOAD_COLUMNS = ("input_data", "output_data", "error_traceback")
+STEP_SUMMARY_COLUMNS = [c for c in StepModel.model_fields if c not in _STEP_PAYLOAD_COLUMNS]
+
+# Searchable kinds: table, pipeline id column, title column, time column
+_SEARCH_KINDS = {
+    "pipeline": ("pipelines", "id", "name", "started_at"),
+    "step": ("steps", "pipeline_id", "step_name", "started_at"),
+    "event": ("events", "pipeline_id", "event_name", "created_at"),
+}
+
+# Tables of the dashboard data view
+_DATA_TABLES = ("pipelines", "steps", "events", "alerts_fired", "alerts_config", "step_history", "system_metrics")
+_STATUS_TABLES = ("pipelines", "steps", "step_history")
+
+
+def _fts_query(text: str) -> str:
+    """Turn user text into an FTS5 query: all words, the last one as a prefix."""
+    words = re.findall(r"\w+", text)
+    if not words:
+        return ""
+    return " ".join(f'"{w}"' for w in words) + "*"
+
+
+def fetch_rows(db: Any, query: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+    """
+    Run a read query on the shared connection of a table accessor, or on a
+    connection of the read pool registered for its database.
+
+    Args:
+        db: Database accessor of any table of the tracking database.
+        query: SQL query.
+        params: Query parameters.
+
+    Returns:
+        List of rows as dictionaries.
+    """
+    from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+    pool = get_pool(getattr(db, "db_path", None))
+    if pool is not None:
+        with pool.connection() as conn:
+            cursor = conn.execute(query, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    with _db_lock:
+        cursor = db._get_connection().execute(query, params)  # pylint: disable=protected-access
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 
 class QueryManager:
@@ -33,6 +98,46 @@ class QueryManager:
         self.db_alerts_fired = db_alerts_fired
         self.db_events = db_events
 
+    @staticmethod
+    def _page(
+        db: Any,
+        columns: Sequence[str],
+        filters: Dict[str, Any],
+        order_by: str,
+        limit: int,
+        offset: int = 0,
+        before: Optional[Tuple[Any, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Read one page of a table, newest first.
+
+        Args:
+            db: Database accessor of the table.
+            columns: Columns to read.
+            filters: Equality filters (None values are ignored).
+            order_by: Column the page is sorted on, descending (ties by id).
+            limit: Maximum number of rows.
+            offset: Number of rows to skip.
+            before: ``(order_by value, id)`` of the last row of the previous
+                page, for keyset pagination.
+
+        Returns:
+            List of rows as dictionaries.
+        """
+        where, params = [], []
+        for column, value in filters.items():
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if before is not None:
+            where.append(f"({order_by} < ? OR ({order_by} = ? AND id < ?))")
+            params.extend([before[0], before[0], before[1]])
+        query = f"SELECT {', '.join(columns)} FROM {db.table_name}"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += f" ORDER BY {order_by} DESC, id DESC LIMIT ? OFFSET ?"
+        return fetch_rows(db, query, [*params, limit, offset])
+
     @staticmethod
     def _parse_json_fields(data: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
         """
@@ -55,106 +160,146 @@ class QueryManager:
         return data
 
     def get_pipelines(
-        self, limit: int = 50, offset: int = 0, status: Optional[str] = None
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        status: Optional[str] = None,
+        name: Optional[str] = None,
+        before: Optional[Tuple[str, str]] = None,
+        include_data: bool = False,
     ) -> List[Dict[str, Any]]:
         """
-        Get list of pipelines for the dashboard.
+        Get list of pipelines for the dashboard, most recent first.
 
         Args:
             limit: Maximum number of pipelines to return.
             offset: Number of pipelines to skip.
             status: Filter by pipeline status.
+            name: Filter by pipeline name.
+            before: ``(started_at, id)`` of the last pipeline of the previous
+                page; only older pipelines are returned.
+            include_data: Also return the (parsed) input and output data.
 
         Returns:
             A list of pipeline data dictionaries.
         """
+        columns = ["*"] if include_data else PIPELINE_SUMMARY_COLUMNS
         try:
-            all_pipelines = self.db_pipelines.get_all()
-        except (AttributeError, RuntimeError, ValueError):
+            rows = self._page(
+                self.db_pipelines, columns, {"status": status, "name": name}, "started_at", limit, offset, before
+            )
+        except (AttributeError, sqlite3.Error):
             return []
+        if include_data:
+            for row in rows:
+                self._parse_json_fields(row, list(_PAYLOAD_COLUMNS))
+        return rows
 
-        all_pipelines.sort(key=lambda x: x.started_at or "", reverse=True)
-
-        if status:
-            all_pipelines = [p for p in all_pipelines if p.status == status]
-
-        paged = all_pipelines[offset : offset + limit]
-
-        result = []
-        for p in paged:
-            try:
-                d = p.model_dump()
-                self._parse_json_fields(d, ["input_data", "output_data"])
-                result.append(d)
-            except (AttributeError, TypeError):
-                continue
-        return result
-
-    def get_pipeline(self, pipeline_id: str) -> Optional[Dict[str, Any]]:
+    def get_pipeline(self, pipeline_id: str, include_data: bool = True) -> Optional[Dict[str, Any]]:
         """
         Get detailed pipeline data including steps.
 
+        Without ``include_data`` the steps are a summary projection: their
+        payloads stay in the database (``has_input``, ``has_output`` and
+        ``has_traceback`` tell whether there is one, ``get_step`` reads it)
+        and only the branch taken and expression of condition steps are
+        extracted from the output.
+
         Args:
             pipeline_id: Unique identifier for the pipeline.
+            include_data: Also return the payloads of the pipeline and steps.
 
         Returns:
             Dictionary with pipeline and steps data, or None if not found.
         """
+        columns = "*" if include_data else ", ".join(PIPELINE_SUMMARY_COLUMNS)
         try:
-            pipelines = self.db_pipelines.get_by_field(id=pipeline_id)
-        except (AttributeError, RuntimeError, ValueError):
+            pipelines = fetch_rows(self.db_pipelines, f"SELECT {columns} FROM pipelines WHERE id = ?", (pipeline_id,))
+        except (AttributeError, sqlite3.Error):
             return None
 
         if not pipelines:
             return None
 
+        pipeline = self._parse_json_fields(pipelines[0], ["input_data", "output_data"])
+
+        if include_data:
+            query = "SELECT * FROM steps WHERE pipeline_id = ? ORDER BY step_order, id"
+        else:
+            query = (
+                f"SELECT {', '.join(STEP_SUMMARY_COLUMNS)}, "
+                "input_data IS NOT NULL AS has_input, output_data IS NOT NULL AS has_output, "
+                "error_traceback IS NOT NULL AS has_traceback, "
+                "CASE WHEN step_type = 'condition' AND json_valid(output_data) "
+                "THEN json_extract(output_data, '$.branch_taken') END AS branch_taken, "
+                "CASE WHEN step_type = 'condition' AND json_valid(output_data) "
+                "THEN json_extract(output_data, '$.expression') END AS expression "
+                "FROM steps WHERE pipeline_id = ? ORDER BY step_order, id"
+            )
         try:
-            pipeline = pipelines[0].model_dump()
-        except (AttributeError, IndexError):
-            return None
+            steps = fetch_rows(self.db_steps, query, (pipeline_id,))
+        except (AttributeError, sqlite3.Error):
+            steps = []
 
-        self._parse_json_fields(pipeline, ["input_data", "output_data"])
+        if include_data:
+            pipeline["steps"] = [self._parse_json_fields(sd, ["input_data", "output_data"]) for sd in steps]
+        else:
+            for step in steps:
+                for flag in ("has_input", "has_output", "has_traceback"):
+                    step[flag] = bool(step[flag])
+            pipeline["steps"] = steps
+        return pipeline
 
-        try:
-            steps = self.db_steps.get_by_field(pipeline_id=pipeline_id)
-            steps.sort(key=lambda x: x.step_order)
-        except (AttributeError, RuntimeError, ValueError):
-            steps = []
+    def get_step(self, step_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get one step with its payloads.
 
-        pipeline["steps"] = []
-        for s in steps:
-            try:
-                sd = s.model_dump()
-                self._parse_json_fields(sd, ["input_data", "output_data"])
-                pipeline["steps"].append(sd)
-            except (AttributeError, TypeError):
-                continue
+        Args:
+            step_id: Id of the step.
 
-        return pipeline
+        Returns:
+            Dictionary with the step data, or None if not found.
+        """
+        try:
+            steps = fetch_rows(self.db_steps, "SELECT * FROM steps WHERE id = ?", (step_id,))
+        except (AttributeError, sqlite3.Error):
+            return None
+        return self._parse_json_fields(steps[0], ["input_data", "output_data"]) if steps else None
 
     def get_pipeline_executions(
-        self, name: str, limit: int = 100, offset: int = 0
+        self,
+        name: str,
+        limit: int = 100,
+        offset: int = 0,
+        before: Optional[Tuple[str, str]] = None,
+        include_data: bool = False,
     ) -> List[Dict[str, Any]]:
         """
-        Get all executions of a pipeline by name.
+        Get all executions of a pipeline by name, most recent first.
 
         Args:
             name: Name of the pipeline.
             limit: Maximum number of executions to return.
             offset: Number of executions to skip.
+            before: ``(started_at, id)`` of the last execution of the
+                previous page, for keyset pagination.
+            include_data: Also return the input and output data.
 
         Returns:
             A list of pipeline execution data dictionaries.
         """
+        columns = ["*"] if include_data else PIPELINE_SUMMARY_COLUMNS
         try:
-            all_p = self.db_pipelines.get_by_field(name=name)
-            all_p.sort(key=lambda x: x.started_at or "", reverse=True)
-            return [p.model_dump() for p in all_p[offset : offset + limit]]
-        except (AttributeError, RuntimeError, ValueError):
+            return self._page(self.db_pipelines, columns, {"name": name}, "started_at", limit, offset, before)
+        except (AttributeError, sqlite3.Error):
             return []
 
     def get_fired_alerts(
-        self, limit: int = 50, severity: Optional[str] = None
+        self,
+        limit: int = 50,
+        severity: Optional[str] = None,
+        offset: int = 0,
+        before: Optional[Tuple[str, int]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Get recent fired alerts.
@@ -162,17 +307,17 @@ class QueryManager:
         Args:
             limit: Maximum number of alerts to return.
             severity: Filter by alert severity.
+            offset: Number of alerts to skip.
+            before: ``(fired_at, id)`` of the last alert of the previous page.
 
         Returns:
             A list of fired alert data dictionaries.
         """
         try:
-            alerts = self.db_alerts_fired.get_all()
-            alerts.sort(key=lambda x: x.fired_at or "", reverse=True)
-            if severity:
-                alerts = [a for a in alerts if a.severity == severity]
-            return [a.model_dump() for a in alerts[:limit]]
-        except (AttributeError, RuntimeError, ValueError):
+            return self._page(
+                self.db_alerts_fired, ["*"], {"severity": severity}, "fired_at", limit, offset, before
+            )
+        except (AttributeError, sqlite3.Error):
             return []
 
     def get_alert_thresholds(self) -> List[Dict[str, Any]]:
@@ -183,30 +328,161 @@ class QueryManager:
             A list of alert configuration dictionaries.
         """
         try:
-            return [c.model_dump() for c in self.db_alerts_config.get_all()]
-        except (AttributeError, RuntimeError, ValueError):
+            return fetch_rows(self.db_alerts_config, "SELECT * FROM alerts_config ORDER BY id")
+        except (AttributeError, sqlite3.Error):
             return []
 
     def get_events(
-        self, pipeline_id: Optional[str] = None, limit: int = 50
+        self,
+        pipeline_id: Optional[str] = None,
+        limit: int = 50,
+        event_type: Optional[str] = None,
+        offset: int = 0,
+        before: Optional[Tuple[str, int]] = None,
     ) -> List[Dict[str, Any]]:
         """
-        Get pipeline events.
+        Get pipeline events, most recent first.
 
         Args:
             pipeline_id: Optional filter by pipeline ID.
             limit: Maximum number of events to return.
+            event_type: Optional filter by event type.
+            offset: Number of events to skip.
+            before: ``(created_at, id)`` of the last event of the previous page.
 
         Returns:
             A list of event data dictionaries.
         """
         try:
-            events = (
-                self.db_events.get_by_field(pipeline_id=pipeline_id)
-                if pipeline_id
-                else self.db_events.get_all()
+            return self._page(
+                self.db_events,
+                ["*"],
+                {"pipeline_id": pipeline_id, "event_type": event_type},
+                "created_at",
+                limit,
+                offset,
+                before,
+            )
+        except (AttributeError, sqlite3.Error):
+            return []
+
+    def search(
+        self,
+        text: str,
+        kinds: Optional[Sequence[str]] = None,
+        pipeline_id: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search over pipelines, steps and events, best matches first.
+
+        Pipeline names and errors, failed steps (plus the output keys chosen
+        with ``set_search_output_keys``), and event names, messages and data
+        are indexed. Every word of
+        ``text`` must match; the last one also matches as a prefix.
+
+        Args:
+            text: Words to search for.
+            kinds: Restrict to some of "pipeline", "step" and "event".
+            pipeline_id: Only results of this pipeline.
+            limit: Maximum number of results.
+            offset: Number of results to skip.
+
+        Returns:
+            A list of ``{"kind", "id", "pipeline_id", "title", "snippet",
+            "score", "at"}`` dictionaries (lower scores rank higher).
+
+        Raises:
+            ValueError: If a kind is unknown.
+        """
+        unknown = set(kinds or ()) - set(_SEARCH_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown search kinds: {sorted(unknown)}")
+        match = _fts_query(text)
+        if not match:
+            return []
+        selects, params = [], []
+        for kind in kinds or _SEARCH_KINDS:
+            table, pipeline_column, title, at = _SEARCH_KINDS[kind]
+            index, rowid = SEARCH_INDEXES[table].index, SEARCH_INDEXES[table].rowid
+            where = f"{index} MATCH ?"
+            params.append(match)
+            if pipeline_id is not None:
+                where += f" AND rowid IN (SELECT {rowid} FROM {table} WHERE {pipeline_column} = ?)"
+                params.append(pipeline_id)
+            params.append(limit + offset)
+            selects.append(
+                f"SELECT '{kind}' AS kind, t.id AS id, t.{pipeline_column} AS pipeline_id, t.{title} AS title, "
+                f"m.snippet AS snippet, m.score AS score, t.{at} AS at FROM ("
+                f"SELECT rowid AS r, rank AS score, snippet({index}, -1, '[', ']', '…', 16) AS snippet "
+                f"FROM {index} WHERE {where} ORDER BY rank LIMIT ?"
+                f") m JOIN {table} t ON t.{rowid} = m.r"
             )
-            events.sort(key=lambda x: x.created_at or "", reverse=True)
-            return [e.model_dump() for e in events[:limit]]
-        except (AttributeError, RuntimeError, ValueError):
+        query = " UNION ALL ".join(selects) + " ORDER BY score LIMIT ? OFFSET ?"
+        try:
+            return fetch_rows(self.db_pipelines, query, [*params, limit, offset])
+        except (AttributeError, sqlite3.Error):
             return []
+
+    def get_table_data(
+        self,
+        table: str,
+        page: int = 1,
+        page_size: int = 20,
+        search: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get a page of rows of a tracking table, for the dashboard data view.
+
+        Args:
+            table: Table name.
+            page: Page number, from 1.
+            page_size: Rows per page.
+            search: Full-text search (pipelines, steps and events only);
+                matches are sorted best first instead of newest first.
+            status: Filter by status (tables with a status column).
+
+        Returns:
+            Dictionary with ``items``, ``total``, ``page``, ``page_size`` and
+            ``total_pages``.
+
+        Raises:
+            ValueError: If the table is unknown or cannot be searched.
+        """
+        if table not in _DATA_TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        if search and table not in SEARCH_INDEXES:
+            raise ValueError(f"Table {table} has no search index")
+        rowid = SEARCH_INDEXES[table].rowid if table in SEARCH_INDEXES else "rowid"
+        columns = [f"t.{c}" for c in PIPELINE_SUMMARY_COLUMNS] if table == "pipelines" else ["t.*"]
+        source, where, params = f"{table} t", [], []
+        order = f"t.{rowid} DESC"
+        match = _fts_query(search) if search else None
+        if match:
+            index = SEARCH_INDEXES[table].index
+            source += f" JOIN (SELECT rowid AS r, rank FROM {index} WHERE {index} MATCH ?) m ON m.r = t.{rowid}"
+            params.append(match)
+            order = "m.rank"
+        if status and table in _STATUS_TABLES:
+            where.append("t.status = ?")
+            params.append(status)
+        condition = f" WHERE {' AND '.join(where)}" if where else ""
+        page = max(page, 1)
+        try:
+            total = fetch_rows(self.db_pipelines, f"SELECT COUNT(*) AS n FROM {source}{condition}", params)[0]["n"]
+            items = fetch_rows(
+                self.db_pipelines,
+                f"SELECT {', '.join(columns)} FROM {source}{condition} ORDER BY {order} LIMIT ? OFFSET ?",
+                [*params, page_size, (page - 1) * page_size],
+            )
+        except (AttributeError, sqlite3.Error):
+            total, items = 0, []
+        return {
+            "items": items,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total + page_size - 1) // page_size,
+        }
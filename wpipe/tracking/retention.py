@@ -0,0 +1,405 @@
+"""
+Retention, downsampling and archival of tracking data.
+
+A ``RetentionPolicy`` says how long the rows of a table are kept, and
+whether expired rows are deleted or only have their large payload columns
+cleared. ``RetentionManager.run_once`` applies the policies in bounded
+batches: each batch is written to a gzip-compressed NDJSON archive (when
+an archive directory is set), then deleted or cleared in its own short
+transaction, so other writers are never blocked for long. Old
+``system_metrics`` samples are first downsampled into coarser buckets.
+Freed pages are returned to the file system by incremental vacuum once
+``enable_incremental_vacuum`` has been called on the database.
+
+Rollups (see ``RollupManager``) are not touched: dashboard aggregates keep
+covering the deleted history.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from wpipe.exception.api_error import logger
+
+# Column holding the time of a row, by table
+TIME_COLUMNS = {
+    "pipelines": "started_at",
+    "steps": "started_at",
+    "step_history": "recorded_at",
+    "events": "created_at",
+    "system_metrics": "recorded_at",
+    "alerts_fired": "fired_at",
+    "cache_stats": "recorded_at",
+}
+
+# Tables holding rows of a pipeline, deleted with it
+PIPELINE_CHILD_TABLES = (
+    "steps", "step_history", "events", "system_metrics", "alerts_fired", "cache_stats", "checkpointmodel",
+)
+
+_SYSTEM_METRICS_AGGREGATES = {
+    "cpu_percent": "AVG",
+    "memory_percent": "AVG",
+    "memory_used_mb": "AVG",
+    "memory_available_mb": "AVG",
+    # Cumulative counters: keep the last value of the bucket
+    "disk_io_read_mb": "MAX",
+    "disk_io_write_mb": "MAX",
+}
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch(timestamp: datetime) -> int:
+    """Seconds of a naive timestamp, read as UTC like SQLite's ``strftime('%s')``."""
+    return int((timestamp - _EPOCH).total_seconds())
+
+
+def _from_epoch(seconds: int) -> str:
+    return (_EPOCH + timedelta(seconds=seconds)).isoformat()
+
+
+class RetentionPolicy(NamedTuple):
+    """
+    How long the rows of a table are kept.
+
+    Attributes:
+        table: Table name (a key of ``TIME_COLUMNS``).
+        max_age_hours: Age after which rows expire.
+        clear_columns: If set, expired rows are kept and only these columns
+            are set to NULL (e.g. the JSON payloads of ``steps``).
+    """
+
+    table: str
+    max_age_hours: float
+    clear_columns: Optional[Tuple[str, ...]] = None
+
+
+def delete_pipelines(conn: Any, pipeline_ids: Sequence[str]) -> int:
+    """
+    Delete pipelines and every row that belongs to them, in one transaction.
+
+    Args:
+        conn: SQLite connection of the tracking database.
+        pipeline_ids: Ids of the pipelines to delete.
+
+    Returns:
+        int: Number of pipelines deleted.
+    """
+    if not pipeline_ids:
+        return 0
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    marks = ", ".join("?" * len(pipeline_ids))
+    ids = list(pipeline_ids)
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        for table in PIPELINE_CHILD_TABLES:
+            if table in tables:
+                conn.execute(f"DELETE FROM {table} WHERE pipeline_id IN ({marks})", ids)
+        if "pipeline_relations" in tables:
+            conn.execute(
+                f"DELETE FROM pipeline_relations WHERE parent_pipeline_id IN ({marks}) "
+                f"OR child_pipeline_id IN ({marks})",
+                ids + ids,
+            )
+        deleted = conn.execute(f"DELETE FROM pipelines WHERE id IN ({marks})", ids).rowcount
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    return deleted
+
+
+class RetentionManager:
+    """
+    Applies retention policies to a tracking database.
+
+    Attributes:
+        policies (List[RetentionPolicy]): Policies applied by ``run_once``.
+        archive_dir (Optional[str]): Directory of the archives, None to
+            delete without archiving.
+        batch_size (int): Rows handled per transaction.
+        downsample_after_hours (Optional[float]): Age after which
+            ``system_metrics`` samples are downsampled, None to keep them.
+        bucket_seconds (int): Width of a downsampled ``system_metrics`` bucket.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        db: Any,
+        policies: Iterable[RetentionPolicy] = (),
+        archive_dir: Optional[str] = None,
+        batch_size: int = 5000,
+        downsample_after_hours: Optional[float] = None,
+        bucket_seconds: int = 300,
+        pause_seconds: float = 0.05,
+    ) -> None:
+        """
+        Initialize the manager.
+
+        Args:
+            db: Database accessor of any table of the tracking database.
+            policies: Retention policies.
+            archive_dir: Directory where expired rows are archived.
+            batch_size: Rows handled per transaction.
+            downsample_after_hours: Age after which system metrics are downsampled.
+            bucket_seconds: Width of a downsampled system metrics bucket.
+            pause_seconds: Pause between two batches, letting other writers in.
+        """
+        self.db = db
+        self.policies = list(policies)
+        for policy in self.policies:
+            if policy.table not in TIME_COLUMNS:
+                raise ValueError(f"No retention support for table {policy.table}")
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+        self.downsample_after_hours = downsample_after_hours
+        self.bucket_seconds = bucket_seconds
+        self.pause_seconds = pause_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self, query: str, params: Sequence[Any] = (), many: bool = False) -> Any:
+        """Run one write statement in its own transaction on the shared connection."""
+        from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+        with _db_lock:
+            conn = self.db._get_connection()  # pylint: disable=protected-access
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = conn.executemany(query, params) if many else conn.execute(query, params)
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+            return cursor
+
+    def _select(self, query: str, params: Sequence[Any] = ()) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+        with _db_lock:
+            cursor = self.db._get_connection().execute(query, params)  # pylint: disable=protected-access
+            return [c[0] for c in cursor.description], cursor.fetchall()
+
+    def _archive(self, table: str, columns: List[str], rows: List[Tuple[Any, ...]]) -> None:
+        """Append rows to the table's archive of today (one gzip member per batch)."""
+        if self.archive_dir is None or not rows:
+            return
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"{table}-{datetime.now():%Y-%m-%d}.ndjson.gz")
+        lines = "".join(json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows)
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            f.write(lines)
+
+    def _archive_children(self, pipeline_ids: List[str]) -> None:
+        """Archive the rows ``delete_pipelines`` removes along with the pipelines."""
+        if self.archive_dir is None:
+            return
+        _, tables = self._select("SELECT name FROM sqlite_master WHERE type = 'table'")
+        existing = {row[0] for row in tables}
+        marks = ", ".join("?" * len(pipeline_ids))
+        for table in PIPELINE_CHILD_TABLES:
+            if table in existing:
+                self._archive(table, *self._select(
+                    f"SELECT * FROM {table} WHERE pipeline_id IN ({marks})", pipeline_ids
+                ))
+        if "pipeline_relations" in existing:
+            self._archive("pipeline_relations", *self._select(
+                f"SELECT * FROM pipeline_relations WHERE parent_pipeline_id IN ({marks}) "
+                f"OR child_pipeline_id IN ({marks})",
+                pipeline_ids + pipeline_ids,
+            ))
+
+    def expire(self, policy: RetentionPolicy) -> int:
+        """
+        Apply one policy in batches.
+
+        Args:
+            policy: The retention policy.
+
+        Returns:
+            int: Number of rows deleted or cleared.
+        """
+        time_column = TIME_COLUMNS[policy.table]
+        cutoff = (datetime.now() - timedelta(hours=policy.max_age_hours)).isoformat()
+        where = f"{time_column} < ?"
+        if policy.clear_columns:
+            where += " AND (" + " OR ".join(f"{c} IS NOT NULL" for c in policy.clear_columns) + ")"
+            columns = "id, " + ", ".join(policy.clear_columns)
+        else:
+            columns = "*"
+        total = 0
+        while not self._stop.is_set():
+            names, rows = self._select(
+                f"SELECT {columns} FROM {policy.table} WHERE {where} LIMIT ?", (cutoff, self.batch_size)
+            )
+            if not rows:
+                break
+            self._archive(policy.table, names, rows)
+            ids = [row[names.index("id")] for row in rows]
+            if policy.table == "pipelines" and not policy.clear_columns:
+                from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+                # Children are archived under the same lock as the delete, so none slips in between
+                with _db_lock:
+                    self._archive_children(ids)
+                    delete_pipelines(self.db._get_connection(), ids)  # pylint: disable=protected-access
+            elif policy.clear_columns:
+                assignments = ", ".join(f"{c} = NULL" for c in policy.clear_columns)
+                self._run(f"UPDATE {policy.table} SET {assignments} WHERE id = ?", [(i,) for i in ids], many=True)
+            else:
+                self._run(f"DELETE FROM {policy.table} WHERE id = ?", [(i,) for i in ids], many=True)
+            total += len(rows)
+            if len(rows) < self.batch_size:
+                break
+            time.sleep(self.pause_seconds)
+        return total
+
+    def downsample_system_metrics(self) -> int:
+        """
+        Replace old system metrics samples by one row per pipeline and bucket.
+
+        Samples are processed up to ``downsample_after_hours`` ago, one
+        bucket-aligned window per transaction; a watermark in
+        ``retention_state`` remembers how far downsampling went.
+
+        Returns:
+            int: Number of raw samples replaced.
+        """
+        if self.downsample_after_hours is None:
+            return 0
+        self._run(
+            "CREATE TABLE IF NOT EXISTS retention_state (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        bucket = self.bucket_seconds
+        cutoff = _to_epoch(datetime.now() - timedelta(hours=self.downsample_after_hours))
+        cutoff -= cutoff % bucket
+        _, state = self._select("SELECT value FROM retention_state WHERE name = 'system_metrics_downsampled'")
+        if state:
+            start = int(state[0][0])
+        else:
+            _, first = self._select("SELECT MIN(recorded_at) FROM system_metrics")
+            if first[0][0] is None:
+                return 0
+            start = _to_epoch(datetime.fromisoformat(first[0][0]))
+            start -= start % bucket
+        columns = list(_SYSTEM_METRICS_AGGREGATES)
+        aggregates = ", ".join(f"{fn}({c})" for c, fn in _SYSTEM_METRICS_AGGREGATES.items())
+        bucket_expr = f"(CAST(strftime('%s', recorded_at) AS INTEGER) / {bucket}) * {bucket}"
+        replaced = 0
+        # Windows of a few buckets keep each transaction short
+        window = bucket * max(1, self.batch_size // 100)
+        while start < cutoff and not self._stop.is_set():
+            end = min(start + window, cutoff)
+            lower, upper = _from_epoch(start), _from_epoch(end)
+            from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+            with _db_lock:
+                conn = self.db._get_connection()  # pylint: disable=protected-access
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+                try:
+                    rows = conn.execute(
+                        f"SELECT pipeline_id, {aggregates}, {bucket_expr}, COUNT(*), MAX(id) FROM system_metrics "
+                        "WHERE recorded_at >= ? AND recorded_at < ? GROUP BY pipeline_id, 8",
+                        (lower, upper),
+                    ).fetchall()
+                    if rows:
+                        max_id = max(row[9] for row in rows)
+                        conn.execute(
+                            "DELETE FROM system_metrics WHERE recorded_at >= ? AND recorded_at < ? AND id <= ?",
+                            (lower, upper, max_id),
+                        )
+                        conn.executemany(
+                            f"INSERT INTO system_metrics (pipeline_id, {', '.join(columns)}, recorded_at) "
+                            f"VALUES ({', '.join('?' * (len(columns) + 2))})",
+                            [(*row[:7], _from_epoch(row[7])) for row in rows],
+                        )
+                        replaced += sum(row[8] for row in rows)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO retention_state (name, value) VALUES ('system_metrics_downsampled', ?)",
+                        (str(end),),
+                    )
+                except BaseException:
+                    conn.rollback()
+                    raise
+                conn.commit()
+            start = end
+            time.sleep(self.pause_seconds)
+        return replaced
+
+    def vacuum(self, pages: int = 1000) -> None:
+        """
+        Return free pages to the file system, if incremental vacuum is enabled.
+
+        Args:
+            pages: Maximum number of pages to free.
+        """
+        _, mode = self._select("PRAGMA auto_vacuum")
+        if mode[0][0] == 2:
+            self._run(f"PRAGMA incremental_vacuum({int(pages)})")
+
+    def enable_incremental_vacuum(self) -> None:
+        """
+        Switch the database to incremental auto-vacuum.
+
+        This rewrites the whole file once (``VACUUM``), so run it during a
+        maintenance window.
+        """
+        from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+        with _db_lock:
+            conn = self.db._get_connection()  # pylint: disable=protected-access
+            if conn.in_transaction:
+                conn.commit()
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+
+    def run_once(self) -> Dict[str, int]:
+        """
+        Downsample system metrics, apply every policy and vacuum.
+
+        Returns:
+            Dict[str, int]: Rows handled by table ("system_metrics_downsampled"
+                for the downsampled samples).
+        """
+        result = {"system_metrics_downsampled": self.downsample_system_metrics()}
+        for policy in self.policies:
+            result[policy.table] = result.get(policy.table, 0) + self.expire(policy)
+        self.vacuum()
+        return result
+
+    def start(self, interval_seconds: float = 3600) -> None:
+        """
+        Run ``run_once`` periodically in a background thread.
+
+        Args:
+            interval_seconds: Time between two runs.
+        """
+        self._stop.clear()
+
+        def loop() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.warning("Tracking retention failed: %s", e)
+                self._stop.wait(interval_seconds)
+
+        self._thread = threading.Thread(target=loop, name="wpipe_tracking_retention", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread after its current batch."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,335 @@
+"""
+Incrementally maintained aggregates for the dashboard.
+
+The ``rollups`` table holds, per entity (pipeline or step name), the
+number of runs, successes and errors, the count, sum, min and max of
+successful run durations and a quantile sketch of those durations, both
+all-time (``day = '*'``) and per day of the run start. All-time rows also
+count the runs still in progress. The tracker adds the deltas of every
+start and completion, so dashboard queries read a few pre-aggregated rows
+instead of scanning the history.
+``rebuild`` recomputes the table from the ``pipelines`` and ``steps``
+tables, e.g. after an upgrade or a manual cleanup.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .queries import fetch_rows
+from .sketch import QuantileSketch
+
+ALL_TIME = "*"
+
+# Delta layout: running, runs, success, errors, duration_count, duration_sum, duration_min, duration_max,
+# duration sketch
+_Delta = List[Any]
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS rollups (
+    entity_type TEXT NOT NULL,
+    entity_name TEXT NOT NULL,
+    day TEXT NOT NULL,
+    running INTEGER NOT NULL DEFAULT 0,
+    runs INTEGER NOT NULL DEFAULT 0,
+    success INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    duration_count INTEGER NOT NULL DEFAULT 0,
+    duration_sum REAL NOT NULL DEFAULT 0,
+    duration_min REAL,
+    duration_max REAL,
+    sketch BLOB,
+    PRIMARY KEY (entity_type, entity_name, day)
+)
+"""
+
+_UPSERT = """
+INSERT INTO rollups (entity_type, entity_name, day, running, runs, success, errors,
+                     duration_count, duration_sum, duration_min, duration_max, sketch)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (entity_type, entity_name, day) DO UPDATE SET
+    running = running + excluded.running,
+    runs = runs + excluded.runs,
+    success = success + excluded.success,
+    errors = errors + excluded.errors,
+    duration_count = duration_count + excluded.duration_count,
+    duration_sum = duration_sum + excluded.duration_sum,
+    duration_min = CASE WHEN duration_min IS NULL OR excluded.duration_min < duration_min
+                   THEN excluded.duration_min ELSE duration_min END,
+    duration_max = CASE WHEN duration_max IS NULL OR excluded.duration_max > duration_max
+                   THEN excluded.duration_max ELSE duration_max END,
+    sketch = COALESCE(excluded.sketch, sketch)
+"""
+
+# Sources of ``rebuild``: table, name column, start column, duration column
+_SOURCES = {
+    "pipeline": ("pipelines", "name", "started_at", "total_duration_ms"),
+    "step": ("steps", "step_name", "started_at", "duration_ms"),
+}
+
+
+class RollupManager:
+    """
+    Maintains the ``rollups`` table.
+
+    Deltas are accumulated in memory and written by ``flush`` (or by the
+    step write buffer, inside its own transaction, through ``write``).
+    """
+
+    def __init__(self, db: Any) -> None:
+        """
+        Initialize the manager.
+
+        Args:
+            db: Database accessor of any table of the tracking database.
+        """
+        self.db = db
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str, str], _Delta] = {}
+        self._table_ready = False
+
+    def _delta(self, entity_type: str, name: str, day: str) -> _Delta:
+        key = (entity_type, name, day)
+        delta = self._pending.get(key)
+        if delta is None:
+            delta = self._pending[key] = [0, 0, 0, 0, 0, 0.0, None, None, None]
+        return delta
+
+    def started(self, entity_type: str, name: str) -> None:
+        """
+        Count a run in progress.
+
+        Args:
+            entity_type: "pipeline" or "step".
+            name: Pipeline or step name.
+        """
+        with self._lock:
+            self._delta(entity_type, name, ALL_TIME)[0] += 1
+
+    def finished(
+        self,
+        entity_type: str,
+        name: str,
+        started_at: Optional[str],
+        status: str,
+        duration_ms: Optional[float],
+    ) -> None:
+        """
+        Count a finished run (previously counted by ``started``).
+
+        Args:
+            entity_type: "pipeline" or "step".
+            name: Pipeline or step name.
+            started_at: ISO start time of the run, which selects its day.
+            status: Final status ("completed" or "error").
+            duration_ms: Duration of the run.
+        """
+        with self._lock:
+            self._delta(entity_type, name, ALL_TIME)[0] -= 1
+            days = [ALL_TIME, started_at[:10]] if started_at else [ALL_TIME]
+            for day in days:
+                delta = self._delta(entity_type, name, day)
+                delta[1] += 1
+                if status == "error":
+                    delta[3] += 1
+                elif status == "completed":
+                    delta[2] += 1
+                    if duration_ms is not None:
+                        delta[4] += 1
+                        delta[5] += duration_ms
+                        delta[6] = duration_ms if delta[6] is None else min(delta[6], duration_ms)
+                        delta[7] = duration_ms if delta[7] is None else max(delta[7], duration_ms)
+                        if delta[8] is None:
+                            delta[8] = QuantileSketch()
+                        delta[8].add(duration_ms)
+
+    def _ensure_table(self, conn: Any) -> None:
+        if not self._table_ready:
+            conn.execute(_CREATE_TABLE)
+            columns = [info[1] for info in conn.execute("PRAGMA table_info(rollups)")]
+            if "sketch" not in columns:
+                conn.execute("ALTER TABLE rollups ADD COLUMN sketch BLOB")
+            self._table_ready = True
+
+    @staticmethod
+    def _merged_sketches(
+        conn: Any, pending: Dict[Tuple[str, str, str], _Delta]
+    ) -> Dict[Tuple[str, str, str], bytes]:
+        """Merge pending sketch deltas into the stored sketches of the same rows."""
+        merged = {}
+        for key, delta in pending.items():
+            if delta[8] is None:
+                continue
+            row = conn.execute(
+                "SELECT sketch FROM rollups WHERE entity_type = ? AND entity_name = ? AND day = ?", key
+            ).fetchone()
+            sketch = QuantileSketch()
+            if row is not None and row[0] is not None:
+                sketch = QuantileSketch.from_bytes(row[0])
+            sketch.merge(delta[8])
+            merged[key] = sketch.to_bytes()
+        return merged
+
+    def write(self, conn: Any) -> None:
+        """
+        Write the pending deltas on a connection, inside the caller's transaction.
+
+        Args:
+            conn: SQLite connection of the tracking database.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            self._ensure_table(conn)
+            sketches = self._merged_sketches(conn, pending)
+            conn.executemany(
+                _UPSERT, [(*key, *delta[:8], sketches.get(key)) for key, delta in pending.items()]
+            )
+        except BaseException:
+            with self._lock:
+                for key, delta in pending.items():
+                    self._merge(self._delta(*key), delta)
+            raise
+
+    @staticmethod
+    def _merge(target: _Delta, delta: _Delta) -> None:
+        for i in range(6):
+            target[i] += delta[i]
+        if delta[6] is not None:
+            target[6] = delta[6] if target[6] is None else min(target[6], delta[6])
+        if delta[7] is not None:
+            target[7] = delta[7] if target[7] is None else max(target[7], delta[7])
+        if delta[8] is not None:
+            if target[8] is None:
+                target[8] = QuantileSketch()
+            target[8].merge(delta[8])
+
+    def flush(self) -> None:
+        """Write the pending deltas on the shared connection."""
+        from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+        if not self._pending:
+            return
+        with _db_lock:
+            conn = self.db._get_connection()  # pylint: disable=protected-access
+            # Sketches are read, merged and rewritten: hold the write lock
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            self.write(conn)
+
+    def rebuild(self) -> None:
+        """Recompute every rollup from the pipelines and steps tables."""
+        from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+        with _db_lock:
+            conn = self.db._get_connection()  # pylint: disable=protected-access
+            with self._lock:
+                self._pending.clear()
+            self._ensure_table(conn)
+            conn.execute("DELETE FROM rollups")
+            for entity_type, (table, name, started, duration) in _SOURCES.items():
+                for day in (f"'{ALL_TIME}'", f"substr({started}, 1, 10)"):
+                    conn.execute(
+                        f"""
+                        INSERT INTO rollups
+                        SELECT '{entity_type}', {name}, {day},
+                            SUM(status = 'running') * ({day} = '{ALL_TIME}'),
+                            SUM(status != 'running'),
+                            SUM(status = 'completed'),
+                            SUM(status = 'error'),
+                            SUM(status = 'completed' AND {duration} IS NOT NULL),
+                            TOTAL(CASE WHEN status = 'completed' THEN {duration} END),
+                            MIN(CASE WHEN status = 'completed' THEN {duration} END),
+                            MAX(CASE WHEN status = 'completed' THEN {duration} END),
+                            NULL
+                        FROM {table}
+                        WHERE {day} IS NOT NULL
+                        GROUP BY {name}, {day}
+                        """
+                    )
+                self._rebuild_sketches(conn, entity_type, table, name, started, duration)
+            conn.commit()
+
+    @staticmethod
+    def _rebuild_sketches(
+        conn: Any, entity_type: str, table: str, name: str, started: str, duration: str
+    ) -> None:
+        """Recompute the sketches of one entity type from its raw durations."""
+        sketches: Dict[Tuple[str, str], QuantileSketch] = {}
+        cursor = conn.execute(
+            f"SELECT {name}, substr({started}, 1, 10), {duration} FROM {table} "
+            f"WHERE status = 'completed' AND {duration} IS NOT NULL"
+        )
+        for entity_name, day, value in cursor:
+            for key in ((entity_name, ALL_TIME), (entity_name, day)):
+                if key[1] is not None:
+                    sketches.setdefault(key, QuantileSketch()).add(value)
+        conn.executemany(
+            "UPDATE rollups SET sketch = ? WHERE entity_type = ? AND entity_name = ? AND day = ?",
+            [(sketch.to_bytes(), entity_type, *key) for key, sketch in sketches.items()],
+        )
+
+    def sketches(
+        self, entity_type: str, name: Optional[str] = None, since: Optional[str] = None
+    ) -> Dict[str, QuantileSketch]:
+        """
+        Get the duration sketches of an entity type, merged over days.
+
+        Args:
+            entity_type: "pipeline" or "step".
+            name: Only this entity name.
+            since: Merge the daily sketches from this date (YYYY-MM-DD);
+                None uses the all-time sketches.
+
+        Returns:
+            Dict[str, QuantileSketch]: Sketch by entity name.
+        """
+        rows = self.read(entity_type, day=ALL_TIME if since is None else None, since=since, name=name)
+        result: Dict[str, QuantileSketch] = {}
+        for row in rows:
+            if row["sketch"] is not None:
+                result.setdefault(row["entity_name"], QuantileSketch()).merge(
+                    QuantileSketch.from_bytes(row["sketch"])
+                )
+        return result
+
+    def read(
+        self,
+        entity_type: str,
+        day: Optional[str] = ALL_TIME,
+        since: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Read rollup rows, with pending deltas written first.
+
+        Args:
+            entity_type: "pipeline" or "step".
+            day: Only rows of this day (``ALL_TIME`` for all-time rows, None
+                for every daily row).
+            since: With ``day=None``, only days from this date (YYYY-MM-DD).
+            name: Only rows of this entity name.
+
+        Returns:
+            List of rollup rows as dictionaries.
+        """
+        from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+        with _db_lock:
+            self.flush()
+            self._ensure_table(self.db._get_connection())  # pylint: disable=protected-access
+        where, params = ["entity_type = ?"], [entity_type]
+        if day is None:
+            where.append("day != ?")
+            params.append(ALL_TIME)
+            if since is not None:
+                where.append("day >= ?")
+                params.append(since)
+        else:
+            where.append("day = ?")
+            params.append(day)
+        if name is not None:
+            where.append("entity_name = ?")
+            params.append(name)
+        return fetch_rows(self.db, f"SELECT * FROM rollups WHERE {' AND '.join(where)}", params)
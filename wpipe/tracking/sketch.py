@@ -0,0 +1,139 @@
+"""
+Mergeable quantile sketch for duration percentiles.
+
+A DDSketch: values are counted in logarithmic buckets, so any quantile is
+answered within a fixed relative error (1% by default) from a few hundred
+counters, whatever the number of values. Two sketches with the same
+accuracy merge by adding their bucket counts, which lets daily sketches be
+combined into "p99 over the last 7 days" without reading raw durations.
+"""
+
+import json
+import math
+import zlib
+from typing import Dict, Iterable, Optional
+
+
+class QuantileSketch:
+    """
+    Logarithmic-bucket quantile sketch for positive values.
+
+    Attributes:
+        relative_accuracy (float): Maximum relative error of a quantile.
+        max_buckets (int): Maximum number of buckets; beyond it the lowest
+            buckets are collapsed, trading accuracy on the smallest values.
+        count (int): Number of values added.
+    """
+
+    # Values at or below this are counted as zero
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048) -> None:
+        """
+        Initialize an empty sketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of a quantile.
+            max_buckets: Maximum number of buckets kept.
+        """
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: Dict[int, int] = {}
+        self._zero = 0
+        self.count = 0
+
+    def add(self, value: float, count: int = 1) -> None:
+        """
+        Add a value.
+
+        Args:
+            value: The value (negative values are counted as zero).
+            count: Number of occurrences.
+        """
+        self.count += count
+        if value <= self.MIN_VALUE:
+            self._zero += count
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + count
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def update(self, values: Iterable[float]) -> None:
+        """Add several values."""
+        for value in values:
+            self.add(value)
+
+    def _collapse(self) -> None:
+        """Merge the lowest buckets into one to respect ``max_buckets``."""
+        keys = sorted(self._buckets)
+        excess = keys[: len(keys) - self.max_buckets + 1]
+        self._buckets[keys[len(excess)]] += sum(self._buckets.pop(k) for k in excess)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """
+        Add the values of another sketch.
+
+        Args:
+            other: A sketch with the same relative accuracy.
+
+        Raises:
+            ValueError: If the accuracies differ.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracies")
+        for index, count in other._buckets.items():  # pylint: disable=protected-access
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self._zero += other._zero  # pylint: disable=protected-access
+        self.count += other.count
+        while len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: The quantile, between 0 and 1 (0.99 for p99).
+
+        Returns:
+            Optional[float]: The estimate, None if the sketch is empty.
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self._zero
+        if seen > rank:
+            return 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen > rank:
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._buckets) / (self._gamma + 1)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the sketch to a compact blob."""
+        keys = sorted(self._buckets)
+        data = [self.relative_accuracy, self._zero, keys, [self._buckets[k] for k in keys]]
+        return zlib.compress(json.dumps(data, separators=(",", ":")).encode())
+
+    @classmethod
+    def from_bytes(cls, blob: bytes, max_buckets: int = 2048) -> "QuantileSketch":
+        """
+        Load a sketch serialized by ``to_bytes``.
+
+        Args:
+            blob: The serialized sketch.
+            max_buckets: Maximum number of buckets of the loaded sketch.
+
+        Returns:
+            QuantileSketch: The sketch.
+        """
+        accuracy, zero, keys, counts = json.loads(zlib.decompress(blob))
+        sketch = cls(accuracy, max_buckets)
+        sketch._zero = zero  # pylint: disable=protected-access
+        sketch._buckets = dict(zip(keys, counts))  # pylint: disable=protected-access
+        sketch.count = zero + sum(counts)
+        return sketch
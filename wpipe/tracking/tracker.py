@@ -4,10 +4,10 @@ wpipe Pipeline Tracker - Professional Execution Tracking System using WSQLite.
 
 import json
 import os
-import sqlite3
 import uuid
+import weakref
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 import yaml
 from wsqlite import WSQLite
@@ -15,6 +15,7 @@ from wsqlite import WSQLite
 from wpipe.sqlite.tables_dto.tracker_models import (
     AlertConfigModel,
     AlertFiredModel,
+    CacheStatsModel,
     ComparisonModel,
     EventModel,
     PerformanceStatsModel,
@@ -28,7 +29,13 @@ from wpipe.util.transform import object_to_dict
 
 from .alerts import AlertManager
 from .analysis import AnalysisManager
+from .buffer import StepBuffer
+from .live import get_bus
+from .migrations import ensure_schema, set_search_payload_keys
+from .pool import ReadPool, register_pool
 from .queries import QueryManager
+from .retention import RetentionManager, RetentionPolicy, delete_pipelines
+from .rollups import RollupManager
 
 
 def _safe_json_dumps(data: Any) -> str:
@@ -134,6 +141,10 @@ class system_metrics(SystemMetricsModel):
 
 class comparisons(ComparisonModel):
     """Comparisons table model."""
+
+
+class cache_stats(CacheStatsModel):
+    """Step cache statistics table model."""
 # pylint: enable=invalid-name
 
 
@@ -142,16 +153,42 @@ class PipelineTracker:
     Unified Pipeline Tracker.
 
     Orchestrates registration, step tracking, alerts, and dashboard queries.
+
+    In buffered mode step rows are kept in memory and written in batches by
+    a background thread (see ``StepBuffer``); ``start_step`` then returns a
+    provisional negative id. Pending rows are flushed when a pipeline
+    completes, on ``flush`` and at interpreter exit. Other readers of the
+    database may see running steps up to ``flush_interval`` late.
     """
 
     # pylint: disable=too-many-instance-attributes
-    def __init__(self, db_path: str, config_dir: Optional[str] = None):
+    def __init__(
+        self,
+        db_path: str,
+        config_dir: Optional[str] = None,
+        buffered: bool = False,
+        flush_records: int = 500,
+        flush_interval: float = 0.2,
+        error_rate_runs: int = 100,
+        error_rate_minutes: Optional[float] = None,
+        read_pool_size: int = 0,
+        search_output_keys: Optional[Sequence[str]] = None,
+    ):
         """
         Initialize the PipelineTracker.
 
         Args:
             db_path: Path to the SQLite database.
             config_dir: Directory to store pipeline configurations.
+            buffered: Buffer step writes in memory and flush them in batches.
+            flush_records: Pending records that trigger a flush (buffered mode).
+            flush_interval: Maximum seconds a record stays pending (buffered mode).
+            error_rate_runs: Recent pipeline runs the ``error_rate`` alert metric covers.
+            error_rate_minutes: Only runs of the last minutes count for ``error_rate``.
+            read_pool_size: If set, dashboard queries of this process run on a
+                pool of this many read-only connections (see ``ReadPool``).
+            search_output_keys: Keys of step outputs to index for search (see
+                ``set_search_output_keys``); None keeps the database's setting.
         """
         self.db_path = db_path
         self.config_dir = os.path.abspath(config_dir or "pipeline_configs")
@@ -168,15 +205,37 @@ class PipelineTracker:
         self.db_pipeline_relations = WSQLite(pipeline_relations, db_path)
         self.db_system_metrics = WSQLite(system_metrics, db_path)
         self.db_comparisons = WSQLite(comparisons, db_path)
+        self.db_cache_stats = WSQLite(cache_stats, db_path)
+
+        self._ensure_schema_up_to_date()
+        if search_output_keys is not None:
+            self.set_search_output_keys(search_output_keys)
 
-        # Deferred - called on first use instead of at import time
-        # self._ensure_schema_up_to_date()
+        self.read_pool: Optional[ReadPool] = None
+        if read_pool_size:
+            self.read_pool = ReadPool(db_path, read_pool_size)
+            register_pool(self.read_pool)
 
         self._alert_hooks: Dict[str, List[str]] = {}
+        self.live = get_bus(db_path)
+
+        self.rollups = RollupManager(self.db_pipelines)
+        self._buffer: Optional[StepBuffer] = None
+        if buffered:
+            self._buffer = StepBuffer(
+                self.db_steps, self.db_step_history, flush_records, flush_interval, self.rollups
+            )
+            weakref.finalize(self, self._buffer.close)
 
         # specialized Managers
         self.alerts = AlertManager(
-            self.db_alerts_config, self.db_alerts_fired, self._alert_hooks
+            self.db_alerts_config,
+            self.db_alerts_fired,
+            self._alert_hooks,
+            error_rate_runs=error_rate_runs,
+            error_rate_minutes=error_rate_minutes,
+            live=self.live,
+            db_pipelines=self.db_pipelines,
         )
         self.queries = QueryManager(
             self.db_pipelines,
@@ -186,7 +245,11 @@ class PipelineTracker:
             self.db_events,
         )
         self.analysis = AnalysisManager(
-            self.db_pipelines, self.db_steps, self.db_step_history, self.db_alerts_fired
+            self.db_pipelines,
+            self.db_steps,
+            self.db_step_history,
+            self.db_alerts_fired,
+            self.rollups,
         )
 
         # Set this tracker as the active one for Metric.record utility
@@ -208,6 +271,10 @@ class PipelineTracker:
         """Delegate to queries manager."""
         return self.queries.get_pipeline(*args, **kwargs)
 
+    def get_step(self, *args, **kwargs) -> Optional[Dict[str, Any]]:
+        """Delegate to queries manager."""
+        return self.queries.get_step(*args, **kwargs)
+
     def get_stats(self, *args, **kwargs) -> Dict[str, Any]:
         """Delegate to analysis manager."""
         return self.analysis.get_stats(*args, **kwargs)
@@ -220,6 +287,10 @@ class PipelineTracker:
         """Delegate to analysis manager."""
         return self.analysis.get_top_slow_steps(*args, **kwargs)
 
+    def get_step_durations(self, *args, **kwargs) -> Dict[str, float]:
+        """Delegate to analysis manager."""
+        return self.analysis.get_step_durations(*args, **kwargs)
+
     def get_events(self, *args, **kwargs) -> List[Dict[str, Any]]:
         """Delegate to queries manager."""
         return self.queries.get_events(*args, **kwargs)
@@ -240,9 +311,17 @@ class PipelineTracker:
         """Delegate to analysis manager."""
         return self.analysis.get_pipelines_analysis(*args, **kwargs)
 
-    def get_table_data(self, *args, **kwargs) -> Dict[str, Any]:
+    def get_percentiles(self, *args, **kwargs) -> Dict[str, Dict[str, Any]]:
         """Delegate to analysis manager."""
-        return self.analysis.get_table_data(*args, **kwargs)
+        return self.analysis.get_percentiles(*args, **kwargs)
+
+    def get_table_data(self, *args, **kwargs) -> Dict[str, Any]:
+        """Delegate to queries manager."""
+        return self.queries.get_table_data(*args, **kwargs)
+
+    def search(self, *args, **kwargs) -> List[Dict[str, Any]]:
+        """Delegate to queries manager."""
+        return self.queries.search(*args, **kwargs)
 
     def get_pipeline_executions(self, *args, **kwargs) -> List[Dict[str, Any]]:
         """Delegate to queries manager."""
@@ -307,6 +386,9 @@ class PipelineTracker:
             yaml_path=yaml_path,
         )
         self.db_pipelines.insert(model)
+        self.rollups.started("pipeline", name)
+        self.rollups.flush()
+        self._publish("pipeline", pipeline_id, name=name, status="running", started_at=model.started_at)
         if kwargs.get("parent_pipeline_id"):
             self.link_pipelines(str(kwargs.get("parent_pipeline_id")), pipeline_id)
         return {"pipeline_id": pipeline_id, "yaml_path": yaml_path}
@@ -330,6 +412,7 @@ class PipelineTracker:
         Returns:
             List of fired alert hooks.
         """
+        self.flush()
         pipeline_records = self.db_pipelines.get_by_field(id=pipeline_id)
         if not pipeline_records:
             return []
@@ -343,8 +426,20 @@ class PipelineTracker:
         model.error_message = error_message
         model.error_step = error_step
         self.db_pipelines.update(pipeline_id, model)
+        self.rollups.finished("pipeline", model.name, model.started_at, model.status, duration_ms)
+        self.rollups.flush()
+        self._publish(
+            "pipeline",
+            pipeline_id,
+            name=model.name,
+            status=model.status,
+            started_at=model.started_at,
+            completed_at=model.completed_at,
+            total_duration_ms=duration_ms,
+            error_message=error_message,
+        )
         return self.alerts.check_pipeline_alerts(
-            pipeline_id, model.name, model.status, duration_ms, self.db_pipelines
+            pipeline_id, model.name, model.status, duration_ms, completed_at=model.completed_at
         )
 
     def start_step(
@@ -360,7 +455,8 @@ class PipelineTracker:
             **kwargs: Additional metadata (step_version, step_type, parent_step_id, parallel_group, input_data).
 
         Returns:
-            The ID of the inserted step record.
+            The ID of the inserted step record (a provisional negative id in
+            buffered mode).
         """
         model = StepModel(
             pipeline_id=pipeline_id,
@@ -377,7 +473,24 @@ class PipelineTracker:
                 else None
             ),
         )
-        return self.db_steps.insert(model)
+        self.rollups.started("step", step_name)
+        if self._buffer is not None:
+            row = model.model_dump()
+            row.pop("id", None)
+            step_id = self._buffer.start(row)
+        else:
+            step_id = self.db_steps.insert(model)
+            self.rollups.flush()
+        self._publish(
+            "step",
+            step_id,
+            pipeline_id=pipeline_id,
+            step_name=step_name,
+            step_order=step_order,
+            status="running",
+            started_at=model.started_at,
+        )
+        return step_id
 
     def complete_step(
         self,
@@ -400,6 +513,10 @@ class PipelineTracker:
         Returns:
             List of fired alert hooks.
         """
+        if self._buffer is not None and self._buffer.owns(step_id):
+            return self._complete_buffered_step(
+                step_id, output_data, error_message, error_traceback, pipeline_id
+            )
         step_records = self.db_steps.get_by_field(id=step_id)
         if not step_records:
             return []
@@ -421,10 +538,94 @@ class PipelineTracker:
             status=model.status,
         )
         self.db_step_history.insert(history)
+        self.rollups.finished("step", model.step_name, model.started_at, model.status, duration_ms)
+        self.rollups.flush()
+        self._publish_step_end(step_id, model.model_dump())
         return self.alerts.check_step_alerts(
             pipeline_id or model.pipeline_id, model.step_name, duration_ms
         )
 
+    def _complete_buffered_step(
+        self,
+        step_id: int,
+        output_data: Optional[Dict[str, Any]],
+        error_message: Optional[str],
+        error_traceback: Optional[str],
+        pipeline_id: Optional[str],
+    ) -> List[str]:
+        """Complete a step whose row is still held by the write buffer."""
+        assert self._buffer is not None
+        completed_at = datetime.now()
+        row = self._buffer.get(step_id)
+        if row is None:
+            return []
+        duration_ms = (completed_at - datetime.fromisoformat(row["started_at"])).total_seconds() * 1000
+        status = "error" if error_message else "completed"
+        row = self._buffer.complete(
+            step_id,
+            {
+                "status": status,
+                "completed_at": completed_at.isoformat(),
+                "duration_ms": duration_ms,
+                "output_data": _safe_json_dumps(output_data) if output_data else None,
+                "error_message": error_message,
+                "error_traceback": error_traceback,
+            },
+            StepHistoryModel(
+                pipeline_id=pipeline_id or row["pipeline_id"],
+                step_name=row["step_name"],
+                duration_ms=duration_ms,
+                status=status,
+            ).model_dump(exclude={"id"}),
+        )
+        if row is None:
+            return []
+        self.rollups.finished("step", row["step_name"], row["started_at"], status, duration_ms)
+        self._publish_step_end(step_id, row)
+        return self.alerts.check_step_alerts(pipeline_id or row["pipeline_id"], row["step_name"], duration_ms)
+
+    def _publish(self, kind: str, entity_id: Any, **data: Any) -> None:
+        """Publish a delta to the live bus, if anyone listens."""
+        if self.live.has_subscribers:
+            self.live.publish(kind, entity_id, data)
+
+    def _publish_step_end(self, step_id: Any, row: Dict[str, Any]) -> None:
+        if self.live.has_subscribers:
+            self._publish(
+                "step",
+                step_id,
+                **{
+                    k: row.get(k)
+                    for k in (
+                        "pipeline_id", "step_name", "step_order", "status", "started_at", "completed_at",
+                        "duration_ms", "error_message",
+                    )
+                },
+            )
+
+    def flush(self) -> None:
+        """Write buffered step records and rollup deltas now."""
+        if self._buffer is not None:
+            self._buffer.flush()
+        self.rollups.flush()
+
+    def rebuild_rollups(self) -> None:
+        """Recompute the dashboard rollups from the pipelines and steps tables."""
+        self.flush()
+        self.rollups.rebuild()
+
+    def resolve_step_id(self, step_id: Any) -> Any:
+        """
+        Get the database id of a step.
+
+        Args:
+            step_id: The id returned by ``start_step``.
+
+        Returns:
+            The database id (None for a buffered step not flushed yet).
+        """
+        return self._buffer.resolve(step_id) if self._buffer is not None else step_id
+
     def link_pipelines(
         self, parent_id: str, child_id: str, relation_type: str = "triggered"
     ) -> None:
@@ -462,7 +663,17 @@ class PipelineTracker:
             data=_safe_json_dumps(kwargs.get("data")) if kwargs.get("data") else None,
             tags=_safe_json_dumps(kwargs.get("tags")) if kwargs.get("tags") else None,
         )
-        self.db_events.insert(model)
+        event_id = self.db_events.insert(model)
+        self._publish(
+            "event",
+            event_id,
+            pipeline_id=pipeline_id,
+            step_id=model.step_id,
+            event_type=event_type,
+            event_name=event_name,
+            message=model.message,
+            created_at=model.created_at,
+        )
 
     def record_system_metrics(self, pipeline_id: str, metrics: Dict[str, Any]) -> None:
         """
@@ -483,6 +694,50 @@ class PipelineTracker:
         )
         self.db_system_metrics.insert(model)
 
+    def record_cache_stats(self, pipeline_id: str, stats: Dict[str, Dict[str, int]]) -> None:
+        """
+        Record the step cache counters of a pipeline run.
+
+        Args:
+            pipeline_id: Unique pipeline identifier.
+            stats: Counters by step name ({"hits", "misses", "evictions"}).
+        """
+        for step_name, counters in stats.items():
+            model = CacheStatsModel(
+                pipeline_id=pipeline_id,
+                step_name=step_name,
+                hits=counters.get("hits", 0),
+                misses=counters.get("misses", 0),
+                evictions=counters.get("evictions", 0),
+            )
+            self.db_cache_stats.insert(model)
+
+    def get_cache_stats(self, pipeline_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Get step cache counters, summed per step.
+
+        Args:
+            pipeline_id: Optional pipeline ID to restrict the stats to one run.
+
+        Returns:
+            Dictionary of {"hits", "misses", "evictions", "hit_rate"} by step name.
+        """
+        rows = (
+            self.db_cache_stats.get_by_field(pipeline_id=pipeline_id)
+            if pipeline_id
+            else self.db_cache_stats.get_all()
+        )
+        result: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            totals = result.setdefault(row.step_name, {"hits": 0, "misses": 0, "evictions": 0})
+            totals["hits"] += row.hits
+            totals["misses"] += row.misses
+            totals["evictions"] += row.evictions
+        for totals in result.values():
+            lookups = totals["hits"] + totals["misses"]
+            totals["hit_rate"] = round(totals["hits"] / lookups, 4) if lookups else 0.0
+        return result
+
     def acknowledge_alert(self, alert_id: int) -> Dict[str, str]:
         """
         Acknowledge a fired alert.
@@ -498,30 +753,65 @@ class PipelineTracker:
             self.db_alerts_fired.update(alert_id, alert_records[0])
         return {"status": "success"}
 
-    def get_pipeline_graph(self, pipeline_id: str) -> Dict[str, Any]:
+    def get_pipeline_graph(
+        self, pipeline_id: str, expand: Optional[List[int]] = None, collapse_over: int = 20
+    ) -> Dict[str, Any]:
         """
         Get pipeline data formatted for graph visualization with full metadata.
 
+        The graph is built in one pass over the step summaries (payloads are
+        not read). ``For`` and ``Parallel`` blocks with more than
+        ``collapse_over`` direct children are collapsed: their steps are left
+        out and the block node carries ``hidden_steps``, the number, status
+        counts and total duration of the steps it hides.
+
         Args:
             pipeline_id: Unique pipeline identifier.
+            expand: Ids of collapsed blocks to show the children of.
+            collapse_over: Children a block needs to be collapsed (0
+                collapses every block).
 
         Returns:
             Dictionary with nodes and edges for visualization.
         """
-        pipeline = self.get_pipeline(pipeline_id)
+        pipeline = self.queries.get_pipeline(pipeline_id, include_data=False)
         if not pipeline:
             return {"nodes": [], "edges": []}
 
-        nodes = []
-        edges = []
         steps_list = pipeline.get("steps", [])
-
-        for i, step in enumerate(steps_list):
-            output_data = step.get("output_data") or {}
-
-            step_id = step.get("id")
-            if not step_id or step_id == "None" or step_id == "":
-                step_id = step.get("step_order")
+        expanded = set(expand or [])
+        children: Dict[int, int] = {}
+        for step in steps_list:
+            if step.get("parent_step_id"):
+                children[step["parent_step_id"]] = children.get(step["parent_step_id"], 0) + 1
+
+        nodes: List[Dict[str, Any]] = []
+        edges: List[Dict[str, Any]] = []
+        by_id: Dict[int, Dict[str, Any]] = {}
+        # Collapsed block hiding each hidden step
+        hidden_by: Dict[int, int] = {}
+        # Predecessor of the next top-level step
+        prev_top: Optional[Dict[str, Any]] = None
+
+        for step in steps_list:
+            step_id = step["id"]
+            parent_id = step.get("parent_step_id")
+            owner = hidden_by.get(parent_id) if parent_id else None
+            if owner is None and parent_id in by_id and by_id[parent_id]["collapsed"]:
+                owner = parent_id
+            if owner is not None:
+                hidden_by[step_id] = owner
+                hidden = by_id[owner]["hidden_steps"]
+                hidden["count"] += 1
+                hidden["statuses"][step["status"]] = hidden["statuses"].get(step["status"], 0) + 1
+                hidden["duration_ms"] += step.get("duration_ms") or 0
+                continue
+
+            collapsed = (
+                step["step_type"] in ("for", "parallel")
+                and step_id not in expanded
+                and children.get(step_id, 0) > collapse_over
+            )
             node = {
                 "id": f"step_{step_id}",
                 "name": step["step_name"],
@@ -531,61 +821,46 @@ class PipelineTracker:
                 "version": step.get("step_version"),
                 "error": step.get("error_message"),
                 "order": step["step_order"],
-                "parent_step_id": step.get("parent_step_id"),
+                "parent_step_id": parent_id,
                 "parallel_group": step.get("parallel_group"),
-                "branch_taken": (
-                    output_data.get("branch_taken")
-                    if isinstance(output_data, dict)
-                    else None
-                ),
-                "expression": (
-                    output_data.get("expression")
-                    if isinstance(output_data, dict)
-                    else None
-                ),
-                "has_input": step.get("input_data") is not None,
-                "has_output": step.get("output_data") is not None,
+                "branch_taken": step.get("branch_taken"),
+                "expression": step.get("expression"),
+                "has_input": step["has_input"],
+                "has_output": step["has_output"],
+                "collapsed": collapsed,
             }
+            if collapsed:
+                node["hidden_steps"] = {"count": 0, "statuses": {}, "duration_ms": 0}
             nodes.append(node)
+            by_id[step_id] = node
 
             # --- Edge connection logic ---
-            parent_id = step.get("parent_step_id")
-            step_order = step.get("step_order")
-
             if parent_id:
+                parent = by_id.get(parent_id)
                 edges.append({
-                    "from": f"step_{parent_id}" if parent_id else f"step_{step_order}",
+                    "from": f"step_{parent_id}",
                     "to": f"step_{step_id}",
-                    "label": "parallel",
+                    "label": "loop" if parent and parent["type"] == "for" else "parallel",
                     "style": "dashed" if step["status"] == "skipped" else "solid"
                 })
-            elif i > 0:
-                j = i - 1
-                found_prev = None
-                while j >= 0:
-                    cand = steps_list[j]
-                    if not cand.get("parent_step_id"):
-                        found_prev = cand
-                        break
-                    j -= 1
-
-                if found_prev:
-                    prev_id = found_prev.get("id") or found_prev.get("step_order")
-                    prev_order = found_prev.get("step_order")
-                    is_skipped = step["status"] == "skipped" or step["step_type"] == "skipped"
-                    edges.append({
-                        "from": f"step_{prev_id}" if prev_id else f"step_{prev_order}",
-                        "to": f"step_{step_id}",
-                        "label": (
-                            "next" if found_prev["step_type"] != "condition"
-                            else ("taken" if not is_skipped else "skipped")
-                        ),
-                        "style": "solid" if not is_skipped else "dashed",
-                        "color": (
-                            "#10b981" if (found_prev["step_type"] == "condition" and not is_skipped)
-                            else None
-                        )
-                    })
+                continue
+
+            if prev_top is not None:
+                is_skipped = step["status"] == "skipped" or step["step_type"] == "skipped"
+                edges.append({
+                    "from": prev_top["id"],
+                    "to": node["id"],
+                    "label": (
+                        "next" if prev_top["type"] != "condition"
+                        else ("taken" if not is_skipped else "skipped")
+                    ),
+                    "style": "solid" if not is_skipped else "dashed",
+                    "color": (
+                        "#10b981" if (prev_top["type"] == "condition" and not is_skipped)
+                        else None
+                    )
+                })
+            prev_top = node
 
         return {
             "pipeline_id": pipeline_id,
@@ -603,32 +878,46 @@ class PipelineTracker:
         Args:
             pipeline_id: Unique pipeline identifier.
         """
-        self.db_pipelines.delete(pipeline_id)
-        for s in self.db_steps.get_by_field(pipeline_id=pipeline_id):
-            self.db_steps.delete(s.id)
-        for e in self.db_events.get_by_field(pipeline_id=pipeline_id):
-            self.db_events.delete(e.id)
+        from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+        self.flush()
+        with _db_lock:
+            delete_pipelines(self.db_pipelines._get_connection(), [pipeline_id])  # pylint: disable=protected-access
+
+    def apply_retention(
+        self, policies: List[RetentionPolicy], archive_dir: Optional[str] = None, **kwargs: Any
+    ) -> Dict[str, int]:
+        """
+        Archive and delete expired tracking rows once.
+
+        Args:
+            policies: Retention policies to apply.
+            archive_dir: Directory of the compressed archives, None to delete
+                without archiving.
+            **kwargs: Other ``RetentionManager`` options.
+
+        Returns:
+            Dict[str, int]: Rows handled by table.
+        """
+        self.flush()
+        return RetentionManager(self.db_pipelines, policies, archive_dir, **kwargs).run_once()
+
+    def set_search_output_keys(self, keys: Sequence[str]) -> None:
+        """
+        Choose which keys of step outputs full-text search indexes.
+
+        Failed steps are always indexed, but outputs only through these
+        keys, so successful steps cost nothing to index by default. The
+        setting is stored in the database; changing it reindexes the steps.
+
+        Args:
+            keys: Top-level output keys, or JSON paths such as ``$.file.name``.
+        """
+        from wpipe import _db_lock  # pylint: disable=import-outside-toplevel
+
+        with _db_lock:
+            set_search_payload_keys(self.db_steps._get_connection(), "steps", keys)  # pylint: disable=protected-access
 
     def _ensure_schema_up_to_date(self) -> None:
-        """Ensure the database schema is up to date with the latest models."""
-        if not os.path.exists(self.db_path):
-            return
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            for table in ["steps", "stepmodel"]:
-                cursor.execute(f"PRAGMA table_info({table})")
-                columns = [info[1] for info in cursor.fetchall()]
-                if columns:
-                    modified = False
-                    if "parent_step_id" not in columns:
-                        cursor.execute(f"ALTER TABLE {table} ADD COLUMN parent_step_id INTEGER")
-                        modified = True
-                    if "parallel_group" not in columns:
-                        cursor.execute(f"ALTER TABLE {table} ADD COLUMN parallel_group TEXT")
-                        modified = True
-                    if modified:
-                        conn.commit()
-            conn.close()
-        except (sqlite3.Error, AttributeError, RuntimeError, ValueError):
-            pass
+        """Apply the pending schema migrations (see ``wpipe.tracking.migrations``)."""
+        ensure_schema(self.db_pipelines)
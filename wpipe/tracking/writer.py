@@ -0,0 +1,146 @@
+"""
+Background writer for pipeline tracking.
+
+PipelineTracker writes to SQLite synchronously. TrackingWriter runs those
+calls in submission order on a dedicated thread, so callers on an event
+loop only enqueue them. Each call returns a ``concurrent.futures.Future``;
+futures passed as arguments of later calls (e.g. the id returned by
+``start_step`` given to ``complete_step``) are replaced by their result
+when the later call runs, which is always after the earlier one.
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Optional
+
+from wpipe.exception.api_error import logger
+
+_STOP = object()
+
+
+def _resolve(value: Any) -> Any:
+    """Replace a finished future by its result (None if it failed)."""
+    if isinstance(value, Future):
+        return value.result() if value.exception() is None else None
+    return value
+
+
+class TrackingWriter:
+    """
+    Runs tracker calls in order on a background thread.
+
+    Attributes:
+        tracker (PipelineTracker): The tracker whose methods are called.
+    """
+
+    def __init__(self, tracker: Any, max_pending: int = 10000) -> None:
+        """
+        Initialize the writer. The thread starts on first use.
+
+        Args:
+            tracker: The tracker whose methods are called.
+            max_pending: Maximum number of queued calls; ``submit`` blocks
+                beyond it, so a stalled disk cannot grow memory without bound.
+        """
+        self.tracker = tracker
+        self._queue: "queue.Queue[Any]" = queue.Queue(max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self) -> None:
+        """Start the writer thread if it is not running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="wpipe_tracking_writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Writer thread body."""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            future, method, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            if method is None:
+                future.set_result(None)
+                continue
+            try:
+                result = getattr(self.tracker, method)(
+                    *(_resolve(a) for a in args),
+                    **{k: _resolve(v) for k, v in kwargs.items()},
+                )
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning("Tracking call %s failed: %s", method, e)
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def submit(self, method: str, *args: Any, **kwargs: Any) -> Future:
+        """
+        Enqueue a tracker call.
+
+        Args:
+            method: Name of the PipelineTracker method.
+            *args: Positional arguments (futures of earlier calls are resolved).
+            **kwargs: Keyword arguments (futures of earlier calls are resolved).
+
+        Returns:
+            Future: Completes with the call's result once it has run.
+        """
+        self._ensure_thread()
+        future: Future = Future()
+        self._queue.put((future, method, args, kwargs))
+        return future
+
+    async def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a tracker call on the writer thread and await its result.
+
+        Args:
+            method: Name of the PipelineTracker method.
+            *args: Positional arguments.
+            **kwargs: Keyword arguments.
+
+        Returns:
+            Any: The result of the call.
+        """
+        return await asyncio.wrap_future(self.submit(method, *args, **kwargs))
+
+    def _barrier(self) -> Future:
+        """Enqueue a no-op that completes once every earlier call has run."""
+        self._ensure_thread()
+        future: Future = Future()
+        self._queue.put((future, None, (), {}))
+        return future
+
+    async def drain(self) -> None:
+        """Wait, without blocking the event loop, until every queued call has run."""
+        await asyncio.wrap_future(self._barrier())
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """
+        Block until every queued call has run.
+
+        Args:
+            timeout: Maximum time to wait in seconds.
+        """
+        self._barrier().result(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Run the queued calls and stop the writer thread.
+
+        Args:
+            timeout: Maximum time to wait in seconds.
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)